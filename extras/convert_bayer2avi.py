@@ -0,0 +1,58 @@
+"""
+Convert raw Bayer FLIR recordings (``*_flir.bayer``, written with ``capture_format: bayer``) into the ``.avi`` files
+the default ``bgr`` capture mode produces.
+
+Usage::
+
+    python extras/convert_bayer2avi.py PATH [PATH ...] [--fourcc MJPG] [--delete]
+
+Each PATH is a ``.bayer`` file or a folder searched recursively (e.g. a session folder). The video is written next to
+its source with the same base name, so ``<task>_flir.bayer`` becomes ``<task>_flir.avi`` and lines up with the LSL
+``FlirFrameIndex`` stream exactly as a live recording would.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from neurobooth_os.iout.bayer_file import BAYER_EXTENSION, BayerFileException, convert_to_avi
+
+
+def find_bayer_files(paths: Iterable[str]) -> List[Path]:
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(path.rglob(f"*{BAYER_EXTENSION}")))
+        else:
+            files.append(path)
+    return files
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("paths", nargs="+", help="Raw Bayer files, or folders to search for them.")
+    p.add_argument("--fourcc", default="MJPG", help="Codec of the output video (default MJPG, as recorded live).")
+    p.add_argument("--delete", action="store_true", help="Delete each raw file after a complete conversion.")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    failed = 0
+    for path in find_bayer_files(args.paths):
+        try:
+            out_path, n = convert_to_avi(str(path), fourcc=args.fourcc)
+        except (BayerFileException, OSError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"{path} -> {out_path} ({n} frames)")
+        if args.delete:
+            os.remove(path)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""FLIR capture -> save-thread buffering benchmark, driven by synthetic frames.
+
+``VidRec_Flir`` used to hand frames to its MJPG save thread through an
+unbounded ``queue.Queue``; when encoding fell behind the camera, RAM grew
+until the session ended (or the machine swapped). It now uses the
+preallocated ``FrameRing`` (``neurobooth_os/iout/frame_ring.py``). This
+benchmark reproduces the capture/save pair without a camera -- a producer
+emitting frames at the FLIR rate the way ``MockVidRec_Flir`` does, and a
+consumer writing them -- and samples the process RSS while it runs, so the
+two can be compared:
+
+* ``--buffer ring`` (default): memory should plateau at roughly the ring
+  size; overload shows up as drops / blocked time instead.
+* ``--buffer queue``: the old unbounded queue, for the before picture.
+
+The consumer either really encodes MJPG with OpenCV (``--encoder mjpg``) or
+stands in for a slow encoder by sleeping ``--encode-ms`` per frame
+(``--encoder sleep``), which makes "encoding falls behind" reproducible on
+any machine. Like the camera's ``NewestOnly`` buffer mode, a producer that is
+held up skips the frames it missed rather than catching up.
+
+Usage::
+
+    uv run python extras/perf/flir_ring_bench.py \\
+        [--fps 196] [--seconds 60] [--width 1024] [--height 768] \\
+        [--buffer ring|queue] [--capacity 128] [--policy block|drop_newest] \\
+        [--encoder mjpg|sleep] [--encode-ms 6] \\
+        [--out PATH] [--no-json] [--stdout] [--strict]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import psutil
+
+from _baseline_common import (
+    build_envelope,
+    collect_os_identity,
+    os_segment,
+    resolved_log_dir,
+)
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from neurobooth_os.iout.frame_ring import FRAME_RING_POLICIES, FrameRing  # noqa: E402
+
+SCHEMA_NAME = "flir_ring_bench"
+SCHEMA_VERSION = 1
+
+# RSS growth allowed beyond the buffer itself (encoder state, allocator slack).
+_RSS_SLACK_MB = 64.0
+_RSS_SAMPLE_SEC = 0.5
+
+
+class _QueueBuffer:
+    """The pre-FrameRing behaviour: an unbounded queue of per-frame arrays."""
+
+    capacity = None
+    policy = "unbounded"
+
+    def __init__(self):
+        self._q = queue.Queue(0)
+        self._closed = False
+        self.max_depth = 0
+        self.n_put = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def nbytes(self) -> int:
+        return 0
+
+    def put(self, frame, meta=None, timeout=None) -> bool:
+        self._q.put(frame.copy())  # the old imgage_proc returned a fresh array per frame
+        self.n_put += 1
+        self.max_depth = max(self.max_depth, self._q.qsize())
+        return True
+
+    def get(self, timeout=None):
+        try:
+            return None, self._q.get(timeout=timeout), None
+        except queue.Empty:
+            return None
+
+    def release(self, slot) -> None:
+        pass
+
+    def close(self) -> None:
+        self._closed = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {"capacity": None, "policy": self.policy, "frames_queued": self.n_put, "frames_dropped": 0,
+                "max_depth": self.max_depth, "blocked_sec": 0.0, "buffer_mb": None}
+
+
+def summarize(rss_mb: List[float], buffer_mb: Optional[float], slack_mb: float = _RSS_SLACK_MB) -> Dict[str, Any]:
+    """RSS start / peak / growth and whether growth stayed within the buffer size. Pure; the unit-test seam.
+
+    The first sample is taken after the buffer is allocated, so a bounded
+    buffer shows near-zero growth. An unbounded buffer (``buffer_mb=None``)
+    is judged against ``slack_mb`` alone.
+    """
+    if not rss_mb:
+        return {"rss_start_mb": None, "rss_peak_mb": None, "rss_growth_mb": None, "bounded": None}
+    start = rss_mb[0]
+    peak = max(rss_mb)
+    growth = peak - start
+    return {
+        "rss_start_mb": round(start, 1),
+        "rss_peak_mb": round(peak, 1),
+        "rss_growth_mb": round(growth, 1),
+        "bounded": growth <= (buffer_mb or 0.0) + slack_mb,
+    }
+
+
+def derive_verdict(result: Dict[str, Any], fps: float) -> Dict[str, Any]:
+    """OK when memory stayed bounded and the producer kept (almost) the full rate."""
+    reasons: List[str] = []
+    mem = result["memory"]
+    if mem["bounded"] is False:
+        reasons.append(f"RSS grew {mem['rss_growth_mb']} MB during the run; the buffer is not bounding memory.")
+    achieved = result["frames"]["achieved_fps"]
+    if achieved < 0.95 * fps:
+        reasons.append(f"Producer sustained {achieved} fps of {fps} requested.")
+    dropped = result["buffer"]["frames_dropped"]
+    if dropped:
+        reasons.append(f"{dropped} frames dropped by the buffer ({result['buffer']['policy']}).")
+    category = "DEGRADED" if mem["bounded"] is False or achieved < 0.95 * fps else "OK"
+    return {"category": category, "reasons": reasons, "remediation_hints": []}
+
+
+def _make_writer(encoder: str, path: str, fps: float, width: int, height: int, encode_ms: float):
+    if encoder == "sleep":
+        return lambda frame: time.sleep(encode_ms / 1e3), lambda: None
+    import cv2
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    return writer.write, writer.release
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    shape = (args.height, args.width, 3)
+    if args.buffer == "ring":
+        buf = FrameRing(args.capacity, shape, policy=args.policy)
+    else:
+        buf = _QueueBuffer()
+
+    proc = psutil.Process()
+    rss_mb: List[float] = []
+    done = threading.Event()
+
+    def sample_rss():
+        while not done.wait(_RSS_SAMPLE_SEC):
+            rss_mb.append(proc.memory_info().rss / 2 ** 20)
+
+    encode_ms: List[float] = []
+    tmpdir = tempfile.mkdtemp(prefix="flir_ring_bench_")
+    write, release = _make_writer(
+        args.encoder, os.path.join(tmpdir, "bench.avi"), args.fps, args.width, args.height, args.encode_ms,
+    )
+
+    def consume():
+        while True:
+            item = buf.get(timeout=1)
+            if item is None:
+                if buf.closed:
+                    break
+                continue
+            slot, frame, _ = item
+            t0 = time.perf_counter()
+            write(frame)
+            encode_ms.append((time.perf_counter() - t0) * 1e3)
+            buf.release(slot)
+
+    template = np.random.default_rng(0).integers(0, 255, size=shape, dtype=np.uint8)
+    rss_mb.append(proc.memory_info().rss / 2 ** 20)
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    consumer = threading.Thread(target=consume)
+    sampler.start()
+    consumer.start()
+
+    period = 1.0 / args.fps
+    produced = skipped = 0
+    t_start = time.perf_counter()
+    next_index = 0
+    while True:
+        now = time.perf_counter()
+        elapsed = now - t_start
+        if elapsed >= args.seconds:
+            break
+        due = int(elapsed / period)
+        if due > next_index:  # held up: skip what the camera would have overwritten
+            skipped += due - next_index
+            next_index = due
+        template[0, 0, 0] = next_index & 0xFF
+        buf.put(template, next_index)
+        produced += 1
+        next_index += 1
+        sleep = t_start + next_index * period - time.perf_counter()
+        if sleep > 0:
+            time.sleep(sleep)
+    run_sec = time.perf_counter() - t_start
+
+    buf.close()
+    consumer.join()
+    drain_sec = time.perf_counter() - t_start - run_sec
+    done.set()
+    sampler.join()
+    release()
+    for name in os.listdir(tmpdir):
+        os.remove(os.path.join(tmpdir, name))
+    os.rmdir(tmpdir)
+
+    stats = buf.stats()
+    encode_sorted = sorted(encode_ms)
+    return {
+        "config": {k: getattr(args, k) for k in (
+            "fps", "seconds", "width", "height", "buffer", "capacity", "policy", "encoder", "encode_ms")},
+        "frames": {
+            "produced": produced,
+            "camera_skipped": skipped,
+            "achieved_fps": round(produced / run_sec, 1),
+            "drain_sec": round(drain_sec, 2),
+        },
+        "buffer": stats,
+        "encode_ms": {
+            "mean": round(sum(encode_sorted) / len(encode_sorted), 3) if encode_sorted else None,
+            "max": round(encode_sorted[-1], 3) if encode_sorted else None,
+        },
+        "memory": summarize(rss_mb, stats["buffer_mb"]),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--fps", type=float, default=196.0, help="Producer frame rate (default 196).")
+    p.add_argument("--seconds", type=float, default=60.0, help="Run length (default 60).")
+    p.add_argument("--width", type=int, default=1024, help="Frame width (default 1024).")
+    p.add_argument("--height", type=int, default=768, help="Frame height (default 768).")
+    p.add_argument("--buffer", choices=("ring", "queue"), default="ring",
+                   help="FrameRing, or the old unbounded queue (default ring).")
+    p.add_argument("--capacity", type=int, default=128, help="Ring capacity in frames (default 128).")
+    p.add_argument("--policy", choices=FRAME_RING_POLICIES, default="block", help="Ring policy (default block).")
+    p.add_argument("--encoder", choices=("mjpg", "sleep"), default="mjpg",
+                   help="Real OpenCV MJPG encoding, or a fixed per-frame sleep (default mjpg).")
+    p.add_argument("--encode-ms", type=float, default=6.0, help="Per-frame cost for --encoder sleep (default 6).")
+    p.add_argument("--out", type=Path, help="Output path override.")
+    p.add_argument("--no-json", action="store_true", help="Do not write the JSON file.")
+    p.add_argument("--stdout", action="store_true", help="Also print the JSON envelope to stdout.")
+    p.add_argument("--strict", action="store_true", help="Exit non-zero on a DEGRADED verdict.")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    print(f"Running {args.buffer} buffer at {args.fps} fps for {args.seconds} s "
+          f"({args.width}x{args.height}, encoder={args.encoder})...", file=sys.stderr)
+    result = run(args)
+
+    machine, errors = collect_os_identity(None)
+    payload = build_envelope(
+        schema_name=SCHEMA_NAME,
+        schema_version=SCHEMA_VERSION,
+        machine=machine,
+        blocks=result,
+        verdict=derive_verdict(result, args.fps),
+        errors=errors,
+    )
+
+    out_path = args.out or (
+        resolved_log_dir(SCHEMA_NAME)
+        / os_segment(machine)
+        / f"{machine.get('hostname', 'unknown')}_{args.buffer}.json"
+    )
+    if not args.no_json:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+        print(f"Wrote: {out_path}", file=sys.stderr)
+
+    mem, frames, buf = result["memory"], result["frames"], result["buffer"]
+    print(f"frames: {frames['produced']} at {frames['achieved_fps']} fps, {frames['camera_skipped']} skipped, "
+          f"{buf['frames_dropped']} dropped, max depth {buf['max_depth']}", file=sys.stderr)
+    print(f"RSS: {mem['rss_start_mb']} -> peak {mem['rss_peak_mb']} MB (+{mem['rss_growth_mb']} MB)", file=sys.stderr)
+    print(f"Verdict: {payload['verdict']['category']}", file=sys.stderr)
+    if args.stdout:
+        print(json.dumps(payload, indent=2, default=str))
+
+    if args.strict and payload["verdict"]["category"] == "DEGRADED":
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""Import-time budget for the server entry points.
+
+Restarting ACQ/STM/CTR between sessions pays the full module-import cost
+before the message loop begins. Device SDKs are meant to load lazily (via
+``DeviceArgs.device_class()``), so a stray module-level ``import PySpin`` or
+``import matplotlib`` on an entry-point path is a silent start-up regression.
+
+This runs ``python -X importtime -c "import <entry point>"`` in a fresh
+interpreter per entry point, attributes the *self* time of every imported
+module to its top-level package, and reports:
+
+* total import time and the most expensive packages,
+* packages that must stay deferred for that entry point but were imported
+  eagerly (``MUST_DEFER``) -- the deterministic, machine-independent check,
+* the delta against a stored baseline artefact, if one is given.
+
+Timings are machine-dependent, so a baseline is only meaningful for the same
+host; as with the other comparators an over-budget delta is a flag for
+review. ``--strict`` turns eager SDK imports or an over-budget total into a
+non-zero exit.
+
+Usage::
+
+    uv run python extras/perf/import_budget.py \\
+        [--entry server_acq] [--entry gui] [--repeat 3] \\
+        [--baseline extras/perf/baselines/import_time/win10/<host>.json] \\
+        [--tolerance 0.25] [--out PATH] [--no-json] [--stdout] [--strict]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from _baseline_common import (
+    CollectionError,
+    build_envelope,
+    collect_os_identity,
+    os_segment,
+    resolved_log_dir,
+)
+
+SCHEMA_NAME = "import_time"
+SCHEMA_VERSION = 1
+
+# Entry-point label -> module imported by the corresponding service.
+ENTRY_POINTS: Dict[str, str] = {
+    "server_acq": "neurobooth_os.server_acq",
+    "server_stm": "neurobooth_os.server_stm",
+    "gui": "neurobooth_os.gui",
+}
+
+# Top-level packages an entry point must not import at module level. Device
+# SDKs belong behind DeviceArgs.device_class(); plotting and XDF tooling
+# behind the call sites that use them.
+MUST_DEFER: Dict[str, Tuple[str, ...]] = {
+    "server_acq": ("PySpin", "pyrealsense2", "mbientlab", "pylink", "psychopy", "matplotlib"),
+    "server_stm": ("PySpin", "pyrealsense2", "mbientlab"),
+    "gui": ("PySpin", "pyrealsense2", "mbientlab", "pylink", "psychopy", "matplotlib", "pyxdf", "h5io"),
+}
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def parse_importtime(text: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` stderr into rows. Pure; the unit-test seam.
+
+    Each row is ``{"module", "self_us", "cumulative_us", "depth"}``; depth 0
+    is a module imported directly by the ``-c`` statement. Non-importtime
+    lines (warnings, tracebacks) are ignored.
+    """
+    rows: List[Dict[str, Any]] = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # the header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip(" ")
+        # importtime indents two spaces per nesting level after one leading space
+        depth = max(0, (len(name) - len(stripped) - 1) // 2)
+        rows.append({
+            "module": stripped,
+            "self_us": self_us,
+            "cumulative_us": cumulative_us,
+            "depth": depth,
+        })
+    return rows
+
+
+def summarize(rows: List[Dict[str, Any]], top: int = 15) -> Dict[str, Any]:
+    """Attribute self time to top-level packages.
+
+    Summing *self* time (not cumulative) keeps the per-package numbers
+    additive, so they add up to ``total_ms``.
+    """
+    by_package: Dict[str, int] = {}
+    for r in rows:
+        root = r["module"].split(".")[0]
+        by_package[root] = by_package.get(root, 0) + r["self_us"]
+    ranked = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)
+    return {
+        "total_ms": round(sum(by_package.values()) / 1000.0, 1),
+        "n_modules": len(rows),
+        "packages_ms": {k: round(v / 1000.0, 1) for k, v in ranked},
+        "top": [k for k, _ in ranked[:top]],
+    }
+
+
+def eager_violations(entry: str, rows: List[Dict[str, Any]]) -> List[str]:
+    """Return the ``MUST_DEFER`` packages that *entry* imported eagerly."""
+    imported = {r["module"].split(".")[0] for r in rows}
+    return [pkg for pkg in MUST_DEFER.get(entry, ()) if pkg in imported]
+
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+) -> Dict[str, Dict[str, Any]]:
+    """Per-entry delta of ``total_ms`` against a baseline ``entries`` block.
+
+    An entry is ``over_budget`` when it exceeds the baseline total by more
+    than *tolerance* (a fraction). Entries missing from the baseline are
+    reported with ``baseline_ms=None`` and never flagged.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    for entry, cur in current.items():
+        base = baseline.get(entry)
+        if base is None or "total_ms" not in base:
+            out[entry] = {"current_ms": cur.get("total_ms"), "baseline_ms": None, "over_budget": False}
+            continue
+        cur_ms = cur.get("total_ms")
+        base_ms = base["total_ms"]
+        delta = None if cur_ms is None else round(cur_ms - base_ms, 1)
+        out[entry] = {
+            "current_ms": cur_ms,
+            "baseline_ms": base_ms,
+            "delta_ms": delta,
+            "over_budget": cur_ms is not None and cur_ms > base_ms * (1.0 + tolerance),
+        }
+    return out
+
+
+def derive_verdict(
+    entries: Dict[str, Dict[str, Any]],
+    deltas: Optional[Dict[str, Any]],
+    failed: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """OK / DEGRADED / INCOMPLETE from eager imports, budget overruns and failed imports."""
+    reasons: List[str] = []
+    for entry in failed:
+        reasons.append(f"{entry} failed to import; see collection_errors.")
+    for entry, e in entries.items():
+        if e.get("eager"):
+            reasons.append(f"{entry} imports {', '.join(e['eager'])} at module level; these must stay deferred.")
+    for entry, d in (deltas or {}).items():
+        if d["over_budget"]:
+            reasons.append(
+                f"{entry} import time {d['current_ms']} ms exceeds baseline {d['baseline_ms']} ms "
+                f"(+{d['delta_ms']} ms)."
+            )
+    if deltas is None:
+        reasons.append("No baseline given; totals are informational only.")
+    category = "DEGRADED" if any(e.get("eager") for e in entries.values()) or \
+        any(d["over_budget"] for d in (deltas or {}).values()) else ("INCOMPLETE" if failed else "OK")
+    return {"category": category, "reasons": reasons, "remediation_hints": []}
+
+
+def measure(module: str, timeout: int = 300) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Import *module* in a fresh interpreter. Returns ``(rows, error)``.
+
+    The import runs with the repo root as the working directory so the
+    in-tree package is the one measured. A failed import still returns the
+    rows recorded up to the failure, plus the last line of the traceback.
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        cwd=str(_REPO_ROOT),
+        env=env,
+        check=False,
+    )
+    rows = parse_importtime(completed.stderr)
+    error = None
+    if completed.returncode != 0:
+        tail = [ln for ln in completed.stderr.splitlines() if ln and not ln.startswith("import time:")]
+        error = tail[-1] if tail else f"exit code {completed.returncode}"
+    return rows, error
+
+
+def collect(entries: List[str], repeat: int) -> Tuple[Dict[str, Dict[str, Any]], List[CollectionError]]:
+    """Measure each entry point *repeat* times and keep the fastest run.
+
+    The minimum is the least noisy estimate of the import cost itself; slower
+    runs mostly measure disk cache and scheduler state.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: List[CollectionError] = []
+    for entry in entries:
+        best: Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = None
+        for _ in range(max(1, repeat)):
+            try:
+                rows, error = measure(ENTRY_POINTS[entry])
+            except Exception as exc:  # noqa: BLE001
+                errors.append(CollectionError.from_exception(f"entries.{entry}", exc))
+                break
+            if error is not None:
+                errors.append(CollectionError(field=f"entries.{entry}", message=error))
+                break
+            summary = summarize(rows)
+            if best is None or summary["total_ms"] < best[0]["total_ms"]:
+                best = (summary, rows)
+        if best is not None:
+            summary, rows = best
+            summary["eager"] = eager_violations(entry, rows)
+            results[entry] = summary
+    return results, errors
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument(
+        "--entry",
+        action="append",
+        choices=sorted(ENTRY_POINTS),
+        default=[],
+        help="Entry point to measure (repeatable; default all).",
+    )
+    p.add_argument("--repeat", type=int, default=3, help="Runs per entry point; fastest kept (default 3).")
+    p.add_argument("--baseline", type=Path, help="Earlier import_time artefact to compare against.")
+    p.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="Allowed fractional growth over the baseline total (default 0.25).",
+    )
+    p.add_argument("--out", type=Path, help="Output path override.")
+    p.add_argument("--no-json", action="store_true", help="Do not write the JSON file.")
+    p.add_argument("--stdout", action="store_true", help="Also print the JSON envelope to stdout.")
+    p.add_argument(
+        "--strict",
+        action="store_true",
+        help="Exit non-zero on eager SDK imports or an over-budget entry point.",
+    )
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    entries = args.entry or sorted(ENTRY_POINTS)
+
+    print(f"Measuring import time for {', '.join(entries)} (x{args.repeat})...", file=sys.stderr)
+    results, errors = collect(entries, args.repeat)
+
+    deltas = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        deltas = compare(results, baseline.get("entries", {}), args.tolerance)
+
+    machine, os_errors = collect_os_identity(None)
+    errors.extend(os_errors)
+    blocks: Dict[str, Any] = {"python": sys.version.split()[0], "entries": results}
+    if deltas is not None:
+        blocks["baseline"] = {"path": str(args.baseline), "tolerance": args.tolerance, "deltas": deltas}
+    payload = build_envelope(
+        schema_name=SCHEMA_NAME,
+        schema_version=SCHEMA_VERSION,
+        machine=machine,
+        blocks=blocks,
+        verdict=derive_verdict(results, deltas, [e for e in entries if e not in results]),
+        errors=errors,
+    )
+
+    out_path = args.out or (
+        resolved_log_dir(SCHEMA_NAME)
+        / os_segment(machine)
+        / f"{machine.get('hostname', 'unknown')}.json"
+    )
+    if not args.no_json:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+        print(f"Wrote: {out_path}", file=sys.stderr)
+
+    for entry, summary in results.items():
+        top = ", ".join(f"{pkg}={summary['packages_ms'][pkg]}" for pkg in summary["top"][:5])
+        print(f"{entry}: {summary['total_ms']} ms over {summary['n_modules']} modules ({top})", file=sys.stderr)
+    print(f"Verdict: {payload['verdict']['category']}", file=sys.stderr)
+    if args.stdout:
+        print(json.dumps(payload, indent=2, default=str))
+
+    if args.strict and payload["verdict"]["category"] == "DEGRADED":
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""Per-frame vs micro-batched LSL pushes for the camera frame-index outlets, driven by the mock cameras.
+
+``VidRec_Flir``, ``VidRec_Webcam`` and ``VidRec_Intel`` announce every frame on
+their LSL outlet. With ``lsl_batch_samples: 1`` (the default) that is one
+``push_sample``-sized call per frame; larger values collect frames with their
+own timestamps and push them with one ``push_chunk``
+(``neurobooth_os/iout/lsl_batch.py``). This benchmark records with the mock
+cameras ACQ runs together -- ``MockVidRec_Flir`` at 196 fps and three
+``MockVidRec_Intel`` at 90 fps by default -- once per-frame and once batched,
+and reports for each run:
+
+* **CPU**: process CPU time (user + system) per wall-clock second, in percent
+  of one core. The mocks' own work (FLIR encoding, sleeps) is the same in both
+  runs, so the difference is the push overhead.
+* **Latency**: for every sample an in-process inlet receives, ``local_clock()``
+  on receipt minus the sample's timestamp, i.e. how long after the frame was
+  announced a recorder sees it.
+
+Usage::
+
+    uv run python extras/perf/lsl_batch_bench.py \\
+        [--seconds 30] [--flir-fps 196] [--intel-fps 90] [--intel-count 3] \\
+        [--batch 8] [--latency-ms 20] \\
+        [--out PATH] [--no-json] [--stdout] [--strict]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+from _baseline_common import (
+    build_envelope,
+    collect_os_identity,
+    os_segment,
+    percentile,
+    resolved_log_dir,
+)
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+SCHEMA_NAME = "lsl_batch_bench"
+SCHEMA_VERSION = 1
+
+# Latency allowed beyond the batch bound: one frame interval for the push to be triggered, plus scheduling slack.
+_LATENCY_SLACK_MS = 5.0
+
+
+def _flir_args(fps: float, batch: int, latency_ms: float):
+    from neurobooth_os.iout.stim_param_reader import FlirSensorArgs, MockFlirDeviceArgs
+
+    sensor = FlirSensorArgs.model_construct(
+        sensor_id="flir_sens_1", sample_rate=fps, width_px=1024, height_px=768,
+        offsetX=0, offsetY=0, exposure=4000, gain=10, gamma=1.0, fd=1,
+    )
+    return MockFlirDeviceArgs.model_construct(
+        ENV_devices={}, device_id="FLIR_dev_1", sensor_ids=["flir_sens_1"], sensor_array=[sensor],
+        device_sn="MOCK_SN", arg_parser="iout.stim_param_reader.py::MockFlirDeviceArgs()",
+        lsl_batch_samples=batch, lsl_batch_latency_ms=latency_ms,
+    )
+
+
+def _intel_args(index: int, fps: float, batch: int, latency_ms: float):
+    from neurobooth_os.iout.stim_param_reader import IntelSensorArgs, MockIntelDeviceArgs
+
+    sensors = [
+        IntelSensorArgs.model_construct(sensor_id=f"intel_{kind}_sens_{index}", sample_rate=fps,
+                                        width_px=640, height_px=480)
+        for kind in ("rgb", "depth")
+    ]
+    return MockIntelDeviceArgs.model_construct(
+        ENV_devices={}, device_id=f"Intel_dev_{index}", sensor_ids=[s.sensor_id for s in sensors],
+        sensor_array=sensors, device_sn=f"MOCK_INTEL_SN_{index}", auto_exposure_priority=0.0,
+        arg_parser="iout.stim_param_reader.py::MockIntelDeviceArgs()",
+        lsl_batch_samples=batch, lsl_batch_latency_ms=latency_ms,
+    )
+
+
+def summarize_latency(latency_ms: List[float]) -> Dict[str, Any]:
+    """Receipt-latency percentiles in ms. Pure; the unit-test seam."""
+    if not latency_ms:
+        return {"samples": 0, "p50": None, "p95": None, "max": None}
+    ordered = sorted(latency_ms)
+    return {
+        "samples": len(ordered),
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def run_once(args: argparse.Namespace, batch: int) -> Dict[str, Any]:
+    """Record with the mock cameras for ``args.seconds`` and measure CPU and receipt latency."""
+    from pylsl import StreamInlet, local_clock, resolve_byprop
+
+    import neurobooth_os.iout.metadator as meta
+    from neurobooth_os.iout.mock.mock_flir import MockVidRec_Flir
+    from neurobooth_os.iout.mock.mock_intel import MockVidRec_Intel
+
+    meta.post_message = lambda msg: None  # No database; the mocks only announce their outlets
+    devices = [MockVidRec_Flir(device_args=_flir_args(args.flir_fps, batch, args.latency_ms))]
+    devices += [
+        MockVidRec_Intel(device_args=_intel_args(i, args.intel_fps, batch, args.latency_ms))
+        for i in range(1, args.intel_count + 1)
+    ]
+    for device in devices:
+        device.connect()
+    inlets = []
+    for device in devices:
+        infos = resolve_byprop("source_id", device.outlet_id, timeout=5)
+        if not infos:
+            raise RuntimeError(f"Could not resolve the outlet of {device.device_id}")
+        inlets.append(StreamInlet(infos[0]))
+
+    latency_ms: List[float] = []
+    done = threading.Event()
+
+    def read(inlet: StreamInlet):
+        inlet.open_stream(timeout=5)
+        while not done.is_set():
+            _, timestamps = inlet.pull_chunk(timeout=0.1)
+            now = local_clock()
+            latency_ms.extend((now - t) * 1e3 for t in timestamps)
+
+    readers = [threading.Thread(target=read, args=(inlet,), daemon=True) for inlet in inlets]
+    for reader in readers:
+        reader.start()
+    time.sleep(0.5)  # Let the inlets connect before the first frame
+
+    proc = psutil.Process()
+    tmpdir = tempfile.mkdtemp(prefix="lsl_batch_bench_")
+    cpu0 = proc.cpu_times()
+    t0 = time.perf_counter()
+    for device in devices:
+        device.start(str(Path(tmpdir) / device.device_id))
+    time.sleep(args.seconds)
+    for device in devices:
+        device.stop()
+    for device in devices:
+        device.ensure_stopped(timeout_seconds=10)
+    wall = time.perf_counter() - t0
+    cpu1 = proc.cpu_times()
+
+    time.sleep(0.5)  # Let the readers receive the final chunks
+    done.set()
+    for reader in readers:
+        reader.join()
+    for device in devices:
+        device.close()
+    shutil.rmtree(tmpdir, ignore_errors=True)
+
+    cpu_sec = (cpu1.user - cpu0.user) + (cpu1.system - cpu0.system)
+    return {
+        "batch_samples": batch,
+        "cpu_percent": round(100.0 * cpu_sec / wall, 1),
+        "latency_ms": summarize_latency(latency_ms),
+    }
+
+
+def derive_verdict(result: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """OK when batching kept receipt latency within its bound and did not cost CPU."""
+    reasons: List[str] = []
+    per_frame, batched = result["per_frame"], result["batched"]
+    p95 = batched["latency_ms"]["p95"]
+    bound = args.latency_ms + 1e3 / min(args.flir_fps, args.intel_fps) + _LATENCY_SLACK_MS
+    if p95 is None or p95 > bound:
+        reasons.append(f"Batched p95 receipt latency {p95} ms exceeds the {bound:.1f} ms bound.")
+    if batched["cpu_percent"] > per_frame["cpu_percent"]:
+        reasons.append(f"Batched run used more CPU ({batched['cpu_percent']}%) than per-frame "
+                       f"({per_frame['cpu_percent']}%).")
+    return {"category": "DEGRADED" if reasons else "OK", "reasons": reasons, "remediation_hints": []}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--seconds", type=float, default=30.0, help="Recording length per run (default 30).")
+    p.add_argument("--flir-fps", type=float, default=196.0, help="Mock FLIR frame rate (default 196).")
+    p.add_argument("--intel-fps", type=float, default=90.0, help="Mock RealSense frame rate (default 90).")
+    p.add_argument("--intel-count", type=int, default=3, help="Number of mock RealSense cameras (default 3).")
+    p.add_argument("--batch", type=int, default=8, help="lsl_batch_samples for the batched run (default 8).")
+    p.add_argument("--latency-ms", type=float, default=20.0,
+                   help="lsl_batch_latency_ms for the batched run (default 20).")
+    p.add_argument("--out", type=Path, help="Output path override.")
+    p.add_argument("--no-json", action="store_true", help="Do not write the JSON file.")
+    p.add_argument("--stdout", action="store_true", help="Also print the JSON envelope to stdout.")
+    p.add_argument("--strict", action="store_true", help="Exit non-zero on a DEGRADED verdict.")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    result: Dict[str, Any] = {"config": {k: getattr(args, k) for k in (
+        "seconds", "flir_fps", "intel_fps", "intel_count", "batch", "latency_ms")}}
+    for label, batch in (("per_frame", 1), ("batched", args.batch)):
+        print(f"Recording {args.seconds} s with lsl_batch_samples={batch}...", file=sys.stderr)
+        result[label] = run_once(args, batch)
+
+    machine, errors = collect_os_identity(None)
+    payload = build_envelope(
+        schema_name=SCHEMA_NAME,
+        schema_version=SCHEMA_VERSION,
+        machine=machine,
+        blocks=result,
+        verdict=derive_verdict(result, args),
+        errors=errors,
+    )
+
+    out_path = args.out or (
+        resolved_log_dir(SCHEMA_NAME) / os_segment(machine) / f"{machine.get('hostname', 'unknown')}.json"
+    )
+    if not args.no_json:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+        print(f"Wrote: {out_path}", file=sys.stderr)
+
+    for label in ("per_frame", "batched"):
+        r = result[label]
+        lat = r["latency_ms"]
+        print(f"{label}: CPU {r['cpu_percent']}%, {lat['samples']} samples received, latency p50 {lat['p50']} / "
+              f"p95 {lat['p95']} / max {lat['max']} ms", file=sys.stderr)
+    print(f"Verdict: {payload['verdict']['category']}", file=sys.stderr)
+    if args.stdout:
+        print(json.dumps(payload, indent=2, default=str))
+
+    if args.strict and payload["verdict"]["category"] == "DEGRADED":
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
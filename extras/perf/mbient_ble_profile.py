@@ -0,0 +1,358 @@
+"""Sweep Mbient BLE connection parameters, sensor ODRs and fusion for a booth's device count; recommend the cheapest.
+
+Which connection interval, sample rate and fused/unfused streaming a booth can
+sustain depends on how many Mbients share its Bluetooth adapter. This sweeps
+every combination of ``--intervals-ms`` (requested min = max connection
+interval), ``--latencies``, ``--odrs`` (accelerometer and gyroscope rate) and
+fused/unfused streaming, streams each for ``--seconds`` from ``--devices``
+devices, and reports per configuration:
+
+* **Throughput and loss**: delivered samples per second over all devices, and
+  lost samples, counted from the steps in the device epoch by the same
+  ``GapCounter`` production uses.
+* **Delay**: time from sampling to receipt (p50 / p95 / max), simulated
+  backend only.
+* **Airtime**: percentage of the adapter's time spent carrying these
+  notifications, simulated backend only.
+
+The recommendation is the configuration with the least airtime among those
+that stream at least ``--min-hz`` with no more than ``--max-loss-pct`` loss and
+``--max-delay-ms`` p95 delay. ``--write-sensor-args DIR`` writes it as one
+``MbientSensorArgs`` YAML per sensor, plus the matching ``MbientDeviceArgs``
+fields.
+
+By default the devices are simulated (``neurobooth_os/iout/mock/ble_link.py``),
+so the sweep runs anywhere and in seconds; the adapter model is set with
+``--adapter-min-interval-ms``, ``--packets-per-event``, ``--device-queue`` and
+``--event-miss-prob``. ``--mac`` (repeatable) runs the same sweep on real
+devices through the production ``Mbient`` bring-up, which takes about a
+minute per configuration.
+
+Usage::
+
+    uv run python extras/perf/mbient_ble_profile.py \\
+        [--devices 5] [--seconds 20] [--intervals-ms 7.5 15 30] [--latencies 0 4] \\
+        [--odrs 50 100 200] [--min-hz 100] [--max-loss-pct 0.1] [--max-delay-ms 100] \\
+        [--mac AA:BB.. --mac CC:DD..] [--write-sensor-args DIR] \\
+        [--out PATH] [--no-json] [--stdout] [--strict]
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from _baseline_common import (
+    build_envelope,
+    collect_os_identity,
+    os_segment,
+    percentile,
+    resolved_log_dir,
+)
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+SCHEMA_NAME = "mbient_ble_profile"
+SCHEMA_VERSION = 1
+
+ACC_DATA_RANGE = 16  # g
+GYRO_DATA_RANGE = 2000  # deg/s
+
+
+def sweep_grid(
+        intervals_ms: List[float],
+        latencies: List[int],
+        odrs: List[int],
+        fusion: List[bool] = (True, False),
+) -> List[Dict[str, Any]]:
+    """Every configuration of the sweep, fused before unfused."""
+    return [
+        {"interval_ms": interval, "latency": latency, "odr_hz": odr, "sensor_fusion": fused}
+        for fused, interval, latency, odr in itertools.product(fusion, intervals_ms, latencies, odrs)
+    ]
+
+
+def _connection_params(cfg: Dict[str, Any], timeout_ms: int = 6000):
+    from neurobooth_os.iout.mbient import ConnectionParameters
+
+    return ConnectionParameters(cfg["interval_ms"], cfg["interval_ms"], cfg["latency"], timeout_ms)
+
+
+def summarize_devices(per_device: List[Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+    """Pool the per-device ``GapCounter`` summaries and delays of one configuration. Pure; the unit-test seam."""
+    received = sum(d["received"] for d in per_device)
+    expected = sum(d["expected"] for d in per_device)
+    delays = sorted(ms for d in per_device for ms in d.get("delays_ms", []))
+    airtime = [d["airtime_pct"] for d in per_device if d.get("airtime_pct") is not None]
+    return {
+        "delivered_hz": round(received / seconds, 1) if seconds else None,
+        "per_device_hz": round(received / seconds / len(per_device), 1) if seconds and per_device else None,
+        "loss_pct": round(100 * (expected - received) / expected, 3) if expected else None,
+        "worst_device_loss_pct": max(
+            (round(d["loss_pct"], 3) for d in per_device if d["loss_pct"] is not None), default=None),
+        "gaps": sum(d["gaps"] for d in per_device),
+        "delay_ms": {
+            "p50": round(percentile(delays, 50), 2),
+            "p95": round(percentile(delays, 95), 2),
+            "max": round(delays[-1], 2),
+        } if delays else None,
+        "airtime_pct": round(sum(airtime), 2) if airtime else None,
+        "links_dropped": sum(1 for d in per_device if d.get("link_dropped")),
+    }
+
+
+def simulate_config(cfg: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """Stream one configuration from ``args.devices`` simulated devices."""
+    from neurobooth_os.iout.mock.ble_link import SimulatedBleLink, simulate_stream
+    from neurobooth_os.iout.sample_gaps import GapCounter
+
+    per_device = []
+    for i in range(args.devices):
+        link = SimulatedBleLink(
+            _connection_params(cfg),
+            n_devices=args.devices,
+            min_interval_ms=args.adapter_min_interval_ms,
+            packets_per_event=args.packets_per_event,
+            device_queue_packets=args.device_queue,
+            event_miss_prob=args.event_miss_prob,
+            seed=args.seed + i,
+        )
+        sample_times, received = simulate_stream(link, cfg["odr_hz"], args.seconds, cfg["sensor_fusion"])
+        counter = GapCounter(cfg["odr_hz"])
+        delays = []
+        for t_sample, t_received in zip(sample_times, received):
+            if t_received == t_received:  # Not NaN
+                counter.add(round(t_sample * 1e3))
+                delays.append((t_received - t_sample) * 1e3)
+        summary = counter.summary()
+        # Samples lost after the last one received leave no step in the epoch; count them as well
+        summary["expected"] = max(summary["expected"], len(sample_times))
+        summary["loss_pct"] = 100 * (1 - summary["received"] / summary["expected"])
+        summary["delays_ms"] = delays
+        summary["airtime_pct"] = 100 * link.packets_sent * link.packet_ms / 1e3 / args.seconds
+        summary["link_dropped"] = link.link_dropped_at is not None
+        per_device.append(summary)
+    return {**cfg, "interval_granted_ms": link.interval_ms, **summarize_devices(per_device, args.seconds)}
+
+
+def hardware_config(cfg: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """Stream one configuration from the real devices given with ``--mac``, through the production bring-up."""
+    import neurobooth_os.iout.mbient as mbient
+    from neurobooth_os.iout.stim_param_reader import MbientDeviceArgs, MbientSensorArgs
+
+    mbient.DISABLE_LSL = True
+    mbient.post_message = lambda msg: None
+    devices = []
+    for i, mac in enumerate(args.mac):
+        sensors = [
+            MbientSensorArgs.model_construct(sensor_id="acc1", sample_rate=cfg["odr_hz"], data_range=ACC_DATA_RANGE),
+            MbientSensorArgs.model_construct(sensor_id="gyro1", sample_rate=cfg["odr_hz"], data_range=GYRO_DATA_RANGE),
+        ]
+        device_args = MbientDeviceArgs.model_construct(
+            ENV_devices={}, device_id=f"Mbient_P{i}_1", sensor_ids=["acc1", "gyro1"], sensor_array=sensors,
+            mac=mac, device_name=f"P{i}", conn_min_interval_ms=cfg["interval_ms"],
+            conn_max_interval_ms=cfg["interval_ms"], conn_latency=cfg["latency"],
+            sensor_fusion=cfg["sensor_fusion"], clock_correction=False,
+            arg_parser="iout.stim_param_reader.py::MbientDeviceArgs()",
+        )
+        devices.append(mbient.Mbient(device_args))
+    started = [d for d in mbient.Mbient.bring_up_group(devices, {}) if d is not None]
+    try:
+        time.sleep(args.seconds)
+        for device in started:
+            device.stop()
+        per_device = [device.gap_counter.summary() for device in started]
+    finally:
+        for device in devices:
+            try:
+                device.close()
+            except Exception as e:  # A device that failed bring-up may have nothing to close
+                print(f"{device.dev_name}: close failed: {e}", file=sys.stderr)
+    result = {**cfg, **summarize_devices(per_device, args.seconds)} if per_device else {**cfg, "loss_pct": None}
+    result["devices_started"] = len(started)
+    return result
+
+
+def recommend(
+        results: List[Dict[str, Any]],
+        min_hz: float,
+        max_loss_pct: float,
+        max_delay_ms: float,
+) -> Optional[Dict[str, Any]]:
+    """The configuration with the least airtime (else the longest interval) that meets the targets. Pure."""
+    def meets(r: Dict[str, Any]) -> bool:
+        delay = r.get("delay_ms")
+        return (
+            r["odr_hz"] >= min_hz
+            and r.get("loss_pct") is not None and r["loss_pct"] <= max_loss_pct
+            and (delay is None or delay["p95"] <= max_delay_ms)
+            and not r.get("links_dropped")
+        )
+
+    candidates = [r for r in results if meets(r)]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda r: (
+        r["airtime_pct"] if r.get("airtime_pct") is not None else 0.0,
+        r["odr_hz"], not r["sensor_fusion"], -r["interval_ms"], r["latency"],
+    ))
+
+
+def recommended_args(best: Dict[str, Any], acc_sensor_id: str, gyro_sensor_id: str) -> Dict[str, Any]:
+    """The recommendation as ``MbientSensorArgs`` fields per sensor and ``MbientDeviceArgs`` fields. Pure."""
+    def sensor(sensor_id: str, data_range: int) -> Dict[str, Any]:
+        return {
+            "sensor_id": sensor_id,
+            "arg_parser": "iout.stim_param_reader.py::MbientSensorArgs()",
+            "file_type": "hdf5",
+            "sample_rate": int(best["odr_hz"]),
+            "data_range": data_range,
+        }
+
+    return {
+        "sensors": [sensor(acc_sensor_id, ACC_DATA_RANGE), sensor(gyro_sensor_id, GYRO_DATA_RANGE)],
+        "device_args": {
+            "conn_min_interval_ms": best["interval_ms"],
+            "conn_max_interval_ms": best["interval_ms"],
+            "conn_latency": best["latency"],
+            "sensor_fusion": best["sensor_fusion"],
+        },
+    }
+
+
+def write_sensor_args(recommendation: Dict[str, Any], out_dir: Path) -> List[Path]:
+    """Write each recommended sensor as a validated ``MbientSensorArgs`` YAML, and the device fields alongside."""
+    import yaml
+    from neurobooth_os.iout.stim_param_reader import MbientSensorArgs
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for sensor in recommendation["sensors"]:
+        MbientSensorArgs(ENV_devices=None, **sensor)  # Validate before writing
+        path = out_dir / f"{sensor['sensor_id']}.yml"
+        path.write_text(yaml.safe_dump(sensor, sort_keys=False), encoding="utf-8")
+        paths.append(path)
+    path = out_dir / "mbient_device_args.yml"
+    path.write_text(yaml.safe_dump(recommendation["device_args"], sort_keys=False), encoding="utf-8")
+    paths.append(path)
+    return paths
+
+
+def derive_verdict(result: Dict[str, Any]) -> Dict[str, Any]:
+    """OK when some configuration meets the targets; DEGRADED otherwise."""
+    if result.get("recommended") is not None:
+        return {"category": "OK", "reasons": [], "remediation_hints": []}
+    target = result["targets"]
+    return {
+        "category": "DEGRADED",
+        "reasons": [f"No configuration streamed {target['min_hz']} Hz from {result['config']['devices']} devices with "
+                    f"at most {target['max_loss_pct']}% loss and {target['max_delay_ms']} ms p95 delay."],
+        "remediation_hints": ["Connect fewer Mbients to this adapter, or lower --min-hz."],
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--devices", type=int, default=5, help="Simulated devices sharing the adapter (default 5).")
+    p.add_argument("--mac", action="append", default=[], help="Profile real devices instead (repeatable).")
+    p.add_argument("--seconds", type=float, default=20.0, help="Seconds streamed per configuration (default 20).")
+    p.add_argument("--intervals-ms", type=float, nargs="+", default=[7.5, 11.25, 15.0, 30.0, 50.0],
+                   help="Requested connection intervals (default 7.5 11.25 15 30 50).")
+    p.add_argument("--latencies", type=int, nargs="+", default=[0, 4], help="Slave latencies (default 0 4).")
+    p.add_argument("--odrs", type=int, nargs="+", default=[50, 100, 200],
+                   help="Accelerometer/gyroscope sample rates (default 50 100 200).")
+    p.add_argument("--min-hz", type=float, default=100.0, help="Lowest acceptable sample rate (default 100).")
+    p.add_argument("--max-loss-pct", type=float, default=0.1, help="Highest acceptable loss (default 0.1%%).")
+    p.add_argument("--max-delay-ms", type=float, default=100.0, help="Highest acceptable p95 delay (default 100).")
+    p.add_argument("--adapter-min-interval-ms", type=float, default=7.5,
+                   help="Simulated adapter: shortest interval it grants (default 7.5).")
+    p.add_argument("--packets-per-event", type=int, default=4,
+                   help="Simulated adapter: notifications per connection event (default 4).")
+    p.add_argument("--device-queue", type=int, default=32,
+                   help="Simulated device: notifications queued between events (default 32).")
+    p.add_argument("--event-miss-prob", type=float, default=0.01,
+                   help="Simulated link: probability a connection event is lost (default 0.01).")
+    p.add_argument("--seed", type=int, default=0, help="Simulation seed (default 0).")
+    p.add_argument("--acc-sensor-id", default="mbient_acc_1", help="Sensor ID for the written accelerometer args.")
+    p.add_argument("--gyro-sensor-id", default="mbient_gyro_1", help="Sensor ID for the written gyroscope args.")
+    p.add_argument("--write-sensor-args", type=Path, help="Write the recommended sensor/device args to this folder.")
+    p.add_argument("--out", type=Path, help="Output path override.")
+    p.add_argument("--no-json", action="store_true", help="Do not write the JSON file.")
+    p.add_argument("--stdout", action="store_true", help="Also print the JSON envelope to stdout.")
+    p.add_argument("--strict", action="store_true", help="Exit non-zero on a DEGRADED verdict.")
+    args = p.parse_args(argv)
+    if args.mac:
+        args.devices = len(args.mac)
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    grid = sweep_grid(args.intervals_ms, args.latencies, args.odrs)
+    backend = "hardware" if args.mac else "simulated"
+    print(f"Profiling {len(grid)} configurations on {args.devices} {backend} devices...", file=sys.stderr)
+    run_config = hardware_config if args.mac else simulate_config
+    configurations = [run_config(cfg, args) for cfg in grid]
+
+    result: Dict[str, Any] = {
+        "config": {
+            "backend": backend, "devices": args.devices, "seconds": args.seconds,
+            **({} if args.mac else {k: getattr(args, k) for k in (
+                "adapter_min_interval_ms", "packets_per_event", "device_queue", "event_miss_prob", "seed")}),
+        },
+        "targets": {k: getattr(args, k) for k in ("min_hz", "max_loss_pct", "max_delay_ms")},
+        "configurations": configurations,
+    }
+    best = recommend(configurations, args.min_hz, args.max_loss_pct, args.max_delay_ms)
+    result["recommended"] = None
+    if best is not None:
+        result["recommended"] = {"configuration": best, **recommended_args(
+            best, args.acc_sensor_id, args.gyro_sensor_id)}
+
+    machine, errors = collect_os_identity(None)
+    payload = build_envelope(
+        schema_name=SCHEMA_NAME,
+        schema_version=SCHEMA_VERSION,
+        machine=machine,
+        blocks=result,
+        verdict=derive_verdict(result),
+        errors=errors,
+    )
+
+    out_path = args.out or (
+        resolved_log_dir(SCHEMA_NAME) / os_segment(machine) / f"{machine.get('hostname', 'unknown')}.json"
+    )
+    if not args.no_json:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+        print(f"Wrote: {out_path}", file=sys.stderr)
+    if best is not None and args.write_sensor_args:
+        for path in write_sensor_args(result["recommended"], args.write_sensor_args):
+            print(f"Wrote: {path}", file=sys.stderr)
+
+    for r in configurations:
+        delay = r.get("delay_ms") or {}
+        print(f"{'fused' if r['sensor_fusion'] else 'unfused':7} {r['interval_ms']:6} ms lat {r['latency']} "
+              f"{r['odr_hz']:4} Hz: {r.get('delivered_hz')} samples/s, loss {r.get('loss_pct')}%, "
+              f"p95 delay {delay.get('p95')} ms, airtime {r.get('airtime_pct')}%", file=sys.stderr)
+    if best is not None:
+        print(f"Recommended: {json.dumps(result['recommended']['device_args'])}, "
+              f"{int(best['odr_hz'])} Hz", file=sys.stderr)
+    print(f"Verdict: {payload['verdict']['category']}", file=sys.stderr)
+    if args.stdout:
+        print(json.dumps(payload, indent=2, default=str))
+
+    if args.strict and payload["verdict"]["category"] == "DEGRADED":
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
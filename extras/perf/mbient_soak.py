@@ -40,12 +40,30 @@ Usage::
     uv run python extras/perf/mbient_soak.py \\
         [--json ~/mbients.json | --mac AA:BB.. --mac CC:DD.. | --scan] \\
         [--duration-min 120] [--stream-seconds 30] [--with-iphone] \\
-        [--mock] [--wer-dumps] [--out PATH] [--no-json] [--stdout] [--strict]
+        [--mock | --sim [--sim-disconnects-per-min N] [--sim-connect-fail-prob P]] \\
+        [--wer-dumps] [--out PATH] [--no-json] [--stdout] [--strict] \\
+        [--lsl] [--lsl-push-interval-ms 20] [--compare-push]
+
+``--lsl`` keeps the LSL outlet (and so ``Mbient._lsl_data_handler``) in the
+loop, and every cycle records how long each sample spent in the data
+handlers on the BLE callback thread (``callback_us``, from the device's
+HOTPATH counters). ``--compare-push`` runs the soak twice with LSL on, first
+pushing every sample from the callback (``lsl_push_interval_ms=0``, the
+pre-ring behaviour) and then through the sample ring and pusher thread, and
+reports both callback-time distributions side by side.
+
+``--sim`` drives the production ``Mbient`` (not ``MockMbient``) against the
+simulated MetaWear SDK in ``neurobooth_os/iout/mock/sim_metawear.py``, so the
+real connect, reset, reconnect and callback code runs on any machine;
+``--sim-disconnects-per-min`` and ``--sim-connect-fail-prob`` inject link drops
+and failed connects. Without ``--mac``/``--json`` it simulates ``--scan-n``
+devices. Numbers from a simulated run benchmark the driver, not a booth.
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
 import datetime as dt
 import json
 import logging
@@ -85,6 +103,8 @@ _DISCONNECT_MARKERS = (
 SANITY_MIN_OK_CYCLE_FRACTION = 0.5  # < half the cycles succeeded -> flag
 SANITY_DROP_RATE_FLAG = 0.10  # mean per-cycle sample drop-rate > 10% -> flag
 
+CALLBACK_PERCENTILES = (50.0, 95.0, 99.0)
+
 
 # ---------------------------------------------------------------------------
 # Pure layer (stdlib only; unit-tested without the neurobooth stack)
@@ -112,6 +132,52 @@ def _stats(values: List[float]) -> Dict[str, Optional[float]]:
     }
 
 
+def summarize_callback_us(cycles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Pool the per-cycle ``callback_us`` histograms into one distribution.
+
+    The device only keeps bucket counts, so ``p50`` / ``p95`` / ``p99`` are
+    the upper edge of the bucket holding that rank (the pooled ``max`` when
+    it falls in the open top bucket): an upper bound, at bucket resolution.
+    Cycles without ``callback_us`` (LSL off, or a failed cycle) are skipped.
+    """
+    n = 0
+    total = 0.0
+    peak: Optional[float] = None
+    edges: List[float] = []
+    counts: List[int] = []
+    for c in cycles:
+        cb = c.get("callback_us")
+        if not cb or not cb.get("n"):
+            continue
+        n += cb["n"]
+        total += cb["mean"] * cb["n"]
+        peak = cb["max"] if peak is None else max(peak, cb["max"])
+        if not counts:
+            edges, counts = list(cb["edges"]), [0] * len(cb["counts"])
+        counts = [a + b for a, b in zip(counts, cb["counts"])]
+    out: Dict[str, Any] = {"n": n, "mean": (total / n) if n else None, "max": peak}
+    for pct in CALLBACK_PERCENTILES:
+        key = f"p{pct:g}"
+        out[key] = None
+        if not n:
+            continue
+        rank, seen = pct / 100.0 * sum(counts), 0
+        for i, count in enumerate(counts):
+            seen += count
+            if count and seen >= rank:
+                out[key] = edges[i] if i < len(edges) else peak
+                break
+    return out
+
+
+def compare_callback(inline: Dict[str, Any], ring: Dict[str, Any]) -> Dict[str, Any]:
+    """Side-by-side ``summarize_callback_us`` blocks for ``--compare-push``."""
+    ratio = None
+    if inline.get("p95") and ring.get("p95") is not None:
+        ratio = ring["p95"] / inline["p95"]
+    return {"inline": inline, "ring": ring, "p95_ratio": ratio}
+
+
 def summarize_cycles(cycles: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Reduce per-cycle soak records to the comparable metric block.
 
@@ -121,11 +187,11 @@ def summarize_cycles(cycles: List[Dict[str, Any]]) -> Dict[str, Any]:
         cycles: Per-cycle dicts written by the worker. Recognized keys:
             ``ok`` (bool), ``connect_ms``, ``reset_ms``, ``cycle_wall_s``,
             ``samples``, ``expected_samples``, ``ble_disconnects``,
-            ``error`` (str|None).
+            ``callback_us`` (dict|None), ``error`` (str|None).
 
     Returns:
         ``{n_cycles, n_ok, n_failed, ok_fraction, connect_ms{}, reset_ms{},
-        cycle_wall_s{}, drop_rate{}, ble_disconnects_total,
+        cycle_wall_s{}, drop_rate{}, callback_us{}, ble_disconnects_total,
         cycles_with_disconnect, errors[]}``.
     """
     n = len(cycles)
@@ -155,13 +221,18 @@ def summarize_cycles(cycles: List[Dict[str, Any]]) -> Dict[str, Any]:
         "reset_ms": _stats(reset_ms),
         "cycle_wall_s": _stats(wall),
         "drop_rate": _stats(drop_rates),
+        "callback_us": summarize_callback_us(cycles),
         "ble_disconnects_total": sum(disconnects),
         "cycles_with_disconnect": sum(1 for d in disconnects if d > 0),
         "errors": errors,
     }
 
 
-def derive_verdict(metrics: Dict[str, Any], crash: Dict[str, Any]) -> Dict[str, Any]:
+def derive_verdict(
+    metrics: Dict[str, Any],
+    crash: Dict[str, Any],
+    callback_comparison: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """Honest single-run verdict. Never pass/fail for the OS question.
 
     Category is ``CRASHED`` if the worker process died on a native fault
@@ -169,7 +240,8 @@ def derive_verdict(metrics: Dict[str, Any], crash: Dict[str, Any]) -> Dict[str,
     else ``CAPTURED`` / ``CAPTURED_WITH_ERRORS``. ``reasons`` always states
     that the regression assessment is a comparison, plus any obviously-bad
     signal that means the run should probably be re-taken before being
-    locked as a baseline.
+    locked as a baseline. With ``--compare-push``, a ring p95 callback time
+    above the inline one is flagged too.
     """
     reasons: List[str] = [
         "Single-run capture. Regression assessment is a comparison: run "
@@ -205,6 +277,13 @@ def derive_verdict(metrics: Dict[str, Any], crash: Dict[str, Any]) -> Dict[str,
                 f"> {SANITY_DROP_RATE_FLAG:.0%} sanity bound."
             )
 
+    if callback_comparison and (callback_comparison.get("p95_ratio") or 0) > 1.0:
+        reasons.append(
+            f"Callback p95 with the sample ring "
+            f"({callback_comparison['ring']['p95']} us) exceeds pushing inline "
+            f"({callback_comparison['inline']['p95']} us)."
+        )
+
     if crashed:
         category = "CRASHED"
     elif metrics.get("errors") or metrics.get("n_failed"):
@@ -351,7 +430,13 @@ class _DisconnectTally(logging.Handler):
 
 
 def make_device(
-    name: str, mac: str, mock: bool, acc_hz: int, gyro_hz: int, data_range: int
+    name: str,
+    mac: str,
+    mock: bool,
+    acc_hz: int,
+    gyro_hz: int,
+    data_range: int,
+    lsl_push_interval_ms: float = 20.0,
 ) -> Any:
     """Build a production ``Mbient`` (or ``MockMbient``) for one device.
 
@@ -380,6 +465,7 @@ def make_device(
         sensor_array=[acc, gyro],
         mac=mac,
         device_name=name,
+        lsl_push_interval_ms=lsl_push_interval_ms,
         arg_parser=f"iout.stim_param_reader.py::{args_cls.__name__}()",
     )
     if mock:
@@ -392,13 +478,18 @@ def make_device(
 
 
 def resolve_device_list(
-    macs: List[str], json_path: Optional[str], scan: bool, scan_n: int
+    macs: List[str],
+    json_path: Optional[str],
+    scan: bool,
+    scan_n: int,
+    sim: bool = False,
 ) -> List[Tuple[str, str]]:
     """Return ``[(name, mac), ...]`` reusing reset_mbients' discovery (DRY).
 
     ``--mac`` is handled inline (trivial); ``--json`` / ``--scan`` defer to
     ``reset_mbients.discovery_json`` / ``discovery_scan`` so the device-list
-    convention stays single-sourced.
+    convention stays single-sourced. With ``--sim`` and no explicit list,
+    ``scan_n`` simulated devices are made up.
     """
     if json_path:
         extras_dir = Path(__file__).resolve().parent.parent
@@ -409,6 +500,8 @@ def resolve_device_list(
         return [(d.name, d.address) for d in discovery_json(json_path)]
     if macs:
         return [(f"CL-{i}", m) for i, m in enumerate(macs)]
+    if sim:
+        return [(f"SIM-{i}", f"5E:00:00:00:00:{i:02X}") for i in range(scan_n)]
     if scan:
         extras_dir = Path(__file__).resolve().parent.parent
         if str(extras_dir) not in sys.path:
@@ -439,11 +532,11 @@ def run_soak_worker(cfg: Dict[str, Any], jsonl_path: str) -> int:
     Returns 0 on clean completion. (A native fault never returns -- the
     process dies and the parent classifies the exit code.)
     """
-    # Neutralize LSL + DB at the harness boundary (production module
-    # untouched) -- the exact pattern tests/pytest/test_mock_mbient.py uses.
+    # Neutralize LSL (unless measuring the LSL push path) + DB at the harness
+    # boundary -- the exact pattern tests/pytest/test_mock_mbient.py uses.
     from neurobooth_os.iout import mbient as mbient_mod
 
-    mbient_mod.DISABLE_LSL = True
+    mbient_mod.DISABLE_LSL = not cfg.get("lsl", False)
     mbient_mod.post_message = lambda msg: None
 
     try:
@@ -458,6 +551,22 @@ def run_soak_worker(cfg: Dict[str, Any], jsonl_path: str) -> int:
     app_logger.addHandler(tally)
     app_logger.setLevel(logging.DEBUG)
 
+    # --sim: the real Mbient talks to the simulated SDK until the worker ends
+    sim_sdk = contextlib.ExitStack()
+    if cfg.get("sim"):
+        from neurobooth_os.iout.mock.sim_metawear import SimulatedMetaWear, installed
+
+        sim_sdk.enter_context(
+            installed(
+                SimulatedMetaWear(
+                    macs=[mac for _, mac in cfg["devices"]],
+                    connect_fail_prob=cfg.get("sim_connect_fail_prob", 0.0),
+                    disconnects_per_min=cfg.get("sim_disconnects_per_min", 0.0),
+                ),
+                mbient_mod,
+            )
+        )
+
     corunner = None
     if cfg["with_iphone"]:
         corunner = SyntheticIphoneCorunner()
@@ -471,6 +580,7 @@ def run_soak_worker(cfg: Dict[str, Any], jsonl_path: str) -> int:
             cfg["acc_hz"],
             cfg["gyro_hz"],
             cfg["data_range"],
+            cfg.get("lsl_push_interval_ms", 20.0),
         )
         for name, mac in cfg["devices"]
     ]
@@ -501,6 +611,7 @@ def run_soak_worker(cfg: Dict[str, Any], jsonl_path: str) -> int:
                     "samples": None,
                     "expected_samples": expected,
                     "ble_disconnects": 0,
+                    "callback_us": None,
                     "cycle_wall_s": None,
                 }
                 t_cycle = time.perf_counter()
@@ -517,6 +628,12 @@ def run_soak_worker(cfg: Dict[str, Any], jsonl_path: str) -> int:
                     dev.start(buzz=False)
                     time.sleep(stream_s)
                     rec["samples"] = dev.n_samples_streamed - n0
+                    hot = dev.hot_log.flush(f"soak cycle {cycle_idx}") or {}
+                    if "callback_us" in hot.get("stats", {}):
+                        rec["callback_us"] = {
+                            **hot["stats"]["callback_us"],
+                            **hot["histograms"]["callback_us"],
+                        }
 
                     t0 = time.perf_counter()
                     dev.reset_and_reconnect()
@@ -541,6 +658,7 @@ def run_soak_worker(cfg: Dict[str, Any], jsonl_path: str) -> int:
         out.close()
         app_logger.removeHandler(tally)
         tally.close()
+        sim_sdk.close()
     return 0
 
 
@@ -560,7 +678,7 @@ def _lib_version(name: str) -> Optional[str]:
 
 
 def collect_run_context(
-    with_iphone: bool, mock: bool
+    with_iphone: bool, mock: bool, sim: bool = False
 ) -> Tuple[Dict[str, Any], List[CollectionError], Dict[str, Any]]:
     """OS identity + BT radio/driver/power + lib versions + run flags.
 
@@ -578,6 +696,7 @@ def collect_run_context(
         },
         "iphone_corunner": ("synthetic" if with_iphone else "none"),
         "mock": mock,
+        "sim": sim,
         "connection_params_requested": {
             "min_conn_interval": 7.5,
             "max_conn_interval": 7.5,
@@ -674,6 +793,40 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Drive MockMbient (no hardware/DB) for dev/CI.",
     )
+    p.add_argument(
+        "--sim",
+        action="store_true",
+        help="Drive the real Mbient against the simulated MetaWear SDK.",
+    )
+    p.add_argument(
+        "--sim-disconnects-per-min",
+        type=float,
+        default=0.0,
+        help="--sim: rate of spontaneous link drops per streaming device (default 0).",
+    )
+    p.add_argument(
+        "--sim-connect-fail-prob",
+        type=float,
+        default=0.0,
+        help="--sim: probability that a connect fails (default 0).",
+    )
+    p.add_argument(
+        "--lsl",
+        action="store_true",
+        help="Keep the LSL outlet so the callback includes the LSL handoff.",
+    )
+    p.add_argument(
+        "--lsl-push-interval-ms",
+        type=float,
+        default=20.0,
+        help="Device lsl_push_interval_ms; 0 pushes from the callback (default 20).",
+    )
+    p.add_argument(
+        "--compare-push",
+        action="store_true",
+        help="Run twice with LSL on: inline push, then the sample ring; "
+        "compare callback times.",
+    )
     p.add_argument(
         "--wer-dumps",
         action="store_true",
@@ -701,11 +854,40 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     return p.parse_args(argv)
 
 
+def _run_worker_process(
+    cfg: Dict[str, Any], jsonl_path: Path, timeout_s: float
+) -> Tuple[Optional[int], List[Dict[str, Any]]]:
+    """Run ``run_soak_worker`` in a child process; return its exit code and cycles."""
+    proc = mp.Process(target=run_soak_worker, args=(cfg, str(jsonl_path)))
+    proc.start()
+    proc.join(timeout=timeout_s)
+    if proc.is_alive():
+        proc.terminate()
+        proc.join(timeout=30)
+
+    cycles: List[Dict[str, Any]] = []
+    if jsonl_path.exists():
+        for line in jsonl_path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line:
+                try:
+                    cycles.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # a torn final line after a native fault
+    return proc.exitcode, cycles
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     args = parse_args(argv)
-    devices = resolve_device_list(args.mac, args.json_path, args.scan, args.scan_n)
+    if args.mock and args.sim:
+        raise SystemExit("--mock and --sim are exclusive.")
+    devices = resolve_device_list(
+        args.mac, args.json_path, args.scan, args.scan_n, sim=args.sim
+    )
 
-    machine, errors, run_context = collect_run_context(args.with_iphone, args.mock)
+    machine, errors, run_context = collect_run_context(
+        args.with_iphone, args.mock, sim=args.sim
+    )
     seg = os_segment(machine)
     host = machine.get("hostname", "unknown")
     stamp = dt.datetime.now(tz=dt.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
@@ -735,38 +917,42 @@ def main(argv: Optional[List[str]] = None) -> int:
         "data_range": args.data_range,
         "with_iphone": args.with_iphone,
         "mock": args.mock,
+        "sim": args.sim,
+        "sim_disconnects_per_min": args.sim_disconnects_per_min,
+        "sim_connect_fail_prob": args.sim_connect_fail_prob,
         "log_file": str(log_file),
+        "lsl": args.lsl or args.compare_push,
+        "lsl_push_interval_ms": args.lsl_push_interval_ms,
     }
+    # (label, cfg, cycles JSONL); the last variant supplies the headline metrics.
+    variants = [("soak", cfg, jsonl_path)]
+    if args.compare_push:
+        variants = [
+            ("inline", {**cfg, "lsl_push_interval_ms": 0.0},
+             run_dir / f"{host}_{stamp}.inline.cycles.jsonl"),
+            ("ring", cfg, jsonl_path),
+        ]
 
     print(
         f"Mbient soak: {len(devices)} device(s), "
-        f"{args.duration_min} min, mock={args.mock}, "
-        f"with_iphone={args.with_iphone}",
+        f"{args.duration_min} min{' per variant' if args.compare_push else ''}, "
+        f"mock={args.mock}, sim={args.sim}, with_iphone={args.with_iphone}, lsl={cfg['lsl']}",
         file=sys.stderr,
     )
 
-    proc = mp.Process(target=run_soak_worker, args=(cfg, str(jsonl_path)))
-    proc.start()
-    grace_s = max(60.0, args.stream_seconds * 4)
-    proc.join(timeout=args.duration_min * 60.0 + grace_s)
-    if proc.is_alive():
-        proc.terminate()
-        proc.join(timeout=30)
-    exit_code = proc.exitcode
+    exit_code: Optional[int] = 0
+    variant_cycles: Dict[str, List[Dict[str, Any]]] = {}
+    for label, variant_cfg, variant_jsonl in variants:
+        code, variant_cycles[label] = _run_worker_process(
+            variant_cfg, variant_jsonl, args.duration_min * 60.0 + max(60.0, args.stream_seconds * 4)
+        )
+        if exit_code == 0:
+            exit_code = code  # Report the first abnormal exit
+    cycles = variant_cycles[variants[-1][0]]
 
     if args.wer_dumps:
         disable_wer_localdumps()
 
-    cycles: List[Dict[str, Any]] = []
-    if jsonl_path.exists():
-        for line in jsonl_path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if line:
-                try:
-                    cycles.append(json.loads(line))
-                except json.JSONDecodeError:
-                    pass  # a torn final line after a native fault
-
     crash = classify_exit(exit_code)
     if dump_dir and Path(dump_dir).is_dir():
         crash["dump_paths"] = [str(p) for p in Path(dump_dir).glob("*.dmp")]
@@ -775,12 +961,21 @@ def main(argv: Optional[List[str]] = None) -> int:
     crash["app_log"] = str(log_file)
 
     metrics = summarize_cycles(cycles)
-    verdict = derive_verdict(metrics, crash)
+    blocks: Dict[str, Any] = {"metrics": metrics, "run": run_context, "crash": crash}
+    comparison = None
+    if args.compare_push:
+        comparison = compare_callback(
+            summarize_callback_us(variant_cycles["inline"]),
+            summarize_callback_us(variant_cycles["ring"]),
+        )
+        blocks["metrics_inline"] = summarize_cycles(variant_cycles["inline"])
+        blocks["callback_comparison"] = comparison
+    verdict = derive_verdict(metrics, crash, comparison)
     payload = build_envelope(
         schema_name=SCHEMA_NAME,
         schema_version=SCHEMA_VERSION,
         machine=machine,
-        blocks={"metrics": metrics, "run": run_context, "crash": crash},
+        blocks=blocks,
         verdict=verdict,
         errors=errors,
     )
@@ -790,6 +985,14 @@ def main(argv: Optional[List[str]] = None) -> int:
             json.dumps(payload, indent=2, default=str), encoding="utf-8"
         )
         print(f"Wrote: {out_path}", file=sys.stderr)
+    if comparison is not None:
+        for label in ("inline", "ring"):
+            cb = comparison[label]
+            print(
+                f"callback {label}: n={cb['n']} mean={cb['mean']} us "
+                f"p95<={cb['p95']} us p99<={cb['p99']} us max={cb['max']} us",
+                file=sys.stderr,
+            )
     print(f"Verdict: {verdict['category']}", file=sys.stderr)
     if args.stdout:
         print(json.dumps(payload, indent=2, default=str))
@@ -0,0 +1,210 @@
+"""Allocations and CPU of the microphone's per-chunk LSL path, legacy vs preallocated, driven by the mock mic.
+
+``MicStream`` used to turn every audio chunk into a new int16 array
+(``np.frombuffer``), hstack it with the elapsed-time header into a new int64
+array, and ``push_sample`` it as one sample of the DataVersion 1.0 layout,
+which copies it value by value into a ctypes array. ``MicStream._push_audio``
+copies the audio bytes into one preallocated int16 chunk and pushes it with
+``push_chunk``, one sample per audio frame (DataVersion 2.0), which hands the
+numpy buffer to liblsl without a copy. This benchmark pushes ``--seconds`` of
+audio, as fast as it can, through the legacy path on an outlet with the old
+layout and through ``_push_audio`` on the outlet of a connected
+``MockMicStream``, and reports for each:
+
+* **Allocations**: peak Python/numpy memory allocated while processing one
+  chunk (``tracemalloc``), averaged over chunks, and the number of allocated
+  blocks still alive after the run.
+* **CPU**: process CPU time per second of audio, in milliseconds.
+
+Usage::
+
+    uv run python extras/perf/mic_alloc_bench.py \\
+        [--seconds 60] [--sample-rate 44100] [--chunk 1024] \\
+        [--out PATH] [--no-json] [--stdout] [--strict]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from _baseline_common import (
+    build_envelope,
+    collect_os_identity,
+    os_segment,
+    resolved_log_dir,
+)
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+SCHEMA_NAME = "mic_alloc_bench"
+SCHEMA_VERSION = 1
+
+
+def _mic_args(sample_rate: int, chunk: int):
+    from neurobooth_os.iout.stim_param_reader import MicYetiSensorArgs, MockMicYetiDeviceArgs
+
+    sensor = MicYetiSensorArgs.model_construct(
+        sensor_id="mic_sens_1", sample_rate=sample_rate, sample_chunk_size=chunk,
+        input=True, output=False, channels=1, format="paInt16",
+    )
+    return MockMicYetiDeviceArgs.model_construct(
+        ENV_devices={}, device_id="Mic_Yeti_dev_1", sensor_ids=["mic_sens_1"], sensor_array=[sensor],
+        microphone_name="MockYeti", arg_parser="iout.stim_param_reader.py::MockMicYetiDeviceArgs()",
+    )
+
+
+def legacy_push(device) -> Callable[[bytes], None]:
+    """The per-chunk path MicStream.stream had before the preallocated buffer, on an outlet with its layout."""
+    from pylsl import StreamInfo, StreamOutlet, local_clock
+
+    outlet = StreamOutlet(StreamInfo("AudioLegacyBench", "Experimental", device.CHUNK + 1, device.fps / device.CHUNK,
+                                     "int16", f"{device.outlet_id}_legacy"))
+    last_time = [int(local_clock() * 10e3)]
+
+    def push(data: bytes) -> None:
+        decoded = np.frombuffer(data, "int16")
+        tlocal = int(local_clock() * 10e3)
+        tdiff = tlocal - last_time[0]
+        last_time[0] = tlocal
+        decoded = np.hstack((np.array(tdiff), decoded))
+        outlet.push_sample(decoded)
+        device.tic = time.time()
+
+    return push
+
+
+def preallocated_push(device) -> Callable[[bytes], None]:
+    """MicStream's current per-chunk path, stamped as read mode does."""
+    from pylsl import local_clock
+
+    return lambda data: device._push_audio(data, local_clock())
+
+
+def measure(push: Callable[[bytes], None], chunks: List[bytes]) -> Dict[str, Any]:
+    """Run ``push`` over ``chunks`` twice: untraced for CPU time, then traced for allocations."""
+    push(chunks[0])  # Warm up lazily created state outside the measurements
+    cpu0 = time.process_time()
+    for data in chunks:
+        push(data)
+    cpu_sec = time.process_time() - cpu0
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for data in chunks:
+            tracemalloc.clear_traces()  # Also resets the peak
+            push(data)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        retained_blocks = len(tracemalloc.take_snapshot().traces)
+    finally:
+        tracemalloc.stop()
+    return {"cpu_sec": cpu_sec, "peak_bytes": peaks, "retained_blocks": retained_blocks}
+
+
+def summarize(raw: Dict[str, Any], audio_sec: float) -> Dict[str, Any]:
+    """Per-chunk allocation and per-audio-second CPU figures from ``measure``. Pure; the unit-test seam."""
+    peaks = raw["peak_bytes"]
+    return {
+        "chunks": len(peaks),
+        "alloc_bytes_per_chunk": round(sum(peaks) / len(peaks), 1) if peaks else None,
+        "retained_blocks": raw["retained_blocks"],
+        "cpu_ms_per_audio_sec": round(1e3 * raw["cpu_sec"] / audio_sec, 4) if audio_sec else None,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import neurobooth_os.iout.microphone as mic
+    from neurobooth_os.iout.mock.mock_microphone import MockMicStream
+
+    mic.post_message = lambda msg: None  # No database; the mock only announces its outlet
+    device = MockMicStream(device_args=_mic_args(args.sample_rate, args.chunk))
+    device.connect()
+    try:
+        n_chunks = max(1, int(args.seconds * args.sample_rate / args.chunk))
+        rng = np.random.default_rng(0)
+        chunks = [rng.integers(-2000, 2000, args.chunk, dtype=np.int16).tobytes() for _ in range(64)]
+        chunks = [chunks[i % len(chunks)] for i in range(n_chunks)]
+        audio_sec = n_chunks * args.chunk / args.sample_rate
+        return {
+            "audio_sec": round(audio_sec, 3),
+            "legacy": summarize(measure(legacy_push(device), chunks), audio_sec),
+            "preallocated": summarize(measure(preallocated_push(device), chunks), audio_sec),
+        }
+    finally:
+        device.close()
+
+
+def derive_verdict(result: Dict[str, Any]) -> Dict[str, Any]:
+    """OK when the preallocated path allocates and costs no more than the legacy one."""
+    reasons: List[str] = []
+    legacy, new = result["legacy"], result["preallocated"]
+    if new["alloc_bytes_per_chunk"] > legacy["alloc_bytes_per_chunk"]:
+        reasons.append(f"Preallocated path allocated more per chunk ({new['alloc_bytes_per_chunk']} B) than the "
+                       f"legacy path ({legacy['alloc_bytes_per_chunk']} B).")
+    if new["cpu_ms_per_audio_sec"] > legacy["cpu_ms_per_audio_sec"]:
+        reasons.append(f"Preallocated path used more CPU ({new['cpu_ms_per_audio_sec']} ms per audio second) than "
+                       f"the legacy path ({legacy['cpu_ms_per_audio_sec']} ms).")
+    return {"category": "DEGRADED" if reasons else "OK", "reasons": reasons, "remediation_hints": []}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--seconds", type=float, default=60.0, help="Seconds of audio to push per path (default 60).")
+    p.add_argument("--sample-rate", type=int, default=44100, help="Mock microphone sample rate (default 44100).")
+    p.add_argument("--chunk", type=int, default=1024, help="Samples per chunk (default 1024).")
+    p.add_argument("--out", type=Path, help="Output path override.")
+    p.add_argument("--no-json", action="store_true", help="Do not write the JSON file.")
+    p.add_argument("--stdout", action="store_true", help="Also print the JSON envelope to stdout.")
+    p.add_argument("--strict", action="store_true", help="Exit non-zero on a DEGRADED verdict.")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    print(f"Pushing {args.seconds} s of audio through each path...", file=sys.stderr)
+    result: Dict[str, Any] = {"config": {k: getattr(args, k) for k in ("seconds", "sample_rate", "chunk")}}
+    result.update(run(args))
+
+    machine, errors = collect_os_identity(None)
+    payload = build_envelope(
+        schema_name=SCHEMA_NAME,
+        schema_version=SCHEMA_VERSION,
+        machine=machine,
+        blocks=result,
+        verdict=derive_verdict(result),
+        errors=errors,
+    )
+
+    out_path = args.out or (
+        resolved_log_dir(SCHEMA_NAME) / os_segment(machine) / f"{machine.get('hostname', 'unknown')}.json"
+    )
+    if not args.no_json:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+        print(f"Wrote: {out_path}", file=sys.stderr)
+
+    for label in ("legacy", "preallocated"):
+        r = result[label]
+        print(f"{label}: {r['alloc_bytes_per_chunk']} B allocated per chunk, {r['retained_blocks']} blocks retained, "
+              f"CPU {r['cpu_ms_per_audio_sec']} ms per audio second", file=sys.stderr)
+    print(f"Verdict: {payload['verdict']['category']}", file=sys.stderr)
+    if args.stdout:
+        print(json.dumps(payload, indent=2, default=str))
+
+    if args.strict and payload["verdict"]["category"] == "DEGRADED":
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Bulk-import DB-log fallback records into ``log_application``.
+
+When the database is unreachable, ``PostgreSQLHandler`` (log_manager) queues
+application log records to ``neurobooth_db_log_fallback.log`` in the machine's
+log directory, one JSON object per line holding the ``log_application``
+columns plus the reason for the fallback. When the DB is back, the handler
+logs a "DB logging restored" warning with the number of records written and
+dropped; this script then puts those records where the rest of the session's
+logs are.
+
+Lines that are not JSON (the pre-JSON text format, or a line cut off by a
+crash) are skipped and counted. Once a file has been imported it is renamed
+to ``<name>.replayed-<timestamp>`` so that running the script again does not
+insert duplicates; ``--keep`` leaves it in place.
+
+Usage::
+
+    # on a booth machine (uses the NB_CONFIG database)
+    python extras/perf/replay_db_log_fallback.py [PATH ...] [--dry-run] [--keep]
+
+    # from a dev machine, through the SSH tunnel in db_credentials.json
+    python extras/perf/replay_db_log_fallback.py PATH --direct
+
+With no PATH, the fallback file in the configured log directory is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+FALLBACK_LOG_NAME = "neurobooth_db_log_fallback.log"
+
+# Columns of log_application written by PostgreSQLHandler, in insert order.
+COLUMNS = (
+    "session_id", "subject_id", "server_type", "server_id", "server_time", "log_level", "device",
+    "filename", "function", "line_no", "message", "traceback",
+)
+_REQUIRED = ("server_time", "log_level", "message")
+_LEVELS = ("debug", "info", "warning", "error", "critical")
+
+
+def parse_fallback(lines: Iterable[str]) -> Tuple[List[Tuple[Any, ...]], int]:
+    """Turn fallback-file lines into ``log_application`` rows. Pure; the unit-test seam.
+
+    Returns ``(rows, n_skipped)``. Each row is a tuple in ``COLUMNS`` order
+    with ``server_time`` parsed back into a datetime. Missing optional columns
+    become None; unknown log levels become ``debug`` as in the handler.
+    """
+    rows: List[Tuple[Any, ...]] = []
+    skipped = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+            if not isinstance(rec, dict) or any(k not in rec for k in _REQUIRED):
+                raise ValueError("not a fallback record")
+            rec["server_time"] = datetime.fromisoformat(rec["server_time"])
+        except ValueError:
+            skipped += 1
+            continue
+        if rec["log_level"] not in _LEVELS:
+            rec["log_level"] = "debug"
+        rows.append(tuple(rec.get(col) for col in COLUMNS))
+    return rows, skipped
+
+
+def default_path() -> Path:
+    """The fallback file in this machine's configured log directory."""
+    if str(_REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(_REPO_ROOT))
+    import neurobooth_os.config as cfg
+    cfg.load_neurobooth_config()
+    from neurobooth_os.log_manager import _get_log_dir
+    return Path(_get_log_dir()) / FALLBACK_LOG_NAME
+
+
+def connect(direct: bool, database: Optional[str]):
+    """Return ``(conn, tunnel)``; ``tunnel`` is None unless ``direct``."""
+    if direct:
+        from _db import get_conn
+        return get_conn()
+    if str(_REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(_REPO_ROOT))
+    import neurobooth_os.config as cfg
+    cfg.load_neurobooth_config()
+    from neurobooth_os.iout.metadator import get_database_connection
+    return get_database_connection(database), None
+
+
+def insert_rows(conn, rows: List[Tuple[Any, ...]], page_size: int = 1000) -> None:
+    """Insert all rows in one transaction."""
+    from psycopg2.extras import execute_values
+
+    query = f"INSERT INTO log_application ({', '.join(COLUMNS)}) VALUES %s"
+    with conn:
+        with conn.cursor() as cursor:
+            execute_values(cursor, query, rows, page_size=page_size)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("paths", nargs="*", type=Path, help="Fallback files (default: this machine's).")
+    p.add_argument("--direct", action="store_true", help="Use the SSH tunnel connection (for dev machines).")
+    p.add_argument("--database", default=None, help="Database name override (for neurobooth config).")
+    p.add_argument("--dry-run", action="store_true", help="Parse and report only; insert nothing.")
+    p.add_argument("--keep", action="store_true", help="Do not rename files after importing them.")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    paths = args.paths or [default_path()]
+
+    parsed = []
+    for path in paths:
+        if not path.exists():
+            print(f"{path}: not found", file=sys.stderr)
+            continue
+        with open(path, encoding="utf-8", errors="replace") as f:
+            rows, skipped = parse_fallback(f)
+        print(f"{path}: {len(rows)} records, {skipped} unparseable lines skipped", file=sys.stderr)
+        parsed.append((path, rows))
+
+    if args.dry_run or not any(rows for _, rows in parsed):
+        return 0
+
+    conn, tunnel = connect(args.direct, args.database)
+    try:
+        for path, rows in parsed:
+            if not rows:
+                continue
+            insert_rows(conn, rows)
+            print(f"{path}: inserted {len(rows)} records into log_application", file=sys.stderr)
+            if not args.keep:
+                done = path.with_name(f"{path.name}.replayed-{datetime.now():%Y%m%d_%H%M%S}")
+                try:
+                    os.replace(path, done)
+                except OSError as e:
+                    # On Windows a running server still holding the file open blocks the rename.
+                    print(f"{path}: imported but not renamed ({e}); move it aside before replaying again",
+                          file=sys.stderr)
+                    continue
+                print(f"{path}: renamed to {done.name}", file=sys.stderr)
+    finally:
+        conn.close()
+        if tunnel is not None:
+            tunnel.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
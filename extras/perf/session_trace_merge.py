@@ -0,0 +1,200 @@
+"""Merge binary session traces from CTR, STM and ACQ onto one timeline.
+
+Session traces (``.nbtrace``, written when ``NB_SESSION_TRACE=1``; see
+``neurobooth_os/util/session_trace.py``) stamp every log record with the
+writing machine's LSL ``local_clock()``. That clock is monotonic and cheap
+but its epoch is per machine, so traces from different machines need an
+offset before they can be interleaved.
+
+Each segment header carries an ``(anchor_lsl_time, anchor_unix_time)`` pair
+taken when the segment was opened. By default a server's LSL times are put on
+the reference server's LSL clock through those wall-clock anchors, which is as
+accurate as the booth machines' NTP sync (typically a few ms). Where a better
+estimate is known -- e.g. the LSL ``time_correction`` CTR's LabRecorder
+stores per stream in the XDF -- pass it with ``--offset SERVER=SECONDS`` to add
+a correction on top of the anchor mapping.
+
+Output is one row per record, sorted by ``t`` (seconds on the reference
+server's LSL clock), as CSV or JSON lines. A per-server summary goes to
+stderr.
+
+Usage::
+
+    uv run python extras/perf/session_trace_merge.py \\
+        <CTR log dir>/<session> <STM log dir>/<session> <ACQ log dir>/<session> \\
+        [--reference CTR] [--offset ACQ_0=0.0042] [--level INFO] \\
+        [--format csv|jsonl] [--out merged.csv]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from neurobooth_os.util.session_trace import FILE_EXTENSION, read_trace  # noqa: E402
+
+COLUMNS = ("t", "server", "lsl_time", "unix_time", "level", "thread", "filename", "function", "line_no",
+           "message", "fields")
+
+Trace = Tuple[Dict[str, Any], List[Dict[str, Any]]]
+
+
+def find_segments(paths: Iterable[Path]) -> List[Path]:
+    """Expand files and directories (searched recursively) into trace segment paths."""
+    found: List[Path] = []
+    for p in paths:
+        if p.is_dir():
+            found.extend(sorted(p.rglob(f"*{FILE_EXTENSION}")))
+        else:
+            found.append(p)
+    return found
+
+
+def load_traces(paths: Iterable[Path]) -> List[Trace]:
+    """Read every segment. Raises on a file that is not a session trace."""
+    return [read_trace(str(p)) for p in find_segments(paths)]
+
+
+def clock_offsets(
+    headers: List[Dict[str, Any]],
+    reference: Optional[str] = None,
+    manual: Optional[Dict[str, float]] = None,
+) -> Dict[str, float]:
+    """Offset to add to each server's LSL time to land on the reference server's LSL clock.
+
+    Uses the earliest segment per server as its anchor, since all segments of
+    one process share one LSL clock. ``reference`` defaults to ``CTR`` if
+    present, else the first server alphabetically. Pure; the unit-test seam.
+    """
+    anchors: Dict[str, Tuple[int, float]] = {}
+    for h in headers:
+        server = h["server"]
+        wall_minus_lsl = h["anchor_unix_time"] - h["anchor_lsl_time"]
+        segment = h.get("segment", 0)
+        if server not in anchors or segment < anchors[server][0]:
+            anchors[server] = (segment, wall_minus_lsl)
+    if not anchors:
+        return {}
+    if reference is None:
+        reference = "CTR" if "CTR" in anchors else sorted(anchors)[0]
+    if reference not in anchors:
+        raise ValueError(f"Reference server '{reference}' has no trace (have: {', '.join(sorted(anchors))})")
+
+    ref = anchors[reference][1]
+    manual = manual or {}
+    return {server: wall_minus_lsl - ref + manual.get(server, 0.0) for server, (_, wall_minus_lsl) in anchors.items()}
+
+
+def merge(traces: List[Trace], offsets: Dict[str, float], min_level: int = logging.NOTSET) -> List[Dict[str, Any]]:
+    """Interleave all records by reference-clock time ``t``.
+
+    Records within a segment are nearly, but not strictly, ordered (threads
+    race for the handler lock), so each segment is sorted before the k-way
+    merge.
+    """
+    streams = []
+    for header, records in traces:
+        server = header["server"]
+        offset = offsets[server]
+        rows = []
+        for r in records:
+            if logging.getLevelName(r["level"]) < min_level:
+                continue
+            row = dict(r)
+            row["server"] = server
+            row["t"] = r["lsl_time"] + offset
+            rows.append(row)
+        rows.sort(key=lambda row: row["t"])
+        streams.append(rows)
+    return list(heapq.merge(*streams, key=lambda row: row["t"]))
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-server record count, level histogram and time span on the merged clock."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        s = out.setdefault(row["server"], {"n_records": 0, "levels": {}, "t_first": row["t"], "t_last": row["t"]})
+        s["n_records"] += 1
+        s["levels"][row["level"]] = s["levels"].get(row["level"], 0) + 1
+        s["t_first"] = min(s["t_first"], row["t"])
+        s["t_last"] = max(s["t_last"], row["t"])
+    return out
+
+
+def write_rows(rows: List[Dict[str, Any]], fmt: str, stream) -> None:
+    if fmt == "jsonl":
+        for row in rows:
+            stream.write(json.dumps({k: row[k] for k in COLUMNS}) + "\n")
+        return
+    writer = csv.writer(stream)
+    writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow([
+            f"{row['t']:.6f}", row["server"], f"{row['lsl_time']:.6f}", f"{row['unix_time']:.6f}", row["level"],
+            row["thread"], row["filename"], row["function"], row["line_no"], row["message"],
+            json.dumps(row["fields"]) if row["fields"] else "",
+        ])
+
+
+def _parse_offset(text: str) -> Tuple[str, float]:
+    server, _, value = text.partition("=")
+    if not server or not value:
+        raise argparse.ArgumentTypeError(f"expected SERVER=SECONDS, got '{text}'")
+    return server, float(value)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("paths", nargs="+", type=Path, help="Trace files or session log folders.")
+    p.add_argument("--reference", help="Server whose LSL clock is the output timeline (default CTR).")
+    p.add_argument(
+        "--offset",
+        action="append",
+        type=_parse_offset,
+        default=[],
+        help="Extra clock correction for a server, SERVER=SECONDS (repeatable).",
+    )
+    p.add_argument("--level", default="DEBUG", help="Minimum level to export (default DEBUG).")
+    p.add_argument("--format", choices=("csv", "jsonl"), default="csv", help="Output format (default csv).")
+    p.add_argument("--out", type=Path, help="Output file (default stdout).")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    traces = load_traces(args.paths)
+    if not traces:
+        print("No session trace segments found.", file=sys.stderr)
+        return 1
+
+    offsets = clock_offsets([h for h, _ in traces], args.reference, dict(args.offset))
+    rows = merge(traces, offsets, logging.getLevelName(args.level.upper()))
+
+    if args.out is None:
+        write_rows(rows, args.format, sys.stdout)
+    else:
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            write_rows(rows, args.format, f)
+        print(f"Wrote: {args.out}", file=sys.stderr)
+
+    for server, s in sorted(summarize(rows).items()):
+        print(
+            f"{server}: {s['n_records']} records over {s['t_last'] - s['t_first']:.1f} s "
+            f"(offset {offsets[server]:+.6f} s) {s['levels']}",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Incremental WAV/FLAC writing of int16 audio from a background thread.
+
+``MicStream`` with ``save_on_disk`` used to keep every chunk of a task in memory and join and write it all in
+``stop()``, so memory and ``stop()`` time grew with the task length. An :class:`AudioFileWriter` appends chunks to
+the file as they arrive instead; ``stop()`` only writes the last few chunks and patches the header with the final
+length, which costs the same however long the task was.
+
+``.wav`` files are written with the standard library ``wave`` module. ``.flac`` files need ``soundfile``, which is
+imported only when one is opened.
+"""
+
+import collections
+import threading
+import wave
+from typing import Optional
+
+AUDIO_FILE_FORMATS = ("wav", "flac")
+
+
+class AudioFileWriter(threading.Thread):
+    """
+    Appends 16-bit PCM chunks to a WAV or FLAC file from a background thread.
+
+    ``submit()`` only appends to a buffer, so it is safe to call from an audio callback. Unlike a lossy log buffer,
+    the buffer is unbounded: audio is never dropped, and the thread drains it every ``flush_interval_sec``.
+    """
+
+    def __init__(self, path: str, channels: int, frame_rate: int, flush_interval_sec: float = 0.25):
+        """
+        :param path: File to write; the format is taken from the extension (one of ``AUDIO_FILE_FORMATS``).
+        :param channels: Number of interleaved channels in each chunk.
+        :param frame_rate: Sample rate, in Hz.
+        :param flush_interval_sec: How often the buffer is written when not woken by ``stop()``.
+        """
+        super().__init__(name="audio_file_writer", daemon=True)
+        self.format = path.rsplit(".", 1)[-1].lower()
+        if self.format not in AUDIO_FILE_FORMATS:
+            raise ValueError(f"Unsupported audio file format '{self.format}' ({path}); "
+                             f"expected one of {AUDIO_FILE_FORMATS}.")
+        self.path = path
+        self.channels = channels
+        self.frame_rate = frame_rate
+        self.flush_interval_sec = flush_interval_sec
+        self.written_bytes = 0
+        self.error: Optional[Exception] = None
+        self._buffer = collections.deque()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def submit(self, data: bytes) -> None:
+        """Queue a chunk of interleaved int16 samples for writing. Never blocks; ``data`` must not be reused."""
+        if self.error is None:  # After a write error, stop buffering audio that will never be written
+            self._buffer.append(data)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write what is queued, finalize the header and close the file."""
+        self._stopping.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def _open(self):
+        if self.format == "flac":
+            import soundfile
+            return soundfile.SoundFile(self.path, "w", samplerate=self.frame_rate, channels=self.channels,
+                                       format="FLAC", subtype="PCM_16")
+        wav = wave.open(self.path, "wb")
+        wav.setnchannels(self.channels)
+        wav.setsampwidth(2)
+        wav.setframerate(self.frame_rate)
+        return wav
+
+    def _write(self, file, data: bytes) -> None:
+        if self.format == "flac":
+            file.buffer_write(data, dtype="int16")
+        else:
+            file.writeframesraw(data)  # Unlike writeframes, does not rewrite the header on every call
+        self.written_bytes += len(data)
+
+    def run(self) -> None:
+        try:
+            file = self._open()
+        except Exception as e:
+            self.error = e
+            self._buffer.clear()
+            return
+        try:
+            while True:
+                self._wake.wait(self.flush_interval_sec)
+                self._wake.clear()
+                stopping = self._stopping.is_set()
+                try:
+                    while True:
+                        self._write(file, self._buffer.popleft())
+                except IndexError:
+                    pass
+                if stopping:
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            file.close()  # Patches the header with the final length
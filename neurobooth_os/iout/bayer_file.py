@@ -0,0 +1,107 @@
+"""
+Raw Bayer video for the FLIR camera's ``capture_format: bayer`` mode, and its offline converter.
+
+In that mode the capture loop records the sensor's Bayer mosaic as-is, in a raw frame file
+(``raw_frame_file.py``) whose header also carries the Bayer pattern and the downscale factor ``fd``. Demosaicing and
+downscaling move from the capture loop to :func:`convert_to_avi`, which produces the same ``.avi`` the live ``bgr``
+mode writes. A raw frame is a third of the size of the demosaiced one, and the capture thread only copies bytes.
+"""
+
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from neurobooth_os.iout.raw_frame_file import RawFrameException, RawFrameReader, RawFrameWriter
+
+BAYER_FOURCC = "BAYR"  # Pseudo-FOURCC that selects BayerWriter in video_encoder.open_video_writer
+BAYER_EXTENSION = ".bayer"
+
+# cv2 conversion code names for the FLIR PixelColorFilter patterns
+_DEMOSAIC_CODES = {
+    "BG": "COLOR_BayerBG2BGR",
+    "GB": "COLOR_BayerGB2BGR",
+    "RG": "COLOR_BayerRG2BGR",
+    "GR": "COLOR_BayerGR2BGR",
+}
+
+BayerFileException = RawFrameException
+
+
+class BayerWriter(RawFrameWriter):
+    """Writes single-channel Bayer frames; has the ``write`` / ``release`` interface of ``cv2.VideoWriter``."""
+
+    def __init__(
+            self,
+            path: str,
+            fps: float,
+            frame_size: Tuple[int, int],
+            pattern: str = "BG",
+            fd: float = 1.0,
+            compression: str = "none",
+    ):
+        """
+        :param path: Output file.
+        :param fps: Frame rate to give the converted video.
+        :param frame_size: ``(width, height)`` of the raw frames.
+        :param pattern: Bayer pattern of the sensor (one of ``"BG"``, ``"GB"``, ``"RG"``, ``"GR"``).
+        :param fd: Downscale factor the converter applies after demosaicing (the FLIR ``fd`` argument).
+        :param compression: ``"none"`` or ``"zlib"`` (lossless, level 1).
+        """
+        if pattern not in _DEMOSAIC_CODES:
+            raise BayerFileException(f"Unknown Bayer pattern '{pattern}'")
+        super().__init__(path, fps, frame_size, compression=compression, pattern=pattern, fd=float(fd))
+
+
+class BayerReader(RawFrameReader):
+    """Iterates the raw frames of a file written by :class:`BayerWriter`."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        if "pattern" not in self.header:
+            self.close()
+            raise BayerFileException(f"{path} is not a raw Bayer file")
+
+
+def demosaic(raw: np.ndarray, pattern: str = "BG", fd: float = 1.0) -> np.ndarray:
+    """Turn a raw frame into the BGR frame the live ``bgr`` capture mode would have recorded."""
+    import cv2
+    bgr = cv2.demosaicing(raw, getattr(cv2, _DEMOSAIC_CODES[pattern]))
+    return cv2.resize(bgr, None, fx=fd, fy=fd)
+
+
+def convert_to_avi(path: str, out_path: Optional[str] = None, fourcc: str = "MJPG") -> Tuple[str, int]:
+    """
+    Convert a raw Bayer file into the ``.avi`` the live ``bgr`` mode produces (same demosaic, resize and codec).
+    Odd frame sizes are rounded down to even ones, which every codec accepts (OpenCV's MJPG writer does not store odd
+    sizes as given).
+
+    :param path: The ``.bayer`` file.
+    :param out_path: Output video; defaults to ``path`` with an ``.avi`` extension.
+    :param fourcc: Codec of the output video.
+    :returns: The output path and the number of frames written.
+    """
+    import cv2
+
+    if out_path is None:
+        out_path = os.path.splitext(path)[0] + ".avi"
+    with BayerReader(path) as reader:
+        h = reader.header
+        writer = None
+        n = 0
+        try:
+            for raw in reader:
+                frame = demosaic(raw, h["pattern"], h["fd"])
+                if writer is None:
+                    frame_size = (max(2, frame.shape[1] // 2 * 2), max(2, frame.shape[0] // 2 * 2))
+                    writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*fourcc), h["fps"], frame_size)
+                if (frame.shape[1], frame.shape[0]) != frame_size:
+                    frame = cv2.resize(frame, frame_size, interpolation=cv2.INTER_AREA)
+                writer.write(frame)
+                n += 1
+        finally:
+            if writer is not None:
+                writer.release()
+        if reader.truncated:
+            raise BayerFileException(f"{path} ends with an incomplete frame; converted the first {n} frames")
+    return out_path, n
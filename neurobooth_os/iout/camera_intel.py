@@ -5,12 +5,13 @@
 from __future__ import annotations
 
 import os.path as op
-from time import time
+from time import perf_counter, time
 import threading
 import warnings
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from pylsl import local_clock
 
 # Hardware import — guarded so this module is importable on a hardware-less
@@ -38,8 +39,12 @@ def _require_pyrealsense2() -> None:
 from pylsl import StreamInfo, StreamOutlet
 
 import neurobooth_os.iout.metadator as meta
+from neurobooth_os.iout.degrade import encoder_load, resize_for_encoding, scaled_frame_size
 from neurobooth_os.iout.device import Device, DeviceCapability, DeviceState
+from neurobooth_os.iout.lsl_batch import SampleBatcher
+from neurobooth_os.iout.raw_frame_file import RAW_EXTENSION, RAW_FOURCC
 from neurobooth_os.iout.stim_param_reader import IntelDeviceArgs
+from neurobooth_os.iout.video_encoder import VideoEncoder, count_encoder_stats, make_video_encoder
 from neurobooth_os.iout.stream_utils import DataVersion, set_stream_description
 from neurobooth_os.log_manager import APP_LOG_NAME
 from neurobooth_os.msg.messages import DeviceInitialization, Request
@@ -54,7 +59,7 @@ class RealSenseException(Exception):
 
 class VidRec_Intel(Device):
 
-    capabilities = DeviceCapability.RECORD | DeviceCapability.RECORD_PER_TASK
+    capabilities = DeviceCapability.RECORD | DeviceCapability.RECORD_PER_TASK | DeviceCapability.DEGRADABLE
 
     def __init__(
         self,
@@ -75,8 +80,24 @@ class VidRec_Intel(Device):
         self.serial_num = device_args.device_sn
         self.config = None
         self.pipeline = None
+        # recording_backend "frames": the pipeline keeps running between tasks and encoders write the files
+        self.frame_recording = device_args.recording_backend == "frames"
+        self.acquiring = False
+        self.depth_filename: Optional[str] = None
+        self.color_size: Optional[Tuple[int, int]] = None  # (width, height) of the open color video
+        self.depth_scale: Optional[float] = None
+        self.lsl_batch = SampleBatcher(
+            self._push_chunk, device_args.lsl_batch_samples, device_args.lsl_batch_latency_ms / 1e3,
+        )
         self._configure_pipeline()
 
+        self.color_encoder: Optional[VideoEncoder] = None
+        self.depth_encoder: Optional[VideoEncoder] = None
+        if self.frame_recording:
+            self.color_encoder = self._make_encoder('color')
+            if device_args.has_depth_sensor():
+                self.depth_encoder = self._make_encoder('depth')
+
     def _configure_pipeline(self) -> None:
         """Build the pyrealsense2 ``config`` and ``pipeline``.
 
@@ -92,7 +113,7 @@ class VidRec_Intel(Device):
             rs.stream.color,
             self.device_args.framesize()[0][0],
             self.device_args.framesize()[0][1],
-            rs.format.rgb8,
+            rs.format.bgr8 if self.frame_recording else rs.format.rgb8,  # The video encoder expects BGR
             self.device_args.sample_rate()[0],
         )
 
@@ -105,6 +126,15 @@ class VidRec_Intel(Device):
                 self.device_args.sample_rate()[1],
             )
 
+    def _make_encoder(self, stream: str) -> VideoEncoder:
+        return make_video_encoder(
+            self.device_args.encoder_backend,
+            self.device_args.frame_buffer_frames,
+            self.device_args.frame_buffer_policy,
+            self.device_args.encoder_threads,
+            name=f'{self.device_id}_{stream}_encoder',
+        )
+
     def connect(self) -> None:
         """Create the LSL outlet and notify the control server."""
         self.streamName = f"IntelFrameIndex_cam{self.device_index}"
@@ -149,9 +179,13 @@ class VidRec_Intel(Device):
             filename: Base name for the output video file. Defaults to ``"temp_video"``.
 
         Returns:
-            List containing the created video file basename.
+            List containing the created video file basename (the ``.bag``, or with ``recording_backend: frames``
+            the color ``.avi`` followed by the depth ``.nbraw``).
         """
         name = filename if filename is not None else "temp_video"
+        self._mark_start()
+        if self.frame_recording:
+            return self._start_frame_recording(name)
         if self.video_thread is not None and self.video_thread.is_alive():
             error_msg = (f'RealSense [{self.device_index}]: '
                          f'Attempting to start new recording thread while old one is still alive!')
@@ -203,22 +237,42 @@ class VidRec_Intel(Device):
         meta.post_message(Request(source='VidRec_Intel', destination='CTR', body=msg_body))
         return StreamOutlet(info)
 
-    def record(self):
-        self.frame_counter = 1
+    def _push_frame_index(self) -> None:
+        """Announce the current frameset on LSL (batched per ``lsl_batch_samples``)."""
+        self.lsl_batch.push([self.frame_counter, self.n, self.tsmp, time()], local_clock())
+        self.frame_counter += 1
 
+    def _push_chunk(self, samples: List[List[float]], timestamps: List[float]) -> None:
         try:
-            self.logger.debug(f'RealSense [{self.device_index}]: Starting Pipeline')
-            self.pipeline.start(self.config)
+            self.outlet.push_chunk(samples, timestamps)
         except Exception as e:
-            self.logger.error(f'RealSense [{self.device_index}]: Unable to start pipeline: {e}')
-            self.record_stopped_flag.set()
-            return
+            self.logger.warning(f'RealSense [{self.device_index}]: Reopening closed stream: {e}')
+            self.outlet = self._recreate_outlet()
+            self.outlet.push_chunk(samples, timestamps)
+
+    def _start_pipeline(self) -> None:
+        self.logger.debug(f'RealSense [{self.device_index}]: Starting Pipeline')
+        t0 = perf_counter()
+        self.pipeline.start(self.config)
+        self.hot_log.observe("pipeline_start_ms", (perf_counter() - t0) * 1e3)
 
+    def _configure_active_device(self) -> None:
         # Avoid autoexposure frame drops
         dev = self.pipeline.get_active_profile().get_device()
         sens = dev.first_color_sensor()
         sens.set_option(rs.option.auto_exposure_priority, self.device_args.auto_exposure_priority)
 
+    def record(self):
+        self.frame_counter = 1
+
+        try:
+            self._start_pipeline()
+        except Exception as e:
+            self.logger.error(f'RealSense [{self.device_index}]: Unable to start pipeline: {e}')
+            self.record_stopped_flag.set()
+            return
+        self._configure_active_device()
+
         self.toffset = time() - local_clock()
 
         self.logger.debug(f'RealSense [{self.device_index}]: Entering LSL Loop')
@@ -231,22 +285,147 @@ class VidRec_Intel(Device):
 
                 self.n = frame.get_frame_number()
                 self.tsmp = frame.get_timestamp()
-                try:
-                    self.outlet.push_sample([self.frame_counter, self.n, self.tsmp, time()])
-                except Exception as e:
-                    self.logger.warning(f'RealSense [{self.device_index}]: Reopening closed stream: {e}')
-                    self.outlet = self._recreate_outlet()
-                    self.outlet.push_sample([self.frame_counter, self.n, self.tsmp, time()])
-
-                self.frame_counter += 1
+                self._mark_first_frame()
+                self._push_frame_index()
         except Exception as e:
             self.logger.error(f'RealSense [{self.device_index}]: Unhandled exception in record loop: {e}')
         finally:
             self.logger.debug(f'RealSense [{self.device_index}]: Exited Record Loop')
+            self.lsl_batch.flush()
+            t0 = perf_counter()
             self.pipeline.stop()
+            self.hot_log.observe("pipeline_stop_ms", (perf_counter() - t0) * 1e3)
+            self.hot_log.count("frames", self.frame_counter - 1)
+            self.hot_log.flush(f'RealSense [{self.device_index}]')
             self.record_stopped_flag.set()
             self.logger.debug(f'RealSense [{self.device_index}]: Stopped Pipeline')
 
+    # ---- Frame recording (recording_backend: frames) ----
+
+    def _start_frame_recording(self, name: str) -> List[str]:
+        """Open the next task's files on the running pipeline, starting the pipeline first if needed."""
+        if not self.acquiring:
+            try:
+                self._start_pipeline()
+            except Exception as e:
+                error_msg = f'RealSense [{self.device_index}]: Unable to start pipeline: {e}'
+                self.logger.error(error_msg)
+                raise RealSenseException(error_msg)
+            self._configure_active_device()
+            if self.depth_encoder is not None:
+                dev = self.pipeline.get_active_profile().get_device()
+                self.depth_scale = dev.first_depth_sensor().get_depth_scale()
+            self.toffset = time() - local_clock()
+            self.acquiring = True
+            self.record_stopped_flag.set()
+            self.video_thread = threading.Thread(target=self._acquire, name=f'{self.device_id}_acquisition')
+            self.video_thread.start()
+        elif not self.record_stopped_flag.wait(10):
+            error_msg = f'RealSense [{self.device_index}]: Previous recording files were not closed'
+            self.logger.error(error_msg)
+            raise RealSenseException(error_msg)
+
+        self.name = name
+        fps_rgb, fps_depth = self.device_args.sample_rate()
+        size_rgb, size_depth = self.device_args.framesize()
+        self.video_filename = "{}_intel{}.avi".format(name, self.device_index)
+        self.color_size = (int(size_rgb[0]), int(size_rgb[1]))
+        if self._degraded("resize"):  # Depth frames are never resized; that would average depth values
+            self.color_size = scaled_frame_size(self.color_size, self.device_args.degrade_resize_factor)
+        self.color_encoder.open(self.video_filename, self.device_args.fourcc, fps_rgb, self.color_size)
+        files = [self.video_filename]
+        if self.depth_encoder is not None:
+            self.depth_filename = "{}_intel{}_depth{}".format(name, self.device_index, RAW_EXTENSION)
+            self.depth_encoder.open(
+                self.depth_filename, RAW_FOURCC, fps_depth, (int(size_depth[0]), int(size_depth[1])),
+                channels=1, dtype="uint16",
+                writer_options={
+                    "dtype": "uint16",
+                    "compression": self.device_args.depth_compression,
+                    "depth_scale_m": self.depth_scale,
+                },
+            )
+            files.append(self.depth_filename)
+
+        self.frame_counter = 1
+        self.record_stopped_flag.clear()
+        self.recording.set()  # The acquisition loop starts writing with the next frameset
+        self.logger.debug(f'RealSense [{self.device_index}]: Beginning Recording (pipeline already running)')
+        self.state = DeviceState.STARTED
+        self.streaming = True
+        return [op.split(f)[-1] for f in files]
+
+    def _acquire(self) -> None:
+        """Read every frameset while the pipeline runs; write and announce framesets only while a task records."""
+        self.logger.debug(f'RealSense [{self.device_index}]: Acquisition Thread Started')
+        writing = False
+        try:
+            while self.acquiring:
+                if writing and not self.recording.is_set():
+                    writing = False
+                    self._end_files()
+                success, frames = self.pipeline.try_wait_for_frames(timeout_ms=1000)
+                if not success:
+                    if writing:
+                        self.hot_log.count("timeouts")
+                        self.hot_log.sample("timeout", logging.WARNING,
+                                            "RealSense [%d]: Timeout when waiting for frame!", self.device_index,
+                                            every_sec=5)
+                    continue
+                if not self.recording.is_set():
+                    continue
+                writing = True
+                self._write_frameset(frames)
+        except Exception as e:
+            self.logger.error(f'RealSense [{self.device_index}]: Unhandled exception in acquisition loop: {e}')
+        finally:
+            self.recording.clear()
+            if writing:
+                self._end_files()
+            self.acquiring = False
+            self.pipeline.stop()
+            self.record_stopped_flag.set()
+            self.logger.debug(f'RealSense [{self.device_index}]: Stopped Pipeline; Exiting Acquisition Thread')
+
+    def _write_frameset(self, frames) -> None:
+        """Queue one frameset's color (and depth) frames for encoding, then announce it on LSL."""
+        self.n = frames.get_frame_number()
+        self.tsmp = frames.get_timestamp()
+        color = frames.get_color_frame()
+        if not color or not self.color_encoder.put(
+                resize_for_encoding(np.asanyarray(color.get_data()), self.color_size), self.n):
+            # Not announced, so FrameNum stays an index into the color video
+            self.hot_log.count("color_dropped")
+            self.hot_log.sample("encoder_drop", logging.WARNING,
+                                "RealSense [%d]: Color frame missing or frame buffer full; dropped frame %d",
+                                self.device_index, self.n, every_sec=5)
+            return
+        if self.depth_encoder is not None:
+            depth = frames.get_depth_frame()
+            if not depth or not self.depth_encoder.put(np.asanyarray(depth.get_data()), self.n):
+                self.hot_log.count("depth_dropped")
+        self._mark_first_frame()
+        self._push_frame_index()
+
+    def _end_files(self) -> None:
+        """Close the current task's files and emit the task summary."""
+        self.lsl_batch.flush()
+        count_encoder_stats(self.hot_log, self.color_encoder.close_file())
+        if self.depth_encoder is not None:
+            count_encoder_stats(self.hot_log, self.depth_encoder.close_file(), prefix="depth_encoder")
+        self.hot_log.count("frames", self.frame_counter - 1)
+        self.hot_log.flush(f'RealSense [{self.device_index}]')
+        self.record_stopped_flag.set()
+
+    def degrade_steps(self) -> Tuple[str, ...]:
+        # The SDK writes .bag files itself; only frame recording has color frames to resize, and there is no preview
+        return ("resize",) if self.frame_recording else ()
+
+    def degrade_load(self) -> Dict[str, Optional[float]]:
+        if not self.recording.is_set():
+            return {}
+        return encoder_load(self.color_encoder, float(self.device_args.sample_rate()[0]))
+
     def stop(self) -> None:
         self.logger.debug(f'RealSense [{self.device_index}]: Setting Record Stop Flag')
         self.recording.clear()
@@ -256,6 +435,12 @@ class VidRec_Intel(Device):
     def close(self) -> None:
         self.previewing = False
         self.stop()
+        if self.acquiring:
+            self.acquiring = False
+            self.video_thread.join(10)
+        for encoder in (self.color_encoder, self.depth_encoder):
+            if encoder is not None:
+                encoder.shutdown()
         self.config = []
         self.state = DeviceState.DISCONNECTED
 
@@ -263,7 +448,22 @@ class VidRec_Intel(Device):
         """Check to make sure the recording is actually stopped."""
         if not self.record_stopped_flag.wait(timeout=timeout_seconds):
             self.logger.error(f'RealSense [{self.device_index}]: Potential Zombie Detected!')
+            if self.frame_recording:
+                self._stop_acquisition(timeout_seconds)
+                return
             try:
                 self.pipeline.stop()
             except Exception as e:
                 self.logger.error(f'RealSense [{self.device_index}]: Unable to stop pipeline: {e}')
+
+    def _stop_acquisition(self, timeout_seconds: float) -> None:
+        """
+        End an acquisition thread that did not close the task's files: it closes them and stops the pipeline on its
+        way out, and the next start() brings the pipeline up again.
+        """
+        self.acquiring = False
+        self.video_thread.join(timeout_seconds)
+        if self.video_thread.is_alive():
+            error_msg = f'RealSense [{self.device_index}]: Acquisition thread did not stop; files may be left open'
+            self.logger.error(error_msg)
+            raise RealSenseException(error_msg)
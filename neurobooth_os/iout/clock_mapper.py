@@ -0,0 +1,158 @@
+"""
+Online mapping of a device clock onto the local LSL clock.
+
+A device that stamps its samples with its own clock (e.g. the FLIR camera's nanosecond timestamp) is periodically
+*latched*: its clock is read while the LSL ``local_clock()`` is read on either side of the call, and the midpoint is
+taken as the matching local time. A linear fit (offset and drift) over the most recent latches then converts every
+device timestamp to the LSL clock as it is recorded, so sync analysis needs no post-hoc regression over whole files.
+
+The fit is recomputed over a sliding window of latches, so it follows slow drift changes (e.g. the camera warming up)
+and the statistics it reports describe the current state of the two clocks.
+
+A device that cannot be latched, but stamps every sample it sends (e.g. the Mbient's millisecond epoch, delivered in
+BLE connection-interval bursts), is mapped by an :class:`EnvelopeClockMapper` instead. The receive time of a sample is
+its true time plus a transport delay that is never negative, so the samples received soonest after they were taken
+trace the lower envelope of receive time against device time. Each bin of device time contributes its earliest
+receive as a latch, and the line through those latches stamps every sample as if it had arrived with the smallest
+delay seen, which removes the burst jitter while keeping the constant part of the delay.
+"""
+
+import math
+from collections import deque
+from typing import Deque, Tuple
+
+import numpy as np
+
+
+class ClockMapper:
+    """Sliding-window linear fit of local time against device time."""
+
+    def __init__(self, window: int = 60, device_tick_sec: float = 1e-9):
+        """
+        :param window: Number of most recent latches the fit uses.
+        :param device_tick_sec: Length of one device clock tick in seconds (1e-9 for a nanosecond clock).
+        """
+        self.device_tick_sec = device_tick_sec
+        self._latches: Deque[Tuple[float, float]] = deque(maxlen=max(window, 2))
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every latch, e.g. after the device clock was set to a new time."""
+        self._latches.clear()
+        self._origin: Tuple[int, float] = (0, 0.0)  # First latch; keeps the fitted values small and well-conditioned
+        self.n_latches = 0
+        self.offset_sec = math.nan
+        self.slope = 1.0
+        self.residual_sec = math.nan
+
+    def add_latch(self, device_ticks: int, local_sec: float) -> None:
+        """Record that the device clock read ``device_ticks`` at local (LSL) time ``local_sec``, then refit."""
+        if self.n_latches == 0:
+            self._origin = (device_ticks, float(local_sec))
+        self._latches.append(self._centered(device_ticks, local_sec))
+        self.n_latches += 1
+        self._fit()
+
+    def _centered(self, device_ticks: int, local_sec: float) -> Tuple[float, float]:
+        # Subtract the origin in ticks before converting, so integer nanosecond clocks keep their precision
+        return float(device_ticks - self._origin[0]) * self.device_tick_sec, float(local_sec) - self._origin[1]
+
+    def _fit(self) -> None:
+        x, y = np.array(self._latches).T
+        self._fit_points(x, y)
+
+    def _fit_points(self, x: np.ndarray, y: np.ndarray) -> None:
+        if len(x) < 2 or np.ptp(x) == 0:
+            self.slope = 1.0
+            self.offset_sec = float(np.mean(y - x))
+            return
+        x_mean, y_mean = x.mean(), y.mean()
+        self.slope = float(np.sum((x - x_mean) * (y - y_mean)) / np.sum((x - x_mean) ** 2))
+        self.offset_sec = float(y_mean - self.slope * x_mean)
+        if len(x) > 2:  # Two points always fit exactly
+            residuals = y - (self.offset_sec + self.slope * x)
+            self.residual_sec = float(np.sqrt(np.mean(residuals ** 2)))
+
+    @property
+    def drift_ppm(self) -> float:
+        """How much faster (positive) or slower the local clock runs than the device clock, in parts per million."""
+        return (self.slope - 1.0) * 1e6
+
+    def to_local(self, device_ticks: int) -> float:
+        """Convert a device timestamp to LSL time; NaN until the first latch."""
+        if self.n_latches == 0:
+            return math.nan
+        x, _ = self._centered(device_ticks, self._origin[1])
+        return self._origin[1] + self.offset_sec + self.slope * x
+
+
+class EnvelopeClockMapper(ClockMapper):
+    """
+    :class:`ClockMapper` latched from the lower envelope of per-sample (device time, receive time) pairs.
+
+    Call :meth:`stamp` with every sample as it is received. It returns the sample's LSL time from the current fit, or
+    the receive time until the first bin has closed. Refits happen once per bin, so most calls only evaluate the line.
+    """
+
+    def __init__(
+            self,
+            window: int = 60,
+            device_tick_sec: float = 1e-3,
+            bin_sec: float = 1.0,
+            outlier_sec: float = 0.005,
+            max_jump_sec: float = 1.0,
+    ):
+        """
+        :param window: Number of most recent bins the fit uses.
+        :param device_tick_sec: Length of one device clock tick in seconds (1e-3 for a millisecond epoch).
+        :param bin_sec: Device time covered by each bin; each bin contributes its earliest receive as one latch.
+        :param outlier_sec: Bins whose earliest receive is this far above the fitted line (e.g. every sample of the
+            bin was held up by a stall) are left out of the fit.
+        :param max_jump_sec: A sample this far from the fit means the device clock was set again (e.g. after a
+            reconnect); the fit starts over.
+        """
+        self.bin_ticks = bin_sec / device_tick_sec
+        self.outlier_sec = outlier_sec
+        self.max_jump_sec = max_jump_sec
+        self.n_resets = 0
+        self.n_clamped = 0
+        self._bin = None
+        self._bin_min: Tuple[int, float, float] = (0, 0.0, math.inf)  # (device ticks, local time, local - device)
+        super().__init__(window, device_tick_sec)
+
+    def reset(self) -> None:
+        super().reset()
+        self._bin = None
+
+    def stamp(self, device_ticks: int, local_sec: float) -> float:
+        """
+        Add a sample received at local (LSL) time ``local_sec`` and return its LSL time. The result is never later
+        than ``local_sec``: a sample received sooner than the fit expects has at least that much less delay.
+        """
+        device_sec = device_ticks * self.device_tick_sec
+        if self.n_latches and abs(local_sec - self.to_local(device_ticks)) > self.max_jump_sec:
+            self.reset()
+            self.n_resets += 1
+        b = device_ticks // self.bin_ticks
+        if b != self._bin:
+            if self._bin is not None:
+                self.add_latch(*self._bin_min[:2])
+            self._bin = b
+            self._bin_min = (device_ticks, local_sec, local_sec - device_sec)
+        elif local_sec - device_sec < self._bin_min[2]:
+            self._bin_min = (device_ticks, local_sec, local_sec - device_sec)
+        if self.n_latches == 0:
+            return local_sec
+        mapped = self.to_local(device_ticks)
+        if mapped > local_sec:
+            self.n_clamped += 1
+            return local_sec
+        return mapped
+
+    def _fit(self) -> None:
+        x, y = np.array(self._latches).T
+        self._fit_points(x, y)
+        if len(x) > 3:  # Refit without bins that never saw a short delay
+            keep = y - (self.offset_sec + self.slope * x) <= self.outlier_sec
+            if 2 <= keep.sum() < len(x):
+                self._fit_points(x[keep], y[keep])
@@ -0,0 +1,167 @@
+"""
+Adaptive degradation of camera recording when the acquisition machine runs short of CPU.
+
+When an ACQ machine saturates, every camera's capture and encoder threads slow down together and frames back up in
+the encoder buffers until they block the capture loops or are dropped. A :class:`DegradeController` polls the machine
+CPU and each camera's encoder load and, under sustained pressure, sheds work one step at a time from the cameras the
+YAML marks as least important (``degrade_priority``), restoring it in reverse order once the pressure is gone.
+
+A camera's steps, applied cumulatively in ``DEGRADE_STEPS`` order (``Device.degrade_steps`` lists the ones it
+supports):
+
+- ``"preview"``: the capture loop stops feeding the operator preview.
+- ``"resize"``: video files opened from now on are encoded at ``degrade_resize_factor`` of the capture size. A file
+  keeps the size it was opened with, so this takes effect from the next task.
+
+No step skips frames, so frame-index LSL streams stay complete. Every level change is logged as a
+``DEGRADE MARKER`` JSON record stamped with the LSL clock, for alignment with the recorded streams.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import psutil
+from pylsl import local_clock
+
+from neurobooth_os.iout.device import Device, DeviceCapability
+from neurobooth_os.iout.video_encoder import VideoEncoder
+from neurobooth_os.log_manager import APP_LOG_NAME
+
+DEGRADE_STEPS = ("preview", "resize")
+
+# Pressure: the machine CPU or any camera's encoder buffer is at least this high, or an encoder takes longer per frame
+# than the frame interval. Relief: the CPU and every buffer are below the low marks.
+CPU_HIGH_PERCENT = 90.0
+CPU_LOW_PERCENT = 70.0
+FILL_HIGH = 0.5
+FILL_LOW = 0.1
+
+
+def encoder_load(encoder: Optional[VideoEncoder], fps: float) -> Dict[str, Optional[float]]:
+    """A camera's ``degrade_load`` from the encoder of its open file and its frame rate."""
+    if encoder is None:
+        return {}
+    fill, encode_ms = encoder.load()
+    return {"fill": fill, "encode_ms": encode_ms, "frame_ms": 1e3 / fps if fps else None}
+
+
+def scaled_frame_size(frame_size: Tuple[int, int], factor: float) -> Tuple[int, int]:
+    """``(width, height)`` scaled by ``factor`` and rounded down to even sizes, which every codec accepts."""
+    return tuple(max(2, int(round(n * factor)) // 2 * 2) for n in frame_size)
+
+
+def resize_for_encoding(frame: np.ndarray, frame_size: Tuple[int, int]) -> np.ndarray:
+    """Resize a frame to the ``(width, height)`` of the open video file, if it is not that size already."""
+    if (frame.shape[1], frame.shape[0]) == tuple(frame_size):
+        return frame
+    import cv2
+    return cv2.resize(frame, tuple(frame_size), interpolation=cv2.INTER_AREA)
+
+
+class DegradeController(threading.Thread):
+    """Polls camera load and machine CPU and steps camera degrade levels up or down, one change at a time."""
+
+    def __init__(
+            self,
+            devices: Mapping[str, Device],
+            interval_sec: float = 2.0,
+            hold_sec: float = 10.0,
+            cpu_percent: Callable[[], float] = psutil.cpu_percent,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param devices: Candidate devices; those with the ``DEGRADABLE`` capability and a ``degrade_priority`` are
+            managed.
+        :param interval_sec: How often to poll.
+        :param hold_sec: Minimum time between level changes, so each change can take effect before the next.
+        :param cpu_percent: Machine CPU use since the previous call, in percent.
+        :param clock: Monotonic clock for ``hold_sec``.
+        """
+        super().__init__(name="degrade_controller", daemon=True)
+        self.logger = logging.getLogger(APP_LOG_NAME)
+        self.devices: Dict[str, Device] = {
+            device_id: device for device_id, device in devices.items()
+            if isinstance(device, Device)
+            and device.has_capability(DeviceCapability.DEGRADABLE)
+            and device.device_args.degrade_priority is not None
+            and device.degrade_steps()
+        }
+        self.interval_sec = interval_sec
+        self.hold_sec = hold_sec
+        self._cpu_percent = cpu_percent
+        self._clock = clock
+        self._last_change = -float("inf")
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        self._cpu_percent()  # The first call only starts the measurement
+        while not self._stop_event.wait(self.interval_sec):
+            try:
+                self.step()
+            except Exception:
+                self.logger.exception("Degrade controller: poll failed; skipping this poll.")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _priority(self, device_id: str) -> Tuple[int, str]:
+        return self.devices[device_id].device_args.degrade_priority, device_id
+
+    def step(self) -> Optional[Dict[str, Any]]:
+        """Poll once and change at most one device's level. Returns the logged marker, if any."""
+        cpu = self._cpu_percent()
+        loads = {device_id: device.degrade_load() for device_id, device in self.devices.items()}
+
+        reasons: List[str] = []
+        if cpu >= CPU_HIGH_PERCENT:
+            reasons.append(f"cpu {cpu:.0f}%")
+        calm = cpu < CPU_LOW_PERCENT
+        for device_id, load in loads.items():
+            fill, encode_ms, frame_ms = load.get("fill"), load.get("encode_ms"), load.get("frame_ms")
+            if fill is not None:
+                if fill >= FILL_HIGH:
+                    reasons.append(f"{device_id} buffer {fill:.0%}")
+                calm = calm and fill < FILL_LOW
+            if encode_ms is not None and frame_ms is not None and encode_ms > frame_ms:
+                reasons.append(f"{device_id} encode {encode_ms:.1f} ms > {frame_ms:.1f} ms frame interval")
+                calm = False
+
+        now = self._clock()
+        if now - self._last_change < self.hold_sec:
+            return None
+        by_priority = sorted(self.devices, key=self._priority)
+        if reasons:  # Degrade the least important device that has a step left
+            candidates = [
+                d for d in by_priority if self.devices[d].degrade_level < len(self.devices[d].degrade_steps())
+            ]
+            change = 1
+        elif calm:  # Restore the most important degraded device
+            candidates = [d for d in reversed(by_priority) if self.devices[d].degrade_level > 0]
+            change = -1
+            reasons = [f"relief: cpu {cpu:.0f}%"]
+        else:
+            return None
+        if not candidates:
+            return None
+
+        device_id = candidates[0]
+        device = self.devices[device_id]
+        old_level = device.degrade_level
+        device.set_degrade_level(old_level + change)
+        self._last_change = now
+        marker = {
+            "time_lsl": local_clock(),
+            "device_id": device_id,
+            "level": device.degrade_level,
+            "previous_level": old_level,
+            "steps": list(device.degrade_steps()[:device.degrade_level]),
+            "reasons": reasons,
+            "cpu_percent": cpu,
+            "loads": loads,
+        }
+        self.logger.warning(f"DEGRADE MARKER: {json.dumps(marker)}")
+        return marker
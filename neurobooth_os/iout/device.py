@@ -1,13 +1,14 @@
 """Common device types and base class defining the standard device lifecycle."""
 
 import logging
+import time
 import uuid
 from abc import ABC, abstractmethod
 from enum import Enum, Flag, auto
-from typing import Any, ByteString, ClassVar, List, Mapping, Optional
+from typing import Any, ByteString, ClassVar, Dict, List, Mapping, Optional, Tuple
 
 from neurobooth_os.iout.stim_param_reader import DeviceArgs
-from neurobooth_os.log_manager import APP_LOG_NAME
+from neurobooth_os.log_manager import APP_LOG_NAME, HotPathLogger
 
 
 class CameraPreviewException(Exception):
@@ -25,6 +26,8 @@ class DeviceCapability(Flag):
     RECORD_PER_TASK = auto()  # Recording is driven by the per-task lifecycle (cameras)
     RESETTABLE = auto()       # Participates in operator-triggered reset (mbient)
     SESSION_LEVEL = auto()    # Brought up regardless of whether any task references it (marker)
+    DEGRADABLE = auto()       # Can shed work under CPU pressure (cameras; see iout/degrade.py)
+    GROUP_BRING_UP = auto()   # Brought up together with its peers via bring_up_group (mbient)
 
 
 class DeviceState(Enum):
@@ -55,6 +58,8 @@ class Device(ABC):
         outlet: The LSL StreamOutlet (created during ``connect()``).
         streaming: Whether the device is currently streaming/recording.
         state: Current lifecycle state.
+        hot_log: Sampled logging and counters for per-frame / per-sample paths.
+        degrade_level: Number of ``degrade_steps()`` currently applied (see ``iout/degrade.py``).
     """
 
     capabilities: ClassVar[DeviceCapability] = DeviceCapability(0)
@@ -67,6 +72,9 @@ class Device(ABC):
         self.streaming: bool = False
         self.state: DeviceState = DeviceState.CREATED
         self.logger = logging.getLogger(APP_LOG_NAME)
+        self.hot_log = HotPathLogger(self.logger, device=self.device_id)
+        self._start_t0: Optional[float] = None
+        self.degrade_level: int = 0
 
     def configure(self) -> None:
         """Set device parameters from config. No-op by default."""
@@ -96,6 +104,19 @@ class Device(ABC):
         """Stop data acquisition / streaming."""
         ...
 
+    def _mark_start(self) -> None:
+        """Note that ``start()`` was called, for the ``first_frame_ms`` latency in the task summary."""
+        self._start_t0 = time.perf_counter()
+
+    def _mark_first_frame(self) -> None:
+        """Record the time from ``start()`` to the first recorded frame in ``hot_log`` (once per start).
+
+        Cheap enough to call for every frame.
+        """
+        if self._start_t0 is not None:
+            self.hot_log.observe("first_frame_ms", (time.perf_counter() - self._start_t0) * 1e3)
+            self._start_t0 = None
+
     def ensure_stopped(self, timeout_seconds: float = 10.0) -> None:
         """Wait for async stop to complete. No-op by default.
 
@@ -150,6 +171,25 @@ class Device(ABC):
             self.start()
         return self
 
+    @classmethod
+    def bring_up_group(cls, devices: List["Device"], context: Mapping[str, Any]) -> List[Optional["Device"]]:
+        """Bring up several devices of this class in one call.
+
+        ``DeviceManager`` calls this instead of ``bring_up`` for classes with
+        the ``GROUP_BRING_UP`` capability, passing every such device of the
+        session. Default: ``bring_up`` each device in turn. Override when
+        the devices share a resource that can be coordinated (e.g. Mbient's
+        BLE scan and adapter).
+
+        Args:
+            devices: The devices to bring up, all instances of this class.
+            context: Passed to each device's ``bring_up``.
+
+        Returns:
+            The ``bring_up`` result of each device, in order.
+        """
+        return [device.bring_up(context) for device in devices]
+
     def on_task_reconnect(self) -> None:
         """Hook called by DeviceManager before each task starts.
 
@@ -158,6 +198,31 @@ class Device(ABC):
         """
         pass
 
+    def on_task_end(self) -> None:
+        """Hook called by DeviceManager after each task's recording stops.
+
+        No-op by default. Override for devices that defer recovery work to
+        the gap between tasks (e.g. Mbient's health monitor).
+        """
+        pass
+
+    @classmethod
+    def supervise(cls, devices: List["Device"]) -> Optional[Any]:
+        """Start background supervision of this class's loaded devices.
+
+        ``DeviceManager`` calls this once per ``WEARABLE`` class after
+        ``create_streams``, with every loaded device of the class, and calls
+        ``stop()`` on the returned object in ``close_streams``. Default: no
+        supervision (``None``).
+
+        Args:
+            devices: The loaded devices of this class.
+
+        Returns:
+            An object with a ``stop()`` method, or ``None``.
+        """
+        return None
+
     def on_session_reset(self) -> bool:
         """Hook called when the operator requests a device reset.
 
@@ -170,6 +235,27 @@ class Device(ABC):
         """
         return True
 
+    def degrade_steps(self) -> Tuple[str, ...]:
+        """The ``DEGRADE_STEPS`` this device supports, in the order they are applied. None by default."""
+        return ()
+
+    def degrade_load(self) -> Dict[str, Optional[float]]:
+        """Current load for the degrade controller. Empty by default and while not recording.
+
+        Keys: ``fill`` (fraction of the encoder buffer in use), ``encode_ms`` (recent encode time per frame, None
+        if not known) and ``frame_ms`` (frame interval).
+        """
+        return {}
+
+    def set_degrade_level(self, level: int) -> None:
+        """Apply the first ``level`` of ``degrade_steps()``. Called by the degrade controller."""
+        self.degrade_level = max(0, min(level, len(self.degrade_steps())))
+        self.hot_log.count("degrade_changes")
+
+    def _degraded(self, step: str) -> bool:
+        """Whether a degrade step is currently applied. Cheap enough to call for every frame."""
+        return step in self.degrade_steps()[:self.degrade_level]
+
     def frame_preview(self) -> ByteString:
         """Return a single preview frame as encoded image bytes.
 
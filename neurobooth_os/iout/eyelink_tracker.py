@@ -315,6 +315,11 @@ class EyeTracker(Device):
 
                         self.outlet.push_sample(values)
                         old_sample = smp
+                        self.hot_log.count("samples")
+                    else:
+                        self.hot_log.count("repeat_polls")
+                else:
+                    self.hot_log.count("empty_polls")
 
                 while t2 - t1 < 1 / (self.sample_rate * 4):
                     t2 = local_clock()
@@ -330,6 +335,7 @@ class EyeTracker(Device):
         finally:
             self.tk.stopRecording()
             self.tk.closeDataFile()
+            self.hot_log.flush('EyeLink')
             self.logger.debug('EyeLink: Exiting Record Thread')
 
     def stop(self) -> None:
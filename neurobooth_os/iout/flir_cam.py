@@ -3,12 +3,11 @@ from __future__ import annotations
 
 import os.path as op
 import numpy as np
-import queue
 import time
 import os
 import threading
 import logging
-from typing import Callable, Any, List, Optional, ByteString
+from typing import Callable, Any, Dict, List, Optional, ByteString, Tuple
 
 import cv2
 
@@ -34,18 +33,31 @@ def _require_pyspin() -> None:
         )
 
 
-from pylsl import StreamInfo, StreamOutlet
+from pylsl import StreamInfo, StreamOutlet, local_clock
 
 from neurobooth_os.iout.stim_param_reader import FlirDeviceArgs
 from neurobooth_os.iout.stream_utils import DataVersion, set_stream_description
 from neurobooth_os.log_manager import APP_LOG_NAME
 from neurobooth_os.msg.messages import DeviceInitialization, Request
 from neurobooth_os.iout.device import Device, DeviceCapability, DeviceState
+from neurobooth_os.iout.bayer_file import BAYER_EXTENSION, BAYER_FOURCC, demosaic
+from neurobooth_os.iout.clock_mapper import ClockMapper
+from neurobooth_os.iout.degrade import DEGRADE_STEPS, encoder_load, resize_for_encoding, scaled_frame_size
+from neurobooth_os.iout.lsl_batch import SampleBatcher
+from neurobooth_os.iout.preview_slot import PreviewSlot, encode_jpeg
+from neurobooth_os.iout.video_encoder import count_encoder_stats, make_video_encoder
 import neurobooth_os.iout.metadator as meta
 
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
 
+# Sensor mosaic demosaiced with cv2.COLOR_BayerBG2BGR; recorded in raw Bayer files for the offline converter
+BAYER_PATTERN = "BG"
+
+# A clock latch whose LSL reads are further apart than this says too little about when the camera clock was read
+MAX_LATCH_ROUND_TRIP_SEC = 0.005
+
+
 class FlirException(Exception):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -57,6 +69,7 @@ class VidRec_Flir(Device):
         DeviceCapability.RECORD
         | DeviceCapability.RECORD_PER_TASK
         | DeviceCapability.CAMERA_PREVIEW
+        | DeviceCapability.DEGRADABLE
     )
 
     def __init__(
@@ -75,8 +88,31 @@ class VidRec_Flir(Device):
         self.gamma = device_args.gamma()
         self.fd = device_args.fd()
         self.recording = False
+        self.raw_capture = device_args.capture_format == "bayer"
+        self.acquiring = False  # Camera streaming between tasks (continuous_acquisition)
+        self.file_closed = threading.Event()
+        self.file_closed.set()
+        # Raw mosaics are written as captured and resized offline, so they can only shed preview work
+        self._degrade_steps = DEGRADE_STEPS[:1] if self.raw_capture else DEGRADE_STEPS
+        self.encode_size: Optional[Tuple[int, int]] = None  # (width, height) of the open video file
+        # Raw mosaics are kept full size and demosaiced when a preview is requested
+        self.preview = PreviewSlot(
+            device_args.preview_every_n_frames, device_args.preview_max_age_sec, downscale=not self.raw_capture,
+        )
+        # Camera clock -> LSL clock; kept for the life of the device because the camera clock runs across tasks
+        self.clock_mapper = ClockMapper(window=device_args.clock_fit_window)
+        self._next_latch_time = 0.0
+        self.lsl_batch = SampleBatcher(
+            self._push_chunk, device_args.lsl_batch_samples, device_args.lsl_batch_latency_ms / 1e3,
+        )
 
-        self.image_queue = queue.Queue(0)
+        self.video_encoder = make_video_encoder(
+            device_args.encoder_backend,
+            device_args.frame_buffer_frames,
+            device_args.frame_buffer_policy,
+            device_args.encoder_threads,
+            name=f'{self.device_id}_encoder',
+        )
 
     def connect(self) -> None:
         """Connect to the FLIR camera, configure it, and create the LSL outlet."""
@@ -141,16 +177,20 @@ class VidRec_Flir(Device):
                 name=self.streamName,
                 type="videostream",
                 channel_format="double64",
-                channel_count=2,
+                channel_count=4,
                 source_id=self.outlet_id,
             ),
             device_id=self.device_id,
             sensor_ids=self.sensor_ids,
-            data_version=DataVersion(1, 0),
-            columns=['FrameNum', 'Time_FLIR'],
+            data_version=DataVersion(1, 1),
+            columns=['FrameNum', 'Time_FLIR', 'Time_FLIR_LSL', 'ClockFit_RMS'],
             column_desc={
                 'FrameNum': 'Frame number',
                 'Time_FLIR': 'Camera timestamp (ns)',
+                'Time_FLIR_LSL': 'Camera timestamp mapped to the LSL clock by the online clock fit (s); NaN before '
+                                 'the first clock latch',
+                'ClockFit_RMS': 'RMS residual of the clock fit over its recent latches (s); NaN before the third '
+                                'latch',
             },
             serial_number=self.serial_num,
             fps_rgb=str(self.device_args.sample_rate()),
@@ -167,21 +207,85 @@ class VidRec_Flir(Device):
         meta.post_message(Request(source='Flir', destination='CTR', body=msg_body))
         self.outlet = StreamOutlet(info)
 
-    # function to capture images, convert to numpy, send to queue, and release
-    # from buffer in separate process
-    def camCaptureVid(self):
-        self.logger.debug('FLIR: Save Thread Started')
-        while self.recording or self.image_queue.qsize():
-            try:
-                dequeuedImage = self.image_queue.get(block=True, timeout=1)
-                self.video_out.write(dequeuedImage)
-            except queue.Empty:
-                continue
-        self.logger.debug('FLIR: Exiting Save Thread')
+    def _queue_frame(self, im: np.ndarray, tsmp: int) -> bool:
+        """
+        Hand a frame to the video encoder, then announce it on LSL. A frame the encoder drops is not announced, so
+        each FrameNum in the LSL stream is the index of a frame in the video file.
+
+        :returns: False if the frame was dropped.
+        """
+        if not self.video_encoder.put(resize_for_encoding(im, self.encode_size), tsmp):
+            self.hot_log.sample("encoder_drop", logging.WARNING,
+                                "FLIR: Frame buffer full (%d frames, policy=%s); dropped frame at camera time %d",
+                                self.video_encoder.capacity, self.video_encoder.policy, tsmp, every_sec=5)
+            return False
+        self._mark_first_frame()
+        self._update_clock_fit()
+
+        sample = [self.frame_counter, tsmp, self.clock_mapper.to_local(tsmp), self.clock_mapper.residual_sec]
+        self.lsl_batch.push(sample, local_clock())
+        self.frame_counter += 1
+        return True
+
+    def _push_chunk(self, samples: List[List[float]], timestamps: List[float]) -> None:
+        try:
+            self.outlet.push_chunk(samples, timestamps)
+        except BaseException:
+            self.logger.debug(f"Reopening FLIR stream already closed")
+            self._create_outlet()
+            self.outlet.push_chunk(samples, timestamps)
+
+    def _latch_clock(self) -> Tuple[int, float, float]:
+        """
+        Latch the camera clock between two reads of the LSL clock.
+
+        :returns: The camera timestamp (ns), the LSL time it was taken at (midpoint of the reads), and the time
+            between the reads (s).
+        """
+        t0 = local_clock()
+        self.cam.TimestampLatch.Execute()
+        tsmp = self.cam.TimestampLatchValue.GetValue()
+        t1 = local_clock()
+        return tsmp, (t0 + t1) / 2, t1 - t0
+
+    def _update_clock_fit(self) -> None:
+        """Add a clock latch to the camera-to-LSL fit once every ``clock_latch_interval_sec``."""
+        now = local_clock()
+        if now < self._next_latch_time:
+            return
+        self._next_latch_time = now + self.device_args.clock_latch_interval_sec
+        try:
+            tsmp, lsl_time, round_trip = self._latch_clock()
+        except Exception as e:
+            self.hot_log.count("clock_latch_errors")
+            self.hot_log.sample("clock_latch", logging.WARNING, "FLIR: Clock latch failed: %s", e, every_sec=60)
+            return
+        self.hot_log.observe("clock_latch_ms", round_trip * 1e3)
+        if round_trip > MAX_LATCH_ROUND_TRIP_SEC:
+            self.hot_log.count("clock_latch_rejected")
+            return
+        self.clock_mapper.add_latch(tsmp, lsl_time)
+
+    def _observe_clock_fit(self) -> None:
+        """Add the current clock fit to the task summary."""
+        if self.clock_mapper.n_latches > 1:
+            self.hot_log.observe("clock_drift_ppm", self.clock_mapper.drift_ppm)
+        if not np.isnan(self.clock_mapper.residual_sec):
+            self.hot_log.observe("clock_fit_rms_us", self.clock_mapper.residual_sec * 1e6)
+
+    def _finish_video(self) -> None:
+        """Let the encoder write every queued frame and release the file, then add its counters to the task summary."""
+        stats = self.video_encoder.close_file()
+        count_encoder_stats(self.hot_log, stats)
+        if stats.get("write_errors"):
+            self.logger.error(f'FLIR: {stats["write_errors"]} frames failed to encode into {self.video_filename}')
 
     def start(self, filename: Optional[str] = None) -> List[str]:
         """Begin recording video.
 
+        With ``continuous_acquisition``, the camera is started by the first call and keeps streaming between tasks;
+        later calls only open the next video file.
+
         Args:
             filename: Base name for the output video file. Defaults to ``"temp_video"``.
 
@@ -189,6 +293,11 @@ class VidRec_Flir(Device):
             List containing the created video file basename.
         """
         name = filename if filename is not None else "temp_video"
+        self._mark_start()
+        if self.device_args.continuous_acquisition:
+            self._start_warm(name)
+            return [op.split(self.video_filename)[-1]]
+
         self._prepare_recording(name)
         self.video_thread = threading.Thread(target=self.record)
         self.logger.debug('FLIR: Beginning Recording')
@@ -196,79 +305,182 @@ class VidRec_Flir(Device):
         self.video_thread.start()
         return [op.split(self.video_filename)[-1]]
 
-    def imgage_proc(self):
+    def imgage_proc(self, raw: bool = False):
         im = self.cam.GetNextImage(2000)
         tsmp = im.GetTimeStamp()
         imgarr = im.GetNDArray()
+        if raw:  # Demosaic and resize happen offline (see iout/bayer_file.py)
+            imgarr = imgarr.copy()  # The array views the camera buffer, which Release hands back to the driver
+            im.Release()
+            return imgarr, tsmp
         im_conv = cv2.demosaicing(imgarr, cv2.COLOR_BayerBG2BGR)
         im.Release()
         return cv2.resize(im_conv, None, fx=self.fd, fy=self.fd), tsmp
 
+    def _next_frame(self):
+        """Block until the camera delivers the next frame (the mock paces itself here)."""
+        return self.imgage_proc(raw=self.raw_capture)
+
     def _prepare_recording(self, name: str = "temp_video") -> None:
         self.cam.BeginAcquisition()
-        im, _ = self.imgage_proc()
+        im, _ = self.imgage_proc(raw=self.raw_capture)
         self.frameSize = (im.shape[1], im.shape[0])
-        self.video_filename = "{}_flir.avi".format(name)
-
-        fourcc = cv2.VideoWriter_fourcc(*"MJPG")
         self.FRAME_RATE_OUT = self.cam.AcquisitionResultingFrameRate()
-        self.video_out = cv2.VideoWriter(
-            self.video_filename, fourcc, self.FRAME_RATE_OUT, self.frameSize
-        )
+        self._open_video(name)
         self.streaming = True
 
+    def _open_video(self, name: str) -> None:
+        """Open this recording's video file on the encoder. frameSize and FRAME_RATE_OUT must already be set."""
+        self.encode_size = self.frameSize
+        if self._degraded("resize"):
+            self.encode_size = scaled_frame_size(self.frameSize, self.device_args.degrade_resize_factor)
+        if self.raw_capture:
+            self.video_filename = "{}_flir{}".format(name, BAYER_EXTENSION)
+            self.video_encoder.open(
+                self.video_filename, BAYER_FOURCC, self.FRAME_RATE_OUT, self.frameSize, channels=1,
+                writer_options={
+                    "pattern": BAYER_PATTERN, "fd": self.fd, "compression": self.device_args.bayer_compression,
+                },
+            )
+        else:
+            self.video_filename = "{}_flir.avi".format(name)
+            self.video_encoder.open(
+                self.video_filename, self.device_args.fourcc, self.FRAME_RATE_OUT, self.encode_size,
+            )
+
+    def _observe_queue_depth(self) -> None:
+        queue_depth = self.video_encoder.depth()
+        self.hot_log.observe("queue_depth", queue_depth)
+        if queue_depth > 2:
+            self.hot_log.sample("queue", logging.DEBUG, "FLIR: Queue length is %d frame count: %d",
+                                queue_depth, self.frame_counter, every_sec=5)
+
+    def _end_file(self) -> None:
+        """Close the current video file and emit the task summary."""
+        self.lsl_batch.flush()
+        self._finish_video()
+        self._observe_clock_fit()
+        self.hot_log.count("frames", self.frame_counter)
+        self.hot_log.flush("FLIR")
+        self.file_closed.set()
+
     def record(self):
         self.logger.debug('FLIR: LSL Thread Started')
         self.recording = True
         self.frame_counter = 0
-        self.save_thread = threading.Thread(target=self.camCaptureVid)
-        self.save_thread.start()
 
-        self.stamp = []
         try:
             while self.recording:
                 try:
-                    im, tsmp = self.imgage_proc()
-                except Exception:
+                    im, tsmp = self.imgage_proc(raw=self.raw_capture)
+                except Exception as e:
+                    self.hot_log.count("grab_errors")
+                    self.hot_log.sample("grab_error", logging.WARNING, "FLIR: Frame grab failed: %s", e,
+                                        every_sec=5)
                     continue
 
-                self.image_queue.put(im)
-                self.stamp.append(tsmp)
-
-                try:
-                    self.outlet.push_sample([self.frame_counter, tsmp])
-                except BaseException:
-                    self.logger.debug(f"Reopening FLIR stream already closed")
-                    self._create_outlet()
-                    self.outlet.push_sample([self.frame_counter, tsmp])
-
-                self.frame_counter += 1
-
-                if not self.frame_counter % 1000 and self.image_queue.qsize() > 2:
-                    self.logger.debug(
-                        f"Queue length is {self.image_queue.qsize()} frame count: {self.frame_counter}"
-                    )
+                if not self._degraded("preview"):
+                    self.preview.offer(im)
+                if not self._queue_frame(im, tsmp):
+                    continue
+                self._observe_queue_depth()
         except Exception as e:
             self.logger.error(f'FLIR: Unhandled exception in record loop: {e}')
         finally:
             self.cam.EndAcquisition()
             self.recording = False
-            self.save_thread.join()
-            self.video_out.release()
+            self._end_file()
             self.logger.debug('FLIR: Video File Released; Exiting LSL Thread')
 
+    # ---- Continuous acquisition (continuous_acquisition: true) ----
+
+    def _start_warm(self, name: str) -> None:
+        """Open the next video file on the running camera, starting the camera first if it is not streaming."""
+        if not self.acquiring:
+            self.cam.BeginAcquisition()
+            im, _ = self.imgage_proc(raw=self.raw_capture)
+            self.frameSize = (im.shape[1], im.shape[0])
+            self.FRAME_RATE_OUT = self.cam.AcquisitionResultingFrameRate()
+            self.acquiring = True
+            self.video_thread = threading.Thread(target=self._acquire, name=f'{self.device_id}_acquisition')
+            self.video_thread.start()
+        elif not self.file_closed.wait(10):
+            raise FlirException('Previous video file was not closed')
+
+        self._open_video(name)
+        self.frame_counter = 0
+        self.file_closed.clear()
+        self.recording = True  # The acquisition loop starts writing with the next frame
+        self.streaming = True
+        self.state = DeviceState.STARTED
+        self.logger.debug('FLIR: Beginning Recording (camera already streaming)')
+
+    def _acquire(self) -> None:
+        """Grab every frame while the camera streams; write and announce frames only while a task is recording."""
+        self.logger.debug('FLIR: Acquisition Thread Started')
+        writing = False
+        try:
+            while self.acquiring:
+                if writing and not self.recording:
+                    writing = False
+                    self._end_file()
+                try:
+                    im, tsmp = self._next_frame()
+                except Exception as e:
+                    if writing:
+                        self.hot_log.count("grab_errors")
+                        self.hot_log.sample("grab_error", logging.WARNING, "FLIR: Frame grab failed: %s", e,
+                                            every_sec=5)
+                    continue
+
+                if not self._degraded("preview"):
+                    self.preview.offer(im)
+                if not self.recording:
+                    continue
+                writing = True
+                if self._queue_frame(im, tsmp):
+                    self._observe_queue_depth()
+        except Exception as e:
+            self.logger.error(f'FLIR: Unhandled exception in acquisition loop: {e}')
+        finally:
+            self.recording = False
+            if writing:
+                self._end_file()
+            self.acquiring = False
+            self.cam.EndAcquisition()
+            self.logger.debug('FLIR: Exiting Acquisition Thread')
+
     def frame_preview(self) -> ByteString:
         """
         Retrieve a frame preview from the FLIR.
 
-        :returns: The raw data of the image/frame, or an empty byte string if an error occurs.
+        While the camera is streaming, or shortly after it stopped, the newest frame of the capture loop is served
+        without touching the camera. Otherwise a single frame is grabbed.
+
+        :returns: The JPEG-encoded image/frame, or an empty byte string if an error occurs.
         """
+        convert = self._demosaic_preview if self.raw_capture else None
+        live = self.recording or self.acquiring
+        # With the "preview" degrade step applied the capture loop keeps no preview frames, so there is none to wait for
+        img = self.preview.jpeg(timeout=1.0 if live and not self._degraded("preview") else 0.0, convert=convert)
+        if img or live:
+            return img
+
         self.cam.BeginAcquisition()
         img, _ = self.imgage_proc()
         self.cam.EndAcquisition()
+        return encode_jpeg(img)
+
+    def _demosaic_preview(self, raw: np.ndarray) -> np.ndarray:
+        return demosaic(raw, BAYER_PATTERN, self.fd)
+
+    def degrade_steps(self) -> Tuple[str, ...]:
+        return self._degrade_steps
 
-        rc, img = cv2.imencode('.png', img)
-        return img.tobytes() if rc else b""
+    def degrade_load(self) -> Dict[str, Optional[float]]:
+        if not self.recording:
+            return {}
+        return encoder_load(self.video_encoder, float(self.device_args.sample_rate()))
 
     def stop(self) -> None:
         if self.open and self.recording:
@@ -277,14 +489,28 @@ class VidRec_Flir(Device):
         self.streaming = False
         self.state = DeviceState.STOPPED
 
+    def _stop_acquisition(self) -> None:
+        """End continuous acquisition, closing any open video file."""
+        if self.acquiring:
+            self.acquiring = False
+            self.video_thread.join(10)
+
     def close(self) -> None:
         self.stop()
+        self._stop_acquisition()
         self.cam.DeInit()
+        self.video_encoder.shutdown()
         self.open = False
         self.state = DeviceState.DISCONNECTED
 
     def ensure_stopped(self, timeout_seconds: float = 10.0) -> None:
         """Check to make sure the recording is actually stopped."""
+        if self.device_args.continuous_acquisition:
+            if not self.file_closed.wait(timeout_seconds):
+                self.logger.error('FLIR: Video file not closed after stop')
+                raise FlirException('Video file not closed after stop')
+            return
+
         self.video_thread.join()
         if self.video_thread.is_alive():
             self.logger.error('FLIR: Potential Zombie Thread Detected!')
@@ -0,0 +1,157 @@
+"""
+A fixed-capacity ring of preallocated frame buffers shared by a capture thread and a save (encode) thread.
+
+Replaces an unbounded ``queue.Queue`` of frames: memory is allocated once per recording and never grows, however
+far the encoder falls behind. When every slot is full, ``put`` applies the configured policy:
+
+- ``"block"`` (back-pressure): wait up to ``timeout`` for the encoder to free a slot, then drop the new frame.
+- ``"drop_newest"``: drop the new frame immediately.
+
+Neither policy ever discards a frame that is already queued. The caller decides whether a frame is recorded *before*
+announcing it (e.g. pushing its LSL sample), so every frame written to the video has exactly one LSL sample and vice
+versa.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+FRAME_RING_POLICIES = ("block", "drop_newest")
+
+
+class FrameRing:
+    """
+    Bounded single-producer/single-consumer frame buffer.
+
+    The producer copies a frame into a free slot with :meth:`put`. The consumer takes the oldest queued slot with
+    :meth:`get`, uses the returned view (e.g. writes it to a ``cv2.VideoWriter``), then hands the slot back with
+    :meth:`release`. A slot is never reused while the consumer holds it.
+    """
+
+    def __init__(self, capacity: int, frame_shape: Tuple[int, ...], dtype=np.uint8, policy: str = "block"):
+        """
+        :param capacity: Number of frame slots.
+        :param frame_shape: Shape of every frame, e.g. ``(height, width, 3)``.
+        :param dtype: Frame dtype.
+        :param policy: What ``put`` does when all slots are in use; one of ``FRAME_RING_POLICIES``.
+        """
+        if capacity < 1:
+            raise ValueError("FrameRing capacity must be at least 1")
+        if policy not in FRAME_RING_POLICIES:
+            raise ValueError(f"Unknown FrameRing policy '{policy}'; expected one of {FRAME_RING_POLICIES}")
+        self.capacity = capacity
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.policy = policy
+        self._frames = np.empty((capacity,) + self.frame_shape, dtype=dtype)
+        self._frames.fill(0)  # Touch every page now rather than on first use during capture
+        self._meta = [None] * capacity
+        self._free = deque(range(capacity))
+        self._ready = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.n_put = 0
+        self.n_dropped = 0
+        self.max_depth = 0
+        self.blocked_sec = 0.0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the preallocated frame storage."""
+        return self._frames.nbytes
+
+    def depth(self) -> int:
+        """Number of frames queued (not counting one held by the consumer)."""
+        return len(self._ready)
+
+    def put(self, frame: np.ndarray, meta: Any = None, timeout: float = 1.0) -> bool:
+        """
+        Copy ``frame`` into a free slot and queue it.
+
+        :param frame: Frame with shape ``frame_shape``.
+        :param meta: Anything to hand to the consumer with the frame (e.g. frame number and camera timestamp).
+        :param timeout: Longest wait for a free slot under the ``"block"`` policy.
+        :returns: True if the frame was queued, False if it was dropped.
+        """
+        with self._cond:
+            if not self._free and self.policy == "block" and not self._closed:
+                t0 = time.monotonic()
+                self._cond.wait_for(lambda: self._free or self._closed, timeout)
+                self.blocked_sec += time.monotonic() - t0
+            if not self._free or self._closed:
+                self.n_dropped += 1
+                return False
+            slot = self._free.popleft()
+
+        # Copy outside the lock: the slot belongs to the producer until it is queued.
+        np.copyto(self._frames[slot], frame)
+        self._meta[slot] = meta
+
+        with self._cond:
+            self._ready.append(slot)
+            self.n_put += 1
+            if len(self._ready) > self.max_depth:
+                self.max_depth = len(self._ready)
+            self._cond.notify_all()
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[int, np.ndarray, Any]]:
+        """
+        Take the oldest queued frame.
+
+        :param timeout: Longest wait for a frame. None waits until a frame arrives or the ring is closed.
+        :returns: ``(slot, frame_view, meta)``, or None on timeout or when closed and empty. The view is valid until
+            the slot is passed to :meth:`release`.
+        """
+        with self._cond:
+            if not self._ready:
+                self._cond.wait_for(lambda: self._ready or self._closed, timeout)
+            if not self._ready:
+                return None
+            slot = self._ready.popleft()
+        return slot, self._frames[slot], self._meta[slot]
+
+    def release(self, slot: int) -> None:
+        """Return a slot obtained from :meth:`get` to the free pool."""
+        with self._cond:
+            self._meta[slot] = None
+            self._free.append(slot)
+            self._cond.notify_all()
+
+    def reset(self) -> None:
+        """Empty the ring and zero its counters, keeping the allocated storage (e.g. for the next task)."""
+        with self._cond:
+            self._meta = [None] * self.capacity
+            self._free = deque(range(self.capacity))
+            self._ready = deque()
+            self._closed = False
+            self.n_put = 0
+            self.n_dropped = 0
+            self.max_depth = 0
+            self.blocked_sec = 0.0
+
+    def close(self) -> None:
+        """Wake any waiting producer or consumer. Queued frames can still be drained with :meth:`get`."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for a per-task summary."""
+        return {
+            "capacity": self.capacity,
+            "policy": self.policy,
+            "frames_queued": self.n_put,
+            "frames_dropped": self.n_dropped,
+            "max_depth": self.max_depth,
+            "blocked_sec": round(self.blocked_sec, 3),
+            "buffer_mb": round(self.nbytes / 2 ** 20, 1),
+        }
@@ -4,6 +4,7 @@ It is also possible to implement them in the device files, or as separate supple
 """
 
 import json
+import numpy as np
 from neurobooth_os.iout.split_xdf import DeviceData
 from neurobooth_os.iout.stream_utils import DataVersion
 
@@ -139,6 +140,37 @@ def correct_yeti(data: DeviceData) -> DeviceData:
     return data
 
 
+def correct_yeti_per_sample(data: DeviceData) -> DeviceData:
+    """
+    Apply correct_yeti, then convert a chunked (pre-2.0) Yeti stream into the DataVersion 2.0 layout: one
+    single-channel sample per audio frame, each with its own timestamp. The timestamp of a chunk was taken when the
+    blocking read returned, so it is used as the time of the chunk's last frame and the earlier frames are spaced back
+    from it at the sample rate. The ElapsedTime column is dropped.
+    """
+    data = correct_yeti(data)
+    device_data = data.device_data
+    data_version = get_data_version(device_data)
+    chunks = np.asarray(device_data['time_series'])
+    if data_version.major >= 2 or chunks.ndim != 2 or chunks.shape[0] == 0:
+        return data
+
+    info = device_data['info']
+    chunk_size = chunks.shape[1] - 1
+    sample_rate = float(info['nominal_srate'][0]) * chunk_size
+    frame_offsets = (np.arange(chunk_size) - (chunk_size - 1)) / sample_rate
+    device_data['time_series'] = chunks[:, 1:].reshape(-1, 1)
+    device_data['time_stamps'] = (np.asarray(device_data['time_stamps'])[:, np.newaxis] + frame_offsets).reshape(-1)
+    info['channel_count'] = ['1']
+    info['nominal_srate'] = [str(sample_rate)]
+
+    desc = get_description(device_data)
+    desc['data_version'] = ['2.0']
+    desc['converted_from_data_version'] = [str(data_version)]
+    desc['column_names'] = [json.dumps(['Amplitude'])]
+    desc['column_descriptions'] = [json.dumps({'Amplitude': 'Audio sample (16-bit PCM)'})]
+    return data
+
+
 def correct_mouse(data: DeviceData) -> DeviceData:
     data_version = get_data_version(data.device_data)
     if data_version.major < 1:
@@ -394,6 +394,7 @@ class IPhone(Device):
     def listen(self):
         """Called by the listener thread. Attempt to receive and process a message."""
         payload, _, _, resp_tag = self._get_packet()
+        self.hot_log.count("packets")
 
         if DEBUG_LOGGING:
             debug_msg = payload if resp_tag == MessageTag.NORMAL_MESSAGE else f'Tag {resp_tag}'
@@ -528,6 +529,7 @@ class IPhone(Device):
         # Push the sample
         lsl_sample = [frame_num, frame_time, time.time()]
         self.outlet.push_sample(lsl_sample)
+        self.hot_log.count("lsl_samples")
 
         if DEBUG_LOGGING:
             self.logger.debug(f'LSL Push: {lsl_sample}')
@@ -888,6 +890,7 @@ class IPhone(Device):
             raise IPhonePanic('Ready state not reached during stop sequence before timeout!')
 
         self.logger.debug(f'iPhone [state={self._state}]: Transition to #READY Detected')
+        self.hot_log.flush('iPhone')
 
     def close(self) -> None:
         """Called during a CLOSE or SHUTDOWN message to the server. Disconnect the iPhone."""
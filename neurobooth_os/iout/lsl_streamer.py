@@ -1,13 +1,16 @@
+import json
 import logging
 import os
 import threading
+import time
 from neurobooth_os.iout.stim_param_reader import DeviceArgs, TaskArgs
 from neurobooth_os.log_manager import APP_LOG_NAME
 from neurobooth_os import config
-from typing import Any, Dict, List, Mapping, ByteString, Optional, Type
+from typing import Any, Dict, List, Mapping, ByteString, Optional, Tuple, Type
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import neurobooth_os.iout.metadator as meta
+from neurobooth_os.iout.degrade import DegradeController
 from neurobooth_os.iout.device import (
     Device, DeviceCapability, CameraPreviewException,
 )
@@ -81,6 +84,9 @@ def is_device_assigned(device_id: str, server_name: str) -> bool:
 # Handle the device life cycle
 # --------------------------------------------------------------------------------
 class DeviceManager:
+    degrade_controller: Optional[DegradeController] = None  # Running while any camera has a degrade_priority
+    supervisors: Tuple[Any, ...] = ()  # Returned by Device.supervise for each WEARABLE class; stopped in close_streams
+
     def __init__(self, node_name: str):
         self.logger = logging.getLogger(APP_LOG_NAME)
         self.streams: Dict[str, Any] = {}
@@ -176,35 +182,96 @@ class DeviceManager:
 
         register_lock = threading.Lock()
 
-        def start_and_register_device(device_args: DeviceArgs) -> None:
-            device_id = device_args.device_id
-            self.logger.debug(f'Device Manager Starting: {device_id}')
-            self.logger.debug(f'Device Manager Starting with args: {device_args}')
-            device_cls: Type[Device] = type(device_args).device_class()
-            # Pass device_args as a keyword so Device subclasses with extra
-            # positional parameters (e.g. IPhone's name) still bind correctly.
-            device = device_cls(device_args=device_args).bring_up(context)
+        def register_device(device_id: str, device: Optional[Device]) -> None:
             if device is None:
                 self.logger.warning(f'Device Manager Failed to Start: {device_id}')
                 return
             with register_lock:
                 self.streams[device_id] = device
 
+        def start_and_register_group(group_args: List[DeviceArgs]) -> None:
+            device_cls: Type[Device] = type(group_args[0]).device_class()
+            devices = []
+            for device_args in group_args:
+                self.logger.debug(f'Device Manager Starting: {device_args.device_id}')
+                self.logger.debug(f'Device Manager Starting with args: {device_args}')
+                # Pass device_args as a keyword so Device subclasses with extra
+                # positional parameters (e.g. IPhone's name) still bind correctly.
+                devices.append(device_cls(device_args=device_args))
+            if len(devices) == 1:
+                results = [devices[0].bring_up(context)]
+            else:
+                results = device_cls.bring_up_group(devices, context)
+            for device_args, device in zip(group_args, results):
+                register_device(device_args.device_id, device)
+
+        # One job per device, except that all devices of a GROUP_BRING_UP class
+        # share the job of the first one (see Device.bring_up_group). A group
+        # job is async if any of its devices is.
+        jobs: List[List[DeviceArgs]] = []
+        group_jobs: Dict[Type[Device], List[DeviceArgs]] = {}
+        for device_id in self.assigned_devices:
+            if device_id not in all_device_args:
+                continue
+            device_args = all_device_args[device_id]
+            device_cls = type(device_args).device_class()
+            if DeviceCapability.GROUP_BRING_UP not in device_cls.capabilities:
+                jobs.append([device_args])
+            elif device_cls in group_jobs:
+                group_jobs[device_cls].append(device_args)
+            else:
+                group_jobs[device_cls] = [device_args]
+                jobs.append(group_jobs[device_cls])
+
         with ThreadPoolExecutor(max_workers=N_ASYNC_THREADS) as executor:
             futures = []
-            for device_id in self.assigned_devices:
-                if device_id not in all_device_args:
-                    continue
-                device_args = all_device_args[device_id]
-                if device_id in ASYNC_STARTUP:
-                    futures.append(executor.submit(start_and_register_device, device_args))
+            for job in jobs:
+                if any(device_args.device_id in ASYNC_STARTUP for device_args in job):
+                    futures.append(executor.submit(start_and_register_group, job))
                 else:  # Run sequentially if not specified as async
-                    start_and_register_device(device_args)
+                    start_and_register_group(job)
 
             for f in as_completed(futures):
                 f.result()  # Raise errors that occur asynchronously
 
         self.logger.info(f'LOADED DEVICES: {list(self.streams.keys())}')
+        self._start_degrade_controller()
+        self._start_supervisors()
+
+    def _start_degrade_controller(self) -> None:
+        """Adapt camera work to CPU pressure if any loaded camera declares a ``degrade_priority``.
+
+        See ``neurobooth_os/iout/degrade.py``. The controller runs until ``close_streams``.
+        """
+        if self.degrade_controller is not None:
+            self.degrade_controller.stop()
+            self.degrade_controller = None
+        controller = DegradeController(self.streams)
+        if not controller.devices:
+            return
+        self.degrade_controller = controller
+        controller.start()
+        self.logger.info(f'Device Manager: adaptive degradation enabled for {sorted(controller.devices)}')
+
+    def _start_supervisors(self) -> None:
+        """Start each ``WEARABLE`` device class's background supervision (see ``Device.supervise``)."""
+        self._stop_supervisors()
+        by_class: Dict[Type[Device], List[Device]] = {}
+        for stream in self.streams.values():
+            if self._is_device(stream) and stream.has_capability(DeviceCapability.WEARABLE):
+                by_class.setdefault(type(stream), []).append(stream)
+        supervisors = []
+        for device_cls, devices in by_class.items():
+            supervisor = device_cls.supervise(devices)
+            if supervisor is not None:
+                supervisors.append(supervisor)
+                self.logger.info(f'Device Manager: supervising {[d.device_id for d in devices]}')
+        self.supervisors = tuple(supervisors)
+
+    def _stop_supervisors(self) -> None:
+        for supervisor in self.supervisors:
+            supervisor.stop()
+        self.supervisors = ()
 
     @staticmethod
     def _get_unique_devices(task_params: Dict[str, TaskArgs]) -> Dict[str, DeviceArgs]:
@@ -289,8 +356,17 @@ class DeviceManager:
         device_files: List[tuple] = []  # [(device, basenames), ...] for DB registration
         if not cameras:
             return all_files
+        start_sec: Dict[str, float] = {}
+
+        def timed_start(device: Device) -> List[str]:
+            t0 = time.perf_counter()
+            try:
+                return device.start(filename)
+            finally:
+                start_sec[device.device_id] = round(time.perf_counter() - t0, 3)
+
         with ThreadPoolExecutor(max_workers=len(cameras)) as executor:
-            futures = {executor.submit(device.start, filename): device for device in cameras}
+            futures = {executor.submit(timed_start, device): device for device in cameras}
             for future, device in futures.items():
                 try:
                     created = future.result()
@@ -301,6 +377,8 @@ class DeviceManager:
                             device_files.append((device, created))
                 except Exception as e:
                     self.logger.exception(e)
+        # Per-device start() latency, e.g. to compare continuous_acquisition against per-task camera restarts
+        self.logger.info(f'DEVICE START LATENCY: {json.dumps(start_sec)}')
         if log_task_id is not None and device_files:
             self._register_sensor_files(log_task_id, filename, device_files)
         return all_files
@@ -378,6 +456,12 @@ class DeviceManager:
             if self._is_device(stream):
                 stream.on_task_reconnect()
 
+    def finish_task(self) -> None:
+        """Call ``on_task_end`` on every Device-backed stream once a task's recording has stopped."""
+        for stream in self.streams.values():
+            if self._is_device(stream):
+                stream.on_task_end()
+
     def reset_devices(self) -> Dict[str, bool]:
         """Call ``on_session_reset`` on devices that declare ``RESETTABLE``.
 
@@ -402,7 +486,8 @@ class DeviceManager:
             device_id: The ID of the camera device to capture from.
 
         Returns:
-            PNG-encoded image bytes.
+            Encoded image bytes (JPEG for FLIR and webcam, served from the capture loop's newest frame while
+            streaming).
 
         Raises:
             CameraPreviewException: If the device is not found or does not support previews.
@@ -418,6 +503,10 @@ class DeviceManager:
 
     def close_streams(self) -> None:
         """Close all device streams. Uses the standard Device.close() lifecycle method."""
+        if self.degrade_controller is not None:
+            self.degrade_controller.stop()
+            self.degrade_controller = None
+        self._stop_supervisors()  # Before closing, so nothing reconnects a device being closed
         for stream_name, stream in self.streams.items():
             self.logger.debug(f'Device Manager Closing: {stream_name}')
             if self._is_device(stream):
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import sys
+import copy
+import json
+import math
 import argparse
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from ctypes import c_void_p
-from time import sleep, time
+from time import perf_counter, sleep, time
 import multiprocessing as mp
 import logging
-from typing import Any, Dict, List, Callable, Mapping, NamedTuple, Optional
+from typing import Any, Dict, FrozenSet, Iterator, List, Callable, Mapping, NamedTuple, Optional, Set
 from abc import ABC, abstractmethod
 from enum import IntEnum
 
@@ -42,8 +47,11 @@ def _require_mbientlab() -> None:
         )
 
 
+from neurobooth_os.iout.clock_mapper import EnvelopeClockMapper
 from neurobooth_os.iout.device import Device, DeviceCapability, DeviceState
 from neurobooth_os.iout.metadator import post_message, get_database_connection
+from neurobooth_os.iout.sample_gaps import GapCounter
+from neurobooth_os.iout.sample_ring import RingPusher, SampleRing
 from neurobooth_os.iout.stim_param_reader import MbientDeviceArgs
 from neurobooth_os.log_manager import APP_LOG_NAME
 from neurobooth_os.msg.messages import StatusMessage, Request, DeviceInitialization, MbientDisconnected
@@ -53,7 +61,7 @@ from neurobooth_os.msg.messages import StatusMessage, Request, DeviceInitializat
 # --------------------------------------------------------------------------------
 DISABLE_LSL: bool = False  # If True, LSL streams will not be created nor will received data be pushed.
 if not DISABLE_LSL:  # Conditional imports based on flags
-    from pylsl import StreamInfo, StreamOutlet
+    from pylsl import StreamInfo, StreamOutlet, local_clock
     from neurobooth_os.iout.stream_utils import DataVersion, set_stream_description
 
 
@@ -495,6 +503,7 @@ class Mbient(Device):
         DeviceCapability.STREAM
         | DeviceCapability.WEARABLE
         | DeviceCapability.RESETTABLE
+        | DeviceCapability.GROUP_BRING_UP
     )
 
     # Class variables to ensure that the BLE scan only happens during one connect() call.
@@ -512,9 +521,16 @@ class Mbient(Device):
     # via "Reset Mbients".  See issue #654.
     MAX_AUTO_RECONNECT_ATTEMPTS = 2
 
+    # How many devices bring_up_group lets talk to the BLE adapter at once (connect, reset, setup, start).
+    # 1 serializes every native BLE call of the bring-up while still overlapping the waits in between.
+    MAX_CONCURRENT_BLE = 2
+
     # Type definitions
     DATA_HANDLER = Callable[[float, Any, Any], None]
 
+    # Buckets (microseconds) for the time each sample spends in the data handlers on the BLE callback thread
+    CALLBACK_US_EDGES = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
     def __init__(
         self,
         device_args: MbientDeviceArgs,
@@ -535,7 +551,13 @@ class Mbient(Device):
             elif "gyro" in sensor.sensor_id:
                 self.gyro_hz = int(sensor.sample_rate)
             self.data_range = sensor.data_range
-        self.connection_params = ConnectionParameters()  # Use the default params
+        self.connection_params = ConnectionParameters(
+            min_conn_interval=device_args.conn_min_interval_ms,
+            max_conn_interval=device_args.conn_max_interval_ms,
+            latency=device_args.conn_latency,
+            timeout=device_args.conn_timeout_ms,
+        )
+        self.sensor_fusion = device_args.sensor_fusion
         self.accel_params = SensorParameters(sample_rate=self.acc_hz, data_range=self.data_range)
         self.gyro_params = SensorParameters(sample_rate=self.gyro_hz, data_range=self.data_range)
 
@@ -545,14 +567,41 @@ class Mbient(Device):
         self.data_handlers: List['Mbient.DATA_HANDLER'] = []
         self._auto_reconnect_failures: int = 0
 
+        # Bring-up: bring_up_group shares a BLE slot semaphore between its devices; phase_ms holds the duration
+        # (ms) of each phase of the last connect()/bring_up(), with ble_queue the total time spent waiting for a slot.
+        self.ble_slots: Optional[threading.Semaphore] = None
+        self.phase_ms: Dict[str, float] = {}
+
+        # Set by supervise(): the background monitor that owns reconnecting this device between tasks
+        self.health_monitor: Optional[MbientHealthMonitor] = None
+
         # Streaming-related variables. The C-level callback binding is created
         # lazily in setup() (where it's actually subscribed) so that
         # constructing an Mbient instance does not require the mbientlab SDK
         # to be installed — the mock subclass can call super().__init__
         # without triggering the cbindings dereference.
         self.callback = None
+        self.acc_callback = None
+        self._latest_acc: Any = None  # Unfused streaming: the accelerometer sample paired with the next gyro sample
         self.n_samples_streamed = 0
 
+        # Per-task accounting of samples lost over BLE, from the steps in the device epoch
+        self.gap_counter = GapCounter(max(self.acc_hz, self.gyro_hz) if self.sensor_fusion else self.gyro_hz)
+        self.loss_alert_pct = device_args.loss_alert_pct
+
+        # LSL handoff: the data handler copies samples into the ring, the pusher thread sends them (None: push inline)
+        self.lsl_push_interval_sec = device_args.lsl_push_interval_ms / 1e3
+        self._lsl_ring: Optional[SampleRing] = None
+        if self.lsl_push_interval_sec > 0:
+            self._lsl_ring = SampleRing(device_args.lsl_ring_samples, 7)
+        self._lsl_pusher: Optional[RingPusher] = None
+
+        # Maps the device epoch (ms) onto the LSL clock for the sample timestamps (None: stamp with receive time)
+        self.clock_mapper: Optional[EnvelopeClockMapper] = None
+        if device_args.clock_correction:
+            self.clock_mapper = EnvelopeClockMapper(window=device_args.clock_fit_window, device_tick_sec=1e-3,
+                                                    bin_sec=device_args.clock_bin_sec)
+
         self.logger.debug(self.format_message(f'acc={self.accel_params}; gyro={self.gyro_params}'))
 
     def format_message(self, msg: str) -> str:
@@ -567,6 +616,7 @@ class Mbient(Device):
         (The alternative is to physically push the button on the devices or scan for devices from a Windows computer.)
         We only need to do this once, so this function ensures it is only done once per machine/server.
         """
+        _require_mbientlab()
         with Mbient.SCAN_LOCK:
             if Mbient.SCAN_PERFORMED:  # Only need to scan once if multiple devices are present
                 return
@@ -587,6 +637,7 @@ class Mbient(Device):
         if retry_delay_sec is None:
             retry_delay_sec = self.retry_delay_sec
 
+        _require_mbientlab()
         device = connect_device(
             mac_address=self.mac,
             n_attempts=n_attempts,
@@ -594,7 +645,13 @@ class Mbient(Device):
             log_fn=lambda msg: self.logger.debug(self.format_message(msg)),
         )
         self.device_wrapper = MetaWearWrapper.create_wrapper(device)
-        self.device_wrapper.on_disconnect = lambda status: self.attempt_reconnect(status)
+        self.device_wrapper.on_disconnect = self._on_ble_disconnect
+
+    def _on_ble_disconnect(self, status: Optional[int] = None) -> None:
+        """Disconnect handler: tell the health monitor (if any) the link is down, then try to reconnect."""
+        if self.health_monitor is not None:
+            self.health_monitor.notify_disconnect(self)
+        self.attempt_reconnect(status)
 
     def attempt_reconnect(self, status: Optional[int] = None, notify: bool = True, n_attempts: int = 3) -> None:
         """
@@ -635,19 +692,29 @@ class Mbient(Device):
                 self.logger.error(self.format_message(f'Failed to Reconnect: {e}'))
             except Exception as e:
                 txt = f"Couldn't setup for {self.dev_name}"
-                self.send_status_msg(txt, status)
+                self.send_status_msg(txt, "ERROR")
                 self.logger.error(self.format_message(f'Error during reconnect: {e}'), exc_info=sys.exc_info())
             finally:
                 self.logger.debug(self.format_message(f'attempt_reconnect took {time() - t0} seconds.'))
 
-    @staticmethod
-    def task_start_reconnect(devices: List['Mbient']) -> None:
+    @classmethod
+    def _advertising_macs(cls, macs: Set[str]) -> Set[str]:
+        """BLE-scan for the given devices; return the MAC addresses found advertising."""
+        ble_results = scan_BLE(timeout_sec=5, n_devices=len(macs))
+        return {mac for _, mac in ble_results.items()}
+
+    @classmethod
+    def task_start_reconnect(cls, devices: List['Mbient']) -> None:
         """Check connectivity and attempt reconnection for disconnected devices.
 
         Each device gets at most :attr:`MAX_AUTO_RECONNECT_ATTEMPTS` automatic
         reconnect attempts across successive tasks.  After that the device is
         skipped until the operator manually resets it (via "Reset Mbients"),
         which resets the counter.
+
+        Blocks for the scan and the reconnects. Devices under a
+        :class:`MbientHealthMonitor` get this from the monitor's thread,
+        between tasks, instead of on the task-start path.
         """
         disconnected = [
             dev for dev in devices
@@ -677,9 +744,7 @@ class Mbient(Device):
             # BLE scan to find which devices are actually advertising.
             # Attempting to connect to an unreachable device crashes the
             # native warble library's error handler (issue #654).
-            target_macs = {d.mac for d in retryable}
-            ble_results = scan_BLE(timeout_sec=5, n_devices=len(target_macs))
-            advertising_macs = {mac for _, mac in ble_results.items()}
+            advertising_macs = cls._advertising_macs({d.mac for d in retryable})
 
             for dev in retryable:
                 if dev.mac not in advertising_macs:
@@ -763,20 +828,121 @@ class Mbient(Device):
             self.logger.error(self.format_message(f'Error during reset and reconnect: {e}'))
             return False
 
+    @contextmanager
+    def _phase(self, name: str, ble: bool = False) -> Iterator[None]:
+        """
+        Time a bring-up phase into ``phase_ms``.
+
+        :param name: The phase.
+        :param ble: Whether the phase talks to the BLE adapter; if so, it first waits for one of the ``ble_slots``.
+        """
+        slots = self.ble_slots if ble else None
+        if slots is not None:
+            t0 = perf_counter()
+            slots.acquire()
+            self.phase_ms['ble_queue'] = self.phase_ms.get('ble_queue', 0.0) + (perf_counter() - t0) * 1e3
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_ms[name] = (perf_counter() - t0) * 1e3
+            if slots is not None:
+                slots.release()
+
     def bring_up(self, context: Mapping[str, Any]) -> Optional[Device]:
         """Connect and start streaming, returning None if the BLE handshake fails."""
         if not self.connect():
             return None
-        self.start()
+        with self._phase('start', ble=True):
+            self.start()
         return self
 
+    @classmethod
+    def bring_up_group(
+            cls,
+            devices: List['Mbient'],
+            context: Mapping[str, Any],
+            max_concurrent_ble: Optional[int] = None,
+    ) -> List[Optional['Mbient']]:
+        """
+        Bring up several Mbients together instead of one after the other.
+
+        One BLE scan wakes every device, then each device runs its own ``bring_up`` on a thread of its own. At most
+        ``max_concurrent_ble`` of them talk to the adapter at a time; the waits in between (for the board reset,
+        after it, and for a free slot) overlap, so the group costs about the slowest device rather than the sum.
+        Each device's phase durations are left in its ``phase_ms`` and logged in one summary line.
+
+        :param devices: The devices to bring up.
+        :param context: Passed to each device's ``bring_up``.
+        :param max_concurrent_ble: BLE slots; defaults to ``MAX_CONCURRENT_BLE``.
+        :returns: The result of each device's ``bring_up``, in order (None for a device that failed to connect).
+        """
+        if not devices:
+            return []
+        logger = devices[0].logger
+        slots = threading.Semaphore(max_concurrent_ble or cls.MAX_CONCURRENT_BLE)
+        t0 = perf_counter()
+        try:
+            devices[0].prepare_scan()  # Once for the group; each device's own call is then a no-op
+        except Exception as e:
+            logger.error(f'Mbient group bring-up: BLE scan failed: {e}')
+        scan_ms = (perf_counter() - t0) * 1e3
+
+        for device in devices:
+            device.ble_slots = slots
+        try:
+            with ThreadPoolExecutor(max_workers=len(devices), thread_name_prefix='mbient_bring_up') as executor:
+                results = list(executor.map(lambda device: device.bring_up(context), devices))
+        finally:
+            for device in devices:
+                device.ble_slots = None
+
+        summary = {
+            'scan_ms': round(scan_ms, 1),
+            'total_ms': round((perf_counter() - t0) * 1e3, 1),
+            'devices': {
+                device.dev_name: {
+                    'ok': result is not None,
+                    **{name: round(ms, 1) for name, ms in device.phase_ms.items()},
+                }
+                for device, result in zip(devices, results)
+            },
+        }
+        logger.info(f'MBIENT BRING-UP: {json.dumps(summary)}')
+        return results
+
     def on_task_reconnect(self) -> None:
-        """Before each task, reconnect this Mbient if its BLE link dropped.
+        """Before each task, make sure this Mbient's BLE link is up.
 
-        The class-level static method handles scanning and retry budgeting
-        across all Mbient instances; we delegate the single-device call to it.
+        Under a health monitor this only reads the monitor's ready set (and
+        tells it a task is running, so it holds off scanning); a device that
+        is not ready is recorded without it and retried after the task.
+        Otherwise the class-level ``task_start_reconnect`` scans and
+        reconnects here, with the same retry budgeting.
         """
-        Mbient.task_start_reconnect([self])
+        monitor = self.health_monitor
+        if monitor is None:
+            type(self).task_start_reconnect([self])
+            return
+        monitor.task_started()
+        if not monitor.is_ready(self):
+            self.logger.warning(self.format_message(
+                'Not connected at task start; the health monitor will retry after the task'
+            ))
+
+    def on_task_end(self) -> None:
+        """After each task, let the health monitor (if any) scan and reconnect."""
+        if self.health_monitor is not None:
+            self.health_monitor.task_ended()
+
+    @classmethod
+    def supervise(cls, devices: List['Mbient']) -> Optional['MbientHealthMonitor']:
+        """Start one :class:`MbientHealthMonitor` for all the given devices."""
+        if not devices:
+            return None
+        monitor = MbientHealthMonitor(devices)
+        monitor.start()
+        return monitor
 
     def on_session_reset(self) -> bool:
         """Reset the board and re-establish the BLE connection (operator action)."""
@@ -788,13 +954,15 @@ class Mbient(Device):
 
         :returns: Whether the connection and setup was successful.
         """
+        self.phase_ms = {}
         try:
             self._acquire_hardware()
 
             # Set up the device to stream acceleration and angular velocity
             if not DISABLE_LSL:
                 self.outlet = self._create_outlet()
-            self.setup()
+            with self._phase('setup', ble=True):
+                self.setup()
             if not DISABLE_LSL:
                 body = DeviceInitialization(
                     stream_name=self.dev_name,
@@ -822,22 +990,27 @@ class Mbient(Device):
         return self.connect()
 
     def _acquire_hardware(self) -> None:
-        """BLE scan, connect, board reset, and reconnect.
+        """BLE scan, connect, board reset, and reconnect, each timed as a bring-up phase.
 
-        Subclass hook: ``MockMbient`` overrides this to skip BLE and the
-        native reset cycle. Anything that touches the mbientlab SDK belongs
-        here, not in ``connect()``.
+        ``MockMbient`` overrides the BLE primitives this calls
+        (``prepare_scan``, ``_ble_connect`` and ``reset``) rather than this
+        sequence, so the mock goes through the same phases. Anything that
+        touches the mbientlab SDK belongs in those, not in ``connect()``.
         """
-        _require_mbientlab()
-        self.prepare_scan()  # Wake up devices
-        self._ble_connect()
+        with self._phase('scan'):
+            self.prepare_scan()  # Wake up devices
+        with self._phase('connect', ble=True):
+            self._ble_connect()
         self.logger.debug(self.format_message(f'Device Model: {self.device_wrapper.model_name}'))
         self.logger.debug(self.format_message(f'Wrapper Class: {self.device_wrapper.__class__.__name__}'))
 
         # Perform a sensor reset and reconnect
-        self.reset()
-        sleep(self.retry_delay_sec)  # Wait a moment before trying to re-connect after the reset
-        self._ble_connect()
+        with self._phase('reset', ble=True):
+            self.reset()
+        with self._phase('reset_wait'):
+            sleep(self.retry_delay_sec)  # Wait a moment before trying to re-connect after the reset
+        with self._phase('reconnect', ble=True):
+            self._ble_connect()
 
     def _create_outlet(self) -> StreamOutlet:
         """Create an LSL outlet; helper for prepare."""
@@ -851,7 +1024,9 @@ class Mbient(Device):
             ),
             device_id=self.device_id,
             sensor_ids=self.sensor_ids,
-            data_version=DataVersion(1, 1),
+            # 1.2: LSL timestamps are the device epoch fitted to the LSL clock rather than the receive time
+            data_version=DataVersion(1, 2) if self.clock_mapper is not None else DataVersion(1, 1),
+            timestamps='device_clock_fit' if self.clock_mapper is not None else 'receive',
             columns=['Time_Mbient', 'AccelX', 'AccelY', 'AccelZ', 'GyroX', 'GyroY', 'GyroZ'],
             column_desc={
                 'Time_Mbient': 'Device timestamp (ms; epoch)',
@@ -867,14 +1042,96 @@ class Mbient(Device):
 
     def _callback(self, context: Any, data: Any) -> None:
         """Process data streamed from the device"""
-        self.n_samples_streamed += 1
         acc, gyro = parse_value(data, n_elem=2)
+        self._dispatch_sample(data.contents.epoch, acc, gyro)
+
+    def _acc_callback(self, context: Any, data: Any) -> None:
+        """Keep the latest accelerometer sample (unfused streaming)."""
+        # parse_value returns a view into the SDK's notification buffer, which is only valid during the callback
+        self._latest_acc = copy.deepcopy(parse_value(data))
+
+    def _gyro_callback(self, context: Any, data: Any) -> None:
+        """Pair a gyroscope sample with the latest accelerometer sample (unfused streaming)."""
+        if self._latest_acc is None:
+            return  # No accelerometer sample yet
+        self._dispatch_sample(data.contents.epoch, self._latest_acc, parse_value(data))
+
+    def _dispatch_sample(self, epoch: float, acc: Any, gyro: Any) -> None:
+        """Run the data handlers for one sample, timing them (this runs on the BLE callback thread)."""
+        t0 = perf_counter()
+        self.n_samples_streamed += 1
+        self.hot_log.count("samples")
+        self.gap_counter.add(epoch)
         for handler in self.data_handlers:
-            handler(data.contents.epoch, acc, gyro)
+            handler(epoch, acc, gyro)
+        self.hot_log.sample("stream", logging.DEBUG, "Mbient [%s; %s]: %d samples streamed",
+                            self.dev_name, self.mac, self.n_samples_streamed, every_sec=30)
+        callback_us = (perf_counter() - t0) * 1e6
+        self.hot_log.observe("callback_us", callback_us)
+        self.hot_log.histogram("callback_us", callback_us, Mbient.CALLBACK_US_EDGES)
 
     def _lsl_data_handler(self, epoch: float, acc: Any, gyro: Any) -> None:
-        """Push data to LSL"""
-        self.outlet.push_sample([epoch, acc.x, acc.y, acc.z, gyro.x, gyro.y, gyro.z])
+        """Hand a sample to LSL: copy it into the ring for the pusher thread, or push it here if there is no ring."""
+        timestamp = self._lsl_timestamp(epoch)
+        if self._lsl_ring is None:
+            self.outlet.push_sample([epoch, acc.x, acc.y, acc.z, gyro.x, gyro.y, gyro.z], timestamp)
+        elif not self._lsl_ring.put((epoch, acc.x, acc.y, acc.z, gyro.x, gyro.y, gyro.z), timestamp):
+            self.hot_log.count("lsl_ring_dropped")
+
+    def _lsl_timestamp(self, epoch: float) -> float:
+        """LSL time of a sample: its receive time, or its device epoch mapped through the clock fit."""
+        received = local_clock()
+        if self.clock_mapper is None:
+            return received
+        n_latches = self.clock_mapper.n_latches
+        timestamp = self.clock_mapper.stamp(epoch, received)
+        self.hot_log.observe("clock_delay_removed_ms", (received - timestamp) * 1e3)
+        if self.clock_mapper.n_latches != n_latches and self.clock_mapper.n_latches > 1:
+            self.hot_log.sample("clock_fit", logging.DEBUG, "Mbient [%s; %s]: clock drift %.1f ppm, fit RMS %.0f us",
+                                self.dev_name, self.mac, self.clock_mapper.drift_ppm,
+                                self.clock_mapper.residual_sec * 1e6, every_sec=60)
+        return timestamp
+
+    def _report_stream(self) -> None:
+        """Log the task's sample accounting, and warn the operator if it lost too many samples."""
+        summary = self.gap_counter.summary()
+        self.logger.info(f'MBIENT STREAM: {json.dumps({"device": self.dev_name, "mac": self.mac, **summary})}')
+        if summary['loss_pct'] is not None and summary['loss_pct'] > self.loss_alert_pct:
+            self.send_status_msg(
+                f"Mbient {self.dev_name} lost {summary['missing']} of {summary['expected']} samples "
+                f"({summary['loss_pct']:.1f}%) in the last task",
+                "WARNING",
+            )
+
+    def _observe_clock_fit(self) -> None:
+        """Add the current clock fit to the task summary."""
+        mapper = self.clock_mapper
+        if mapper is None:
+            return
+        if mapper.n_latches > 1:
+            self.hot_log.observe("clock_drift_ppm", mapper.drift_ppm)
+        if not math.isnan(mapper.residual_sec):
+            self.hot_log.observe("clock_fit_rms_us", mapper.residual_sec * 1e6)
+        self.hot_log.count("clock_clamped", mapper.n_clamped)
+        self.hot_log.count("clock_resets", mapper.n_resets)
+        mapper.n_clamped = mapper.n_resets = 0
+
+    def _push_lsl_chunk(self, samples: Any, timestamps: List[float]) -> None:
+        self.outlet.push_chunk(samples, timestamps)
+
+    def _start_lsl_pusher(self) -> None:
+        """Start draining the LSL ring, if this device uses one and has an outlet."""
+        if self._lsl_ring is None or DISABLE_LSL or (self._lsl_pusher is not None and self._lsl_pusher.is_alive()):
+            return
+        self._lsl_pusher = RingPusher(self._lsl_ring, self._push_lsl_chunk, self.lsl_push_interval_sec,
+                                      name=f'mbient_lsl_{self.dev_name}')
+        self._lsl_pusher.start()
+
+    def _stop_lsl_pusher(self) -> None:
+        """Push what is waiting in the LSL ring and end the pusher thread."""
+        if self._lsl_pusher is not None:
+            self._lsl_pusher.stop()
+            self._lsl_pusher = None
 
     def setup(self) -> None:
         """Configure the device (i.e., connection settings, sensor settings, data streaming callback)"""
@@ -889,7 +1146,10 @@ class Mbient(Device):
 
         Real path: configure connection/sensor settings, create the
         accel+gyro fuser, and subscribe the C-level callback that calls
-        ``_callback`` (which dispatches to ``data_handlers``).
+        ``_callback`` (which dispatches to ``data_handlers``). With
+        ``sensor_fusion`` off, both sensors are subscribed instead and
+        ``_gyro_callback`` dispatches each gyro sample with the latest
+        accelerometer sample.
 
         Subclass hook: ``MockMbient`` overrides this to spawn a synthetic
         data thread that pushes samples directly through the data
@@ -903,15 +1163,24 @@ class Mbient(Device):
         # (As opposed to an anonymous lambda or function-scoped variable.)
         # If not, then the program will silently fail when the callback gets triggered.
         # Speculation: Python can garbage collect variables that the C bindings expect to exist => memory access error.
-        if self.callback is None:
-            self.callback = cbindings.FnVoid_VoidP_DataP(self._callback)
-        processor = MetaWearWrapper.create_data_fusion_processor(sensor_signals)
         if DISABLE_LSL:
             self.logger.warning('LSL Disabled!')
         else:
             self.data_handlers = [self._lsl_data_handler, *self.data_handlers]  # Make sure LSL is called first!
-        libmetawear.mbl_mw_datasignal_subscribe(processor, None, self.callback)
-        self.subscribed_signals.append(processor)
+        if self.sensor_fusion:
+            if self.callback is None:
+                self.callback = cbindings.FnVoid_VoidP_DataP(self._callback)
+            processor = MetaWearWrapper.create_data_fusion_processor(sensor_signals)
+            libmetawear.mbl_mw_datasignal_subscribe(processor, None, self.callback)
+            self.subscribed_signals.append(processor)
+            return
+        if self.callback is None:
+            self.callback = cbindings.FnVoid_VoidP_DataP(self._gyro_callback)
+            self.acc_callback = cbindings.FnVoid_VoidP_DataP(self._acc_callback)
+        self._latest_acc = None
+        libmetawear.mbl_mw_datasignal_subscribe(sensor_signals.accel_signal, None, self.acc_callback)
+        libmetawear.mbl_mw_datasignal_subscribe(sensor_signals.gyro_signal, None, self.callback)
+        self.subscribed_signals.extend(sensor_signals)
 
     def log_battery_info(self) -> None:
         """
@@ -936,6 +1205,8 @@ class Mbient(Device):
             self.device_wrapper.buzz(100, self.buzz_time)
 
         self.logger.debug(self.format_message('Starting Streaming'))
+        self.gap_counter.reset()
+        self._start_lsl_pusher()
         self.streaming = True
         self.state = DeviceState.STARTED
         self.device_wrapper.start_inertial_sampling()
@@ -946,8 +1217,12 @@ class Mbient(Device):
         self.logger.debug(self.format_message('Stopping Streaming'))
         self.device_wrapper.stop_inertial_sampling()
         self.device_wrapper.disable_inertial_sampling()
+        self._stop_lsl_pusher()
         self.streaming = False
         self.state = DeviceState.STOPPED
+        self._report_stream()
+        self._observe_clock_fit()
+        self.hot_log.flush(self.format_message('Stream'))
 
     def disconnect(self) -> None:
         """Disconnect the device."""
@@ -982,6 +1257,7 @@ class Mbient(Device):
             self.device_wrapper.on_disconnect = lambda status: None
 
         self.subscribed_signals.clear()
+        self._stop_lsl_pusher()  # Python only; no native calls
         self.streaming = False
         self.state = DeviceState.STOPPED
 
@@ -994,6 +1270,100 @@ class Mbient(Device):
         post_message(msg)
 
 
+class MbientHealthMonitor(threading.Thread):
+    """
+    Background supervisor of the BLE links of a server's Mbients.
+
+    It keeps a ready set of the devices whose link is up, refreshed every ``poll_interval_sec`` and immediately when
+    a device reports a disconnect, so the task-start path only has to read it. Reconnecting happens on this thread,
+    between tasks: after startup, after each task and after a newly seen disconnect, it runs one
+    ``task_start_reconnect`` round (scan, then reconnect what is advertising) for the devices that are down, with the
+    same ``MAX_AUTO_RECONNECT_ATTEMPTS`` budgeting as at task start. While a task runs, it only watches.
+    """
+
+    def __init__(self, devices: List[Mbient], poll_interval_sec: float = 1.0):
+        """
+        :param devices: The devices to supervise; each one's ``health_monitor`` is set to this monitor.
+        :param poll_interval_sec: How often to check the links when nothing wakes the monitor.
+        """
+        super().__init__(name='mbient_health_monitor', daemon=True)
+        self.devices = list(devices)
+        self.poll_interval_sec = poll_interval_sec
+        self.n_rounds = 0
+        self._lock = threading.Lock()
+        self._ready: FrozenSet[str] = frozenset()
+        self._task_active = False
+        self._reconnect_due = True  # Check once after startup
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        for device in self.devices:
+            device.health_monitor = self
+        self._refresh()
+
+    @staticmethod
+    def _is_connected(device: Mbient) -> bool:
+        return device.device_wrapper is not None and device.device_wrapper.is_connected
+
+    def ready(self) -> FrozenSet[str]:
+        """Names of the devices whose BLE link is up. Never blocks."""
+        return self._ready
+
+    def is_ready(self, device: Mbient) -> bool:
+        return device.dev_name in self._ready
+
+    def notify_disconnect(self, device: Mbient) -> None:
+        """Called from the device's disconnect callback (on a native thread): drop it from the ready set now."""
+        with self._lock:
+            self._ready = self._ready - {device.dev_name}
+            self._reconnect_due = True
+        self._wake.set()
+
+    def task_started(self) -> None:
+        with self._lock:
+            self._task_active = True
+
+    def task_ended(self) -> None:
+        with self._lock:
+            self._task_active = False
+            self._reconnect_due = True
+        self._wake.set()
+
+    def _refresh(self) -> None:
+        ready = frozenset(d.dev_name for d in self.devices if self._is_connected(d))
+        with self._lock:
+            if self._ready - ready:
+                self._reconnect_due = True  # A disconnect that no callback reported
+            self._ready = ready
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self._refresh()
+            with self._lock:
+                reconnect = False
+                if not self._task_active:  # A due round waits for the task to end
+                    reconnect = self._reconnect_due and len(self._ready) < len(self.devices)
+                    self._reconnect_due = False
+            if reconnect:
+                self.n_rounds += 1
+                try:
+                    type(self.devices[0]).task_start_reconnect(self.devices)
+                except Exception as e:
+                    self.devices[0].logger.error(f'Mbient health monitor: reconnect round failed: {e}',
+                                                 exc_info=sys.exc_info())
+                self._refresh()
+            self._wake.wait(self.poll_interval_sec)
+            self._wake.clear()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop supervising; waits for a reconnect round in progress."""
+        self._stop_event.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+        for device in self.devices:
+            device.health_monitor = None
+
+
 # --------------------------------------------------------------------------------
 # Testing Script
 # --------------------------------------------------------------------------------
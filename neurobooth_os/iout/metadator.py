@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import functools
 import importlib
 import json
 import logging
@@ -40,6 +41,11 @@ _ALLOWED_TASK_MODULES: frozenset = frozenset({
     "tasks",  # prefix-match: covers tasks.*, tasks.MOT.task.*, etc.
 })
 
+# Upper bound on memoized str_fileid_to_eval resolutions. A full booth config
+# references well under a hundred distinct callables, so this never evicts in
+# practice; it only guards against unbounded growth from unexpected inputs.
+_FILEID_CACHE_SIZE: int = 256
+
 class LogSession(BaseModel):
     log_session_id: Optional[int] = None
     subject_id: Optional[str] = None
@@ -58,6 +64,11 @@ def str_fileid_to_eval(
 ) -> Callable:
     """Convert a string path.to.module.py::function() to a callable.
 
+    Successful resolutions are memoized in a bounded LRU cache keyed on
+    ``(stim_file_str, allowed_modules)``, so repeat lookups from the message
+    decode and task-build paths are dictionary hits. Rejected inputs raise
+    every time and are never cached. See :func:`warm_fileid_cache`.
+
     Args:
         stim_file_str: String with path to py file ``::`` and function(),
             e.g. ``"tasks.MOT.task.py::MOT()"``.
@@ -72,6 +83,14 @@ def str_fileid_to_eval(
         ValueError: If *stim_file_str* is malformed or the resolved module
             is not in the allowlist.
     """
+    if allowed_modules is not None and not isinstance(allowed_modules, frozenset):
+        allowed_modules = frozenset(allowed_modules)  # must be hashable for the cache key
+    return _resolve_fileid(stim_file_str, allowed_modules)
+
+
+@functools.lru_cache(maxsize=_FILEID_CACHE_SIZE)
+def _resolve_fileid(stim_file_str: str, allowed_modules: Optional[frozenset]) -> Callable:
+    """Uncached implementation of :func:`str_fileid_to_eval`."""
     if ".py::" not in stim_file_str:
         raise ValueError(
             f"Malformed input: expected '<module>.py::<func>()', got '{stim_file_str}'"
@@ -101,6 +120,47 @@ def str_fileid_to_eval(
     return task_func
 
 
+def clear_fileid_cache() -> None:
+    """Drop all memoized :func:`str_fileid_to_eval` resolutions."""
+    _resolve_fileid.cache_clear()
+
+
+def _message_body_fileids() -> List[str]:
+    """Return the ``full_msg_type`` string of every MsgBody subclass in msg.messages."""
+    import neurobooth_os.msg.messages as messages
+
+    fileids = []
+    for obj in vars(messages).values():
+        if isinstance(obj, type) and issubclass(obj, MsgBody) and obj is not MsgBody \
+                and obj.__module__ == messages.__name__:
+            mod = obj.__module__.replace("neurobooth_os.", "", 1)
+            fileids.append(f"{mod}.py::{obj.__name__}()")
+    return fileids
+
+
+def warm_fileid_cache() -> int:
+    """Pre-resolve every message body type.
+
+    Intended to run once at session prep, so the first message decode of a
+    session doesn't pay for module imports. Task constructors and arg parsers
+    need no warm-up: building the session's tasks already resolves them.
+
+    Failures are logged and skipped: warm-up must never block session prep, and a
+    bad entry will raise again at its real call site.
+
+    Returns:
+        The number of distinct strings successfully resolved.
+    """
+    resolved = 0
+    for fileid in _message_body_fileids():
+        try:
+            str_fileid_to_eval(fileid, allowed_modules=_ALLOWED_MESSAGE_MODULES)
+            resolved += 1
+        except Exception as e:
+            logger.warning("Unable to pre-resolve '%s': %s", fileid, e)
+    return resolved
+
+
 def get_database_connection(
     database: Optional[str] = None,
     connect_timeout: Optional[int] = None,
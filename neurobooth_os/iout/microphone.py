@@ -4,7 +4,6 @@ from pylsl import StreamInfo, StreamOutlet, local_clock
 import numpy as np
 import threading
 import time
-import wave
 import logging
 from typing import NamedTuple, List, Optional
 
@@ -30,6 +29,7 @@ def _require_pyaudio() -> None:
         )
 
 
+from neurobooth_os.iout.audio_file import AudioFileWriter
 from neurobooth_os.iout.device import Device, DeviceCapability, DeviceState
 from neurobooth_os.iout.metadator import post_message
 from neurobooth_os.iout.stim_param_reader import MicYetiDeviceArgs
@@ -65,6 +65,11 @@ if _HAS_PYAUDIO:
 else:
     SAMPLE_FORMATS = {}
 
+# PortAudio stream-callback values (pyaudio.paContinue, pyaudio.paInputOverflow); defined here so the callback also
+# runs without pyaudio installed (MockMicStream)
+PA_CONTINUE = 0
+PA_INPUT_OVERFLOW = 0x2
+
 
 class MicStream(Device):
 
@@ -74,6 +79,7 @@ class MicStream(Device):
             self,
             device_args: MicYetiDeviceArgs,
             save_on_disk: bool = False,
+            save_format: str = "wav",
     ) -> None:
         super().__init__(device_args)
         self._device_args = device_args
@@ -83,6 +89,7 @@ class MicStream(Device):
         self.CHUNK = sensor.sample_chunk_size
         self.fps = sensor.sample_rate
         self.save_on_disk = save_on_disk
+        self.save_format = save_format
         self.channels = sensor.channels
         # ``SAMPLE_FORMATS`` is empty when pyaudio isn't installed; fall back
         # to ``None`` so __init__ doesn't raise on hardware-less laptops.
@@ -90,19 +97,28 @@ class MicStream(Device):
         # the mock subclass doesn't use ``self.format``.
         self.format = SAMPLE_FORMATS.get(sensor.format)
         self._sensor = sensor
+        self.capture_mode = device_args.capture_mode
+
+        # One chunk of LSL samples (one per audio frame), reused for every chunk: audio bytes are copied into it
+        # through a byte view and it is pushed with push_chunk, which hands the numpy buffer to liblsl directly. (It
+        # needs a writable buffer; the bytes PyAudio returns are read-only.)
+        self._frames = np.zeros((self.CHUNK, self.channels), dtype=np.int16)
+        self._audio_bytes = memoryview(self._frames).cast('B')
+        self._input_latency = 0.0  # Reported by PortAudio when the stream is opened
 
         # Will be initialized in connect()
         self.p = None  # pyaudio.PyAudio when real
         self.stream_in = None
         self.outlet_audio: Optional[StreamOutlet] = None
 
+        # save_on_disk: the audio, appended to the file as chunks arrive
+        self._raw_writer: Optional[AudioFileWriter] = None
+
         self.stream_on = False
         self.tic = 0
-        self.last_time = 0
 
     def connect(self) -> None:
         """Create the audio stream, LSL outlet, and notify the control server."""
-        self.last_time = local_clock()
         self._acquire_audio_stream()
         self._publish_outlet()
         self.state = DeviceState.CONNECTED
@@ -123,7 +139,8 @@ class MicStream(Device):
             f'Using audio device "{device.name}" at index {device.index}.')
         self.device_name = device.name
 
-        # Create stream
+        # Create stream. In callback mode PortAudio calls _on_audio for every chunk once start() starts the stream.
+        callback = self.capture_mode == "callback"
         self.stream_in = audio.open(
             format=self.format,
             channels=self.channels,
@@ -132,25 +149,24 @@ class MicStream(Device):
             output=self._sensor.output,
             frames_per_buffer=self._sensor.sample_chunk_size,
             input_device_index=device.index,
+            start=not callback,
+            stream_callback=self._on_audio if callback else None,
         )
+        self._input_latency = self.stream_in.get_input_latency()
 
     def _publish_outlet(self) -> None:
         """Build the LSL outlet and post DeviceInitialization. Subclasses should not need to override."""
 
         # Setup outlet stream infos
         self._stream_info_audio = set_stream_description(
-            stream_info=StreamInfo("Audio", "Experimental", self._sensor.sample_chunk_size + 1,
-                                   self._sensor.sample_rate / self._sensor.sample_chunk_size, "int16", self.outlet_id),
+            stream_info=StreamInfo("Audio", "Experimental", self.channels, self.fps, "int16", self.outlet_id),
             device_id=self.device_id,
             sensor_ids=self.sensor_ids,
-            data_version=DataVersion(1, 0),
-            columns=['ElapsedTime', f'Amplitude ({self._sensor.sample_chunk_size} samples)'],
-            column_desc={
-                'ElapsedTime': 'Elapsed time on the local LSL clock since the last chunk of samples (ms)',
-                f'Amplitude ({self._sensor.sample_chunk_size} samples)': 'Remaining columns represent a chunk of audio samples.',
-            },
-            contains_chunks=True,
+            data_version=DataVersion(2, 0),
+            columns=self._columns(),
+            column_desc={c: 'Audio sample (16-bit PCM)' for c in self._columns()},
             fps=str(self.fps),
+            chunk_size=str(self.CHUNK),
             device_name=self._device_args.device_name,
         )
         body = DeviceInitialization(
@@ -167,6 +183,11 @@ class MicStream(Device):
 
         self.outlet_audio = StreamOutlet(self._stream_info_audio)
 
+    def _columns(self) -> List[str]:
+        if self.channels == 1:
+            return ['Amplitude']
+        return [f'Amplitude_{i + 1}' for i in range(self.channels)]
+
     @staticmethod
     def get_audio_devices(audio: pyaudio.PyAudio, host_api_idx: int = 0) -> List[AudioDeviceInfo]:
         """
@@ -214,63 +235,94 @@ class MicStream(Device):
         self.stream_on = True
         self.state = DeviceState.STARTED
         if self.save_on_disk:
-            self.frames = []
-            self.frames_raw = []
+            self._raw_writer = AudioFileWriter(f"raw_mic_data.{self.save_format}", self.channels, self.fps)
+            self._raw_writer.start()
+        if self.capture_mode == "callback":
+            self.logger.debug('Microphone: Starting Callback Stream')
+            self.stream_in.start_stream()
+            return []
         self.stream_thread = threading.Thread(target=self.stream)
         self.logger.debug('Microphone: Starting LSL Thread')
         self.stream_thread.start()
         return []
 
     def stream(self):
-        self.last_time = int(local_clock() * 10e3)
+        """Blocking-read capture loop (capture_mode "read"). Input overflows are not reported in this mode."""
         self.logger.debug('Microphone: Entering LSL Loop')
         while self.streaming:
-            data = self.stream_in.read(self.CHUNK)
-            decoded = np.frombuffer(data, "int16")
+            data = self.stream_in.read(self.CHUNK, exception_on_overflow=False)
+            self._push_audio(data, local_clock() - self._input_latency)
+        self.stream_on = False
+        self.logger.debug('Microphone: Exiting LSL Thread')
+
+    def _on_audio(self, in_data: bytes, frame_count: int, time_info: dict, status_flags: int):
+        """PortAudio stream callback (capture_mode "callback"), called on PortAudio's thread for every chunk."""
+        if status_flags & PA_INPUT_OVERFLOW:
+            self.hot_log.count("input_overflows")
+            self.hot_log.sample("input_overflow", logging.WARNING,
+                                "Microphone: Input overflow; audio was lost before this chunk", every_sec=5)
+        if self.streaming:
+            self._push_audio(in_data, self._last_frame_time(frame_count, time_info))
+        return None, PA_CONTINUE
+
+    def _last_frame_time(self, frame_count: int, time_info: dict) -> float:
+        """
+        LSL time at which the last frame of a callback chunk was sampled.
 
-            tlocal = int((local_clock() * 10e3))
-            tdiff = tlocal - self.last_time
-            self.last_time = tlocal
+        PortAudio reports when the chunk's first frame hit the ADC (``input_buffer_adc_time``) on the stream clock,
+        along with the stream clock's ``current_time``; their difference is how long ago that was. Host APIs that do
+        not report ADC times (zero) fall back to the input latency, as in read mode.
+        """
+        now = local_clock()
+        adc_time, stream_now = time_info.get('input_buffer_adc_time', 0), time_info.get('current_time', 0)
+        if adc_time <= 0 or stream_now <= 0:
+            self.hot_log.count("chunks_without_adc_time")
+            return now - self._input_latency
+        self.hot_log.observe("adc_to_callback_ms", (stream_now - adc_time) * 1e3)
+        return now - (stream_now - adc_time) + (frame_count - 1) / self.fps
+
+    def _push_audio(self, data: bytes, last_frame_time: float) -> None:
+        """
+        Push one chunk of int16 audio as one LSL sample per frame.
 
-            decoded = np.hstack((np.array(tdiff), decoded))
+        :param data: Interleaved int16 audio.
+        :param last_frame_time: LSL time of the chunk's last frame; LSL spaces the earlier frames back from it at the
+            nominal sample rate.
+        """
+        n_bytes = len(data)
+        self._audio_bytes[:n_bytes] = data
+        frames = self._frames if n_bytes == self._frames.nbytes else self._frames[:n_bytes // self._frames[0].nbytes]
 
-            if self.save_on_disk:
-                self.frames_raw.append(data)
-                self.frames.append(decoded)
+        if self._raw_writer is not None:
+            self._raw_writer.submit(data)
 
-            try:
-                self.outlet_audio.push_sample(decoded)
-            except BaseException:  # "OSError" from C++
-                self.logger.debug("Reopening mic stream already closed")
-                self.outlet_audio = StreamOutlet(self._stream_info_audio)
-                self.outlet_audio.push_sample(decoded)
-            self.tic = time.time()
-        self.stream_on = False
-        self.logger.debug('Microphone: Exiting LSL Thread')
+        try:
+            self.outlet_audio.push_chunk(frames, last_frame_time)
+        except BaseException:  # "OSError" from C++
+            self.logger.debug("Reopening mic stream already closed")
+            self.outlet_audio = StreamOutlet(self._stream_info_audio)
+            self.outlet_audio.push_chunk(frames, last_frame_time)
+        self.tic = time.time()
 
     def stop(self) -> None:
         """Stop streaming audio data."""
         self.logger.debug('Microphone: Setting Stop Signal')
         self.streaming = False
-        if hasattr(self, 'stream_thread') and self.stream_thread.is_alive():
+        if self.capture_mode == "callback":
+            if self.stream_in is not None and self.stream_in.is_active():
+                self.stream_in.stop_stream()
+            self.stream_on = False
+        elif hasattr(self, 'stream_thread') and self.stream_thread.is_alive():
             self.stream_thread.join(timeout=5.0)
+        self.hot_log.flush("Microphone")
         self.state = DeviceState.STOPPED
-        if self.save_on_disk:
-            self.logger.debug('Microphone: Saving Data to Disk...')
-
-            with wave.open("decoded_mic_data.wav", "wb") as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(self.p.get_sample_size(self.format))
-                wf.setframerate(self.fps)
-                wf.writeframes(b"".join(self.frames))
-            self.logger.debug('Microphone: Saved Decoded Data to Disk')
-
-            with wave.open("raw_mic_data.wav", "wb") as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(self.p.get_sample_size(self.format))
-                wf.setframerate(self.fps)
-                wf.writeframes(b"".join(self.frames_raw))
-            self.logger.debug('Microphone: Saved Raw Data to Disk')
+        if self._raw_writer is not None:
+            self.logger.debug('Microphone: Finishing Audio Files...')
+            self._raw_writer.stop()
+            if self._raw_writer.error is not None:
+                self.logger.error(f'Microphone: Failed to write {self._raw_writer.path}: {self._raw_writer.error}')
+            self._raw_writer = None
+            self.logger.debug('Microphone: Saved Audio Files')
 
     def disconnect(self) -> None:
         """Release PyAudio resources."""
@@ -0,0 +1,152 @@
+"""Throughput model of Mbient BLE notifications delivered to one host adapter, for profiling without hardware.
+
+A MetaWear sends its samples as GATT notifications, a few per connection event. The host adapter gives each
+connection one event per connection interval and has to fit every connected device's packets into that interval.
+:class:`SimulatedBleLink` follows one device's notifications through that schedule:
+
+* The adapter runs the longest interval the requested parameters allow, but no shorter than the shortest interval it
+  supports with several devices connected (Windows stacks commonly hold multi-device links at 15 ms or more).
+* Each event carries at most ``packets_per_event`` packets, and fewer when ``n_devices`` connections of
+  ``packet_ms`` airtime per packet have to share the interval.
+* The device queues samples between events; when the queue is full, new samples are lost.
+* A connection event can be missed (interference), and with a slave latency the device may skip up to ``latency``
+  events after one where it had nothing to send. Missing events for longer than the supervision timeout drops the
+  link, and nothing after that is delivered.
+
+Fused streaming takes one notification per sample; unfused streaming takes one per sensor, two per sample. The
+model is coarse (no retransmissions, no PHY or data-length extensions), and is meant to rank configurations, not to
+predict a booth's exact numbers.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+import numpy as np
+
+from neurobooth_os.iout.mbient import ConnectionParameters
+
+BLE_INTERVAL_UNIT_MS = 1.25  # Connection intervals are multiples of 1.25 ms
+
+
+class SimulatedBleLink:
+    """One device's BLE connection on a host adapter shared with ``n_devices - 1`` others."""
+
+    def __init__(
+            self,
+            connection_params: ConnectionParameters,
+            n_devices: int = 1,
+            min_interval_ms: float = 7.5,
+            packets_per_event: int = 4,
+            packet_ms: float = 0.4,
+            device_queue_packets: int = 32,
+            event_miss_prob: float = 0.0,
+            seed: Optional[int] = 0,
+    ):
+        """
+        :param connection_params: The requested connection parameters.
+        :param n_devices: Devices connected to the adapter, this one included.
+        :param min_interval_ms: Shortest connection interval the adapter grants.
+        :param packets_per_event: Most notifications one connection event carries.
+        :param packet_ms: Airtime of one notification and its acknowledgement.
+        :param device_queue_packets: Notifications the device can hold between connection events.
+        :param event_miss_prob: Probability that a connection event is lost to interference.
+        :param seed: Seed for the missed-event draws.
+        """
+        self.connection_params = connection_params
+        self.n_devices = n_devices
+        self.min_interval_ms = min_interval_ms
+        self.packets_per_event = packets_per_event
+        self.packet_ms = packet_ms
+        self.device_queue_packets = device_queue_packets
+        self.event_miss_prob = event_miss_prob
+        self.rng = np.random.default_rng(seed)
+        self.packets_sent = 0
+        self.events = 0
+        self.link_dropped_at: Optional[float] = None
+
+    @property
+    def interval_ms(self) -> float:
+        """The connection interval the adapter runs."""
+        requested = max(self.connection_params.max_conn_interval, self.min_interval_ms)
+        return math.ceil(requested / BLE_INTERVAL_UNIT_MS - 1e-9) * BLE_INTERVAL_UNIT_MS
+
+    @property
+    def slots_per_event(self) -> int:
+        """Notifications this device can send per connection event while sharing the interval."""
+        return max(0, min(self.packets_per_event, int(self.interval_ms / (self.n_devices * self.packet_ms))))
+
+    def deliver(self, sample_times: np.ndarray, packets_per_sample: int = 1) -> np.ndarray:
+        """
+        Send samples taken at ``sample_times`` (seconds, ascending).
+
+        :param sample_times: When the device took each sample.
+        :param packets_per_sample: Notifications each sample takes (1 fused, 2 unfused).
+        :returns: The time each sample was received, NaN for samples that were lost.
+        """
+        received = np.full(len(sample_times), np.nan)
+        if len(sample_times) == 0:
+            return received
+        interval = self.interval_ms / 1e3
+        timeout_events = self.connection_params.timeout / self.interval_ms
+        slots = self.slots_per_event
+        capacity = max(self.device_queue_packets, packets_per_sample)
+        t = sample_times[0] + self.rng.uniform(0, interval)  # Events are not aligned with the sampling
+        n_events = int((sample_times[-1] - t) / interval) + 2 + capacity  # Enough to drain a full queue
+        missed = self.rng.random(n_events) < self.event_miss_prob
+
+        queue: Deque[List[int]] = deque()  # [sample index, packets left to send]
+        queued_packets = 0
+        next_sample = 0
+        skip = 0
+        consecutive_misses = 0
+        for k in range(n_events):
+            while next_sample < len(sample_times) and sample_times[next_sample] <= t:
+                if queued_packets + packets_per_sample <= capacity:
+                    queue.append([next_sample, packets_per_sample])
+                    queued_packets += packets_per_sample
+                next_sample += 1
+            if next_sample == len(sample_times) and not queue:
+                break
+            self.events += 1
+            if missed[k]:
+                consecutive_misses += 1
+                if consecutive_misses >= timeout_events:
+                    self.link_dropped_at = t
+                    break
+            elif skip:
+                skip -= 1
+            elif not queue:
+                consecutive_misses = 0
+                skip = self.connection_params.latency
+            else:
+                consecutive_misses = 0
+                for slot in range(slots):
+                    if not queue:
+                        break
+                    head = queue[0]
+                    head[1] -= 1
+                    queued_packets -= 1
+                    self.packets_sent += 1
+                    if head[1] == 0:
+                        received[head[0]] = t + (slot + 1) * self.packet_ms / 1e3
+                        queue.popleft()
+            t += interval
+        return received
+
+
+def simulate_stream(
+        link: SimulatedBleLink,
+        sample_hz: float,
+        seconds: float,
+        fused: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stream ``seconds`` of samples at ``sample_hz`` over ``link``.
+
+    :returns: The sample times and the time each was received (NaN if lost), in seconds.
+    """
+    sample_times = np.arange(0.0, seconds, 1 / sample_hz)
+    return sample_times, link.deliver(sample_times, 1 if fused else 2)
@@ -5,33 +5,42 @@ Overrides the PySpin-touching hooks on :class:`VidRec_Flir`:
 - ``get_cam`` / ``setup_cam`` — no-ops; install a stub ``self.cam`` so
   inherited methods that reach into ``self.cam`` (record-loop teardown,
   ``close``) don't ``AttributeError``.
-- ``imgage_proc`` — returns a synthetic ndarray frame plus a
-  monotonic-ish timestamp, in place of ``self.cam.GetNextImage`` +
-  ``cv2.demosaicing``.
+- ``imgage_proc`` — returns a synthetic ndarray frame (a single-channel
+  mosaic when ``raw``) plus a monotonic-ish timestamp, in place of
+  ``self.cam.GetNextImage`` + ``cv2.demosaicing``.
 - ``_prepare_recording`` — skips ``self.cam.BeginAcquisition`` /
   ``AcquisitionResultingFrameRate`` and uses the configured FPS to set
-  up the ``cv2.VideoWriter``.
-- ``frame_preview`` — skips ``BeginAcquisition`` / ``EndAcquisition``.
-- ``close`` — skips ``self.cam.DeInit``.
+  open the video encoder.
+- ``frame_preview`` — serves the preview slot while streaming like the real
+  camera; otherwise a labeled placeholder instead of ``BeginAcquisition`` /
+  ``EndAcquisition``.
+- ``_latch_clock`` — reads the wall clock the synthetic timestamps come
+  from, in place of ``TimestampLatch`` / ``TimestampLatchValue``.
+- ``_next_frame`` — sleeps one frame period before each synthetic frame, so
+  ``continuous_acquisition`` streams at ``sample_rate``.
+- ``close`` — skips ``self.cam.DeInit`` (still ends continuous acquisition
+  and shuts the video encoder down).
 
 The synthetic record loop pushes black frames at ``device_args.sample_rate()``
-through the existing ``camCaptureVid`` save thread, so a real (small)
-.avi file is produced at the requested path — downstream
-file-cataloguing finds a non-empty file at the expected location.
+through the same video encoder (``neurobooth_os/iout/video_encoder.py``) as
+the real camera, so a real (small) .avi file is produced at the requested path —
+downstream file-cataloguing finds a non-empty file at the expected location.
 """
 
 from __future__ import annotations
 
 import os.path as op
-import threading
 import time
-from typing import Any, ByteString, List, Optional, Tuple
+from typing import Any, ByteString, Optional, Tuple
 
 import cv2
 import numpy as np
 
+from pylsl import local_clock
+
 from neurobooth_os.iout.device import DeviceState
 from neurobooth_os.iout.flir_cam import VidRec_Flir
+from neurobooth_os.iout.preview_slot import encode_jpeg
 
 
 # Synthetic frame size: small enough that the mock video file stays
@@ -59,10 +68,13 @@ class _MockCamStub:
     def DeInit(self) -> None:  # noqa: N802
         return None
 
+    def __init__(self, frame_rate: float = 60.0) -> None:
+        self.frame_rate = frame_rate
+
     def AcquisitionResultingFrameRate(self) -> float:  # noqa: N802
         # Real method returns the actual frame rate the camera achieves;
         # mock just reports the configured target.
-        return 60.0
+        return self.frame_rate
 
 
 class MockVidRec_Flir(VidRec_Flir):  # noqa: N801 — match real class casing
@@ -74,35 +86,46 @@ class MockVidRec_Flir(VidRec_Flir):  # noqa: N801 — match real class casing
 
     def get_cam(self) -> None:
         self.system = None
-        self.cam = _MockCamStub()
+        self.cam = _MockCamStub(float(self.device_args.sample_rate()))
         self.logger.info("MockVidRec_Flir: skipped PySpin camera acquire")
 
     def setup_cam(self) -> None:
         self.open = True
         self.logger.info("MockVidRec_Flir: skipped PySpin camera setup")
 
-    def imgage_proc(self) -> Tuple[np.ndarray, int]:  # noqa: N802 — match real spelling
+    def imgage_proc(self, raw: bool = False) -> Tuple[np.ndarray, int]:  # noqa: N802 — match real spelling
         self._mock_frame_counter += 1
+        # FLIR timestamps are nanoseconds; multiply local clock to mimic.
+        tsmp = int(time.time() * 1e9)
+        if raw:
+            return np.zeros((_MOCK_FRAME_HEIGHT, _MOCK_FRAME_WIDTH), dtype=np.uint8), tsmp
         # Black frame; downstream code only inspects shape / file
         # existence, not pixel content.
         frame = np.zeros(
             (_MOCK_FRAME_HEIGHT, _MOCK_FRAME_WIDTH, 3), dtype=np.uint8)
-        # FLIR timestamps are nanoseconds; multiply local clock to mimic.
-        tsmp = int(time.time() * 1e9)
         # The real method applies self.fd (frame-decimation) via
         # cv2.resize; preserve that so frame size matches user
         # expectations on downstream paths.
         return cv2.resize(frame, None, fx=self.fd, fy=self.fd), tsmp
 
+    def _latch_clock(self) -> Tuple[int, float, float]:
+        t0 = local_clock()
+        tsmp = int(time.time() * 1e9)  # Same clock as the synthetic frame timestamps
+        t1 = local_clock()
+        return tsmp, (t0 + t1) / 2, t1 - t0
+
+    def _next_frame(self) -> Tuple[np.ndarray, int]:
+        # Continuous acquisition: pace like GetNextImage, which blocks
+        # until the camera delivers the next frame.
+        time.sleep(1.0 / float(self.device_args.sample_rate()))
+        return self.imgage_proc(raw=self.raw_capture)
+
     def _prepare_recording(self, name: str = "temp_video") -> None:
-        # Skip BeginAcquisition; build the writer directly.
-        im, _ = self.imgage_proc()
+        # Skip BeginAcquisition; open the encoder directly.
+        im, _ = self.imgage_proc(raw=self.raw_capture)
         self.frameSize = (im.shape[1], im.shape[0])
-        self.video_filename = f"{name}_flir.avi"
-        fourcc = cv2.VideoWriter_fourcc(*"MJPG")
         self.FRAME_RATE_OUT = float(self.device_args.sample_rate())
-        self.video_out = cv2.VideoWriter(
-            self.video_filename, fourcc, self.FRAME_RATE_OUT, self.frameSize)
+        self._open_video(name)
         self.streaming = True
 
     def record(self) -> None:
@@ -110,36 +133,35 @@ class MockVidRec_Flir(VidRec_Flir):  # noqa: N801 — match real class casing
         self.logger.debug("MockVidRec_Flir: synthetic record loop started")
         self.recording = True
         self.frame_counter = 0
-        self.save_thread = threading.Thread(target=self.camCaptureVid)
-        self.save_thread.start()
 
         period = 1.0 / float(self.device_args.sample_rate())
-        self.stamp: List[int] = []
         try:
             while self.recording:
-                im, tsmp = self.imgage_proc()
-                self.image_queue.put(im)
-                self.stamp.append(tsmp)
-                try:
-                    self.outlet.push_sample([self.frame_counter, tsmp])
-                except BaseException:
-                    self.logger.debug(
-                        "MockVidRec_Flir: reopening LSL outlet (was closed)")
-                    self._create_outlet()
-                    self.outlet.push_sample([self.frame_counter, tsmp])
-                self.frame_counter += 1
+                im, tsmp = self.imgage_proc(raw=self.raw_capture)
+                if not self._degraded("preview"):
+                    self.preview.offer(im)
+                self._queue_frame(im, tsmp)
                 time.sleep(period)
         except Exception:
             self.logger.exception(
                 "MockVidRec_Flir: synthetic record loop error")
         finally:
             self.recording = False
-            self.save_thread.join()
-            self.video_out.release()
+            self.lsl_batch.flush()
+            self._finish_video()
+            self._observe_clock_fit()
+            self.hot_log.count("frames", self.frame_counter)
+            self.hot_log.flush("MockVidRec_Flir")
             self.logger.debug(
                 "MockVidRec_Flir: synthetic record loop exited; video written")
 
     def frame_preview(self) -> ByteString:
+        live = self.recording or self.acquiring
+        convert = self._demosaic_preview if self.raw_capture else None
+        preview = self.preview.jpeg(
+            timeout=1.0 if live and not self._degraded("preview") else 0.0, convert=convert)
+        if preview or live:
+            return preview
         # Draw on a fresh full-size frame so the label is legible
         # regardless of frame-decimation settings, and so recorded video
         # frames stay untouched.
@@ -155,10 +177,11 @@ class MockVidRec_Flir(VidRec_Flir):  # noqa: N801 — match real class casing
             2,
             cv2.LINE_AA,
         )
-        rc, encoded = cv2.imencode(".png", img)
-        return encoded.tobytes() if rc else b""
+        return encode_jpeg(img)
 
     def close(self) -> None:
         self.stop()
+        self._stop_acquisition()
+        self.video_encoder.shutdown()
         self.open = False
         self.state = DeviceState.DISCONNECTED
@@ -15,6 +15,12 @@ After ``stop()``, a small placeholder ``.bag`` file is written at the
 expected path so downstream file-cataloguing doesn't choke on a missing
 file. The file is **not** a valid RealSense bag — anything that opens
 and parses it will fail.
+
+With ``recording_backend: frames`` the real acquisition thread and video
+encoders run instead, on a :class:`SyntheticPipeline` that delivers black
+color and constant depth framesets at the configured rate, so real
+(small) color ``.avi`` and depth ``.nbraw`` files are written and tasks
+switch files without restarting the pipeline.
 """
 
 from __future__ import annotations
@@ -23,8 +29,10 @@ import os.path as op
 import threading
 import time
 from time import time as wall_time
-from typing import List, Optional
+from types import SimpleNamespace
+from typing import List, Optional, Tuple
 
+import numpy as np
 from pylsl import local_clock
 
 from neurobooth_os.iout.camera_intel import VidRec_Intel
@@ -36,6 +44,92 @@ from neurobooth_os.iout.device import DeviceState
 # to exist so log_sensor_file rows reference a real file.
 _STUB_BAG_BYTES = b"MOCK_REALSENSE_BAG_PLACEHOLDER\n"
 
+# Depth value (device units) of every synthetic depth pixel, and the depth scale reported for it
+_MOCK_DEPTH_VALUE = 1000
+_MOCK_DEPTH_SCALE = 0.001
+
+
+class _SyntheticFrame:
+    """Stand-in for an ``rs.video_frame``."""
+
+    def __init__(self, data: np.ndarray):
+        self._data = data
+
+    def get_data(self) -> np.ndarray:
+        return self._data
+
+
+class _SyntheticFrameset:
+    """Stand-in for an ``rs.composite_frame`` holding a color and, optionally, a depth frame."""
+
+    def __init__(self, number: int, timestamp_ms: float, color: np.ndarray, depth: Optional[np.ndarray]):
+        self.number = number
+        self.timestamp_ms = timestamp_ms
+        self._color = _SyntheticFrame(color)
+        self._depth = _SyntheticFrame(depth) if depth is not None else None
+
+    def get_frame_number(self) -> int:
+        return self.number
+
+    def get_timestamp(self) -> float:
+        return self.timestamp_ms
+
+    def get_color_frame(self) -> _SyntheticFrame:
+        return self._color
+
+    def get_depth_frame(self) -> Optional[_SyntheticFrame]:
+        return self._depth
+
+
+class SyntheticPipeline:
+    """Stand-in for ``rs.pipeline``: ``try_wait_for_frames()`` returns framesets on a fixed clock at ``fps``."""
+
+    def __init__(self, fps: float, color_size: Tuple[int, int], depth_size: Optional[Tuple[int, int]] = None):
+        """
+        :param fps: Framesets per second.
+        :param color_size: (width, height) of the BGR color frames.
+        :param depth_size: (width, height) of the uint16 depth frames; None for no depth stream.
+        """
+        self.period = 1.0 / fps
+        self.color = np.zeros((color_size[1], color_size[0], 3), dtype=np.uint8)
+        self.depth = None
+        if depth_size is not None:
+            self.depth = np.full((depth_size[1], depth_size[0]), _MOCK_DEPTH_VALUE, dtype=np.uint16)
+        self.n_starts = 0
+        self.n_stops = 0
+        self.frame_number = 0
+        # Cleared to stall try_wait_for_frames(), as a camera that stops delivering would
+        self.delivering = threading.Event()
+        self.delivering.set()
+        self._next_frame = 0.0
+        depth_sensor = SimpleNamespace(get_depth_scale=lambda: _MOCK_DEPTH_SCALE)
+        color_sensor = SimpleNamespace(set_option=lambda option, value: None)
+        device = SimpleNamespace(first_depth_sensor=lambda: depth_sensor, first_color_sensor=lambda: color_sensor)
+        self._profile = SimpleNamespace(get_device=lambda: device)
+
+    def start(self, config=None) -> None:
+        self.n_starts += 1
+        self._next_frame = time.monotonic()
+
+    def stop(self) -> None:
+        self.n_stops += 1
+
+    def get_active_profile(self):
+        return self._profile
+
+    def try_wait_for_frames(self, timeout_ms: int = 5000) -> Tuple[bool, Optional[_SyntheticFrameset]]:
+        if not self.delivering.wait(timeout_ms / 1e3):
+            return False, None
+        delay = self._next_frame - time.monotonic()
+        if delay > timeout_ms / 1e3:
+            time.sleep(timeout_ms / 1e3)
+            return False, None
+        if delay > 0:
+            time.sleep(delay)
+        self._next_frame += self.period
+        self.frame_number += 1
+        return True, _SyntheticFrameset(self.frame_number, wall_time() * 1000.0, self.color, self.depth)
+
 
 class MockVidRec_Intel(VidRec_Intel):  # noqa: N801 — match real class casing
     """Mock RealSense camera that emits synthetic LSL samples."""
@@ -46,10 +140,22 @@ class MockVidRec_Intel(VidRec_Intel):  # noqa: N801 — match real class casing
         # below, so we don't need stubs.
         self.config = None
         self.pipeline = None
+        if self.frame_recording:
+            fps_rgb, _ = self.device_args.sample_rate()
+            size_rgb, size_depth = self.device_args.framesize()
+            self.pipeline = SyntheticPipeline(
+                float(fps_rgb),
+                (int(size_rgb[0]), int(size_rgb[1])),
+                (int(size_depth[0]), int(size_depth[1])) if self.device_args.has_depth_sensor() else None,
+            )
         self.logger.info(
             f"MockVidRec_Intel [{self.device_index}]: skipped pyrealsense2 "
             f"pipeline configuration (no hardware)")
 
+    def _configure_active_device(self) -> None:
+        # Real path sets rs.option.auto_exposure_priority on the color sensor
+        pass
+
     def _prepare_recording(self, name: str) -> None:
         self.name = name
         self.video_filename = f"{name}_intel{self.device_index}.bag"
@@ -72,23 +178,14 @@ class MockVidRec_Intel(VidRec_Intel):  # noqa: N801 — match real class casing
                 # Match real timestamp shape: pyrealsense2 timestamps are
                 # in milliseconds.
                 self.tsmp = wall_time() * 1000.0
-                try:
-                    self.outlet.push_sample(
-                        [self.frame_counter, self.n, self.tsmp, wall_time()])
-                except Exception as e:
-                    self.logger.warning(
-                        f"MockVidRec_Intel [{self.device_index}]: "
-                        f"reopening closed stream: {e}")
-                    self.outlet = self._recreate_outlet()
-                    self.outlet.push_sample(
-                        [self.frame_counter, self.n, self.tsmp, wall_time()])
-                self.frame_counter += 1
+                self._push_frame_index()
                 time.sleep(period)
         except Exception:
             self.logger.exception(
                 f"MockVidRec_Intel [{self.device_index}]: synthetic record "
                 "loop error")
         finally:
+            self.lsl_batch.flush()
             self._write_stub_bag()
             self.record_stopped_flag.set()
             self.logger.debug(
@@ -110,6 +207,9 @@ class MockVidRec_Intel(VidRec_Intel):  # noqa: N801 — match real class casing
                 f".bag at {self.video_filename}: {e}")
 
     def close(self) -> None:
+        if self.frame_recording:  # Stops the acquisition thread and shuts the encoders down
+            super().close()
+            return
         self.previewing = False
         self.stop()
         # Real path sets self.config = []; mock has self.config already None.
@@ -1,14 +1,25 @@
 """Synthetic Mbient that emits LSL samples without real hardware.
 
-Overrides the two hardware hooks on :class:`Mbient`
-(``_acquire_hardware`` and ``_attach_data_source``) plus the lifecycle
-methods that touch the native MetaWear/warble libraries
-(``start`` / ``stop`` / ``disconnect`` / ``close`` / ``reset`` /
-``attempt_reconnect`` / ``on_task_reconnect`` / ``reset_and_reconnect``).
-
-Synthetic samples are produced by a daemon thread that calls every
-registered data handler at the higher of the configured ``acc_hz`` /
-``gyro_hz`` rates.  The values are constants (1g down, zero rotation);
+Overrides the BLE primitives of :class:`Mbient` (``prepare_scan``,
+``_ble_connect`` and ``reset``), so the inherited ``_acquire_hardware``
+runs its real scan/connect/reset/reconnect phases, plus the data-source
+hook ``_attach_data_source`` and the lifecycle methods that touch the
+native MetaWear/warble libraries (``start`` / ``stop`` / ``disconnect`` /
+``close`` / ``attempt_reconnect`` / ``reset_and_reconnect``), and the
+scan behind ``task_start_reconnect`` (``_advertising_macs``).
+
+The BLE primitives are instant unless ``MockMbient.ble_adapter`` is set
+to a :class:`SimulatedBleAdapter`, a latency model of the host adapter
+shared by every mock device: it makes the scan, connects and resets take
+time, fails connects beyond the number it can handle at once, and can put
+devices out of range. With it, ``Mbient.bring_up_group`` and the
+``MbientHealthMonitor`` can be exercised without hardware; a link drop is
+simulated with ``device.device_wrapper.disconnect()``.
+
+Synthetic samples are produced by a daemon thread that hands each one to
+the real ``Mbient._dispatch_sample`` (so the data handlers, the LSL ring
+and pusher thread, and the callback timing are all the production code)
+at the higher of the configured ``acc_hz`` / ``gyro_hz`` rates.  The values are constants (1g down, zero rotation);
 downstream code only needs the LSL samples to flow at the right
 shape and rate, not to look like real motion.
 """
@@ -17,10 +28,10 @@ from __future__ import annotations
 
 import threading
 import time
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Set
 
 from neurobooth_os.iout.device import DeviceState
-from neurobooth_os.iout.mbient import BatteryState, Mbient
+from neurobooth_os.iout.mbient import BatteryState, Mbient, MbientFailedConnection
 
 
 class _MockSample:
@@ -85,20 +96,99 @@ class _MockMetaWearWrapper:
         return BatteryState(voltage=4000.0, charge=100.0)
 
 
+class SimulatedBleAdapter:
+    """Latency model of the host BLE adapter, shared by the mock devices.
+
+    ``scan`` sleeps ``scan_sec`` the first time only (like
+    ``Mbient.SCAN_PERFORMED``). ``connect`` / ``reset`` sleep
+    ``connect_sec`` / ``reset_sec`` while counted as in flight; a connect
+    that starts while ``max_concurrent`` operations are already in flight
+    fails once its time is up, as an overloaded adapter times out.
+    ``post_reset_wait_sec`` is what the mocks use for
+    ``Mbient.retry_delay_sec``. Devices whose MAC is in ``out_of_range``
+    do not advertise and fail to connect.
+    """
+
+    def __init__(
+        self,
+        scan_sec: float = 0.0,
+        connect_sec: float = 0.0,
+        reset_sec: float = 0.0,
+        post_reset_wait_sec: float = 0.0,
+        max_concurrent: Optional[int] = None,
+    ) -> None:
+        self.scan_sec = scan_sec
+        self.connect_sec = connect_sec
+        self.reset_sec = reset_sec
+        self.post_reset_wait_sec = post_reset_wait_sec
+        self.max_concurrent = max_concurrent
+        self.n_scans = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.failed_connects = 0
+        self.out_of_range: Set[str] = set()
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+
+    def scan(self) -> None:
+        with self._scan_lock:
+            if self.n_scans:
+                return
+            time.sleep(self.scan_sec)
+            self.n_scans += 1
+
+    def _operation(self, seconds: float) -> bool:
+        """Sleep ``seconds`` as one in-flight operation; False if the adapter was already full."""
+        with self._lock:
+            overloaded = self.max_concurrent is not None and self.in_flight >= self.max_concurrent
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            time.sleep(seconds)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return not overloaded
+
+    def advertising(self, macs: Set[str]) -> Set[str]:
+        return set(macs) - self.out_of_range
+
+    def connect(self, mac: str) -> None:
+        if not self._operation(self.connect_sec) or mac in self.out_of_range:
+            with self._lock:
+                self.failed_connects += 1
+            raise MbientFailedConnection(f'Unable to connect to {mac}! (simulated adapter)')
+
+    def reset(self) -> None:
+        self._operation(self.reset_sec)
+
+
 class MockMbient(Mbient):
     """Mock Mbient that emits synthetic LSL samples on a daemon thread."""
 
+    # Latency model of the BLE adapter; None makes scan/connect/reset instant.
+    ble_adapter: Optional[SimulatedBleAdapter] = None
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self._mock_thread: Optional[threading.Thread] = None
         self._mock_stop_event = threading.Event()
-
-    def _acquire_hardware(self) -> None:
-        # Skip BLE scan / connect / reset.  Install a stub wrapper so the
-        # inherited start/stop/disconnect paths have something to call.
+        self.retry_delay_sec = self.ble_adapter.post_reset_wait_sec if self.ble_adapter is not None else 0.0
+
+    def prepare_scan(self) -> None:
+        # No BLE scan; the simulated adapter, if any, scans once.
+        if self.ble_adapter is not None:
+            self.ble_adapter.scan()
+
+    def _ble_connect(self, n_attempts: Optional[int] = None, retry_delay_sec: Optional[float] = None) -> None:
+        # Skip the BLE connect.  Install a stub wrapper so the inherited
+        # start/stop/disconnect paths have something to call.
+        if self.ble_adapter is not None:
+            self.ble_adapter.connect(self.mac)
         self.device_wrapper = _MockMetaWearWrapper(self.dev_name)
+        self.device_wrapper.on_disconnect = self._on_ble_disconnect
         self.logger.info(self.format_message(
-            "MockMbient: skipped BLE acquire (no hardware)"))
+            "MockMbient: skipped BLE connect (no hardware)"))
 
     def _attach_data_source(self) -> None:
         # Match the real path's effect on ``data_handlers`` so LSL is
@@ -116,6 +206,8 @@ class MockMbient(Mbient):
         self.streaming = True
         self.state = DeviceState.STARTED
         self._mock_stop_event.clear()
+        self.gap_counter.reset()
+        self._start_lsl_pusher()
         # Use the higher of the two rates: the real fuser emits one sample
         # per matched (acc, gyro) pair which arrive at the higher rate.
         rate_hz = max(self.acc_hz, self.gyro_hz)
@@ -134,15 +226,28 @@ class MockMbient(Mbient):
         if self._mock_thread is not None:
             self._mock_thread.join(timeout=1.0)
             self._mock_thread = None
+        self._stop_lsl_pusher()
         self.streaming = False
         self.state = DeviceState.STOPPED
+        self._report_stream()
+        self._observe_clock_fit()
+        self.hot_log.flush(self.format_message('Stream'))
 
     def disconnect(self) -> None:
         if self.device_wrapper is not None:
             self.device_wrapper.disconnect()
         self.state = DeviceState.DISCONNECTED
 
+    @classmethod
+    def _advertising_macs(cls, macs: Set[str]) -> Set[str]:
+        # No BLE scan; everything in range of the simulated adapter advertises.
+        if cls.ble_adapter is not None:
+            return cls.ble_adapter.advertising(macs)
+        return set(macs)
+
     def close(self) -> None:
+        if self.device_wrapper is not None:  # As in Mbient.close: our own disconnect must not reconnect
+            self.device_wrapper.on_disconnect = lambda status: None
         if self.streaming:
             self.stop()
         self.subscribed_signals.clear()
@@ -151,8 +256,9 @@ class MockMbient(Mbient):
 
     def reset(self, timeout_sec: float = 10) -> None:
         # Real reset waits on a native disconnect callback; the mock
-        # bypasses both the reset and the wait.
-        return None
+        # bypasses both, taking only the simulated adapter's time.
+        if self.ble_adapter is not None:
+            self.ble_adapter.reset()
 
     def attempt_reconnect(
         self,
@@ -160,16 +266,18 @@ class MockMbient(Mbient):
         notify: bool = True,
         n_attempts: int = 3,
     ) -> None:
-        # No native BLE link to recover; surface a benign log so tests
-        # can assert the path was exercised without sending the
+        # No native BLE link to recover: reconnect the stub (through the
+        # simulated adapter, if any) without sending the
         # MbientDisconnected message that real disconnect would.
         self.logger.info(self.format_message(
-            "MockMbient: attempt_reconnect (no-op)"))
-
-    def on_task_reconnect(self) -> None:
-        # Bypass ``Mbient.task_start_reconnect``, which performs a BLE
-        # scan and gates retries on real hardware availability.
-        return None
+            "MockMbient: attempt_reconnect"))
+        if self.device_wrapper is not None and self.device_wrapper.is_connected:
+            return
+        try:
+            self._ble_connect()
+        except MbientFailedConnection as e:
+            self.logger.warning(self.format_message(
+                f"MockMbient: reconnect failed: {e}"))
 
     def reset_and_reconnect(self, timeout_sec: float = 10) -> bool:
         # Operator action; nothing to reset, always succeed.
@@ -186,12 +294,10 @@ class MockMbient(Mbient):
         acc = _MockSample(0.0, 0.0, 1.0)
         gyro = _MockSample(0.0, 0.0, 0.0)
         while not self._mock_stop_event.is_set():
-            self.n_samples_streamed += 1
             epoch_ms = time.time() * 1000.0
-            for handler in list(self.data_handlers):
-                try:
-                    handler(epoch_ms, acc, gyro)
-                except Exception:  # pragma: no cover — defensive
-                    self.logger.exception(self.format_message(
-                        "MockMbient: data handler raised"))
+            try:
+                self._dispatch_sample(epoch_ms, acc, gyro)
+            except Exception:  # pragma: no cover — defensive
+                self.logger.exception(self.format_message(
+                    "MockMbient: data handler raised"))
             self._mock_stop_event.wait(period)
@@ -1,67 +1,132 @@
 """Synthetic microphone that emits LSL audio chunks without pyaudio.
 
 Overrides the single hardware hook on :class:`MicStream`
-(``_acquire_audio_stream``) plus the streaming method (``stream``) and
-the lifecycle methods that touch pyaudio (``stop``, ``disconnect``).
+(``_acquire_audio_stream``), which installs a :class:`SyntheticAudioInput`
+in place of the pyaudio stream, plus ``disconnect`` (no pyaudio to
+terminate).
 
-Synthetic samples are produced by a daemon thread that pushes
-constant-zero int16 chunks at the configured ``sample_rate /
-sample_chunk_size`` rate.  Downstream code only needs the LSL stream
-shape and cadence, not realistic audio.
+Everything else (the callback and blocking-read capture loops, chunk
+timestamping, LSL outlet) is the real code. ``SyntheticAudioInput``
+produces constant-zero int16 chunks at the configured ``sample_rate /
+sample_chunk_size`` rate, with PortAudio-style ADC times on a stream clock
+of its own. It logs when the first frame of each chunk was sampled, so
+tests can measure how far the pushed timestamps are from the true sample
+times. Downstream code only needs the LSL stream shape and cadence, not
+realistic audio.
 """
 
 from __future__ import annotations
 
 import threading
 import time
-from typing import List, Optional
+from typing import Callable, List, Optional
 
-import numpy as np
 from pylsl import local_clock
 
 from neurobooth_os.iout.device import DeviceState
-from neurobooth_os.iout.microphone import MicStream
+from neurobooth_os.iout.microphone import PA_CONTINUE, PA_INPUT_OVERFLOW, MicStream
+
+
+class SyntheticAudioInput:
+    """Stand-in for a mono int16 ``pyaudio.Stream``: paced ``read()``, or a paced callback thread."""
+
+    def __init__(
+            self,
+            rate: int,
+            frames_per_buffer: int,
+            stream_callback: Optional[Callable] = None,
+            overflow_every: int = 0,
+    ) -> None:
+        """
+        :param rate: Sample rate; chunks become available every ``frames_per_buffer / rate`` seconds.
+        :param frames_per_buffer: Samples per chunk.
+        :param stream_callback: PortAudio-style callback; when given, ``start_stream()`` calls it for every chunk.
+        :param overflow_every: If non-zero, flag every n-th callback chunk with ``paInputOverflow``.
+        """
+        self.period = frames_per_buffer / rate
+        self.frames_per_buffer = frames_per_buffer
+        self.stream_callback = stream_callback
+        self.overflow_every = overflow_every
+        self._chunk = bytes(2 * frames_per_buffer)
+        self._stream_t0 = local_clock() - 100.0  # PortAudio stream time has an arbitrary origin
+        self._next_time = local_clock()
+        self._thread: Optional[threading.Thread] = None
+        self._active = False
+        self.chunks = 0
+        self.chunk_times: List[float] = []  # LSL time at which the first frame of each chunk was sampled
+
+    def _wait_for_chunk(self) -> float:
+        """Wait until the next chunk has been sampled; returns the LSL time of its first frame."""
+        self._next_time = max(self._next_time + self.period, local_clock() - self.period)
+        time.sleep(max(self._next_time - local_clock(), 0.0))
+        self.chunks += 1
+        first_frame_time = self._next_time - self.period
+        self.chunk_times.append(first_frame_time)
+        return first_frame_time
+
+    def get_input_latency(self) -> float:
+        return 0.0
+
+    def read(self, num_frames: int, exception_on_overflow: bool = True) -> bytes:
+        self._wait_for_chunk()
+        return self._chunk
+
+    def _run_callback(self) -> None:
+        while self._active:
+            first_frame_time = self._wait_for_chunk()
+            overflow = self.overflow_every and self.chunks % self.overflow_every == 0
+            time_info = {
+                "input_buffer_adc_time": first_frame_time - self._stream_t0,
+                "current_time": local_clock() - self._stream_t0,
+                "output_buffer_dac_time": 0.0,
+            }
+            _, flag = self.stream_callback(
+                self._chunk, self.frames_per_buffer, time_info, PA_INPUT_OVERFLOW if overflow else 0)
+            if flag != PA_CONTINUE:
+                break
+        self._active = False
+
+    def start_stream(self) -> None:
+        if self.stream_callback is None or self._active:
+            return
+        self._active = True
+        self._next_time = local_clock()
+        self._thread = threading.Thread(target=self._run_callback, name="synthetic_audio", daemon=True)
+        self._thread.start()
+
+    def stop_stream(self) -> None:
+        """Stop calling back; like PortAudio, returns once any callback in progress has finished."""
+        self._active = False
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def is_active(self) -> bool:
+        return self._active
+
+    def close(self) -> None:
+        self.stop_stream()
 
 
 class MockMicStream(MicStream):
-    """Mock microphone that emits zero-filled audio chunks on a daemon thread."""
+    """Mock microphone whose audio input is a :class:`SyntheticAudioInput` producing silence."""
 
     def _acquire_audio_stream(self) -> None:
         # Skip pyaudio device enumeration and stream open. Inherited
         # ``connect()`` continues to ``_publish_outlet()`` after this.
         self.device_name = f"MockMicrophone-{self._device_args.microphone_name}"
+        self.stream_in = SyntheticAudioInput(
+            self.fps,
+            self.CHUNK,
+            stream_callback=self._on_audio if self.capture_mode == "callback" else None,
+        )
         self.logger.info(
             f"MockMicStream: skipped pyaudio acquire (no hardware); "
             f"reporting device_name={self.device_name}")
 
-    def stream(self) -> None:
-        """Emit zero-filled int16 chunks at the configured chunk rate."""
-        chunk_period = float(self.CHUNK) / float(self.fps)
-        zero_chunk = np.zeros(self.CHUNK, dtype="int16")
-        self.last_time = int(local_clock() * 10e3)
-        self.logger.debug("MockMicStream: entering synthetic stream loop")
-        try:
-            while self.streaming:
-                tlocal = int(local_clock() * 10e3)
-                tdiff = tlocal - self.last_time
-                self.last_time = tlocal
-                payload = np.hstack((np.array(tdiff), zero_chunk))
-                try:
-                    self.outlet_audio.push_sample(payload)
-                except BaseException:
-                    # Match the real stream's recover-on-closed-outlet behaviour.
-                    self.logger.debug(
-                        "MockMicStream: reopening LSL outlet (was closed)")
-                    from pylsl import StreamOutlet
-                    self.outlet_audio = StreamOutlet(self._stream_info_audio)
-                    self.outlet_audio.push_sample(payload)
-                # Wait a chunk's worth of wall-clock time before the next
-                # synthetic chunk so the LSL cadence matches the real path.
-                time.sleep(chunk_period)
-        finally:
-            self.stream_on = False
-            self.logger.debug("MockMicStream: exiting synthetic stream loop")
-
     def disconnect(self) -> None:
-        """Skip pyaudio teardown; mock has no native handles to release."""
+        """Stop the synthetic input; the mock has no pyaudio handles to release."""
+        if self.stream_in is not None:
+            self.stream_in.close()
+            self.stream_in = None
         self.state = DeviceState.DISCONNECTED
@@ -0,0 +1,110 @@
+"""Synthetic webcam that records through the real grab loop without a camera.
+
+Overrides only the ``cv2.VideoCapture`` hooks on :class:`VidRec_Webcam`:
+
+- ``open_stream`` — installs a :class:`SyntheticCapture` in place of
+  ``cv2.VideoCapture(camera_idx, cv2.CAP_DSHOW)`` and skips the buffer flush.
+
+Everything else (the grab loop, timestamping, video encoder, LSL outlet,
+frame preview) is the real code, so a real (small) ``.avi`` is written at the
+requested path.
+
+``SyntheticCapture`` delivers frames on a fixed clock at ``sample_rate`` and
+makes ``retrieve()`` cost a random "decode" time, like MJPG decoding of real
+frames. It logs when each frame became available, so tests can measure how
+far the recorded timestamps are from the true frame times.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+from pylsl import local_clock
+
+from neurobooth_os.iout.webcam import VidRec_Webcam
+
+
+_MOCK_FRAME_WIDTH = 320
+_MOCK_FRAME_HEIGHT = 240
+
+
+class SyntheticCapture:
+    """Stand-in for ``cv2.VideoCapture``: paced ``grab()``, slow and variable ``retrieve()``."""
+
+    def __init__(
+            self,
+            fps: float,
+            width: int = _MOCK_FRAME_WIDTH,
+            height: int = _MOCK_FRAME_HEIGHT,
+            decode_ms: Tuple[float, float] = (2.0, 12.0),
+            seed: Optional[int] = None,
+    ) -> None:
+        """
+        :param fps: Rate at which frames become available.
+        :param width: Frame width.
+        :param height: Frame height.
+        :param decode_ms: ``retrieve()`` takes a uniformly random time in this range.
+        :param seed: Seed for the decode times.
+        """
+        self.period = 1.0 / fps
+        self.width = width
+        self.height = height
+        self.decode_ms = decode_ms
+        self._rng = random.Random(seed)
+        self._opened = True
+        self._t0 = local_clock()
+        self._next_index = 0
+        self._frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self.frame_times: List[float] = []  # LSL time at which each grabbed frame became available
+        self.grab_returned: List[float] = []  # LSL time at which each grab() returned
+        self.decode_started: List[float] = []  # LSL time at which each retrieve() started decoding
+
+    def isOpened(self) -> bool:  # noqa: N802 — match cv2 casing
+        return self._opened
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        return 0.0
+
+    def grab(self) -> bool:
+        """Wait for the next frame; frames missed while the caller was busy are skipped, as a camera would."""
+        now = local_clock()
+        self._next_index = max(self._next_index, int((now - self._t0) / self.period) + 1)
+        frame_time = self._t0 + self._next_index * self.period
+        time.sleep(max(frame_time - now, 0.0))
+        self._next_index += 1
+        self.frame_times.append(frame_time)
+        self.grab_returned.append(local_clock())
+        return self._opened
+
+    def retrieve(self) -> Tuple[bool, np.ndarray]:
+        self.decode_started.append(local_clock())
+        time.sleep(self._rng.uniform(*self.decode_ms) / 1e3)
+        return True, self._frame.copy()
+
+    def read(self) -> Tuple[bool, np.ndarray]:
+        self.grab()
+        return self.retrieve()
+
+    def release(self) -> None:
+        self._opened = False
+
+
+class MockVidRec_Webcam(VidRec_Webcam):  # noqa: N801 — match real class casing
+    """Mock webcam whose capture is a :class:`SyntheticCapture` at ``sample_rate``."""
+
+    def __init__(self, device_args, **kwargs) -> None:
+        super().__init__(device_args, **kwargs)
+        self.synthetic_camera: Optional[SyntheticCapture] = None  # Kept after close_stream() for inspection
+
+    def open_stream(self) -> None:
+        self.synthetic_camera = SyntheticCapture(float(self.device_args.sample_rate()))
+        self.camera = self.synthetic_camera
+        self.open = True
@@ -0,0 +1,517 @@
+"""Simulated MetaWear SDK, so the production :class:`Mbient` code runs and can be benchmarked without hardware.
+
+``MockMbient`` replaces Mbient's BLE primitives, so the real scan, connect, reset, reconnect and callback code never
+runs under it. A :class:`SimulatedMetaWear` replaces the SDK underneath instead: :func:`installed` swaps the binding
+points ``neurobooth_os.iout.mbient`` imports from mbientlab (``BleScanner``, ``MetaWear``, ``libmetawear``,
+``parse_value``, ``cbindings``, ``Module`` and ``Model``) for simulated ones, and an unmodified ``Mbient`` then goes
+through ``connect_device``, ``MetaWearWrapper``, ``reset_device``, ``attempt_reconnect`` and ``_callback`` as it would
+on a booth.
+
+The simulation models:
+
+* **Scan latency**: each device advertises ``scan_sec`` after a scan starts; devices in ``out_of_range`` never do.
+* **Connects**: each takes ``connect_sec``, and fails with probability ``connect_fail_prob``, when the device is out
+  of range, or when more than ``max_concurrent_connects`` are in flight.
+* **Disconnects**: a board reset drops the link ``reset_sec`` later; a streaming link drops on its own at
+  ``disconnects_per_min``; ``drop(mac)`` drops one on demand. ``on_disconnect`` is called on a thread of its own, as
+  the native stack does.
+* **Notification batching**: samples are taken at the configured ODR on a device clock that runs
+  ``clock_drift_ppm`` fast, queued on the device, and delivered in bursts at connection events, with the interval and
+  packets per event of a :class:`~neurobooth_os.iout.mock.ble_link.SimulatedBleLink` for the requested connection
+  parameters and the number of connected devices.
+* **Callback timing**: each burst reaches the callbacks ``callback_delay_ms`` after its connection event, on the
+  device's own "native" thread.
+* **Notification buffers**: as with the SDK, ``parse_value`` returns views into the notification, which are
+  overwritten with NaN once the callback returns; values kept longer must be copied.
+
+Latencies are :class:`Distribution` values. The values streamed are constants (1g down, no rotation).
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from types import ModuleType, SimpleNamespace
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from neurobooth_os.iout.mbient import ConnectionParameters, GyroscopeType
+from neurobooth_os.iout.mock.ble_link import SimulatedBleLink
+
+GATT_SERVICE = "326a9000-85cb-9195-d9dd-464cfbbae75a"
+
+
+class Distribution(NamedTuple):
+    """A random duration: "fixed" (``a``), "uniform" (``a`` to ``b``) or "lognormal" (median ``a``, sigma ``b``)."""
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    def draw(self, rng: np.random.Generator) -> float:
+        if self.kind == "fixed":
+            return self.a
+        if self.kind == "uniform":
+            return float(rng.uniform(self.a, self.b))
+        if self.kind == "lognormal":
+            return float(self.a * math.exp(rng.normal(0.0, self.b)))
+        raise ValueError(f"Unknown distribution '{self.kind}'")
+
+
+# Stand-ins for the mbientlab constants Mbient checks
+Module = SimpleNamespace(GYRO=4)
+Model = SimpleNamespace(
+    METAMOTION_S=7, METAMOTION_R=5, METAMOTION_RL=6, METAMOTION_C=4, METAWEAR_RG=1, METAWEAR_RPRO=3,
+)
+
+
+def parse_value(data: Any, n_elem: int = 1) -> Any:
+    """Stand-in for ``mbientlab.metawear.parse_value``."""
+    return data.value if n_elem == 1 else list(data.value)
+
+
+# The SDK's ctypes callback wrappers; the simulation calls Python functions directly
+cbindings = SimpleNamespace(FnVoid_VoidP_DataP=lambda fn: fn, FnVoid_VoidP_VoidP=lambda fn: fn)
+
+
+class _Cartesian:
+    """A ``CartesianFloat`` as ``parse_value`` returns it: a view of ``x``, ``y`` and ``z`` in a notification buffer."""
+
+    def __init__(self, buffer: List[float]):
+        self._buffer = buffer
+
+    @property
+    def x(self) -> float:
+        return self._buffer[0]
+
+    @property
+    def y(self) -> float:
+        return self._buffer[1]
+
+    @property
+    def z(self) -> float:
+        return self._buffer[2]
+
+
+class _Data:
+    """A notification: ``contents.epoch`` (device ms) and the value ``parse_value`` returns."""
+
+    def __init__(self, epoch: float, value: Any, buffers: Iterable[List[float]] = ()):
+        self.contents = SimpleNamespace(epoch=epoch)
+        self.value = value
+        self._buffers = list(buffers)
+
+    def release(self) -> None:
+        """End of the callback: the SDK reuses the buffer, so views read after this see other data (here, NaN)."""
+        for buffer in self._buffers:
+            buffer[:] = [math.nan] * len(buffer)
+
+
+class _ScanResult:
+    def __init__(self, name: str, mac: str):
+        self.name = name
+        self.mac = mac
+
+    @staticmethod
+    def has_service_uuid(uuid: str) -> bool:
+        return uuid == GATT_SERVICE
+
+
+class _Scanner:
+    """Stand-in for ``mbientlab.warble.BleScanner``."""
+
+    def __init__(self, backend: SimulatedMetaWear):
+        self.backend = backend
+        self._handler: Optional[Callable[[_ScanResult], None]] = None
+        self._stop_event = threading.Event()
+
+    def set_handler(self, handler: Callable[[_ScanResult], None]) -> None:
+        self._handler = handler
+
+    def start(self) -> None:
+        backend = self.backend
+        backend.n_scans += 1
+        with backend.lock:
+            found = sorted((backend.scan_sec.draw(backend.rng), name, mac) for mac, name in backend.devices.items())
+        self._stop_event.clear()
+
+        def advertise() -> None:
+            t0 = time.monotonic()
+            for delay, name, mac in found:
+                if self._stop_event.wait(max(0.0, t0 + delay - time.monotonic())):
+                    return
+                if mac not in backend.out_of_range:
+                    self._handler(_ScanResult(name, mac))
+
+        threading.Thread(target=advertise, name="sim_ble_scan", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+class _Board:
+    """The simulated state of one connected board: its configuration, subscriptions and sampling thread."""
+
+    def __init__(self, device: _MetaWear):
+        self.device = device
+        self.backend = device.backend
+        self.connection_params = ConnectionParameters()
+        self.odr = {"acc": 100.0, "gyro": 100.0}
+        self.callbacks: Dict[str, Callable[[Any, Any], None]] = {}  # Signal kind -> subscribed callback
+        self.started: Set[str] = set()
+        self.fused = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start_sampling(self, kind: str) -> None:
+        self.started.add(kind)
+        if self.started == {"acc", "gyro"} and self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._stream, name=f"sim_metawear_{self.device.mac}", daemon=True)
+            self._thread.start()
+
+    def stop_sampling(self, kind: str) -> None:
+        self.started.discard(kind)
+        self._stop_event.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+
+    def _samples(self, t0: float) -> Iterator[Tuple[float, str, float]]:
+        """(time, kind, epoch) of every sample the sensors take from ``t0``, in time order."""
+        kinds = ["fused"] if self.fused else ["acc", "gyro"]
+        drift = 1 + self.backend.clock_drift_ppm * 1e-6
+        epoch0 = self.backend.epoch_ms(self.device.mac)
+        periods = {k: 1.0 / (max(self.odr.values()) if k == "fused" else self.odr[k]) for k in kinds}
+        counters = {k: 0 for k in kinds}
+        while True:
+            kind = min(kinds, key=lambda k: counters[k] * periods[k])
+            elapsed = counters[kind] * periods[kind]
+            counters[kind] += 1
+            yield t0 + elapsed, kind, epoch0 + elapsed * drift * 1e3
+
+    def _stream(self) -> None:
+        backend = self.backend
+        link = SimulatedBleLink(
+            self.connection_params,
+            n_devices=max(1, backend.n_connected),
+            min_interval_ms=backend.adapter_min_interval_ms,
+            packets_per_event=backend.packets_per_event,
+            device_queue_packets=backend.device_queue_packets,
+        )
+        interval = link.interval_ms / 1e3
+        acc, gyro = (0.0, 0.0, 1.0), (0.0, 0.0, 0.0)
+        queue: Deque[Tuple[str, float]] = deque()
+        t0 = time.monotonic()
+        samples = self._samples(t0)
+        pending = next(samples)
+        event = t0 + float(backend.rng.uniform(0, interval))
+        while not self._stop_event.wait(max(0.0, event - time.monotonic())):
+            while pending[0] <= event:
+                if len(queue) < link.device_queue_packets:
+                    queue.append(pending[1:])
+                else:
+                    backend.samples_dropped += 1
+                pending = next(samples)
+            if backend.rng.random() < backend.disconnects_per_min * interval / 60.0:
+                backend.drop(self.device.mac, status=8)  # 8: connection supervision timeout
+                return
+            if queue and backend.rng.random() >= backend.event_miss_prob:
+                delay = backend.callback_delay_ms.draw(backend.rng) / 1e3
+                if delay > 0:
+                    time.sleep(delay)
+                for _ in range(min(link.slots_per_event, len(queue))):
+                    kind, epoch = queue.popleft()
+                    callback = self.callbacks.get(kind)
+                    if callback is None:
+                        continue
+                    buffers = [list(acc), list(gyro)] if kind == "fused" else [list(acc if kind == "acc" else gyro)]
+                    views = [_Cartesian(buffer) for buffer in buffers]
+                    data = _Data(epoch, views if kind == "fused" else views[0], buffers)
+                    backend.n_notifications += 1
+                    callback(None, data)
+                    data.release()
+            event += interval
+
+
+class _MetaWear:
+    """Stand-in for ``mbientlab.metawear.MetaWear``; ``backend`` is set on the class :func:`installed` binds."""
+
+    GATT_SERVICE = GATT_SERVICE
+    backend: SimulatedMetaWear
+
+    def __init__(self, mac: str):
+        self.mac = mac
+        self.board = _Board(self)
+        self.usb = SimpleNamespace(is_connected=False)
+        self.is_connected = False
+        self.on_disconnect: Optional[Callable[[int], None]] = None
+
+    def connect(self) -> None:
+        self.backend.connect(self)
+
+    def disconnect(self) -> None:
+        self.backend.drop(self.mac, status=0, device=self)
+
+
+class _LibMetaWear:
+    """Stand-in for ``libmetawear``: the calls Mbient makes, on :class:`_Board` handles."""
+
+    def __init__(self, backend: SimulatedMetaWear):
+        self.backend = backend
+        self._handles = itertools.count(1)  # Signals are ints: Mbient stores them in a ctypes c_void_p array
+        self._signals: Dict[int, Tuple[_Board, str]] = {}
+
+    def _signal(self, board: _Board, kind: str) -> int:
+        handle = next(self._handles)
+        self._signals[handle] = (board, kind)
+        return handle
+
+    def mbl_mw_metawearboard_get_model(self, board: _Board) -> int:
+        return Model.METAMOTION_S
+
+    def mbl_mw_metawearboard_get_model_name(self, board: _Board) -> bytes:
+        return b"MetaMotionS (simulated)"
+
+    def mbl_mw_metawearboard_lookup_module(self, board: _Board, module: int) -> int:
+        return int(self.backend.gyro_type)
+
+    def mbl_mw_settings_set_connection_parameters(self, board: _Board, min_interval, max_interval, latency, timeout):
+        board.connection_params = ConnectionParameters(min_interval, max_interval, latency, timeout)
+
+    def mbl_mw_acc_set_odr(self, board: _Board, odr: float) -> None:
+        board.odr["acc"] = float(odr)
+
+    def _set_gyro_odr(self, board: _Board, odr: float) -> None:
+        board.odr["gyro"] = float(odr)
+
+    mbl_mw_gyro_bmi160_set_odr = mbl_mw_gyro_bmi270_set_odr = _set_gyro_odr
+
+    def mbl_mw_acc_get_acceleration_data_signal(self, board: _Board) -> int:
+        return self._signal(board, "acc")
+
+    def _gyro_signal(self, board: _Board) -> int:
+        return self._signal(board, "gyro")
+
+    mbl_mw_gyro_bmi160_get_rotation_data_signal = mbl_mw_gyro_bmi270_get_rotation_data_signal = _gyro_signal
+
+    def mbl_mw_settings_get_battery_state_data_signal(self, board: _Board) -> int:
+        return self._signal(board, "battery")
+
+    def mbl_mw_dataprocessor_fuser_create(self, acc_signal: int, others: Any, n: int, context: Any, created) -> None:
+        board, _ = self._signals[acc_signal]
+        created(context, self._signal(board, "fused"))
+
+    def mbl_mw_datasignal_subscribe(self, signal: int, context: Any, callback) -> None:
+        board, kind = self._signals[signal]
+        board.fused = board.fused or kind == "fused"
+        board.callbacks[kind] = callback
+
+    def mbl_mw_datasignal_unsubscribe(self, signal: int) -> None:
+        board, kind = self._signals[signal]
+        board.callbacks.pop(kind, None)
+
+    def mbl_mw_datasignal_read(self, signal: int) -> None:
+        board, kind = self._signals[signal]
+        if kind == "battery" and "battery" in board.callbacks:
+            board.callbacks["battery"](None, _Data(0.0, SimpleNamespace(voltage=4100, charge=90)))
+
+    def mbl_mw_acc_start(self, board: _Board) -> None:
+        board.start_sampling("acc")
+
+    def _gyro_start(self, board: _Board) -> None:
+        board.start_sampling("gyro")
+
+    mbl_mw_gyro_bmi160_start = mbl_mw_gyro_bmi270_start = _gyro_start
+
+    def mbl_mw_acc_stop(self, board: _Board) -> None:
+        board.stop_sampling("acc")
+
+    def _gyro_stop(self, board: _Board) -> None:
+        board.stop_sampling("gyro")
+
+    mbl_mw_gyro_bmi160_stop = mbl_mw_gyro_bmi270_stop = _gyro_stop
+
+    def mbl_mw_debug_disconnect(self, board: _Board) -> None:
+        """The last call of a board reset: the link drops once the board has reset."""
+        board.callbacks.clear()
+        timer = threading.Timer(self.backend.reset_sec.draw(self.backend.rng), self.backend.drop,
+                                args=(board.device.mac,), kwargs={"status": 0, "device": board.device})
+        timer.daemon = True
+        timer.start()
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        # Configuration writes, haptics, logging and macro cleanup: accepted and ignored
+        if name.startswith("mbl_mw_"):
+            return lambda *args, **kwargs: None
+        raise AttributeError(name)
+
+
+class SimulatedMetaWear:
+    """The simulated devices and host adapter behind the stand-in SDK."""
+
+    def __init__(
+            self,
+            macs: Iterable[str] = (),
+            scan_sec: Distribution = Distribution("uniform", 0.05, 0.3),
+            connect_sec: Distribution = Distribution("uniform", 0.05, 0.2),
+            connect_fail_prob: float = 0.0,
+            max_concurrent_connects: Optional[int] = None,
+            reset_sec: Distribution = Distribution("fixed", 0.1),
+            disconnects_per_min: float = 0.0,
+            callback_delay_ms: Distribution = Distribution("fixed", 0.0),
+            adapter_min_interval_ms: float = 7.5,
+            packets_per_event: int = 4,
+            device_queue_packets: int = 32,
+            event_miss_prob: float = 0.0,
+            clock_drift_ppm: float = 0.0,
+            gyro_type: GyroscopeType = GyroscopeType.BMI160,
+            seed: Optional[int] = 0,
+    ):
+        """
+        :param macs: Devices that advertise when scanned for; any MAC connected to is added.
+        :param scan_sec: Time from the start of a scan until each device is found.
+        :param connect_sec: Duration of each connect.
+        :param connect_fail_prob: Probability that a connect fails.
+        :param max_concurrent_connects: Connects beyond this many in flight fail (None: no limit).
+        :param reset_sec: Time from a board reset until its link drops.
+        :param disconnects_per_min: Rate at which a streaming link drops on its own.
+        :param callback_delay_ms: Time from a connection event until its notifications reach the callbacks.
+        :param adapter_min_interval_ms: Shortest connection interval the adapter grants.
+        :param packets_per_event: Most notifications per connection event.
+        :param device_queue_packets: Notifications a device queues between events; more are lost.
+        :param event_miss_prob: Probability that a connection event is lost to interference.
+        :param clock_drift_ppm: How much faster the device clocks run than the host's.
+        :param gyro_type: The gyroscope the boards report.
+        :param seed: Seed for every random draw.
+        """
+        self.devices: Dict[str, str] = {mac: f"MetaWear-{i}" for i, mac in enumerate(macs)}  # MAC -> name
+        self.out_of_range: Set[str] = set()
+        self.scan_sec = scan_sec
+        self.connect_sec = connect_sec
+        self.connect_fail_prob = connect_fail_prob
+        self.max_concurrent_connects = max_concurrent_connects
+        self.reset_sec = reset_sec
+        self.disconnects_per_min = disconnects_per_min
+        self.callback_delay_ms = callback_delay_ms
+        self.adapter_min_interval_ms = adapter_min_interval_ms
+        self.packets_per_event = packets_per_event
+        self.device_queue_packets = device_queue_packets
+        self.event_miss_prob = event_miss_prob
+        self.clock_drift_ppm = clock_drift_ppm
+        self.gyro_type = gyro_type
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self._connected: Dict[str, _MetaWear] = {}
+        self._connecting = 0
+        self._epoch_origin = time.time() * 1e3 - time.monotonic() * 1e3
+
+        self.n_scans = 0
+        self.n_connects = 0
+        self.failed_connects = 0
+        self.n_disconnects = 0
+        self.n_notifications = 0
+        self.samples_dropped = 0
+
+        self.BleScanner = _Scanner(self)
+        self.MetaWear = type("MetaWear", (_MetaWear,), {"backend": self})
+        self.libmetawear = _LibMetaWear(self)
+
+    @property
+    def n_connected(self) -> int:
+        return len(self._connected)
+
+    def epoch_ms(self, mac: str) -> float:
+        """The device's clock, in ms since the Unix epoch."""
+        return self._epoch_origin + time.monotonic() * 1e3
+
+    def connect(self, device: _MetaWear) -> None:
+        with self.lock:
+            self.devices.setdefault(device.mac, f"MetaWear-{len(self.devices)}")
+            self._connecting += 1
+            overloaded = self.max_concurrent_connects is not None and self._connecting > self.max_concurrent_connects
+            duration = self.connect_sec.draw(self.rng)
+            fails = self.rng.random() < self.connect_fail_prob
+        try:
+            time.sleep(duration)
+            if device.mac in self.out_of_range or overloaded or fails:
+                with self.lock:
+                    self.failed_connects += 1
+                reason = "out of range" if device.mac in self.out_of_range else (
+                    "adapter busy" if overloaded else "connection failed")
+                raise RuntimeError(f"Simulated connect to {device.mac} failed: {reason}")
+            device.is_connected = True
+            with self.lock:
+                self.n_connects += 1
+                self._connected[device.mac] = device
+        finally:
+            with self.lock:
+                self._connecting -= 1
+
+    def drop(self, mac: str, status: int = 8, device: Optional[_MetaWear] = None) -> None:
+        """Drop the link to ``mac`` (or the given connection), calling its ``on_disconnect`` on a thread."""
+        with self.lock:
+            if device is None:
+                device = self._connected.get(mac)
+            if device is None:
+                return
+            if self._connected.get(mac) is device:
+                del self._connected[mac]
+            was_connected, device.is_connected = device.is_connected, False
+            if was_connected:
+                self.n_disconnects += 1
+        device.board.started.clear()
+        device.board._stop_event.set()
+        callback = device.on_disconnect
+        if callable(callback):
+            threading.Thread(target=callback, args=(status,), name="sim_metawear_disconnect", daemon=True).start()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters of everything the simulation did, for benchmarks."""
+        return {
+            "scans": self.n_scans,
+            "connects": self.n_connects,
+            "failed_connects": self.failed_connects,
+            "disconnects": self.n_disconnects,
+            "notifications": self.n_notifications,
+            "samples_dropped": self.samples_dropped,
+        }
+
+
+@contextmanager
+def installed(backend: SimulatedMetaWear, mbient: Optional[ModuleType] = None) -> Iterator[SimulatedMetaWear]:
+    """
+    Point the mbient module at the simulated SDK for the duration of the block.
+
+    :param backend: The simulation to install.
+    :param mbient: The module to patch: the one whose globals the ``Mbient`` class in use reads, i.e.
+        ``sys.modules[Mbient.__module__]``. Defaults to ``neurobooth_os.iout.mbient`` as currently imported, which is
+        a different module from a class imported before the module was re-imported.
+    """
+    if mbient is None:
+        import neurobooth_os.iout.mbient  # noqa: F401  (ensure it is imported)
+        mbient = sys.modules["neurobooth_os.iout.mbient"]
+
+    bindings: Dict[str, Any] = {
+        "BleScanner": backend.BleScanner,
+        "MetaWear": backend.MetaWear,
+        "libmetawear": backend.libmetawear,
+        "parse_value": parse_value,
+        "cbindings": cbindings,
+        "Module": Module,
+        "Model": Model,
+        "_HAS_MBIENTLAB": True,
+    }
+    saved = {name: getattr(mbient, name) for name in bindings}
+    for name, value in bindings.items():
+        setattr(mbient, name, value)
+    try:
+        yield backend
+    finally:
+        for name, value in saved.items():
+            setattr(mbient, name, value)
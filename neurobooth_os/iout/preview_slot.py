@@ -0,0 +1,83 @@
+"""
+The newest frame of a camera's capture loop, kept for operator frame previews.
+
+A preview used to grab its own frame: ``BeginAcquisition``/``EndAcquisition`` on the FLIR, opening and closing the
+``cv2.VideoCapture`` on the webcam. That takes hundreds of milliseconds and, while the camera is recording or about to
+start, competes with acquisition. Instead, the capture loop offers every frame to a :class:`PreviewSlot`, which keeps
+a downscaled copy of every Nth one, and ``frame_preview`` JPEG-encodes the slot on request without touching the camera.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+PREVIEW_MAX_WIDTH = 640  # Frames are decimated to at most this width; the GUI shows them smaller still
+PREVIEW_JPEG_QUALITY = 85
+
+
+def encode_jpeg(img: np.ndarray) -> bytes:
+    """JPEG-encode a frame for a preview reply; an empty byte string if encoding fails."""
+    rc, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, PREVIEW_JPEG_QUALITY])
+    return buf.tobytes() if rc else b""
+
+
+class PreviewSlot:
+    """Latest-frame slot written by a capture thread and read by ``frame_preview``."""
+
+    def __init__(self, every_n: int = 10, max_age_sec: float = 2.0, downscale: bool = True):
+        """
+        :param every_n: Keep one in this many offered frames.
+        :param max_age_sec: Frames older than this are not served (e.g. the last frame of a finished recording).
+        :param downscale: Decimate kept frames to at most ``PREVIEW_MAX_WIDTH``. Disable for frames that must not be
+            decimated, such as Bayer mosaics that are demosaiced when served.
+        """
+        self.every_n = every_n
+        self.max_age_sec = max_age_sec
+        self.downscale = downscale
+        self._n = 0
+        self._frame: Optional[np.ndarray] = None
+        self._frame_time = 0.0
+        self._cond = threading.Condition()
+
+    def offer(self, frame: np.ndarray) -> None:
+        """Called by the capture loop with every frame; copies one in ``every_n``."""
+        self._n += 1
+        if (self._n - 1) % self.every_n:
+            return
+        if self.downscale and frame.shape[1] > PREVIEW_MAX_WIDTH:
+            step = -(-frame.shape[1] // PREVIEW_MAX_WIDTH)  # Ceiling division
+            frame = frame[::step, ::step]
+        frame = frame.copy()  # The caller may reuse or release the buffer
+        with self._cond:
+            self._frame = frame
+            self._frame_time = time.monotonic()
+            self._cond.notify_all()
+
+    def latest(self, timeout: float = 0.0) -> Optional[np.ndarray]:
+        """
+        The newest kept frame if it is recent enough, waiting up to ``timeout`` for one (e.g. right after a
+        recording starts).
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._frame is None or time.monotonic() - self._frame_time > self.max_age_sec:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return self._frame
+
+    def jpeg(self, timeout: float = 0.0, convert: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> bytes:
+        """
+        The newest kept frame as JPEG, or an empty byte string if there is none.
+
+        :param timeout: How long to wait for a frame if the slot is empty or stale.
+        :param convert: Applied to the frame before encoding (e.g. demosaicing).
+        """
+        frame = self.latest(timeout)
+        if frame is None:
+            return b""
+        return encode_jpeg(convert(frame) if convert is not None else frame)
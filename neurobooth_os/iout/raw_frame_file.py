@@ -0,0 +1,133 @@
+"""
+A minimal container for uncompressed (or losslessly zlib-compressed) camera frames.
+
+Used where no video codec fits: raw FLIR Bayer mosaics (``bayer_file.py``) and RealSense z16 depth frames recorded
+without a ``.bag`` (``camera_intel.py``).
+
+File layout (little-endian)::
+
+    b"NBFRAME1"                  magic
+    uint32 n, n bytes            JSON header: width, height, channels, dtype, fps, compression, plus writer metadata
+    repeated per frame:
+        uint32 n, n bytes        frame payload (height * width * channels values, zlib-compressed if requested)
+
+Frames are self-delimiting, so a file cut short by a crash is readable up to its last complete frame.
+"""
+
+import json
+import struct
+import zlib
+from typing import Any, Dict, Iterator, Tuple
+
+import numpy as np
+
+RAW_FOURCC = "RAWF"  # Pseudo-FOURCC that selects RawFrameWriter in video_encoder.open_video_writer
+RAW_EXTENSION = ".nbraw"
+RAW_COMPRESSIONS = ("none", "zlib")
+
+_MAGIC = b"NBFRAME1"
+_LENGTH = struct.Struct("<I")
+
+
+class RawFrameException(Exception):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+
+class RawFrameWriter:
+    """Writes frames of a fixed shape and dtype; has the ``write`` / ``release`` interface of ``cv2.VideoWriter``."""
+
+    def __init__(
+            self,
+            path: str,
+            fps: float,
+            frame_size: Tuple[int, int],
+            dtype: str = "uint8",
+            channels: int = 1,
+            compression: str = "none",
+            **metadata: Any,
+    ):
+        """
+        :param path: Output file.
+        :param fps: Nominal frame rate, for readers and converters.
+        :param frame_size: ``(width, height)`` of the frames.
+        :param dtype: Numpy dtype name of the frames.
+        :param channels: Values per pixel.
+        :param compression: ``"none"`` or ``"zlib"`` (lossless, level 1).
+        :param metadata: Extra JSON-serializable header fields (e.g. the Bayer pattern).
+        """
+        if compression not in RAW_COMPRESSIONS:
+            raise RawFrameException(f"Unknown compression '{compression}'; expected one of {RAW_COMPRESSIONS}")
+        self.header: Dict[str, Any] = dict(metadata)
+        self.header.update({
+            "width": int(frame_size[0]),
+            "height": int(frame_size[1]),
+            "channels": int(channels),
+            "dtype": np.dtype(dtype).name,
+            "fps": float(fps),
+            "compression": compression,
+        })
+        self.n_frames = 0
+        self._f = open(path, "wb")
+        header = json.dumps(self.header).encode("utf-8")
+        self._f.write(_MAGIC)
+        self._f.write(_LENGTH.pack(len(header)))
+        self._f.write(header)
+
+    def isOpened(self) -> bool:  # noqa: N802 — match cv2.VideoWriter
+        return not self._f.closed
+
+    def write(self, frame: np.ndarray) -> None:
+        payload = memoryview(np.ascontiguousarray(frame)).cast("B")
+        if self.header["compression"] == "zlib":
+            payload = zlib.compress(payload, 1)
+        self._f.write(_LENGTH.pack(len(payload)))
+        self._f.write(payload)
+        self.n_frames += 1
+
+    def release(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+
+class RawFrameReader:
+    """Iterates the frames of a file written by :class:`RawFrameWriter`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        if self._f.read(len(_MAGIC)) != _MAGIC:
+            self._f.close()
+            raise RawFrameException(f"{path} is not a raw frame file")
+        (n,) = _LENGTH.unpack(self._f.read(_LENGTH.size))
+        self.header: Dict[str, Any] = json.loads(self._f.read(n).decode("utf-8"))
+        h = self.header
+        self.shape = (h["height"], h["width"], h["channels"]) if h["channels"] > 1 else (h["height"], h["width"])
+        self.dtype = np.dtype(h["dtype"])
+        self.truncated = False
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        while True:
+            length = self._f.read(_LENGTH.size)
+            if not length:
+                return
+            payload = self._f.read(_LENGTH.unpack(length)[0]) if len(length) == _LENGTH.size else b""
+            if self.header["compression"] == "zlib":
+                try:
+                    payload = zlib.decompress(payload)
+                except zlib.error:
+                    payload = b""
+            if len(payload) != frame_bytes:  # Incomplete final frame, e.g. after a crash
+                self.truncated = True
+                return
+            yield np.frombuffer(payload, dtype=self.dtype).reshape(self.shape)
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "RawFrameReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
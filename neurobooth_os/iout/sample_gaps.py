@@ -0,0 +1,100 @@
+"""
+Live accounting of samples lost from a stream that stamps every sample with the device's own clock.
+
+The Mbient stamps each sample with a millisecond epoch, so a sample lost over BLE shows up as a step of more than one
+sample period between consecutive epochs. A :class:`GapCounter` sees every epoch as it is received, with a constant
+amount of work per sample: the step is counted into a histogram of sample periods, and each step of ``n`` periods
+counts ``n - 1`` missing samples. At the end of a task, :meth:`GapCounter.summary` reports how many samples arrived out
+of how many the device took, so dropouts are known without loading the recording.
+"""
+
+import math
+from bisect import bisect_right
+from typing import Any, Dict, Sequence
+
+# Buckets for the step between consecutive epochs, in sample periods: < 0.5 (early or repeated), about 1 (on time),
+# 2, 3-4, 5-10, 11-100 and > 100 periods (1 to 99+ samples missing).
+DELTA_PERIOD_EDGES = (0.5, 1.5, 2.5, 4.5, 10.5, 100.5)
+
+
+class GapCounter:
+    """Counts samples received, missing samples and epoch steps for a stream with a nominal sample rate."""
+
+    def __init__(
+            self,
+            rate_hz: float,
+            device_tick_sec: float = 1e-3,
+            max_gap_sec: float = 60.0,
+            edges: Sequence[float] = DELTA_PERIOD_EDGES,
+    ):
+        """
+        :param rate_hz: Nominal sample rate of the stream.
+        :param device_tick_sec: Length of one device clock tick in seconds (1e-3 for a millisecond epoch).
+        :param max_gap_sec: A step longer than this, or backwards, means the device clock was set again (e.g. after a
+            reconnect) rather than that samples were lost; it is counted as a discontinuity.
+        :param edges: Histogram bucket edges, in sample periods.
+        """
+        self.rate_hz = rate_hz
+        self.period_ticks = 1 / (rate_hz * device_tick_sec)
+        self.device_tick_sec = device_tick_sec
+        self.max_gap_ticks = max_gap_sec / device_tick_sec
+        self.edges = list(edges)
+        self.reset()
+
+    def reset(self) -> None:
+        """Start counting a new task."""
+        self.received = 0
+        self.missing = 0
+        self.gaps = 0
+        self.max_gap_periods = 0.0
+        self.discontinuities = 0
+        self.span_ticks = 0.0  # Device time covered by the steps that were counted
+        self.counts = [0] * (len(self.edges) + 1)
+        self._last = None
+
+    def add(self, device_ticks: float) -> int:
+        """Account for a sample stamped ``device_ticks``; returns how many samples are missing before it."""
+        self.received += 1
+        last, self._last = self._last, device_ticks
+        if last is None:
+            return 0
+        delta = device_ticks - last
+        if delta < 0 or delta > self.max_gap_ticks:
+            self.discontinuities += 1
+            return 0
+        self.span_ticks += delta
+        periods = delta / self.period_ticks
+        self.counts[bisect_right(self.edges, periods)] += 1
+        missing = int(periods + 0.5) - 1
+        if missing <= 0:
+            return 0
+        self.missing += missing
+        self.gaps += 1
+        if periods > self.max_gap_periods:
+            self.max_gap_periods = periods
+        return missing
+
+    @property
+    def expected(self) -> int:
+        return self.received + self.missing
+
+    @property
+    def loss_pct(self) -> float:
+        """Percentage of the samples the device took that never arrived; NaN before the first sample."""
+        return 100 * self.missing / self.expected if self.expected else math.nan
+
+    def summary(self) -> Dict[str, Any]:
+        """The counts for the task so far, as a JSON-serializable dictionary."""
+        span_sec = self.span_ticks * self.device_tick_sec
+        return {
+            'received': self.received,
+            'expected': self.expected,
+            'missing': self.missing,
+            'loss_pct': None if math.isnan(self.loss_pct) else round(self.loss_pct, 3),
+            'gaps': self.gaps,
+            'max_gap_ms': round(self.max_gap_periods * self.period_ticks * self.device_tick_sec * 1e3, 1),
+            'discontinuities': self.discontinuities,
+            'nominal_hz': self.rate_hz,
+            'effective_hz': round(sum(self.counts) / span_sec, 2) if span_sec > 0 else None,
+            'delta_periods': {'edges': self.edges, 'counts': list(self.counts)},
+        }
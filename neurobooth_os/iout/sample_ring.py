@@ -0,0 +1,109 @@
+"""
+Lock-free handoff of LSL samples from a device callback to a pusher thread.
+
+Some devices deliver samples on a native callback thread (the Mbient BLE stack calls back on every 100 Hz IMU
+sample), where every microsecond of Python work delays the next notification. A :class:`SampleRing` lets the callback
+copy the sample into a preallocated NumPy row and return; a :class:`RingPusher` thread hands everything waiting to
+LSL with one ``push_chunk`` per interval, with each sample's own timestamp, so the recorded times are unchanged.
+
+The ring has exactly one producer (the callback) and one consumer (the pusher). Each side only advances its own
+counter, and the producer publishes a row by advancing its counter after the row is written, so no lock is needed.
+When the pusher falls a whole ring behind, new samples are dropped and counted rather than overwriting unsent ones.
+"""
+
+import threading
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+# push_chunk(samples, timestamps): samples is a C-contiguous (n, channels) float64 view into the ring, valid only for
+# the duration of the call; timestamps is a list of the samples' LSL times.
+PushChunk = Callable[[np.ndarray, List[float]], None]
+
+
+class SampleRing:
+    """Fixed-capacity single-producer/single-consumer ring of float64 samples and their LSL timestamps."""
+
+    def __init__(self, capacity: int, n_channels: int):
+        """
+        :param capacity: Number of samples the ring holds.
+        :param n_channels: Values per sample.
+        """
+        self.capacity = capacity
+        self.data = np.zeros((capacity, n_channels), dtype=np.float64)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self._written = 0  # Advanced only by the producer
+        self._read = 0  # Advanced only by the consumer
+        self.dropped = 0
+
+    def put(self, sample: Sequence[float], timestamp: float) -> bool:
+        """Copy a sample into the ring (producer side). Returns False, and counts a drop, if the ring is full."""
+        if self._written - self._read >= self.capacity:
+            self.dropped += 1
+            return False
+        i = self._written % self.capacity
+        self.data[i] = sample
+        self.timestamps[i] = timestamp
+        self._written += 1  # Publish the row
+        return True
+
+    def pending(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Views of the samples not yet consumed, oldest first, as at most two contiguous ``(data, timestamps)`` blocks
+        (two when they wrap around the end of the ring). Consumer side; call :meth:`consume` once they are handled.
+        """
+        start, end = self._read, self._written
+        if start == end:
+            return []
+        i, j = start % self.capacity, end % self.capacity
+        if i < j:
+            return [(self.data[i:j], self.timestamps[i:j])]
+        blocks = [(self.data[i:], self.timestamps[i:])]
+        if j:
+            blocks.append((self.data[:j], self.timestamps[:j]))
+        return blocks
+
+    def consume(self, n: int) -> None:
+        """Free the ``n`` oldest samples for reuse (consumer side)."""
+        self._read += n
+
+    def __len__(self) -> int:
+        return self._written - self._read
+
+
+class RingPusher(threading.Thread):
+    """Drains a :class:`SampleRing` into LSL every ``interval_sec`` with one ``push_chunk`` per contiguous block."""
+
+    def __init__(self, ring: SampleRing, push_chunk: PushChunk, interval_sec: float = 0.02, name: str = "ring_pusher"):
+        """
+        :param ring: The ring to drain.
+        :param push_chunk: Called with each block of samples and their timestamps.
+        :param interval_sec: How often to drain; bounds how late a sample reaches LSL.
+        :param name: Thread name.
+        """
+        super().__init__(name=name, daemon=True)
+        self.ring = ring
+        self._push_chunk = push_chunk
+        self.interval_sec = interval_sec
+        self.n_chunks = 0
+        self.n_samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval_sec):
+            self.drain()
+        self.drain()
+
+    def drain(self) -> None:
+        """Push everything waiting in the ring."""
+        for data, timestamps in self.ring.pending():
+            self._push_chunk(data, timestamps.tolist())
+            self.ring.consume(len(timestamps))
+            self.n_chunks += 1
+            self.n_samples += len(timestamps)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Push what is waiting and end the thread."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
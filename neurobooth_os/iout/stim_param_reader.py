@@ -2,7 +2,7 @@ from os import environ, path
 
 from pydantic import BaseModel, ConfigDict, NonNegativeFloat, NonNegativeInt, Field, PositiveInt, PositiveFloat, \
     SerializeAsAny
-from typing import TYPE_CHECKING, Optional, List, Callable, Tuple, Dict, Type
+from typing import TYPE_CHECKING, Optional, List, Callable, Tuple, Dict, Type, Literal
 import os
 import yaml
 
@@ -175,6 +175,9 @@ class MicYetiDeviceArgs(DeviceArgs):
     # Attributes required for program execution
     microphone_name: str
     sensor_array: List[MicYetiSensorArgs] = []
+    # "read" is the blocking-read loop on a thread of our own. "callback" (opt-in) has PortAudio hand each chunk to
+    # MicStream._on_audio, stamps it from the ADC time and reports input overflows
+    capture_mode: Literal["callback", "read"] = "read"
 
     def __init__(self, **kwargs):
 
@@ -303,7 +306,31 @@ class MockIPhoneDeviceArgs(IPhoneDeviceArgs):
         return MockIPhone
 
 
-class FlirDeviceArgs(DeviceArgs):
+class CameraDeviceArgs(DeviceArgs):
+    """
+    Arguments shared by the video cameras (FLIR, Intel and webcam)
+    """
+
+    # Frames buffered between capture and encoding, and what to do when the buffer is full
+    # (see iout/frame_ring.py). Cameras with larger frames override the default.
+    frame_buffer_frames: PositiveInt = 64
+    frame_buffer_policy: Literal["block", "drop_newest"] = "block"
+    # Video encoding in a save thread or a separate encoder process (see iout/video_encoder.py), and the encoder
+    # process's OpenCV thread count (None = OpenCV default; ignored by the thread backend)
+    encoder_backend: Literal["thread", "process"] = "thread"
+    encoder_threads: Optional[PositiveInt] = None
+    # Announce frames on LSL in chunks of up to lsl_batch_samples, each chunk pushed no later than
+    # lsl_batch_latency_ms after its oldest frame (see iout/lsl_batch.py). 1 pushes every frame as it is recorded.
+    lsl_batch_samples: PositiveInt = 1
+    lsl_batch_latency_ms: PositiveFloat = 20.0
+    # Adaptive degradation under CPU pressure (see iout/degrade.py): cameras with a lower degrade_priority shed work
+    # first; None never degrades this camera. Degraded video files are encoded at degrade_resize_factor of the
+    # capture size.
+    degrade_priority: Optional[int] = None
+    degrade_resize_factor: float = Field(0.5, gt=0, le=1)
+
+
+class FlirDeviceArgs(CameraDeviceArgs):
     """
     FLIR device arguments
     The FLIR should have only one sensor, represented by an instance
@@ -313,6 +340,25 @@ class FlirDeviceArgs(DeviceArgs):
     # Attributes required for program execution
     sensor_array: List[FlirSensorArgs] = []
 
+    # 128 frames of 1024x768 BGR is ~300 MB
+    frame_buffer_frames: PositiveInt = 128
+    fourcc: str = "MJPG"  # Video codec to use
+    # "bgr" demosaics and resizes in the capture loop and writes <name>_flir.avi. "bayer" records the raw sensor
+    # mosaic to <name>_flir.bayer, optionally zlib-compressed, for offline conversion (see iout/bayer_file.py).
+    capture_format: Literal["bgr", "bayer"] = "bgr"
+    bayer_compression: Literal["none", "zlib"] = "none"
+    # Keep the camera streaming between tasks and only rotate the video file at task boundaries, instead of
+    # BeginAcquisition/EndAcquisition per task
+    continuous_acquisition: bool = False
+    # Latch the camera clock against the LSL clock this often, and fit offset/drift over this many recent latches
+    # (see iout/clock_mapper.py)
+    clock_latch_interval_sec: PositiveFloat = 1.0
+    clock_fit_window: PositiveInt = 60
+    # Keep one in this many frames for operator previews, served while no older than preview_max_age_sec
+    # (see iout/preview_slot.py)
+    preview_every_n_frames: PositiveInt = 10
+    preview_max_age_sec: PositiveFloat = 2.0
+
     def __init__(self, **kwargs):
         # pull-in environment specific param "device_sn", updating the kwargs with the appropriate value
         my_id = kwargs.get('device_id')
@@ -362,12 +408,20 @@ class MockFlirDeviceArgs(FlirDeviceArgs):
         return MockVidRec_Flir
 
 
-class IntelDeviceArgs(DeviceArgs):
+class IntelDeviceArgs(CameraDeviceArgs):
 
     # Attributes required for program execution
     sensor_array: List[IntelSensorArgs] = []
     auto_exposure_priority: NonNegativeFloat
 
+    # "bag": the pipeline records <name>_intel<N>.bag itself and is restarted for every task. "frames": the pipeline
+    # runs from the first task until close and frames are written by a video encoder (see iout/video_encoder.py):
+    # color to <name>_intel<N>.avi, depth to <name>_intel<N>_depth.nbraw (see iout/raw_frame_file.py), so switching
+    # files at a task boundary needs no pipeline restart.
+    recording_backend: Literal["bag", "frames"] = "bag"
+    fourcc: str = "MJPG"
+    depth_compression: Literal["none", "zlib"] = "zlib"
+
     def sample_rate(self):
         """
         Returns a tuple containing the fps value from each sensor
@@ -425,7 +479,7 @@ class MockIntelDeviceArgs(IntelDeviceArgs):
         return MockVidRec_Intel
 
 
-class WebcamDeviceArgs(DeviceArgs):
+class WebcamDeviceArgs(CameraDeviceArgs):
     """
     Webcam device arguments
     The webcam should be only one sensor, represented by an instance of type StandardSensorArgs
@@ -437,6 +491,13 @@ class WebcamDeviceArgs(DeviceArgs):
     n_frames_to_flush: int  # Number of frames to discard before recording
     sensor_array: List[StandardSensorArgs] = []
 
+    # Fewer frames than the base default: 32 frames of 1920x1080 BGR is ~200 MB
+    frame_buffer_frames: PositiveInt = 32
+    # Keep one in this many frames for operator previews, served while no older than preview_max_age_sec
+    # (see iout/preview_slot.py)
+    preview_every_n_frames: PositiveInt = 10
+    preview_max_age_sec: PositiveFloat = 2.0
+
     def __init__(self, **kwargs):
         # pull-in environment specific param "camera_idx", updating the kwargs with the appropriate value
         my_id = kwargs.get('device_id')
@@ -459,11 +520,43 @@ class WebcamDeviceArgs(DeviceArgs):
         return VidRec_Webcam
 
 
+class MockWebcamDeviceArgs(WebcamDeviceArgs):
+    """DeviceArgs for :class:`MockVidRec_Webcam` — same fields, different device class."""
+
+    @classmethod
+    def device_class(cls) -> Type["Device"]:
+        from neurobooth_os.iout.mock.mock_webcam import MockVidRec_Webcam
+        return MockVidRec_Webcam
+
+
 class MbientDeviceArgs(DeviceArgs):
 
     # Attributes required for program execution
     sensor_array: List[MbientSensorArgs] = []
     mac: str
+    # The BLE callback copies each sample into a ring and a pusher thread sends what is waiting to LSL every
+    # lsl_push_interval_ms (see iout/sample_ring.py). 0 pushes each sample from the BLE callback.
+    lsl_push_interval_ms: NonNegativeFloat = 20.0
+    lsl_ring_samples: PositiveInt = 1024
+    # Requested BLE connection parameters (see Mbient.ConnectionParameters); the host adapter may negotiate others.
+    # extras/perf/mbient_ble_profile.py sweeps these and the sensor ODRs for a booth's number of devices.
+    conn_min_interval_ms: PositiveFloat = 7.5
+    conn_max_interval_ms: PositiveFloat = 7.5
+    conn_latency: NonNegativeInt = 0
+    conn_timeout_ms: PositiveInt = 6000
+    # True fuses each accelerometer/gyroscope pair on the device into one BLE notification. False subscribes to
+    # both sensors and pairs each gyroscope sample with the latest accelerometer sample on the host, which takes
+    # twice the notifications per sample.
+    sensor_fusion: bool = True
+    # Stamp samples on LSL from their device epoch, mapped onto the LSL clock by a lower-envelope fit of receive time
+    # over the last clock_fit_window bins of clock_bin_sec each (see iout/clock_mapper.py). False stamps each sample
+    # with its BLE receive time.
+    clock_correction: bool = True
+    clock_bin_sec: PositiveFloat = 1.0
+    clock_fit_window: PositiveInt = 60
+    # Warn the operator when a task loses more than this percentage of its samples, going by the steps in the device
+    # epoch (see iout/sample_gaps.py)
+    loss_alert_pct: NonNegativeFloat = 1.0
 
     def __init__(self, **kwargs):
         # pull-in environment specific param "mac", updating the kwargs with the appropriate value
@@ -774,3 +867,4 @@ register_mock(EyelinkDeviceArgs, MockEyelinkDeviceArgs)
 register_mock(MicYetiDeviceArgs, MockMicYetiDeviceArgs)
 register_mock(FlirDeviceArgs, MockFlirDeviceArgs)
 register_mock(IntelDeviceArgs, MockIntelDeviceArgs)
+register_mock(WebcamDeviceArgs, MockWebcamDeviceArgs)
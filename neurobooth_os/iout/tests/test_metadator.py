@@ -67,3 +67,53 @@ def test_prefix_boundary():
             "msg.messages_evil.py::Exploit()",
             allowed_modules=meta._ALLOWED_MESSAGE_MODULES,
         )
+
+
+# ---------------------------------------------------------------------------
+# Memoization and warm-up
+# ---------------------------------------------------------------------------
+
+def test_resolution_is_cached():
+    """Repeat lookups hit the cache instead of re-importing."""
+    meta.clear_fileid_cache()
+    meta.str_fileid_to_eval(
+        "msg.messages.py::PrepareRequest()",
+        allowed_modules=meta._ALLOWED_MESSAGE_MODULES,
+    )
+    meta.str_fileid_to_eval(
+        "msg.messages.py::PrepareRequest()",
+        allowed_modules=meta._ALLOWED_MESSAGE_MODULES,
+    )
+    info = meta._resolve_fileid.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+
+def test_cache_keyed_on_allowlist():
+    """A cached resolution must not bypass a stricter allowlist."""
+    meta.clear_fileid_cache()
+    meta.str_fileid_to_eval("iout.stim_param_reader.py::DeviceArgs()")
+    with pytest.raises(ValueError, match="not in the allowed import list"):
+        meta.str_fileid_to_eval(
+            "iout.stim_param_reader.py::DeviceArgs()",
+            allowed_modules=meta._ALLOWED_MESSAGE_MODULES,
+        )
+
+
+def test_plain_set_allowlist_accepted():
+    """A mutable set allowlist is normalized rather than failing to hash."""
+    from neurobooth_os.msg.messages import PrepareRequest
+    result = meta.str_fileid_to_eval(
+        "msg.messages.py::PrepareRequest()",
+        allowed_modules={"msg.messages"},
+    )
+    assert result is PrepareRequest
+
+
+def test_warm_cache_resolves_message_bodies():
+    """Warm-up without task args pre-resolves every message body type."""
+    meta.clear_fileid_cache()
+    resolved = meta.warm_fileid_cache()
+    assert resolved == len(meta._message_body_fileids())
+    assert "msg.messages.py::FramePreviewReply()" in meta._message_body_fileids()
+    assert meta._resolve_fileid.cache_info().currsize == resolved
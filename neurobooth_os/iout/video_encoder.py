@@ -0,0 +1,528 @@
+"""
+Video encoding back-ends for the frame-based camera recorders (FLIR, webcam).
+
+A recorder's capture loop hands each frame to a :class:`VideoEncoder` with ``put`` and never touches the video file
+itself. Two back-ends implement the same interface:
+
+- ``"thread"`` (:class:`ThreadEncoder`): a :class:`~neurobooth_os.iout.frame_ring.FrameRing` drained by a save
+  thread that owns the ``cv2.VideoWriter``, in the recorder's process. Simple, but encoding competes with capture and
+  LSL pushes for the GIL and CPU.
+- ``"process"`` (:class:`EncoderProcess`): a dedicated encoder process owns the ``cv2.VideoWriter``. Frames are
+  copied into ``multiprocessing.shared_memory`` slots and only slot indices cross the process boundary. The process
+  is started on first use and reused for every task until :meth:`VideoEncoder.shutdown`, or replaced if it does not
+  finish a file within ``close_file``'s timeout.
+
+Both keep memory bounded and apply the same full-buffer policies as ``FrameRing`` (``"block"`` or
+``"drop_newest"``), and both report the same per-file statistics from ``close_file``.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from neurobooth_os.iout.frame_ring import FRAME_RING_POLICIES, FrameRing
+
+ENCODER_BACKENDS = ("thread", "process")
+
+FrameSize = Tuple[int, int]  # (width, height), as cv2.VideoWriter takes it
+
+
+class VideoEncoderException(Exception):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+
+def open_video_writer(path: str, fourcc: str, fps: float, frame_size: FrameSize, **options):
+    """
+    Default writer factory: a ``cv2.VideoWriter``, or a raw frame file for the ``BAYER_FOURCC`` (``bayer_file.py``)
+    and ``RAW_FOURCC`` (``raw_frame_file.py``) pseudo-codecs. Anything with ``write(frame)`` and ``release()`` will do.
+    """
+    from neurobooth_os.iout.bayer_file import BAYER_FOURCC, BayerWriter
+    from neurobooth_os.iout.raw_frame_file import RAW_FOURCC, RawFrameWriter
+    if fourcc == BAYER_FOURCC:
+        return BayerWriter(path, fps, frame_size, **options)
+    if fourcc == RAW_FOURCC:
+        return RawFrameWriter(path, fps, frame_size, **options)
+    import cv2
+    return cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, frame_size)
+
+
+def _frame_shape(frame_size: FrameSize, channels: int) -> Tuple[int, ...]:
+    width, height = frame_size
+    return (height, width, channels) if channels > 1 else (height, width)
+
+
+class VideoEncoder(ABC):
+    """Common interface and per-file statistics of the encoder back-ends."""
+
+    backend = ""
+
+    def __init__(
+            self,
+            capacity: int,
+            policy: str = "block",
+            threads: Optional[int] = None,
+            writer_factory: Callable[..., Any] = open_video_writer,
+            name: str = "video_encoder",
+    ):
+        """
+        :param capacity: Number of frames that can wait to be encoded.
+        :param policy: What ``put`` does when every slot is in use; one of ``FRAME_RING_POLICIES``.
+        :param threads: OpenCV worker threads for encoding (``cv2.setNumThreads``). Only applied by back-ends that
+            own their process; None leaves OpenCV's default.
+        :param writer_factory: ``(path, fourcc, fps, frame_size) -> writer``. Must be picklable for the process
+            back-end.
+        :param name: Thread/process name, for logs and debuggers.
+        """
+        if policy not in FRAME_RING_POLICIES:
+            raise ValueError(f"Unknown encoder policy '{policy}'; expected one of {FRAME_RING_POLICIES}")
+        self.capacity = capacity
+        self.policy = policy
+        self.threads = threads
+        self.writer_factory = writer_factory
+        self.name = name
+        # Imported here rather than at module level so the encoder process, which imports this module, does not pull
+        # in log_manager and its database dependencies.
+        from neurobooth_os.log_manager import APP_LOG_NAME
+        self.logger = logging.getLogger(APP_LOG_NAME)
+
+    @abstractmethod
+    def open(
+            self,
+            path: str,
+            fourcc: str,
+            fps: float,
+            frame_size: FrameSize,
+            channels: int = 3,
+            writer_options: Optional[Dict[str, Any]] = None,
+            dtype: str = "uint8",
+    ) -> None:
+        """
+        Start a new video file.
+
+        :param channels: Frames passed to ``put`` have shape ``(height, width, channels)``, or ``(height, width)``
+            for a single channel (e.g. raw Bayer).
+        :param writer_options: Extra keyword arguments for the writer factory.
+        :param dtype: Frame dtype (e.g. ``"uint16"`` for depth frames written with ``RAW_FOURCC``).
+        """
+        ...
+
+    @abstractmethod
+    def put(self, frame: np.ndarray, meta: Any = None, timeout: float = 1.0) -> bool:
+        """Queue a frame for encoding. Returns False if the frame was dropped (see ``policy``)."""
+        ...
+
+    @abstractmethod
+    def depth(self) -> int:
+        """Number of frames waiting to be encoded."""
+        ...
+
+    @abstractmethod
+    def load(self) -> Tuple[float, Optional[float]]:
+        """
+        Fraction of the buffer in use and the recent encode time per frame in ms (None if not known) of the open
+        file. Unlike ``depth``, safe to call from a thread other than the one calling ``put`` (see ``degrade.py``).
+        """
+        ...
+
+    @abstractmethod
+    def close_file(self, timeout: Optional[float] = 60) -> Dict[str, Any]:
+        """Encode every queued frame, release the video file and return its statistics."""
+        ...
+
+    def shutdown(self) -> None:
+        """Release any thread or process kept alive between files."""
+        pass
+
+
+class ThreadEncoder(VideoEncoder):
+    """In-process back-end: a FrameRing drained by a save thread that owns the writer."""
+
+    backend = "thread"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ring: Optional[FrameRing] = None
+        self._thread: Optional[threading.Thread] = None
+        self._reset_counts()
+
+    def _reset_counts(self) -> None:
+        self._n_written = 0
+        self._encode_total_ms = 0.0
+        self._encode_max_ms = 0.0
+        self._encode_ms_recent: Optional[float] = None  # Exponential moving average
+        self._write_errors = 0
+
+    def open(self, path, fourcc, fps, frame_size, channels=3, writer_options=None, dtype="uint8") -> None:
+        if self._thread is not None and self._thread.is_alive():
+            # A second save thread would drain the same ring, splitting and reordering the frames between two files
+            raise VideoEncoderException(f'{self.name}: The save thread is still writing the previous file')
+        shape = _frame_shape(frame_size, channels)
+        if self.ring is None or self.ring.frame_shape != shape or self.ring.dtype != np.dtype(dtype):
+            self.ring = FrameRing(self.capacity, shape, dtype=dtype, policy=self.policy)
+        else:
+            self.ring.reset()
+        self._reset_counts()
+        try:
+            writer = self.writer_factory(path, fourcc, fps, frame_size, **(writer_options or {}))
+        except Exception as e:
+            raise VideoEncoderException(f'{self.name}: Unable to open {path}: {type(e).__name__}: {e}') from e
+        self._thread = threading.Thread(target=self._drain, args=(self.ring, writer), name=self.name, daemon=True)
+        self._thread.start()
+
+    def _drain(self, ring: FrameRing, writer: Any) -> None:
+        """Write frames until the ring is closed and empty, then release the writer (so a late finish still does)."""
+        while True:
+            item = ring.get(timeout=1)
+            if item is None:
+                if ring.closed:
+                    break
+                continue
+            slot, frame, _ = item
+            t0 = time.perf_counter()
+            try:
+                writer.write(frame)
+            except Exception as e:
+                self._write_errors += 1
+                if self._write_errors == 1:  # The count is in the close_file stats; don't log every frame
+                    self.logger.error(f'{self.name}: Frame write failed: {e}')
+            elapsed_ms = (time.perf_counter() - t0) * 1e3
+            self._n_written += 1
+            self._encode_total_ms += elapsed_ms
+            self._encode_max_ms = max(self._encode_max_ms, elapsed_ms)
+            recent = self._encode_ms_recent
+            self._encode_ms_recent = elapsed_ms if recent is None else recent + 0.1 * (elapsed_ms - recent)
+            ring.release(slot)
+        try:
+            writer.release()
+        except Exception as e:
+            self._write_errors += 1
+            self.logger.error(f'{self.name}: Unable to release the video file: {e}')
+
+    def put(self, frame: np.ndarray, meta: Any = None, timeout: float = 1.0) -> bool:
+        return self.ring.put(frame, meta, timeout)
+
+    def depth(self) -> int:
+        return self.ring.depth()
+
+    def load(self) -> Tuple[float, Optional[float]]:
+        if self.ring is None:
+            return 0.0, None
+        return self.ring.depth() / self.capacity, self._encode_ms_recent
+
+    def close_file(self, timeout: Optional[float] = 60) -> Dict[str, Any]:
+        self.ring.close()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self.logger.error(
+                f'{self.name}: Save thread did not finish within {timeout} s; the file is released when it does, '
+                'and no new file can be opened until then'
+            )
+        stats = self.ring.stats()
+        stats.update(_encode_stats(self._n_written, self._encode_total_ms, self._encode_max_ms, self._write_errors))
+        stats["backend"] = self.backend
+        return stats
+
+
+def _encode_stats(n: int, total_ms: float, max_ms: float, errors: int) -> Dict[str, Any]:
+    return {
+        "frames_written": n,
+        "encode_ms_mean": round(total_ms / n, 3) if n else None,
+        "encode_ms_max": round(max_ms, 3) if n else None,
+        "write_errors": errors,
+    }
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == "posix":
+        # The creating (parent) process owns the segment. Without this, the child's resource tracker would unlink it
+        # (with a leak warning) when the child exits. Not needed on Windows, which has no resource tracker.
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")  # noqa: SLF001
+    return shm
+
+
+def _encoder_main(frame_q, done_q, writer_factory, threads: Optional[int]) -> None:
+    """
+    Encoder process entry point.
+
+    Messages on ``frame_q`` are either a slot index (encode that slot, then return the index on ``done_q``) or a
+    command tuple: ``("open", path, fourcc, fps, frame_size, frame_shape, dtype, writer_options, shm_name, capacity)``,
+    ``("close",)`` or ``("exit",)``.
+    ``open`` and ``close`` are acknowledged on ``done_q`` with ``("opened", error_or_None)`` and
+    ``("closed", stats)``.
+    """
+    if threads is not None:
+        try:
+            import cv2
+            cv2.setNumThreads(threads)
+        except ImportError:
+            pass
+
+    shm: Optional[shared_memory.SharedMemory] = None
+    frames: Optional[np.ndarray] = None
+    writer = None
+    n, total_ms, max_ms, errors = 0, 0.0, 0.0, 0
+    last_error: Optional[str] = None
+    while True:
+        msg = frame_q.get()
+        if isinstance(msg, int):
+            t0 = time.perf_counter()
+            try:
+                writer.write(frames[msg])
+            except Exception as e:
+                errors += 1
+                last_error = f"{type(e).__name__}: {e}"
+            elapsed_ms = (time.perf_counter() - t0) * 1e3
+            n += 1
+            total_ms += elapsed_ms
+            max_ms = max(max_ms, elapsed_ms)
+            done_q.put(msg)
+            continue
+
+        command = msg[0]
+        if command == "open":
+            _, path, fourcc, fps, frame_size, frame_shape, dtype, writer_options, shm_name, capacity = msg
+            try:
+                if shm is None or shm.name != shm_name:
+                    frames = None
+                    if shm is not None:
+                        shm.close()
+                    shm = _attach_shared_memory(shm_name)
+                frames = np.ndarray((capacity,) + frame_shape, dtype=dtype, buffer=shm.buf)
+                writer = writer_factory(path, fourcc, fps, frame_size, **(writer_options or {}))
+                n, total_ms, max_ms, errors, last_error = 0, 0.0, 0.0, 0, None
+                done_q.put(("opened", None))
+            except Exception as e:
+                done_q.put(("opened", f"{type(e).__name__}: {e}"))
+        elif command == "close":
+            if writer is not None:
+                try:
+                    writer.release()
+                except Exception as e:
+                    last_error = f"{type(e).__name__}: {e}"
+                writer = None
+            stats = _encode_stats(n, total_ms, max_ms, errors)
+            stats["last_error"] = last_error
+            done_q.put(("closed", stats))
+        elif command == "exit":
+            break
+
+    frames = None
+    if shm is not None:
+        shm.close()
+
+
+class EncoderProcess(VideoEncoder):
+    """Out-of-process back-end: frames go through shared-memory slots to a process that owns the writer."""
+
+    backend = "process"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # spawn everywhere, as on the Windows booths; forking a process that holds camera SDK handles is unsafe.
+        self._ctx = mp.get_context("spawn")
+        self._process = None
+        self._frame_q = None
+        self._done_q = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._frames: Optional[np.ndarray] = None
+        self.frame_shape: Optional[Tuple[int, ...]] = None
+        self.dtype: Optional[np.dtype] = None
+        self._free: Deque[int] = deque()
+        self._replies: List[Tuple[str, Any]] = []
+        self._reset_counts()
+
+    def _reset_counts(self) -> None:
+        self.n_put = 0
+        self.n_dropped = 0
+        self.max_depth = 0
+        self.blocked_sec = 0.0
+        self._last_depth = 0  # Depth when slots were last reclaimed; read by load() from other threads
+
+    def _ensure_started(self) -> None:
+        if self._process is not None and self._process.is_alive():
+            return
+        self._frame_q = self._ctx.Queue()
+        self._done_q = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_encoder_main,
+            args=(self._frame_q, self._done_q, self.writer_factory, self.threads),
+            name=self.name,
+            daemon=True,
+        )
+        self._process.start()
+
+    def open(
+            self, path, fourcc, fps, frame_size, channels=3, writer_options=None, dtype="uint8", timeout: float = 60,
+    ) -> None:
+        self._ensure_started()
+        shape = _frame_shape(frame_size, channels)
+        dtype = np.dtype(dtype)
+        old_shm = None
+        if self._shm is None or self.frame_shape != shape or self.dtype != dtype:
+            old_shm, self._frames = self._shm, None
+            size = self.capacity * int(np.prod(shape)) * dtype.itemsize
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._frames = np.ndarray((self.capacity,) + shape, dtype=dtype, buffer=self._shm.buf)
+            self._frames.fill(0)  # Touch every page now rather than on first use during capture
+            self.frame_shape = shape
+            self.dtype = dtype
+        self._free = deque(range(self.capacity))
+        self._reset_counts()
+
+        self._frame_q.put((
+            "open", path, fourcc, float(fps), tuple(frame_size), shape, dtype.name, writer_options, self._shm.name,
+            self.capacity,
+        ))
+        error = self._await("opened", timeout)
+        if old_shm is not None:
+            old_shm.close()
+            old_shm.unlink()
+        if error is not None:
+            raise VideoEncoderException(f'{self.name}: Unable to open {path}: {error}')
+
+    def _on_reply(self, msg) -> None:
+        if isinstance(msg, int):
+            self._free.append(msg)
+        else:
+            self._replies.append(msg)
+
+    def _reclaim(self, timeout: Optional[float] = None) -> None:
+        """Collect slots the encoder has finished with; with a timeout, wait that long for the first one."""
+        try:
+            msg = self._done_q.get(timeout=timeout) if timeout else self._done_q.get_nowait()
+            while True:
+                self._on_reply(msg)
+                msg = self._done_q.get_nowait()
+        except queue.Empty:
+            pass
+        self._last_depth = self.capacity - len(self._free)
+
+    def _await(self, kind: str, timeout: float) -> Any:
+        deadline = time.monotonic() + timeout
+        while True:
+            for i, (reply_kind, payload) in enumerate(self._replies):
+                if reply_kind == kind:
+                    del self._replies[i]
+                    return payload
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise VideoEncoderException(f'{self.name}: No "{kind}" reply from the encoder process')
+            if not self._process.is_alive():
+                raise VideoEncoderException(
+                    f'{self.name}: Encoder process exited (code {self._process.exitcode}) while waiting for "{kind}"'
+                )
+            self._reclaim(timeout=min(remaining, 0.5))
+
+    def put(self, frame: np.ndarray, meta: Any = None, timeout: float = 1.0) -> bool:
+        if not self._free:
+            self._reclaim()
+        if not self._free and self.policy == "block":
+            t0 = time.monotonic()
+            self._reclaim(timeout=timeout)
+            self.blocked_sec += time.monotonic() - t0
+        if not self._free:
+            self.n_dropped += 1
+            return False
+
+        slot = self._free.popleft()
+        np.copyto(self._frames[slot], frame)
+        self._frame_q.put(slot)
+        self.n_put += 1
+        in_flight = self.capacity - len(self._free)
+        if in_flight > self.max_depth:
+            self.max_depth = in_flight
+        return True
+
+    def depth(self) -> int:
+        self._reclaim()
+        return self.capacity - len(self._free)
+
+    def load(self) -> Tuple[float, Optional[float]]:
+        # Slots are reclaimed only when put() runs out or depth() is called, so this lags by up to one buffer's worth
+        # of frames. Encode times are only reported by close_file.
+        return self._last_depth / self.capacity, None
+
+    def close_file(self, timeout: Optional[float] = 60) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "backend": self.backend,
+            "capacity": self.capacity,
+            "policy": self.policy,
+            "frames_queued": self.n_put,
+            "frames_dropped": self.n_dropped,
+            "max_depth": self.max_depth,
+            "blocked_sec": round(self.blocked_sec, 3),
+            "buffer_mb": round(self._shm.size / 2 ** 20, 1) if self._shm is not None else None,
+        }
+        self._frame_q.put(("close",))
+        try:
+            stats.update(self._await("closed", timeout if timeout is not None else float("inf")))
+        except VideoEncoderException as e:
+            # The process may still be reading queued slots, which the next open() would hand back to put()
+            self.logger.error(f'{e}; stopping the encoder process, the next file starts a new one')
+            stats["last_error"] = str(e)
+            self._terminate()
+            return stats
+        self._reclaim()
+        return stats
+
+    def _terminate(self) -> None:
+        """Kill the encoder process without waiting for it to finish; ``open`` then starts a new one."""
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(1)
+        self._process = None
+        self._replies = []
+
+    def shutdown(self, timeout: float = 10) -> None:
+        if self._process is not None:
+            if self._process.is_alive():
+                self._frame_q.put(("exit",))
+                self._process.join(timeout)
+            if self._process.is_alive():
+                self.logger.error(f'{self.name}: Encoder process did not exit; terminating it')
+                self._process.terminate()
+                self._process.join(1)
+            self._process = None
+        if self._shm is not None:
+            self._frames = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+            self.frame_shape = None
+            self.dtype = None
+
+
+def count_encoder_stats(hot_log, stats: Dict[str, Any], prefix: str = "encoder") -> None:
+    """Fold the statistics returned by ``close_file`` into a device's per-task HOTPATH SUMMARY."""
+    for key in ("frames_written", "frames_dropped", "max_depth", "write_errors"):
+        hot_log.count(f"{prefix}_{key}", stats.get(key) or 0)
+    for key in ("blocked_sec", "encode_ms_mean", "encode_ms_max"):
+        if stats.get(key) is not None:
+            hot_log.observe(f"{prefix}_{key}", stats[key])
+
+
+def make_video_encoder(
+        backend: str,
+        capacity: int,
+        policy: str = "block",
+        threads: Optional[int] = None,
+        name: str = "video_encoder",
+) -> VideoEncoder:
+    """Create the encoder back-end named in a device's YAML (``encoder_backend``)."""
+    if backend == "thread":
+        return ThreadEncoder(capacity, policy, threads, name=name)
+    if backend == "process":
+        return EncoderProcess(capacity, policy, threads, name=name)
+    raise ValueError(f"Unknown encoder backend '{backend}'; expected one of {ENCODER_BACKENDS}")
@@ -1,22 +1,28 @@
 import os.path as op
 import threading
-import queue
 import logging
-from typing import List, Optional, ByteString
-from timeit import default_timer as timer
+from typing import Dict, List, Optional, ByteString, Tuple
 
 import cv2
-from pylsl import StreamInfo, StreamOutlet
+from pylsl import StreamInfo, StreamOutlet, local_clock
 
+from neurobooth_os.iout.lsl_batch import SampleBatcher
 from neurobooth_os.iout.stream_utils import DataVersion, set_stream_description
 import neurobooth_os.iout.metadator as meta
+from neurobooth_os.iout.degrade import DEGRADE_STEPS, encoder_load, resize_for_encoding, scaled_frame_size
 from neurobooth_os.iout.device import Device, DeviceCapability, DeviceState
+from neurobooth_os.iout.preview_slot import PreviewSlot, encode_jpeg
 from neurobooth_os.iout.stim_param_reader import WebcamDeviceArgs
+from neurobooth_os.iout.video_encoder import count_encoder_stats, make_video_encoder
 
 from neurobooth_os.log_manager import APP_LOG_NAME
 from neurobooth_os.msg.messages import DeviceInitialization, Request
 
 
+# Bucket edges (ms) of the per-frame grab, decode and frame-interval histograms in the task summary
+LATENCY_EDGES_MS = (1, 2, 4, 8, 16, 33, 66, 133)
+
+
 class WebcamException(Exception):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -28,6 +34,7 @@ class VidRec_Webcam(Device):
         DeviceCapability.RECORD
         | DeviceCapability.RECORD_PER_TASK
         | DeviceCapability.CAMERA_PREVIEW
+        | DeviceCapability.DEGRADABLE
     )
 
     def __init__(
@@ -41,12 +48,21 @@ class VidRec_Webcam(Device):
 
         self.camera: Optional[cv2.VideoCapture] = None
         self.video_filename: str = ''
+        self.frame_size: Tuple[int, int] = (0, 0)  # (width, height) of the open video file
         self.video_thread: Optional[threading.Thread] = None
-        self.save_thread: Optional[threading.Thread] = None
-        self.video_out: Optional[cv2.VideoWriter] = None
+        self.video_encoder = make_video_encoder(
+            device_args.encoder_backend,
+            device_args.frame_buffer_frames,
+            device_args.frame_buffer_policy,
+            device_args.encoder_threads,
+            name=f'{self.device_id}_encoder',
+        )
+        self.preview = PreviewSlot(device_args.preview_every_n_frames, device_args.preview_max_age_sec)
+        self.lsl_batch = SampleBatcher(
+            self._push_chunk, device_args.lsl_batch_samples, device_args.lsl_batch_latency_ms / 1e3,
+        )
 
         self.frame_counter: int = 0
-        self.image_queue = queue.Queue(0)
         self.timestamps: list[float] = []
 
     def connect(self) -> None:
@@ -62,11 +78,11 @@ class VidRec_Webcam(Device):
             ),
             device_id=self.device_args.device_id,
             sensor_ids=self.device_args.sensor_ids,
-            data_version=DataVersion(1, 0),
+            data_version=DataVersion(1, 1),
             columns=['FrameNum', 'Time_ACQ'],
             column_desc={
                 'FrameNum': 'Frame number',
-                'Time_ACQ': 'System timestamp (s)',
+                'Time_ACQ': 'LSL local_clock() when the frame was grabbed, before decoding (s)',
             },
             camera_idx=str(self.device_args.camera_idx),
             fps_rgb=str(self.device_args.sample_rate()),
@@ -97,11 +113,11 @@ class VidRec_Webcam(Device):
             ),
             device_id=self.device_args.device_id,
             sensor_ids=self.device_args.sensor_ids,
-            data_version=DataVersion(1, 0),
+            data_version=DataVersion(1, 1),
             columns=['FrameNum', 'Time_ACQ'],
             column_desc={
                 'FrameNum': 'Frame number',
-                'Time_ACQ': 'System timestamp (s)',
+                'Time_ACQ': 'LSL local_clock() when the frame was grabbed, before decoding (s)',
             },
             camera_idx=str(self.device_args.camera_idx),
             fps_rgb=str(self.device_args.sample_rate()),
@@ -127,16 +143,6 @@ class VidRec_Webcam(Device):
         self.camera = None
         self.open = False
 
-    def save_to_disk(self) -> None:
-        self.logger.debug('Webcam: Save Thread Started')
-        while self.recording or self.image_queue.qsize():
-            try:
-                dequeuedImage = self.image_queue.get(block=True, timeout=1)
-                self.video_out.write(dequeuedImage)
-            except queue.Empty:
-                continue
-        self.logger.debug('Webcam: Exiting Save Thread')
-
     def start(self, filename: Optional[str] = None) -> List[str]:
         """Begin recording video.
 
@@ -147,8 +153,9 @@ class VidRec_Webcam(Device):
             List containing the created video file basename.
         """
         name = filename if filename is not None else "temp_video"
+        self._mark_start()
         self._prepare_recording(name)
-        self.video_thread = threading.Thread(target=self.record)
+        self.video_thread = threading.Thread(target=self.record, name=f'{self.device_id}_grab')
         self.logger.debug('Webcam: Beginning Recording')
         self.state = DeviceState.STARTED
         self.video_thread.start()
@@ -157,53 +164,90 @@ class VidRec_Webcam(Device):
     def _prepare_recording(self, name: str = "temp_video") -> None:
         self.open_stream()
         self.video_filename = f"{name}_webcam.avi"
-        fourcc = cv2.VideoWriter_fourcc(*self.device_args.fourcc)
         fps = float(self.device_args.sample_rate())
         frame_size = (
             int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH)),
             int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
         )
-        self.video_out = cv2.VideoWriter(self.video_filename, fourcc, fps, frame_size)
+        if self._degraded("resize"):
+            frame_size = scaled_frame_size(frame_size, self.device_args.degrade_resize_factor)
+        self.frame_size = frame_size
+        self.video_encoder.open(self.video_filename, self.device_args.fourcc, fps, frame_size)
         self.streaming = True
 
     def record(self) -> None:
-        self.logger.debug('Webcam: LSL Thread Started')
+        """
+        Grab loop. Each frame is timestamped as soon as ``grab()`` returns, before ``retrieve()`` decodes it, so
+        decode time (which varies with image content) stays out of the timestamp. The timestamp is both Time_ACQ and
+        the LSL sample time. Encoding runs on the video encoder's worker.
+        """
+        self.logger.debug('Webcam: Grab Thread Started')
         self.recording = True
         self.frame_counter = 0
-        self.save_thread = threading.Thread(target=self.save_to_disk)
-        self.save_thread.start()
 
         self.timestamps = []
+        last_tsmp = None
         try:
             while self.recording:
-                rc, img = self.camera.read()
-                tsmp = timer()
+                t0 = local_clock()
+                if not self.camera.grab():
+                    self.hot_log.count("grab_errors")
+                    continue
+                tsmp = local_clock()
+                rc, img = self.camera.retrieve()
+                decode_ms = (local_clock() - tsmp) * 1e3
                 if not rc:
+                    self.hot_log.count("decode_errors")
+                    continue
+                self.hot_log.histogram("grab_wait_ms", (tsmp - t0) * 1e3, LATENCY_EDGES_MS)
+                self.hot_log.histogram("decode_ms", decode_ms, LATENCY_EDGES_MS)
+                if last_tsmp is not None:
+                    self.hot_log.histogram("frame_interval_ms", (tsmp - last_tsmp) * 1e3, LATENCY_EDGES_MS)
+                last_tsmp = tsmp
+                if not self._degraded("preview"):
+                    self.preview.offer(img)
+
+                # A frame the encoder drops gets no LSL sample, so FrameNum stays an index into the video file
+                if not self.video_encoder.put(resize_for_encoding(img, self.frame_size), tsmp):
+                    self.hot_log.sample("encoder_drop", logging.WARNING,
+                                        "Webcam: Frame buffer full (%d frames, policy=%s); dropped a frame",
+                                        self.video_encoder.capacity, self.video_encoder.policy, every_sec=5)
                     continue
-
-                self.image_queue.put(img)
                 self.timestamps.append(tsmp)
+                self._mark_first_frame()
 
-                try:
-                    self.outlet.push_sample([self.frame_counter, tsmp])
-                except BaseException:
-                    self.logger.debug(f"Reopening Webcam {self.device_args.device_index} stream already closed")
-                    self.outlet = self._recreate_outlet()
-                    self.outlet.push_sample([self.frame_counter, tsmp])
-
+                self.lsl_batch.push([self.frame_counter, tsmp], tsmp)
                 self.frame_counter += 1
-                if not self.frame_counter % 1000 and self.image_queue.qsize() > 2:
+                if not self.frame_counter % 1000 and self.video_encoder.depth() > 2:
                     self.logger.debug(
-                        f"Webcam queue length is {self.image_queue.qsize()} frame count: {self.frame_counter}"
+                        f"Webcam queue length is {self.video_encoder.depth()} frame count: {self.frame_counter}"
                     )
         except Exception as e:
             self.logger.error(f'Webcam: Unhandled exception in record loop: {e}')
         finally:
             self.close_stream()
             self.recording = False
-            self.save_thread.join()
-            self.video_out.release()
-            self.logger.debug('Webcam: Video File Released; Exiting LSL Thread')
+            self.lsl_batch.flush()
+            count_encoder_stats(self.hot_log, self.video_encoder.close_file())
+            self.hot_log.count("frames", self.frame_counter)
+            self.hot_log.flush("Webcam")
+            self.logger.debug('Webcam: Video File Released; Exiting Grab Thread')
+
+    def _push_chunk(self, samples: List[List[float]], timestamps: List[float]) -> None:
+        try:
+            self.outlet.push_chunk(samples, timestamps)
+        except BaseException:
+            self.logger.debug(f"Reopening Webcam {self.device_args.device_id} stream already closed")
+            self.outlet = self._recreate_outlet()
+            self.outlet.push_chunk(samples, timestamps)
+
+    def degrade_steps(self) -> Tuple[str, ...]:
+        return DEGRADE_STEPS
+
+    def degrade_load(self) -> Dict[str, Optional[float]]:
+        if not self.recording:
+            return {}
+        return encoder_load(self.video_encoder, float(self.device_args.sample_rate()))
 
     def stop(self) -> None:
         if self.open and self.recording:
@@ -214,6 +258,7 @@ class VidRec_Webcam(Device):
 
     def close(self) -> None:
         self.stop()
+        self.video_encoder.shutdown()
         self.state = DeviceState.DISCONNECTED
 
     def ensure_stopped(self, timeout_seconds: float = 10.0) -> None:
@@ -227,16 +272,22 @@ class VidRec_Webcam(Device):
         """
         Retrieve a frame preview from the webcam.
 
-        :returns: The raw data of the image/frame, or an empty byte string if an error occurs.
+        While recording, or shortly after, the newest frame of the record loop is served without touching the
+        camera. Otherwise the camera is opened for a single frame.
+
+        :returns: The JPEG-encoded image/frame, or an empty byte string if an error occurs.
         """
+        # With the "preview" degrade step applied the record loop keeps no preview frames, so there is none to wait for
+        img = self.preview.jpeg(timeout=1.0 if self.recording and not self._degraded("preview") else 0.0)
+        if img or self.recording:
+            return img
+
         self.open_stream()
         rc, img = self.camera.read()
         self.close_stream()
         if not rc:
             return b""
-
-        rc, img = cv2.imencode('.png', img)
-        return img.tobytes() if rc else b""
+        return encode_jpeg(img)
 
 
 def test_script() -> None:
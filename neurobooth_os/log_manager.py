@@ -1,13 +1,16 @@
+import collections
+from bisect import bisect_right
 import faulthandler
 import json
 import logging
 import os
 import sys
 from datetime import datetime
-from typing import Optional, List, Dict, Any, IO
+from typing import Optional, List, Dict, Any, IO, Sequence, Tuple
 import psutil
 from threading import Thread, Event
 import platform
+import time
 import traceback
 
 from neurobooth_terra import Table
@@ -16,6 +19,7 @@ from pydantic import BaseModel
 import neurobooth_os.config as config
 from neurobooth_os.iout import metadator
 from neurobooth_os.msg.messages import Message
+from neurobooth_os.util.session_trace import SessionTraceHandler
 
 LOG_FORMAT = logging.Formatter('|%(levelname)s| [%(asctime)s] %(filename)s, %(funcName)s, L%(lineno)d> %(message)s')
 
@@ -115,6 +119,52 @@ def make_session_logger_debug(
     return logger
 
 
+# Environment variable that turns on binary session traces (see enable_session_trace)
+SESSION_TRACE_ENV = "NB_SESSION_TRACE"
+
+# The active session trace handler, if any. Replaced when a new session starts.
+_session_trace_handler: Optional[SessionTraceHandler] = None
+
+
+def enable_session_trace(session_name: str, server_name: str) -> Optional[SessionTraceHandler]:
+    """Attach a binary session trace to the application logger, if enabled.
+
+    Traces are opt-in: nothing happens unless the ``NB_SESSION_TRACE`` environment variable is set to a truthy
+    value. When enabled, every ``app`` log record is also written to rotating ``.nbtrace`` files in
+    ``<log dir>/<session_name>/``, stamped with LSL ``local_clock()`` time so traces from CTR, STM and ACQ can be
+    merged afterwards with ``extras/perf/session_trace_merge.py``. Any trace from a previous session is closed.
+
+    Args:
+        session_name: Name of the session; also the trace sub-folder.
+        server_name: Identifier for the process (e.g. ``"CTR"``, ``"STM"``, ``"ACQ_0"``).
+
+    Returns:
+        The new handler, or None if tracing is disabled or could not be started.
+    """
+    global _session_trace_handler
+    if os.environ.get(SESSION_TRACE_ENV, "").lower() not in ("1", "true", "yes", "on"):
+        return None
+
+    app_logger = logging.getLogger(APP_LOG_NAME)
+    if _session_trace_handler is not None:
+        app_logger.removeHandler(_session_trace_handler)
+        _session_trace_handler.close()
+        _session_trace_handler = None
+
+    try:
+        handler = SessionTraceHandler(
+            directory=os.path.join(_get_log_dir(), session_name),
+            server=server_name,
+            session=session_name,
+        )
+    except Exception as e:
+        app_logger.warning(f"Unable to start session trace: {e}")
+        return None
+    app_logger.addHandler(handler)
+    _session_trace_handler = handler
+    return handler
+
+
 def make_db_logger(subject: str = None,
                    session: str = None,
                    log_level: int = logging.DEBUG) -> logging.Logger:
@@ -150,6 +200,126 @@ def log_message_received(message: Message, logger) -> None:
     logger.info(f'MESSAGE RECEIVED: {message_dict}')
 
 
+class HotPathLogger:
+    """
+    Logging for per-frame / per-sample code paths (capture loops, BLE callbacks) where a log call per iteration
+    would cost more than the work being logged.
+
+    - ``sample()`` emits at most 1-in-N calls and/or once per T seconds per call site. Arguments use logging's lazy
+      %-style formatting, and nothing is evaluated beyond an ``isEnabledFor`` check when the level is disabled.
+    - ``count()``, ``observe()`` and ``histogram()`` aggregate counters, value statistics and bucketed value counts
+      in memory without logging.
+    - ``flush()`` emits everything aggregated so far as a single summary record (e.g. once per task) and resets it.
+
+    Counter updates are not locked: ``flush()`` swaps in fresh dictionaries, so an increment racing with a flush may
+    land in either summary (or, rarely, be dropped). That is acceptable for diagnostics and keeps the hot path cheap.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, device: Optional[str] = None):
+        """
+        :param logger: Logger to emit to. Defaults to the application logger.
+        :param device: Device ID attached to every record (populates the ``device`` column of log_application).
+        """
+        self.logger = logger if logger is not None else logging.getLogger(APP_LOG_NAME)
+        self.device = device
+        self._extra = {"device": device}
+        self._sites: Dict[str, List[float]] = {}  # call site -> [n_calls, last_emit_time]
+        self._counters: Dict[str, int] = {}
+        self._stats: Dict[str, List[float]] = {}  # name -> [n, total, min, max]
+        self._histograms: Dict[str, Tuple[List[float], List[int]]] = {}  # name -> (edges, counts)
+
+    def sample(
+            self,
+            site: str,
+            level: int,
+            msg: str,
+            *args: Any,
+            every_n: Optional[int] = None,
+            every_sec: Optional[float] = None,
+    ) -> bool:
+        """
+        Log ``msg % args`` if this call site is due. With neither limit set, behaves like ``logger.log``.
+
+        :param site: Key identifying the call site; limits are tracked per key.
+        :param level: Logging level (e.g. ``logging.DEBUG``).
+        :param msg: %-style format string. Only formatted if the record is emitted.
+        :param every_n: Emit on the 1st, (N+1)th, (2N+1)th, ... call.
+        :param every_sec: Emit at most once per this many seconds.
+        :returns: Whether a record was emitted.
+        """
+        if not self.logger.isEnabledFor(level):
+            return False
+        state = self._sites.get(site)
+        if state is None:
+            state = self._sites[site] = [0, float("-inf")]
+        state[0] += 1
+        if every_n is not None and (state[0] - 1) % every_n:
+            return False
+        if every_sec is not None:
+            now = time.monotonic()
+            if now - state[1] < every_sec:
+                return False
+            state[1] = now
+        self.logger.log(level, msg, *args, extra=self._extra, stacklevel=2)
+        return True
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Add ``n`` to the named counter."""
+        counters = self._counters
+        counters[name] = counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float) -> None:
+        """Accumulate count, mean, min and max of a value (e.g. a latency or queue depth)."""
+        stat = self._stats.get(name)
+        if stat is None:
+            self._stats[name] = [1, value, value, value]
+            return
+        stat[0] += 1
+        stat[1] += value
+        if value < stat[2]:
+            stat[2] = value
+        if value > stat[3]:
+            stat[3] = value
+
+    def histogram(self, name: str, value: float, edges: Sequence[float]) -> None:
+        """
+        Count a value into buckets ``< edges[0]``, ``[edges[0], edges[1])``, ..., ``>= edges[-1]``. The edges given
+        on the first call for a name are kept until the next flush.
+        """
+        hist = self._histograms.get(name)
+        if hist is None:
+            hist = self._histograms[name] = (list(edges), [0] * (len(edges) + 1))
+        hist[1][bisect_right(hist[0], value)] += 1
+
+    def flush(self, label: str = "", level: int = logging.INFO) -> Optional[Dict[str, Any]]:
+        """
+        Emit one summary record of all counters and statistics, then reset them.
+
+        :param label: Prefix identifying the summary (e.g. the device or task).
+        :param level: Level of the summary record.
+        :returns: The summary that was logged, or None if nothing was aggregated.
+        """
+        counters, self._counters = self._counters, {}
+        stats, self._stats = self._stats, {}
+        histograms, self._histograms = self._histograms, {}
+        if not counters and not stats and not histograms:
+            return None
+        summary: Dict[str, Any] = {
+            "counters": counters,
+            "stats": {
+                name: {"n": n, "mean": total / n, "min": lo, "max": hi}
+                for name, (n, total, lo, hi) in stats.items()
+            },
+        }
+        if histograms:
+            summary["histograms"] = {
+                name: {"edges": edges, "counts": counts} for name, (edges, counts) in histograms.items()
+            }
+        self.logger.log(level, "HOTPATH SUMMARY %s: %s", label or self.device, json.dumps(summary),
+                        extra=self._extra)
+        return summary
+
+
 class CpuUsage(BaseModel):
     name: str
     pct: float
@@ -313,6 +483,87 @@ class SystemResourceLogger(Thread):
         self.connection.close()
 
 
+# Records that could not reach log_application, one JSON object per line (see extras/perf/replay_db_log_fallback.py)
+FALLBACK_LOG_NAME = "neurobooth_db_log_fallback.log"
+
+
+class FallbackLogWriter(Thread):
+    """
+    Appends lines to the DB-log fallback file from a background thread.
+
+    ``submit()`` only appends to a bounded ring buffer, so a logging call made during a DB outage (possibly from a
+    device callback) never opens, writes or flushes a file. If the buffer is full, the oldest queued line is
+    overwritten and counted in ``dropped``.
+    """
+
+    def __init__(self, path: str, capacity: int = 10000, flush_interval_sec: float = 1.0):
+        """
+        :param path: File to append to. Opened lazily by the writer thread.
+        :param capacity: Maximum number of lines waiting to be written.
+        :param flush_interval_sec: How often the buffer is drained when not woken by ``flush()`` or ``stop()``.
+        """
+        super().__init__(name="db_log_fallback_writer", daemon=True)
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval_sec = flush_interval_sec
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._buffer = collections.deque(maxlen=capacity)
+        self._wake = Event()
+        self._idle = Event()
+        self._idle.set()
+        self._stopping = Event()
+
+    def submit(self, line: str) -> None:
+        """Queue a line for writing. Never blocks."""
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+        self._idle.clear()
+        self._buffer.append(line)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wake the writer and wait until the buffer has been written. Returns False on timeout."""
+        self._wake.set()
+        return self._idle.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write what is queued, close the file and end the thread."""
+        self._stopping.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self) -> None:
+        file: Optional[IO] = None
+        while True:
+            self._wake.wait(self.flush_interval_sec)
+            self._wake.clear()
+            stopping = self._stopping.is_set()
+            lines = []
+            try:
+                while True:
+                    lines.append(self._buffer.popleft())
+            except IndexError:
+                pass
+            if lines:
+                try:
+                    if file is None:
+                        file = open(self.path, "a", encoding="utf-8")
+                    file.writelines(lines)
+                    file.flush()
+                    self.written += len(lines)
+                except Exception as e:
+                    self.failed += len(lines)
+                    print(f"Failed to write {len(lines)} records to {self.path}: {e}")
+            if not self._buffer:
+                self._idle.set()
+            if stopping:
+                break
+        if file is not None:
+            file.close()
+
+
 class PostgreSQLHandler(logging.Handler):
     """
     A :class:`logging.Handler` that logs to the `log_application` PostgreSQL table
@@ -338,21 +589,36 @@ class PostgreSQLHandler(logging.Handler):
         self.name = "db_handler"
         self.connection = None
         self.cursor = None
-        self._fallback_file: Optional[IO] = None
+        self._fallback_writer: Optional[FallbackLogWriter] = None
         self._last_reconnect_attempt = 0.0
         self._reconnect_interval_sec = 30.0
         self._connect_timeout_sec = 3
 
+        # Outage state. While the DB is down, records go straight to the fallback writer and reconnects happen on
+        # a background thread, so logging callers (device callbacks included) never wait on the network.
+        self._db_down_since: Optional[float] = None
+        self._n_diverted = 0
+        self._dropped_at_outage = 0
+        self._closed = Event()
+
         try:
             self._get_logger_connection()
         except Exception as e:
             print(f"Unable to connect to database for logging:  {e}")
             raise (e)
 
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait (up to ``timeout`` seconds) for queued fallback records to reach the disk."""
+        if self._fallback_writer is not None:
+            self._fallback_writer.flush(timeout)
+
     def close(self):
         """Close this log handler and its DB connection """
         logging.getLogger(APP_LOG_NAME).debug("Closing app log db connection")
         logging.getLogger(APP_LOG_NAME).removeHandler(self)
+        self._closed.set()
+        if self._fallback_writer is not None:
+            self._fallback_writer.stop()
         if self.connection is not None:
             self.connection.close()
         global APP_LOGGER
@@ -367,7 +633,12 @@ class PostgreSQLHandler(logging.Handler):
         try:
             args = self._build_args(record)
         except Exception as e:
-            self._fallback_to_file(record, f"log-record build failed: {e}")
+            self._fallback_to_file(record, None, f"log-record build failed: {e}")
+            return
+
+        if self._db_down_since is not None:
+            # Known outage: don't touch the DB from the caller's thread; _recover() is working on it.
+            self._fallback_to_file(record, args, "DB unavailable")
             return
 
         try:
@@ -386,7 +657,8 @@ class PostgreSQLHandler(logging.Handler):
             except Exception as e:
                 db_error = e
 
-        self._fallback_to_file(record, f"DB log write failed: {db_error}")
+        self._mark_db_down()
+        self._fallback_to_file(record, args, f"DB log write failed: {db_error}")
 
     def _build_args(self, record) -> Dict[str, Any]:
         level = record.levelname.lower()
@@ -432,31 +704,75 @@ class PostgreSQLHandler(logging.Handler):
             print(f"PostgreSQLHandler reconnect failed: {e}")
             return False
 
-    def _fallback_to_file(self, record, reason: str) -> None:
-        """Append a record to a local file when the DB is unreachable, so it is
-        never silently lost. Best-effort; never raises."""
-        try:
-            if self._fallback_file is None:
-                path = os.path.join(_get_log_dir(), "neurobooth_db_log_fallback.log")
-                self._fallback_file = open(path, "a")
-            self._fallback_file.write(
-                f"[{datetime.fromtimestamp(record.created).isoformat()}] "
-                f"{record.levelname} {record.filename}:{record.lineno} "
-                f"{record.funcName}> {record.getMessage()}  ({reason})\n"
+    def _mark_db_down(self) -> None:
+        """Enter the outage state and start the background reconnect loop."""
+        self._db_down_since = time.monotonic()
+        self._n_diverted = 0
+        self._dropped_at_outage = self._fallback_writer.dropped if self._fallback_writer is not None else 0
+        Thread(target=self._recover, name="db_log_recovery", daemon=True).start()
+
+    def _recover(self) -> None:
+        """Retry the DB every ``_reconnect_interval_sec`` off the logging path. Once it is back, swap in the new
+        connection and report how many records the outage diverted to (or dropped from) the fallback file."""
+        while not self._closed.wait(self._reconnect_interval_sec):
+            try:
+                connection, cursor = self._connect()
+            except Exception:
+                continue
+
+            self.acquire()
+            try:
+                old_connection = self.connection
+                self.connection, self.cursor = connection, cursor
+                outage_sec = time.monotonic() - self._db_down_since
+                diverted = self._n_diverted
+                writer = self._fallback_writer
+                dropped = writer.dropped - self._dropped_at_outage if writer is not None else 0
+                self._db_down_since = None
+            finally:
+                self.release()
+            try:
+                if old_connection is not None:
+                    old_connection.close()
+            except Exception:
+                pass
+
+            logging.getLogger(APP_LOG_NAME).warning(
+                "DB logging restored after %.1f s: %d records written to %s, %d dropped (fallback buffer full). "
+                "Replay them with extras/perf/replay_db_log_fallback.py.",
+                outage_sec, diverted - dropped, FALLBACK_LOG_NAME, dropped,
             )
-            if record.exc_info:
-                self._fallback_file.write(
-                    ''.join(traceback.format_exception(*record.exc_info))
-                )
-            self._fallback_file.flush()
+            return
+
+    def _fallback_to_file(self, record, args: Optional[Dict[str, Any]], reason: str) -> None:
+        """Queue a record for the fallback file when the DB is unreachable, so it is
+        never silently lost. Returns without doing I/O; never raises."""
+        try:
+            if args is None:
+                args = {
+                    "log_level": record.levelname.lower(),
+                    "message": str(record.msg),
+                    "function": record.funcName,
+                    "filename": record.filename,
+                    "line_no": record.lineno,
+                    "server_time": datetime.fromtimestamp(record.created),
+                }
+            row = dict(args, server_time=args["server_time"].isoformat(), fallback_reason=reason)
+            if self._fallback_writer is None:
+                self._fallback_writer = FallbackLogWriter(os.path.join(_get_log_dir(), FALLBACK_LOG_NAME))
+                self._fallback_writer.start()
+            self._fallback_writer.submit(json.dumps(row, default=str) + "\n")
+            self._n_diverted += 1
         except Exception as e:
             print(f"Failed to log to DB and to the fallback file: {e}")
 
-    def _get_logger_connection(self):
+    def _connect(self):
         # Short connect_timeout so a reconnect to a dead DB can't block the
         # logging call -- and, via the handler lock, every other thread that
         # logs -- for the OS default TCP timeout.
-        self.connection = metadator.get_database_connection(
-            connect_timeout=self._connect_timeout_sec)
-        self.connection.autocommit = True
-        self.cursor = self.connection.cursor()
+        connection = metadator.get_database_connection(connect_timeout=self._connect_timeout_sec)
+        connection.autocommit = True
+        return connection, connection.cursor()
+
+    def _get_logger_connection(self):
+        self.connection, self.cursor = self._connect()
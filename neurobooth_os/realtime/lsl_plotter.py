@@ -7,8 +7,6 @@ import logging
 
 import numpy as np
 import pylsl
-import matplotlib.pyplot as plt
-import matplotlib
 import cv2
 import threading
 
@@ -100,6 +98,10 @@ class stream_plotter:
         self.inlets = {}
 
     def update_ts(self):
+        # matplotlib is only needed once plotting starts; importing it at module
+        # level would slow every CTR start-up that never opens the plot window.
+        import matplotlib.pyplot as plt
+
         self.inlets_plt = [
             v
             for v in list(self.inlets)
@@ -143,7 +145,9 @@ class stream_plotter:
                     # tv = [[np.mean(itv[1:4]), np.mean(itv[4:])] for itv in tv]
                     tv = [[np.mean(itv[1:4])] for itv in tv]
                 elif "Audio" in nm:
-                    if len(tv[0]) % 2:
+                    if len(tv[0]) == 1:  # One sample per audio frame (DataVersion 2.0): plot the chunk's peak
+                        tv, ts = [[np.max(tv)]], ts[-1:]
+                    elif len(tv[0]) % 2:
                         tv = [[np.max(itv[1:])] for itv in tv]
                     else:
                         tv = [[np.max(itv)] for itv in tv]
@@ -184,6 +188,9 @@ class stream_plotter:
 
 
 def mypause(interval):
+    import matplotlib
+    import matplotlib.pyplot as plt
+
     backend = plt.rcParams["backend"]
     if backend in matplotlib.rcsetup.interactive_bk:
         figManager = matplotlib._pylab_helpers.Gcf.get_active()
@@ -14,7 +14,8 @@ import neurobooth_os.current_config as current_config
 
 from neurobooth_os import config
 from neurobooth_os.iout.stim_param_reader import TaskArgs, DeviceArgs
-from neurobooth_os.log_manager import make_db_logger, make_fallback_logger, log_message_received, enable_crash_handler
+from neurobooth_os.log_manager import make_db_logger, make_fallback_logger, log_message_received, enable_crash_handler, \
+    enable_session_trace
 from neurobooth_os.perf_monitor import ProcessMonitor
 from neurobooth_os.iout.device import CameraPreviewException
 from neurobooth_os.iout.lsl_streamer import DeviceManager
@@ -93,6 +94,7 @@ def run_acq(logger, acq_index: int = 0):
 
                 logger = make_db_logger(subject_id, session_name)
                 logger.info('LOGGER CREATED')
+                enable_session_trace(session_name, service_id)
 
                 if system_resource_logger is None:
                     system_resource_logger = SystemResourceLogger(machine_name=service_id)
@@ -109,6 +111,7 @@ def run_acq(logger, acq_index: int = 0):
                         process_monitor.start()
 
                 task_args = meta.build_tasks_for_collection(collection_id, selected_tasks)
+                meta.warm_fileid_cache()
 
                 device_manager = DeviceManager(node_name=f'acquisition_{acq_index}')
                 if device_manager.streams:
@@ -263,6 +266,7 @@ def start_recording(device_manager: DeviceManager, filename: str, fname: str,
 def stop_recording(device_manager: DeviceManager, task_devices: List[DeviceArgs]) -> float:
     t0 = time()
     device_manager.stop_recording_devices(task_devices)
+    device_manager.finish_task()  # Per-device on_task_end hook (Mbient health monitor may reconnect now)
     elapsed_time = time() - t0
     return elapsed_time
 
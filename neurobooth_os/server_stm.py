@@ -29,7 +29,8 @@ from neurobooth_os.iout import metadator as meta
 
 from neurobooth_os.tasks.welcome_finish_screens import welcome_screen, finish_screen
 import neurobooth_os.tasks.utils as utl
-from neurobooth_os.log_manager import make_db_logger, make_fallback_logger, log_message_received, enable_crash_handler
+from neurobooth_os.log_manager import make_db_logger, make_fallback_logger, log_message_received, enable_crash_handler, \
+    enable_session_trace
 from neurobooth_os.perf_monitor import ProcessMonitor
 
 prefs.hardware["audioLib"] = ["PTB"]
@@ -753,6 +754,7 @@ def prepare_session(prepare_req: PrepareRequest, logger):
     #   (continued) We already have a db_logger, it just needs session attributes
     stm_session.logger = make_db_logger(subject_id, stm_session.session_name)
     stm_session.logger.info('LOGGER CREATED FOR SESSION')
+    enable_session_trace(stm_session.session_name, "STM")
     updator = Request(source="STM", destination="CTR", body=SessionPrepared())
     meta.post_message(updator)
     return stm_session, task_log_entry
@@ -22,13 +22,13 @@ import time as time_mod
 
 import neurobooth_os.config as cfg
 import neurobooth_os.iout.metadator as meta
-from neurobooth_os.iout.split_xdf import postpone_xdf_split, get_xdf_name
 from neurobooth_os.msg.messages import (
     Message, FramePreviewRequest, Request, CreateTasksRequest, PerformTaskRequest,
     TerminateServerRequest, PrepareRequest, PauseSessionRequest,
     ResumeSessionRequest, CancelSessionRequest, LslRecording,
     TasksFinished, MEDIUM_HIGH_PRIORITY,
 )
+from neurobooth_os.log_manager import enable_session_trace
 from neurobooth_os.netcomm import start_server, kill_pid_txt
 from neurobooth_os.realtime.lsl_plotter import create_lsl_inlets
 from neurobooth_os.util.nb_types import Subject
@@ -338,6 +338,13 @@ class SessionController:
     def prepare_devices(self, conn, collection_id: str, selected_tasks: List[str]) -> None:
         """Send PrepareRequest to all server nodes."""
         database = cfg.neurobooth_config.database.dbname
+        body = PrepareRequest(
+            database_name=database,
+            subject_id=self.state.log_task['subject_id'],
+            collection_id=collection_id,
+            selected_tasks=selected_tasks,
+            date=self.state.log_task['date'],
+        )
 
         for node in get_nodes():
             if node.startswith('acquisition_'):
@@ -345,15 +352,9 @@ class SessionController:
                 dest = cfg.neurobooth_config.acq_service_id(idx)
             else:
                 dest = "STM"
-            body = PrepareRequest(
-                database_name=database,
-                subject_id=self.state.log_task['subject_id'],
-                collection_id=collection_id,
-                selected_tasks=selected_tasks,
-                date=self.state.log_task['date'],
-            )
             msg = Request(source='CTR', destination=dest, body=body)
             meta.post_message(msg, conn)
+        enable_session_trace(body.session_name(), "CTR")
 
     # --- Session execution ---
 
@@ -534,6 +535,8 @@ class SessionController:
         the two can safely run concurrently.
         """
         import threading as threading_mod
+        # split_xdf pulls pyxdf/h5io; defer it so CTR start-up doesn't pay for it.
+        from neurobooth_os.iout.split_xdf import postpone_xdf_split, get_xdf_name
 
         session = self.state.session
         recorder = session.recorder
@@ -9,7 +9,8 @@ from psychopy import visual
 from neurobooth_os import config
 from neurobooth_os.iout.eyelink_tracker import EyeTracker
 from neurobooth_os.iout.lsl_streamer import DeviceManager
-from neurobooth_os.iout.metadator import build_tasks_for_collection, get_session_start_end_slides_for_collection
+from neurobooth_os.iout.metadator import build_tasks_for_collection, get_session_start_end_slides_for_collection, \
+    warm_fileid_cache
 from neurobooth_os.log_manager import SystemResourceLogger
 from neurobooth_os.tasks import utils as utl
 
@@ -60,6 +61,7 @@ class StmSession(BaseModel):
         self.session_folder = self.create_session_folder(self.logger, self.session_name)
         self.system_resource_logger: SystemResourceLogger = self.create_sys_resource_logger()
         self.task_func_dict = build_tasks_for_collection(self.collection_id, self.selected_tasks)
+        warm_fileid_cache()
         self.session_start_slide, self.session_end_slide = get_session_start_end_slides_for_collection(
             self.collection_id)
         self.path = os.path.join(config.neurobooth_config.presentation.local_data_dir, self.session_name)
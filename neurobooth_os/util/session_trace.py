@@ -0,0 +1,248 @@
+"""
+Binary, append-only, rotating session trace files.
+
+A session trace captures every ``app`` log record of a session in a compact binary form, for post-session
+performance forensics without hitting the database during the session. Each record carries the LSL
+``local_clock()`` time it was emitted at, the wall-clock time, the level, thread, code location, message and any
+structured fields passed via ``extra={"trace_fields": {...}}``.
+
+File layout (all integers little-endian)::
+
+    MAGIC (8 bytes) | u32 header length | JSON header
+    record*
+
+    record := u32 body length | body
+    body   := f64 lsl_time | f64 unix_time | u8 level | u32 line_no
+              | u16 len(thread) | u16 len(filename) | u16 len(function) | u32 len(message) | u32 len(fields)
+              | thread | filename | function | message | fields (JSON object, or empty)
+
+The JSON header records the server, session, host, pid and a (lsl_time, unix_time) anchor, which lets the reader
+put traces from different machines on one timeline (see ``extras/perf/session_trace_merge.py``). A file cut off by a
+crash is still readable up to its last complete record.
+
+This module has no dependencies beyond the standard library (pylsl is imported lazily for the default clock), so
+the reader can be used off-booth.
+"""
+
+import glob
+import json
+import logging
+import os
+import socket
+import struct
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"NBTRACE\x01"
+FORMAT_VERSION = 1
+FILE_EXTENSION = ".nbtrace"
+
+_LEN = struct.Struct("<I")
+_BODY_HEAD = struct.Struct("<ddBIHHHII")
+
+# Default rotation: 64 MiB segments, keeping the newest 32 of them per server and session.
+DEFAULT_MAX_BYTES = 64 << 20
+DEFAULT_MAX_FILES = 32
+
+
+def _default_clock() -> Callable[[], float]:
+    from pylsl import local_clock
+    return local_clock
+
+
+def _clip(text: str, limit: int) -> bytes:
+    data = text.encode("utf-8", errors="replace")
+    return data if len(data) <= limit else data[:limit]
+
+
+class SessionTraceHandler(logging.Handler):
+    """
+    A :class:`logging.Handler` that appends records to rotating binary trace segments.
+
+    Segments are named ``trace_<server>_<index>.nbtrace`` in ``directory``. Writes are buffered; the buffer is
+    flushed for every WARNING-or-worse record, at least every ``flush_interval_sec``, on rotation and on close.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            server: str,
+            session: str = "",
+            max_bytes: int = DEFAULT_MAX_BYTES,
+            max_files: Optional[int] = DEFAULT_MAX_FILES,
+            flush_interval_sec: float = 2.0,
+            clock: Optional[Callable[[], float]] = None,
+            level: int = logging.DEBUG,
+    ):
+        """
+        :param directory: Folder the segments are written to. Created if missing.
+        :param server: Name of the writing server (e.g. ``"CTR"``, ``"STM"``, ``"ACQ_0"``).
+        :param session: Session name recorded in each segment header.
+        :param max_bytes: Rotate to a new segment once the current one exceeds this size.
+        :param max_files: Delete the oldest segments beyond this count. ``None`` keeps everything.
+        :param flush_interval_sec: Upper bound on how long a record may sit in the write buffer.
+        :param clock: The LSL clock. Defaults to ``pylsl.local_clock``.
+        :param level: Minimum level of records written.
+        """
+        super().__init__(level)
+        self.name = "session_trace"
+        self.directory = directory
+        self.server = server
+        self.session = session
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.flush_interval_sec = flush_interval_sec
+        self.clock = clock if clock is not None else _default_clock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._next_index()
+        self._file = None
+        self._bytes = 0
+        self._last_flush = time.monotonic()
+        self._open_segment()
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"trace_{self.server}_{index:04d}{FILE_EXTENSION}")
+
+    def _existing_segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(glob.escape(self.directory), f"trace_{self.server}_*{FILE_EXTENSION}")))
+
+    def _next_index(self) -> int:
+        """Continue numbering after any segments already in the directory (e.g. a restarted server)."""
+        indices = []
+        for path in self._existing_segments():
+            stem = os.path.basename(path)[:-len(FILE_EXTENSION)]
+            try:
+                indices.append(int(stem.rsplit("_", 1)[1]))
+            except (IndexError, ValueError):
+                continue
+        return max(indices) + 1 if indices else 0
+
+    def _open_segment(self) -> None:
+        header = json.dumps({
+            "version": FORMAT_VERSION,
+            "server": self.server,
+            "session": self.session,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "segment": self._index,
+            "anchor_lsl_time": self.clock(),
+            "anchor_unix_time": time.time(),
+        }).encode("utf-8")
+        self._file = open(self._segment_path(self._index), "ab")
+        self._file.write(MAGIC + _LEN.pack(len(header)) + header)
+        self._bytes = len(MAGIC) + _LEN.size + len(header)
+        self._prune()
+
+    def _prune(self) -> None:
+        if self.max_files is None:
+            return
+        for path in self._existing_segments()[:-self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._index += 1
+        self._open_segment()
+
+    def encode(self, record: logging.LogRecord) -> bytes:
+        """Serialize one log record (including its length prefix)."""
+        fields: Dict[str, Any] = dict(getattr(record, "trace_fields", None) or {})
+        device = getattr(record, "device", None)
+        if device:
+            fields.setdefault("device", device)
+        thread = _clip(record.threadName or "", 0xFFFF)
+        filename = _clip(record.filename or "", 0xFFFF)
+        function = _clip(record.funcName or "", 0xFFFF)
+        message = record.getMessage().encode("utf-8", errors="replace")
+        fields_bytes = json.dumps(fields, default=str).encode("utf-8") if fields else b""
+        body = _BODY_HEAD.pack(
+            self.clock(), record.created, min(record.levelno, 255), record.lineno or 0,
+            len(thread), len(filename), len(function), len(message), len(fields_bytes),
+        ) + thread + filename + function + message + fields_bytes
+        return _LEN.pack(len(body)) + body
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            data = self.encode(record)
+            self._file.write(data)
+            self._bytes += len(data)
+            now = time.monotonic()
+            if record.levelno >= logging.WARNING or now - self._last_flush >= self.flush_interval_sec:
+                self._file.flush()
+                self._last_flush = now
+            if self._bytes >= self.max_bytes:
+                self._rotate()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self._file is not None and not self._file.closed:
+                self._file.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            if self._file is not None and not self._file.closed:
+                self._file.close()
+        finally:
+            self.release()
+        super().close()
+
+
+def read_trace(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Read one trace segment.
+
+    :param path: Path to a ``.nbtrace`` file.
+    :returns: ``(header, records)``. Each record is a dict with ``lsl_time``, ``unix_time``, ``level``, ``thread``,
+        ``filename``, ``function``, ``line_no``, ``message`` and ``fields``. A truncated final record (e.g. from a
+        crash) is dropped.
+    :raises ValueError: If the file is not a session trace.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a session trace file")
+    pos = len(MAGIC)
+    (header_len,) = _LEN.unpack_from(data, pos)
+    pos += _LEN.size
+    header = json.loads(data[pos:pos + header_len].decode("utf-8"))
+    pos += header_len
+    return header, list(_iter_records(data, pos))
+
+
+def _iter_records(data: bytes, pos: int) -> Iterator[Dict[str, Any]]:
+    end = len(data)
+    while pos + _LEN.size <= end:
+        (body_len,) = _LEN.unpack_from(data, pos)
+        start = pos + _LEN.size
+        if start + body_len > end or body_len < _BODY_HEAD.size:
+            return  # truncated tail
+        lsl_time, unix_time, level, line_no, n_thread, n_file, n_func, n_msg, n_fields = \
+            _BODY_HEAD.unpack_from(data, start)
+        p = start + _BODY_HEAD.size
+        strings = []
+        for n in (n_thread, n_file, n_func, n_msg, n_fields):
+            strings.append(data[p:p + n].decode("utf-8", errors="replace"))
+            p += n
+        thread, filename, function, message, fields = strings
+        yield {
+            "lsl_time": lsl_time,
+            "unix_time": unix_time,
+            "level": logging.getLevelName(level),
+            "thread": thread,
+            "filename": filename,
+            "function": function,
+            "line_no": line_no,
+            "message": message,
+            "fields": json.loads(fields) if fields else {},
+        }
+        pos = start + body_len
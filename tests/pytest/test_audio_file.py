@@ -0,0 +1,55 @@
+"""Tests for incremental audio file writing (neurobooth_os/iout/audio_file.py)."""
+
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from neurobooth_os.iout.audio_file import AudioFileWriter
+
+
+def _chunks(n, size=512):
+    rng = np.random.default_rng(0)
+    return [rng.integers(-3000, 3000, size, dtype=np.int16).tobytes() for _ in range(n)]
+
+
+def test_wav_is_written_while_recording_and_finalized_on_stop(tmp_path):
+    path = str(tmp_path / "audio.wav")
+    writer = AudioFileWriter(path, channels=1, frame_rate=16000, flush_interval_sec=0.01)
+    writer.start()
+    chunks = _chunks(20)
+    for chunk in chunks[:10]:
+        writer.submit(chunk)
+    deadline = time.monotonic() + 5
+    while writer.written_bytes < 10 * len(chunks[0]) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.written_bytes == 10 * len(chunks[0])  # Written before stop(), not held in memory
+    for chunk in chunks[10:]:
+        writer.submit(chunk)
+    writer.stop()
+    assert not writer.is_alive() and writer.error is None
+
+    with wave.open(path, "rb") as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, 16000)
+        assert wav.getnframes() == 20 * 512
+        assert wav.readframes(wav.getnframes()) == b"".join(chunks)
+
+
+def test_flac_round_trip(tmp_path):
+    soundfile = pytest.importorskip("soundfile")
+    path = str(tmp_path / "audio.flac")
+    writer = AudioFileWriter(path, channels=1, frame_rate=16000)
+    writer.start()
+    chunks = _chunks(5)
+    for chunk in chunks:
+        writer.submit(chunk)
+    writer.stop()
+    data, rate = soundfile.read(path, dtype="int16")
+    assert rate == 16000
+    assert data.tobytes() == b"".join(chunks)
+
+
+def test_unsupported_extension_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        AudioFileWriter(str(tmp_path / "audio.mp3"), channels=1, frame_rate=16000)
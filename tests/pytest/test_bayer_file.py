@@ -0,0 +1,104 @@
+"""Tests for the raw Bayer FLIR container and converter (neurobooth_os/iout/bayer_file.py)."""
+
+import numpy as np
+import pytest
+
+from neurobooth_os.iout.bayer_file import (
+    BAYER_FOURCC,
+    BayerFileException,
+    BayerReader,
+    BayerWriter,
+    convert_to_avi,
+)
+from neurobooth_os.iout.video_encoder import EncoderProcess, ThreadEncoder
+
+SIZE = (16, 12)  # (width, height); even when halved, as MJPG requires
+
+
+def _raw(value):
+    return np.full((SIZE[1], SIZE[0]), value, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_round_trip(tmp_path, compression):
+    path = str(tmp_path / "a_flir.bayer")
+    writer = BayerWriter(path, 196.0, SIZE, fd=0.5, compression=compression)
+    for i in range(3):
+        writer.write(_raw(i))
+    writer.release()
+
+    with BayerReader(path) as reader:
+        assert reader.header["fd"] == 0.5 and reader.header["pattern"] == "BG"
+        frames = list(reader)
+    assert [f[0, 0] for f in frames] == [0, 1, 2]
+    assert frames[0].shape == (SIZE[1], SIZE[0])
+
+
+def test_truncated_file_reads_complete_frames(tmp_path):
+    path = tmp_path / "a_flir.bayer"
+    writer = BayerWriter(str(path), 30.0, SIZE)
+    writer.write(_raw(1))
+    writer.write(_raw(2))
+    writer.release()
+    path.write_bytes(path.read_bytes()[:-5])
+
+    with BayerReader(str(path)) as reader:
+        assert len(list(reader)) == 1
+        assert reader.truncated
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "a.avi"
+    path.write_bytes(b"RIFF....AVI ")
+    with pytest.raises(BayerFileException):
+        BayerReader(str(path))
+
+
+@pytest.mark.parametrize("backend", [ThreadEncoder, EncoderProcess])
+def test_encoder_writes_single_channel_frames(tmp_path, backend):
+    path = str(tmp_path / "a_flir.bayer")
+    enc = backend(4, name="test_encoder")
+    try:
+        enc.open(path, BAYER_FOURCC, 196.0, SIZE, channels=1, writer_options={"compression": "zlib"})
+        for i in range(5):
+            assert enc.put(_raw(i), timeout=5)
+        assert enc.close_file()["frames_written"] == 5
+    finally:
+        enc.shutdown()
+    with BayerReader(path) as reader:
+        assert [f[0, 0] for f in reader] == [0, 1, 2, 3, 4]
+
+
+def test_convert_to_avi_matches_live_frame_size(tmp_path):
+    pytest.importorskip("cv2")
+    path = str(tmp_path / "a_flir.bayer")
+    writer = BayerWriter(path, 30.0, SIZE, fd=0.5)
+    for i in range(4):
+        writer.write(_raw(i * 10))
+    writer.release()
+
+    out_path, n = convert_to_avi(path)
+    assert out_path.endswith("a_flir.avi") and n == 4
+
+    import cv2
+    cap = cv2.VideoCapture(out_path)
+    ok, frame = cap.read()
+    cap.release()
+    assert ok and frame.shape == (SIZE[1] // 2, SIZE[0] // 2, 3)
+
+
+def test_convert_to_avi_rounds_odd_sizes_down(tmp_path):
+    pytest.importorskip("cv2")
+    path = str(tmp_path / "a_flir.bayer")
+    writer = BayerWriter(path, 30.0, (10, 6), fd=0.5)  # Demosaics to 5x3
+    for i in range(4):
+        writer.write(np.full((6, 10), i * 10, dtype=np.uint8))
+    writer.release()
+
+    out_path, n = convert_to_avi(path)
+
+    import cv2
+    cap = cv2.VideoCapture(out_path)
+    ok, frame = cap.read()
+    cap.release()
+    assert n == 4 and ok and frame.shape == (2, 4, 3)
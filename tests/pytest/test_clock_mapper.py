@@ -0,0 +1,106 @@
+"""Tests for the device-clock to LSL-clock fit (neurobooth_os/iout/clock_mapper.py)."""
+
+import math
+
+import numpy as np
+import pytest
+
+from neurobooth_os.iout.clock_mapper import ClockMapper, EnvelopeClockMapper
+
+CAMERA_EPOCH_NS = 7_200_000_000_000_000  # ~83 days of camera uptime; large enough to lose precision as a float
+
+
+def _latch(mapper, t_lsl, offset=1234.5, drift_ppm=0.0, noise=0.0):
+    """Latch a camera that reads ``(t_lsl - offset) / (1 + drift)`` seconds at LSL time ``t_lsl``."""
+    t_cam = (t_lsl - offset) / (1 + drift_ppm * 1e-6)
+    mapper.add_latch(CAMERA_EPOCH_NS + int(round(t_cam * 1e9)), t_lsl + noise)
+    return t_cam
+
+
+def test_unlatched_mapper_returns_nan():
+    mapper = ClockMapper()
+    assert math.isnan(mapper.to_local(CAMERA_EPOCH_NS))
+    assert math.isnan(mapper.residual_sec)
+
+
+def test_single_latch_maps_offset_only():
+    mapper = ClockMapper()
+    _latch(mapper, 5000.0)
+    t_cam = (5010.0 - 1234.5)
+    assert mapper.to_local(CAMERA_EPOCH_NS + int(t_cam * 1e9)) == pytest.approx(5010.0, abs=1e-6)
+    assert math.isnan(mapper.residual_sec)
+
+
+def test_recovers_offset_and_drift_from_noisy_latches():
+    rng = np.random.default_rng(0)
+    mapper = ClockMapper(window=120)
+    for t in np.arange(5000.0, 5120.0, 1.0):
+        _latch(mapper, t, drift_ppm=25.0, noise=rng.normal(0, 50e-6))
+
+    assert mapper.drift_ppm == pytest.approx(25.0, abs=2.0)
+    assert mapper.residual_sec == pytest.approx(50e-6, rel=0.3)
+    t_cam = (5200.0 - 1234.5) / (1 + 25e-6)
+    assert mapper.to_local(CAMERA_EPOCH_NS + int(round(t_cam * 1e9))) == pytest.approx(5200.0, abs=100e-6)
+
+
+def test_window_follows_a_change_in_drift():
+    mapper = ClockMapper(window=10)
+    for t in np.arange(5000.0, 5030.0, 1.0):
+        _latch(mapper, t, drift_ppm=10.0)
+    # The camera warms up and its clock rate changes; only the last 10 latches count
+    t_cam_last = (5029.0 - 1234.5) / (1 + 10e-6)
+    for i in range(1, 11):
+        mapper.add_latch(CAMERA_EPOCH_NS + int(round((t_cam_last + i) * 1e9)), 5029.0 + i * (1 + 40e-6))
+    assert mapper.drift_ppm == pytest.approx(40.0, abs=1.0)
+    assert mapper.residual_sec < 1e-6
+
+
+def _bursty_stream(mapper, seconds, drift_ppm=0.0, epoch_ms=1_700_000_000_000, t0=5000.0, seed=0):
+    """
+    Stamp a 100 Hz stream whose device clock runs ``drift_ppm`` slow, received in BLE bursts: every 7.5 ms connection
+    event delivers what was sampled since the last one, after a 2-6 ms delay. Returns (true times, stamps, receives).
+    """
+    rng = np.random.default_rng(seed)
+    true, stamps, received = [], [], []
+    for i in range(int(seconds * 100)):
+        t = t0 + i * 0.01
+        event = t0 + (np.floor((t - t0) / 0.0075) + 1) * 0.0075
+        local = event + rng.uniform(0.002, 0.006)
+        stamps.append(mapper.stamp(epoch_ms + 10 * i / (1 + drift_ppm * 1e-6), local))
+        true.append(t)
+        received.append(local)
+    return np.array(true), np.array(stamps), np.array(received)
+
+
+def test_envelope_mapper_removes_burst_jitter():
+    mapper = EnvelopeClockMapper(window=60)
+    true, stamps, received = _bursty_stream(mapper, 60, drift_ppm=30.0)
+
+    settled = slice(1000, None)  # After the first 10 bins
+    error = stamps[settled] - true[settled]
+    assert np.ptp(received[settled] - true[settled]) > 0.008
+    assert np.ptp(error) < 0.001
+    assert np.min(error) > 0.0015  # Keeps the smallest delay rather than guessing it away
+    assert mapper.drift_ppm == pytest.approx(30.0, abs=10.0)
+    assert np.all(stamps <= received)
+
+
+def test_envelope_mapper_ignores_a_stalled_bin():
+    mapper = EnvelopeClockMapper(window=30, bin_sec=0.5)
+    for i in range(3000):
+        t = 5000.0 + i * 0.01
+        stall = 0.2 if 1000 <= i < 1100 else 0.0  # A whole second where every sample was held up
+        mapper.stamp(1_700_000_000_000 + 10 * i, t + 0.003 + stall)
+    assert mapper.drift_ppm == pytest.approx(0.0, abs=1.0)
+    assert mapper.residual_sec < 1e-6
+
+
+def test_envelope_mapper_starts_over_when_the_device_clock_jumps():
+    mapper = EnvelopeClockMapper(bin_sec=0.5)
+    for i in range(300):
+        mapper.stamp(1_700_000_000_000 + 10 * i, 5000.0 + i * 0.01 + 0.003)
+    # Reconnected: the device epoch was set again, an hour away from the old fit
+    first = mapper.stamp(1_700_003_600_000, 5003.0 + 0.003)
+    assert first == 5003.003
+    assert mapper.n_resets == 1
+    assert mapper.n_latches == 0
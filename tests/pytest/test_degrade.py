@@ -0,0 +1,119 @@
+"""Tests for adaptive camera degradation under CPU pressure (neurobooth_os/iout/degrade.py)."""
+
+import json
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from neurobooth_os.iout.degrade import (
+    DEGRADE_STEPS,
+    DegradeController,
+    resize_for_encoding,
+    scaled_frame_size,
+)
+from neurobooth_os.iout.device import Device, DeviceCapability
+
+
+class _Camera(Device):
+    capabilities = DeviceCapability.RECORD | DeviceCapability.DEGRADABLE
+
+    def __init__(self, device_id, priority, steps=DEGRADE_STEPS):
+        self.device_args = SimpleNamespace(device_id=device_id, sensor_ids=[], degrade_priority=priority)
+        super().__init__(self.device_args)
+        self.steps = steps
+        self.load = {}
+
+    def connect(self):
+        pass
+
+    def start(self, filename=None):
+        return []
+
+    def stop(self):
+        pass
+
+    def degrade_steps(self):
+        return self.steps
+
+    def degrade_load(self):
+        return self.load
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _controller(devices, cpu, clock, hold_sec=10.0):
+    return DegradeController({d.device_id: d for d in devices}, hold_sec=hold_sec, cpu_percent=lambda: cpu[0],
+                             clock=clock)
+
+
+def test_pressure_degrades_least_important_camera_first():
+    webcam, intel, flir = _Camera("webcam", 0), _Camera("intel", 1, ("resize",)), _Camera("flir", 5)
+    never = _Camera("never", None)
+    cpu, clock = [95.0], _Clock()
+    controller = _controller([flir, webcam, intel, never], cpu, clock)
+    assert set(controller.devices) == {"webcam", "intel", "flir"}
+
+    changed = []
+    for _ in range(6):
+        marker = controller.step()
+        if marker:
+            changed.append((marker["device_id"], marker["level"]))
+        clock.now += 5.0  # Two polls per hold period
+    assert changed == [("webcam", 1), ("webcam", 2), ("intel", 1)]
+    assert webcam._degraded("preview") and webcam._degraded("resize")
+    assert not flir._degraded("preview")
+
+
+def test_relief_restores_most_important_camera_first_with_hysteresis():
+    low, high = _Camera("low", 0), _Camera("high", 5)
+    low.degrade_level, high.degrade_level = 2, 1
+    cpu, clock = [80.0], _Clock()
+    controller = _controller([low, high], cpu, clock, hold_sec=0.0)
+
+    assert controller.step() is None  # Between the low and high marks: no change either way
+    cpu[0] = 20.0
+    assert [controller.step()["device_id"] for _ in range(3)] == ["high", "low", "low"]
+    assert controller.step() is None
+    assert low.degrade_level == high.degrade_level == 0
+
+
+def test_backed_up_encoder_is_pressure_even_with_spare_cpu(caplog):
+    slow, other = _Camera("slow", 5), _Camera("other", 0)
+    slow.load = {"fill": 0.1, "encode_ms": 40.0, "frame_ms": 1e3 / 30}
+    other.load = {"fill": 0.0, "encode_ms": 2.0, "frame_ms": 1e3 / 30}
+    cpu, clock = [50.0], _Clock()
+    controller = _controller([slow, other], cpu, clock)
+
+    with caplog.at_level(logging.WARNING):
+        marker = controller.step()
+    assert marker["device_id"] == "other"  # The least important camera sheds work, whichever camera is behind
+    assert marker["steps"] == ["preview"]
+    assert any("slow encode" in reason for reason in marker["reasons"])
+    logged = [r.getMessage() for r in caplog.records if r.getMessage().startswith("DEGRADE MARKER: ")]
+    assert json.loads(logged[0].split(": ", 1)[1])["device_id"] == "other"
+
+    slow.load["encode_ms"] = 2.0
+    slow.load["fill"] = 0.6
+    clock.now += 10.0
+    assert controller.step()["device_id"] == "other"
+
+
+def test_scaled_frame_size_is_even():
+    assert scaled_frame_size((1920, 1080), 0.5) == (960, 540)
+    assert scaled_frame_size((1018, 766), 0.5) == (508, 382)
+    assert scaled_frame_size((6, 4), 0.1) == (2, 2)
+
+
+def test_resize_for_encoding_passes_matching_frames_through():
+    frame = np.zeros((4, 6, 3), dtype=np.uint8)
+    assert resize_for_encoding(frame, (6, 4)) is frame
+    pytest.importorskip("cv2")
+    assert resize_for_encoding(np.zeros((8, 12, 3), dtype=np.uint8), (6, 4)).shape == (4, 6, 3)
@@ -68,6 +68,57 @@ class TestBringUpDefault:
         device.bring_up({"psychopy_window": MagicMock(), "extra": 42})
         assert device.streaming
 
+    def test_bring_up_group_brings_up_each_device_in_order(self):
+        devices = [MockStreamDevice(device_id='d1'), MockRecordingDevice(device_id='d2')]
+        assert MockStreamDevice.bring_up_group(devices, {}) == devices
+        assert devices[0].streaming
+        assert devices[1].state == DeviceState.CONNECTED
+
+
+class TestCreateStreamsGroupBringUp:
+    """Devices of a GROUP_BRING_UP class are handed to bring_up_group together."""
+
+    def test_group_devices_share_one_bring_up_call(self, dm, monkeypatch):
+        from neurobooth_os.iout import lsl_streamer, mbient
+        from neurobooth_os.iout.mock.mock_mbient import MockMbient
+        from neurobooth_os.iout.stim_param_reader import MbientSensorArgs, MockMbientDeviceArgs
+
+        def mbient_args(name):
+            sensors = [
+                MbientSensorArgs.model_construct(sensor_id='acc1', sample_rate=100, data_range=8),
+                MbientSensorArgs.model_construct(sensor_id='gyro1', sample_rate=100, data_range=2000),
+            ]
+            return MockMbientDeviceArgs.model_construct(
+                ENV_devices={}, device_id=f'Mbient_{name}_1', sensor_ids=['acc1', 'gyro1'],
+                sensor_array=sensors, mac='AA:BB:CC:DD:EE:FF', device_name=name,
+            )
+
+        all_args = {a.device_id: a for a in (mbient_args('LF'), mbient_args('RF'))}
+        dm.assigned_devices = ['Mbient_LF_1', 'Mbient_RF_1']
+        monkeypatch.setattr(DeviceManager, '_get_unique_devices', staticmethod(lambda task_params: all_args))
+        monkeypatch.setattr(lsl_streamer, 'active_mock_targets', lambda: set())
+        monkeypatch.setattr(mbient, 'DISABLE_LSL', True)
+        monkeypatch.setattr(mbient, 'post_message', lambda msg: None)
+        groups = []
+        real_bring_up_group = MockMbient.bring_up_group.__func__
+
+        def recording_bring_up_group(cls, devices, context):
+            groups.append([d.device_id for d in devices])
+            return real_bring_up_group(cls, devices, context)
+
+        monkeypatch.setattr(MockMbient, 'bring_up_group', classmethod(recording_bring_up_group))
+        try:
+            dm.create_streams(task_params={})
+            assert groups == [['Mbient_LF_1', 'Mbient_RF_1']]
+            assert sorted(dm.streams) == ['Mbient_LF_1', 'Mbient_RF_1']
+            assert all(d.streaming for d in dm.streams.values())
+            monitor, = dm.supervisors  # WEARABLE devices are supervised together
+            assert all(d.health_monitor is monitor for d in dm.streams.values())
+        finally:
+            dm.close_streams()
+        assert dm.supervisors == ()
+        assert not monitor.is_alive()
+
 
 # ---------------------------------------------------------------------------
 # Device.frame_preview default
@@ -131,6 +182,15 @@ class TestDeviceManagerHooks:
 
         device.on_task_reconnect.assert_called_once()
 
+    def test_finish_task_calls_hook_on_every_device(self, dm):
+        d1 = MockStreamDevice(device_id='d1')
+        d1.on_task_end = MagicMock()
+        dm.streams = {'d1': d1, 'raw_outlet': object()}
+
+        dm.finish_task()
+
+        d1.on_task_end.assert_called_once()
+
     def test_reset_devices_only_calls_resettable_devices(self, dm):
         """reset_devices must filter by RESETTABLE so the operator's UI only
         shows devices that actually performed a reset (today: Mbients).
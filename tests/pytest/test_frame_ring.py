@@ -0,0 +1,91 @@
+"""Tests for the FLIR capture/save frame ring (neurobooth_os/iout/frame_ring.py)
+and the pure summary layer of extras/perf/flir_ring_bench.py."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import flir_ring_bench as bench
+from neurobooth_os.iout.frame_ring import FrameRing
+
+SHAPE = (4, 6, 3)
+
+
+def _frame(value):
+    return np.full(SHAPE, value, dtype=np.uint8)
+
+
+def test_fifo_and_metadata():
+    ring = FrameRing(3, SHAPE)
+    assert ring.put(_frame(1), "a")
+    assert ring.put(_frame(2), "b")
+    slot, frame, meta = ring.get(timeout=0)
+    assert (frame == 1).all() and meta == "a"
+    ring.release(slot)
+    slot, frame, meta = ring.get(timeout=0)
+    assert (frame == 2).all() and meta == "b"
+    assert ring.stats()["max_depth"] == 2
+
+
+def test_drop_newest_never_touches_queued_or_held_frames():
+    ring = FrameRing(2, SHAPE, policy="drop_newest")
+    ring.put(_frame(1))
+    held, held_frame, _ = ring.get(timeout=0)
+    ring.put(_frame(2))
+    assert not ring.put(_frame(3))  # both slots in use: one held, one queued
+    assert (held_frame == 1).all()
+    ring.release(held)
+    _, frame, _ = ring.get(timeout=0)
+    assert (frame == 2).all()
+    assert ring.stats()["frames_dropped"] == 1
+
+
+def test_block_waits_for_consumer_then_times_out():
+    ring = FrameRing(1, SHAPE, policy="block")
+    ring.put(_frame(1))
+    slot, _, _ = ring.get(timeout=0)
+
+    threading.Timer(0.05, ring.release, args=(slot,)).start()
+    assert ring.put(_frame(2), timeout=2)  # freed by the consumer while blocked
+    assert ring.stats()["blocked_sec"] > 0
+
+    t0 = time.monotonic()
+    assert not ring.put(_frame(3), timeout=0.05)
+    assert time.monotonic() - t0 < 1
+    assert ring.stats()["frames_dropped"] == 1
+
+
+def test_close_drains_then_ends_consumer():
+    ring = FrameRing(2, SHAPE)
+    ring.put(_frame(1))
+    ring.close()
+    assert not ring.put(_frame(2))
+    slot, _, _ = ring.get(timeout=0)
+    ring.release(slot)
+    assert ring.get(timeout=5) is None  # returns immediately once closed and empty
+    assert ring.closed
+
+
+def test_reset_keeps_storage():
+    ring = FrameRing(2, SHAPE)
+    storage = ring._frames
+    ring.put(_frame(1))
+    ring.close()
+    ring.reset()
+    assert not ring.closed and ring.depth() == 0 and ring.stats()["frames_queued"] == 0
+    assert ring._frames is storage
+
+
+def test_rejects_bad_config():
+    with pytest.raises(ValueError):
+        FrameRing(0, SHAPE)
+    with pytest.raises(ValueError):
+        FrameRing(2, SHAPE, policy="drop_oldest")
+
+
+def test_bench_summarize_bounded():
+    assert bench.summarize([100.0, 110.0, 105.0], buffer_mb=50.0)["bounded"]
+    unbounded = bench.summarize([100.0, 300.0, 500.0], buffer_mb=None)
+    assert unbounded["rss_growth_mb"] == 400.0 and unbounded["bounded"] is False
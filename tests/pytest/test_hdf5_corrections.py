@@ -0,0 +1,43 @@
+"""Tests for the in-memory HDF5 corrections (neurobooth_os/iout/hdf5_corrections.py)."""
+
+import json
+
+import numpy as np
+
+from neurobooth_os.iout.hdf5_corrections import correct_yeti_per_sample
+from neurobooth_os.iout.split_xdf import DeviceData
+
+
+def _yeti_data(data_version, time_series, time_stamps, nominal_srate):
+    device_data = {
+        'info': {
+            'channel_count': [str(time_series.shape[1])],
+            'nominal_srate': [str(nominal_srate)],
+            'desc': [{'data_version': [data_version], 'device_id': ['Mic_Yeti_dev_1']}],
+        },
+        'time_series': time_series,
+        'time_stamps': time_stamps,
+    }
+    return DeviceData('Mic_Yeti_dev_1', device_data, None, ['Mic_Yeti_sens_1'], 'unused.hdf5')
+
+
+def test_chunked_yeti_stream_becomes_one_sample_per_frame():
+    chunks = np.array([[460, 1, 2, 3, 4], [462, 5, 6, 7, 8]], dtype=np.int16)  # ElapsedTime + 4 frames at 100 Hz
+    data = correct_yeti_per_sample(_yeti_data('1.0', chunks, np.array([10.0, 10.04]), nominal_srate=25.0))
+
+    device_data = data.device_data
+    np.testing.assert_array_equal(device_data['time_series'][:, 0], np.arange(1, 9))
+    np.testing.assert_allclose(device_data['time_stamps'], 9.97 + 0.01 * np.arange(8))  # Each chunk ends at its stamp
+    assert device_data['info']['channel_count'] == ['1']
+    assert float(device_data['info']['nominal_srate'][0]) == 100.0
+    desc = device_data['info']['desc'][0]
+    assert desc['data_version'] == ['2.0'] and desc['converted_from_data_version'] == ['1.0']
+    assert json.loads(desc['column_names'][0]) == ['Amplitude']
+
+
+def test_per_sample_yeti_stream_is_unchanged():
+    frames = np.arange(8, dtype=np.int16).reshape(-1, 1)
+    stamps = np.arange(8) / 100.0
+    data = correct_yeti_per_sample(_yeti_data('2.0', frames, stamps, nominal_srate=100.0))
+    assert data.device_data['time_series'] is frames
+    assert data.device_data['time_stamps'] is stamps
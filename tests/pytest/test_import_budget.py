@@ -0,0 +1,67 @@
+"""Unit tests for extras/perf/import_budget.py.
+
+The pure parse/summarize/compare layer is tested on canned ``-X importtime``
+output; one test runs the real subprocess on a stdlib module.
+"""
+
+import import_budget as ib
+
+_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       200 |        200 |     numpy.core._multiarray_umath
+import time:       800 |       1000 |   numpy
+import time:      1500 |       1500 |     matplotlib.pyplot
+import time:       500 |       2000 |   matplotlib
+import time:       100 |       3100 | neurobooth_os.gui
+Traceback (most recent call last):
+"""
+
+
+def test_parse_importtime_rows_and_depth():
+    rows = ib.parse_importtime(_SAMPLE)
+    assert [r["module"] for r in rows] == [
+        "numpy.core._multiarray_umath", "numpy", "matplotlib.pyplot", "matplotlib", "neurobooth_os.gui",
+    ]
+    assert [r["depth"] for r in rows] == [2, 1, 2, 1, 0]
+    assert rows[-1]["cumulative_us"] == 3100
+
+
+def test_summarize_self_time_is_additive():
+    s = ib.summarize(ib.parse_importtime(_SAMPLE))
+    assert s["total_ms"] == 3.1
+    assert s["packages_ms"] == {"matplotlib": 2.0, "numpy": 1.0, "neurobooth_os": 0.1}
+    assert s["top"][0] == "matplotlib"
+
+
+def test_eager_violations_per_entry():
+    rows = ib.parse_importtime(_SAMPLE)
+    assert ib.eager_violations("gui", rows) == ["matplotlib"]
+    assert ib.eager_violations("server_stm", rows) == []
+
+
+def test_compare_and_verdict():
+    current = {"gui": {"total_ms": 130.0, "eager": []}, "server_acq": {"total_ms": 90.0, "eager": []}}
+    baseline = {"gui": {"total_ms": 100.0}}
+    deltas = ib.compare(current, baseline, tolerance=0.25)
+    assert deltas["gui"]["over_budget"] is True
+    assert deltas["gui"]["delta_ms"] == 30.0
+    assert deltas["server_acq"]["baseline_ms"] is None
+    assert ib.derive_verdict(current, deltas)["category"] == "DEGRADED"
+    assert ib.derive_verdict(current, ib.compare(current, baseline, tolerance=0.5))["category"] == "OK"
+
+
+def test_verdict_flags_eager_import_without_baseline():
+    v = ib.derive_verdict({"server_acq": {"total_ms": 1.0, "eager": ["PySpin"]}}, None)
+    assert v["category"] == "DEGRADED"
+    assert any("PySpin" in r for r in v["reasons"])
+
+
+def test_measure_stdlib_module():
+    rows, error = ib.measure("json")
+    assert error is None
+    assert any(r["module"] == "json" and r["depth"] == 0 for r in rows)
+
+
+def test_verdict_incomplete_when_entry_fails_to_import():
+    v = ib.derive_verdict({}, None, failed=["server_acq"])
+    assert v["category"] == "INCOMPLETE"
@@ -0,0 +1,99 @@
+"""Tests for ``HotPathLogger`` (log_manager): sampled emission, lazy formatting,
+and per-task summary flushing for per-frame / per-sample code paths."""
+from __future__ import annotations
+
+import json
+import logging
+
+import pytest
+
+import neurobooth_os.log_manager as lm
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def logger():
+    log = logging.getLogger("test_hot_path")
+    log.propagate = False
+    log.setLevel(logging.DEBUG)
+    handler = _ListHandler()
+    log.addHandler(handler)
+    log.records = handler.records
+    yield log
+    log.removeHandler(handler)
+
+
+def test_sample_every_n(logger):
+    hot = lm.HotPathLogger(logger, device="dev_1")
+    emitted = [hot.sample("site", logging.DEBUG, "frame %d", i, every_n=10) for i in range(25)]
+    assert sum(emitted) == 3
+    assert [r.getMessage() for r in logger.records] == ["frame 0", "frame 10", "frame 20"]
+    assert logger.records[0].device == "dev_1"
+
+
+def test_sample_every_sec(logger, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(lm.time, "monotonic", lambda: now[0])
+    hot = lm.HotPathLogger(logger)
+    assert hot.sample("site", logging.DEBUG, "a", every_sec=5)
+    now[0] += 1
+    assert not hot.sample("site", logging.DEBUG, "b", every_sec=5)
+    assert hot.sample("other", logging.DEBUG, "c", every_sec=5)  # limits are per call site
+    now[0] += 5
+    assert hot.sample("site", logging.DEBUG, "d", every_sec=5)
+    assert [r.getMessage() for r in logger.records] == ["a", "c", "d"]
+
+
+def test_sample_disabled_level_does_not_format(logger):
+    class Exploding:
+        def __str__(self):
+            raise AssertionError("formatted while disabled")
+
+    logger.setLevel(logging.INFO)
+    hot = lm.HotPathLogger(logger)
+    assert not hot.sample("site", logging.DEBUG, "%s", Exploding())
+    assert logger.records == []
+
+
+def test_sample_reports_caller_location(logger):
+    hot = lm.HotPathLogger(logger)
+    hot.sample("site", logging.INFO, "here")
+    assert logger.records[0].funcName == "test_sample_reports_caller_location"
+
+
+def test_flush_summarizes_and_resets(logger):
+    hot = lm.HotPathLogger(logger, device="dev_1")
+    for depth in (1, 4, 2):
+        hot.count("frames")
+        hot.observe("queue_depth", depth)
+    hot.count("grab_errors", 2)
+
+    summary = hot.flush("FLIR")
+    assert summary["counters"] == {"frames": 3, "grab_errors": 2}
+    assert summary["stats"]["queue_depth"] == {"n": 3, "mean": pytest.approx(7 / 3), "min": 1, "max": 4}
+
+    (record,) = logger.records
+    assert record.levelno == logging.INFO
+    assert record.getMessage().startswith("HOTPATH SUMMARY FLIR: ")
+    assert json.loads(record.getMessage().split(": ", 1)[1])["counters"]["frames"] == 3
+
+    assert hot.flush("FLIR") is None  # reset, and nothing logged for an empty period
+    assert len(logger.records) == 1
+
+
+def test_histogram_buckets_and_flush(logger):
+    hot = lm.HotPathLogger(logger)
+    for value in (0.5, 1, 3, 3.9, 4, 100):
+        hot.histogram("decode_ms", value, (1, 2, 4))
+
+    summary = hot.flush("Webcam")
+    assert summary["histograms"] == {"decode_ms": {"edges": [1, 2, 4], "counts": [1, 1, 2, 2]}}
+    assert hot.flush("Webcam") is None
@@ -8,7 +8,9 @@ only ``print()``'d to a hidden console.
 """
 from __future__ import annotations
 
+import json
 import logging
+import time
 from unittest.mock import MagicMock
 
 import pytest
@@ -41,7 +43,8 @@ def handler(monkeypatch, tmp_path):
     h = lm.PostgreSQLHandler(logging.DEBUG)
     h._reconnect_interval_sec = 0.0  # don't rate-limit reconnects in tests
     h._conns = conns
-    return h
+    yield h
+    h.close()
 
 
 def test_emit_happy_path_inserts(handler):
@@ -68,12 +71,70 @@ def test_emit_falls_back_to_file_when_db_down(handler, monkeypatch, tmp_path):
     )
 
     handler.emit(_record("must-not-be-lost"))
+    handler.flush()
 
     fallback = tmp_path / "neurobooth_db_log_fallback.log"
     assert fallback.exists()
     assert "must-not-be-lost" in fallback.read_text()
 
 
+def test_outage_diverts_without_touching_db(handler, monkeypatch, tmp_path):
+    handler.cursor.execute.side_effect = Exception("db down")
+    connect = MagicMock(side_effect=Exception("cannot connect"))
+    monkeypatch.setattr(lm.metadator, "get_database_connection", connect)
+    handler._reconnect_interval_sec = 60.0  # keep the background reconnect out of the way
+    handler._last_reconnect_attempt = 0.0
+
+    handler.emit(_record("first"))
+    assert connect.call_count == 1  # the one inline reconnect on the first failure
+    handler.emit(_record("second"))
+    handler.emit(_record("third"))
+
+    # Once the outage is known, logging callers neither query nor reconnect.
+    assert connect.call_count == 1
+    assert handler.cursor.execute.call_count == 1
+    handler.flush()
+    rows = [json.loads(line) for line in (tmp_path / lm.FALLBACK_LOG_NAME).read_text().splitlines()]
+    assert [r["message"] for r in rows] == ["first", "second", "third"]
+    assert rows[0]["fallback_reason"].startswith("DB log write failed")
+    assert rows[1]["fallback_reason"] == "DB unavailable"
+
+
+def test_recovery_reports_outage(handler, monkeypatch, caplog):
+    handler.cursor.execute.side_effect = Exception("db down")
+    good_conn = MagicMock(name="recovered")
+    attempts = MagicMock(side_effect=[Exception("cannot connect"), Exception("still down"), good_conn])
+    monkeypatch.setattr(lm.metadator, "get_database_connection", attempts)
+    handler._reconnect_interval_sec = 0.01
+
+    with caplog.at_level(logging.WARNING, logger=lm.APP_LOG_NAME):
+        handler.emit(_record("during outage"))
+        deadline = time.monotonic() + 5
+        while handler._db_down_since is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert handler._db_down_since is None
+    assert handler.connection is good_conn
+    assert any("DB logging restored" in r.getMessage() and "1 records written" in r.getMessage()
+               for r in caplog.records)
+    handler.emit(_record("after"))
+    good_conn.cursor.return_value.execute.assert_called_once()
+
+
+def test_fallback_writer_is_bounded(tmp_path):
+    path = tmp_path / "fallback.log"
+    writer = lm.FallbackLogWriter(str(path), capacity=2)
+    for i in range(5):
+        writer.submit(f"line {i}\n")
+    assert writer.dropped == 3
+
+    writer.start()
+    assert writer.flush()
+    writer.stop()
+    assert path.read_text().splitlines() == ["line 3", "line 4"]
+    assert writer.written == 2
+
+
 def test_emit_never_raises(handler, monkeypatch):
     # Even if building the row blows up, emit must not propagate.
     monkeypatch.setattr(
@@ -0,0 +1,45 @@
+"""Tests for micro-batched LSL pushes (neurobooth_os/iout/lsl_batch.py)."""
+
+from neurobooth_os.iout.lsl_batch import SampleBatcher
+
+
+class _Outlet:
+    def __init__(self):
+        self.chunks = []
+
+    def push_chunk(self, samples, timestamps):
+        self.chunks.append((samples, timestamps))
+
+
+def test_single_sample_batches_push_every_sample():
+    outlet = _Outlet()
+    batcher = SampleBatcher(outlet.push_chunk, max_samples=1)
+    for i in range(3):
+        batcher.push([i, 0], 10.0 + i)
+    assert outlet.chunks == [([[0, 0]], [10.0]), ([[1, 0]], [11.0]), ([[2, 0]], [12.0])]
+
+
+def test_pushes_when_full_keeping_per_sample_timestamps():
+    outlet = _Outlet()
+    batcher = SampleBatcher(outlet.push_chunk, max_samples=4, max_latency_sec=1.0)
+    for i in range(10):
+        batcher.push([i], 100.0 + i * 0.005)
+    assert [len(s) for s, _ in outlet.chunks] == [4, 4]
+    assert outlet.chunks[1][1] == [100.0 + i * 0.005 for i in range(4, 8)]
+    assert len(batcher) == 2
+    batcher.flush()
+    assert [s[0] for s in outlet.chunks[-1][0]] == [8, 9]
+    batcher.flush()  # Nothing waiting: no empty chunk
+    assert len(outlet.chunks) == 3
+
+
+def test_pushes_when_oldest_sample_reaches_latency_bound():
+    outlet = _Outlet()
+    batcher = SampleBatcher(outlet.push_chunk, max_samples=100, max_latency_sec=0.02)
+    for t in (0.0, 0.011, 0.019):
+        batcher.push([t], t)
+    assert outlet.chunks == []
+    batcher.push([0.021], 0.021)  # 21 ms after the oldest waiting sample
+    assert [len(s) for s, _ in outlet.chunks] == [4]
+    batcher.push([0.03], 0.03)  # The bound restarts from the new oldest sample
+    assert len(outlet.chunks) == 1
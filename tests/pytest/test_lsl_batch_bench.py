@@ -0,0 +1,23 @@
+"""Unit tests for the pure layer of extras/perf/lsl_batch_bench.py (the mock-camera runs need liblsl)."""
+
+import lsl_batch_bench as b
+
+
+def _run(cpu, p95):
+    return {"cpu_percent": cpu, "latency_ms": {"samples": 100, "p50": p95 / 2, "p95": p95, "max": p95}}
+
+
+def test_summarize_latency():
+    assert b.summarize_latency([])["p95"] is None
+    summary = b.summarize_latency([float(i) for i in range(101)])
+    assert summary["samples"] == 101 and summary["p50"] == 50.0 and summary["p95"] == 95.0
+
+
+def test_verdict_flags_latency_over_bound_and_cpu_regression():
+    args = b.parse_args(["--latency-ms", "20", "--flir-fps", "196", "--intel-fps", "90"])
+    ok = b.derive_verdict({"per_frame": _run(30.0, 1.0), "batched": _run(20.0, 15.0)}, args)
+    assert ok["category"] == "OK"
+
+    # Bound is 20 ms + one 90 fps frame interval + slack, ~36 ms
+    slow = b.derive_verdict({"per_frame": _run(30.0, 1.0), "batched": _run(35.0, 50.0)}, args)
+    assert slow["category"] == "DEGRADED" and len(slow["reasons"]) == 2
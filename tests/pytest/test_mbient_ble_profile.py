@@ -0,0 +1,64 @@
+"""Unit tests for the pure layer of extras/perf/mbient_ble_profile.py (the sweeps themselves need the mbient stack)."""
+
+import mbient_ble_profile as p
+
+
+def _result(interval, odr, fused=True, loss=0.0, p95=10.0, airtime=20.0, latency=0):
+    return {"interval_ms": interval, "latency": latency, "odr_hz": odr, "sensor_fusion": fused,
+            "loss_pct": loss, "delay_ms": {"p50": p95 / 2, "p95": p95, "max": p95 * 2}, "airtime_pct": airtime,
+            "links_dropped": 0}
+
+
+def test_sweep_grid_covers_every_combination_fused_first():
+    grid = p.sweep_grid([7.5, 15.0], [0, 4], [50, 100, 200])
+    assert len(grid) == 24
+    assert grid[0] == {"interval_ms": 7.5, "latency": 0, "odr_hz": 50, "sensor_fusion": True}
+    assert [g["sensor_fusion"] for g in grid] == [True] * 12 + [False] * 12
+
+
+def test_summarize_devices_pools_counts_and_delays():
+    per_device = [
+        {"received": 990, "expected": 1000, "loss_pct": 1.0, "gaps": 3, "delays_ms": [5.0, 15.0], "airtime_pct": 4.0},
+        {"received": 1000, "expected": 1000, "loss_pct": 0.0, "gaps": 0, "delays_ms": [10.0], "airtime_pct": 4.0},
+    ]
+    summary = p.summarize_devices(per_device, seconds=10.0)
+    assert summary["delivered_hz"] == 199.0
+    assert summary["per_device_hz"] == 99.5
+    assert summary["loss_pct"] == 0.5
+    assert summary["worst_device_loss_pct"] == 1.0
+    assert summary["gaps"] == 3
+    assert summary["delay_ms"] == {"p50": 10.0, "p95": 14.5, "max": 15.0}
+    assert summary["airtime_pct"] == 8.0
+    # Hardware summaries carry no delays or airtime
+    hardware = p.summarize_devices([{"received": 10, "expected": 10, "loss_pct": 0.0, "gaps": 0}], 1.0)
+    assert hardware["delay_ms"] is None and hardware["airtime_pct"] is None
+
+
+def test_recommend_picks_least_airtime_meeting_targets():
+    results = [
+        _result(7.5, 100, airtime=40.0),
+        _result(30.0, 100, airtime=20.0),
+        _result(50.0, 100, loss=5.0, airtime=16.0),  # Too lossy
+        _result(30.0, 50, airtime=10.0),  # Too slow
+        _result(30.0, 100, fused=False, airtime=40.0),
+        _result(15.0, 100, airtime=20.0),  # Same airtime; the longer interval wins
+        _result(30.0, 200, p95=150.0, airtime=20.0),  # Too late
+    ]
+    best = p.recommend(results, min_hz=100, max_loss_pct=0.1, max_delay_ms=100)
+    assert (best["interval_ms"], best["odr_hz"], best["sensor_fusion"]) == (30.0, 100, True)
+    assert p.recommend(results, min_hz=400, max_loss_pct=0.1, max_delay_ms=100) is None
+
+
+def test_recommended_args_and_verdict():
+    best = _result(30.0, 100)
+    args = p.recommended_args(best, "mbient_acc_1", "mbient_gyro_1")
+    assert [s["sensor_id"] for s in args["sensors"]] == ["mbient_acc_1", "mbient_gyro_1"]
+    assert all(s["sample_rate"] == 100 for s in args["sensors"])
+    assert args["device_args"] == {"conn_min_interval_ms": 30.0, "conn_max_interval_ms": 30.0, "conn_latency": 0,
+                                   "sensor_fusion": True}
+
+    result = {"config": {"devices": 5}, "targets": {"min_hz": 100, "max_loss_pct": 0.1, "max_delay_ms": 100},
+              "recommended": None}
+    assert p.derive_verdict(result)["category"] == "DEGRADED"
+    result["recommended"] = args
+    assert p.derive_verdict(result)["category"] == "OK"
@@ -122,6 +122,43 @@ def test_derive_verdict_flags_low_ok_fraction():
     assert v["remediation_hints"]
 
 
+def _callback_us(n, mean, peak, counts):
+    return {"n": n, "mean": mean, "max": peak, "edges": [10, 20, 50], "counts": counts}
+
+
+def test_summarize_callback_us_pools_cycle_histograms():
+    cycles = [
+        {"callback_us": _callback_us(10, 12.0, 30.0, [2, 7, 1, 0])},
+        {"callback_us": _callback_us(10, 18.0, 80.0, [0, 8, 1, 1])},
+        {"callback_us": None},  # LSL off or failed cycle
+    ]
+    cb = s.summarize_callback_us(cycles)
+    assert cb["n"] == 20
+    assert cb["mean"] == pytest.approx(15.0)
+    assert cb["max"] == 80.0
+    assert cb["p50"] == 20  # ranks 3-17 are in the [10, 20) bucket
+    assert cb["p95"] == 50  # rank 19 is in [20, 50)
+    assert cb["p99"] == 80.0  # rank 19.8 is in the open top bucket: report the max
+
+
+def test_summarize_callback_us_empty():
+    cb = s.summarize_callback_us([{"ok": True}])
+    assert cb == {"n": 0, "mean": None, "max": None, "p50": None, "p95": None, "p99": None}
+    assert s.summarize_cycles([])["callback_us"]["n"] == 0
+
+
+def test_derive_verdict_flags_slower_ring_callback():
+    m = s.summarize_cycles([{"ok": True, "samples": 1, "expected_samples": 1}])
+    faster = s.compare_callback({"p95": 50}, {"p95": 20})
+    assert faster["p95_ratio"] == pytest.approx(0.4)
+    v = s.derive_verdict(m, {"crashed": False}, faster)
+    assert not any("sample ring" in r for r in v["reasons"])
+
+    slower = s.compare_callback({"p95": 20}, {"p95": 50})
+    v = s.derive_verdict(m, {"crashed": False}, slower)
+    assert any("sample ring" in r for r in v["reasons"])
+
+
 # --- synthetic #669 co-runner ---------------------------------------------
 
 
@@ -196,7 +233,51 @@ def test_run_soak_worker_end_to_end_mock(tmp_path):
     assert recs[0]["ok"] is True
     assert recs[0]["connect_ms"] is not None
     assert recs[0]["samples"] is not None
+    assert recs[0]["callback_us"]["n"] == recs[0]["samples"]
 
     m = s.summarize_cycles(recs)
     assert m["n_cycles"] == len(recs)
     assert m["ok_fraction"] == pytest.approx(1.0)
+
+
+# --- simulated-SDK soak worker --------------------------------------------
+
+
+def test_resolve_device_list_makes_up_sim_devices():
+    out = s.resolve_device_list([], None, False, 3, sim=True)
+    assert [name for name, _ in out] == ["SIM-0", "SIM-1", "SIM-2"]
+    assert len({mac for _, mac in out}) == 3
+
+
+def test_run_soak_worker_end_to_end_sim(tmp_path):
+    """Drive the production Mbient (not the mock) through one soak cycle
+    against the simulated MetaWear SDK, reset_and_reconnect included."""
+    import neurobooth_os.iout.mbient as mb
+
+    saved = (mb.DISABLE_LSL, mb.post_message, mb.MetaWear, mb.Mbient.SCAN_PERFORMED)
+    mb.Mbient.SCAN_PERFORMED = True  # scan_BLE waits its full timeout for < 5 devices
+    jsonl = tmp_path / "c.jsonl"
+    cfg = {
+        "devices": s.resolve_device_list([], None, False, 1, sim=True),
+        "duration_s": 0.05,
+        "stream_seconds": 0.3,
+        "acc_hz": 100,
+        "gyro_hz": 100,
+        "data_range": 8,
+        "with_iphone": False,
+        "mock": False,
+        "sim": True,
+        "log_file": str(tmp_path / "a.log"),
+    }
+    try:
+        rc = s.run_soak_worker(cfg, str(jsonl))
+    finally:
+        mb.DISABLE_LSL, mb.post_message, _, mb.Mbient.SCAN_PERFORMED = saved
+
+    assert rc == 0
+    assert mb.MetaWear is saved[2]  # The simulated SDK is uninstalled
+    recs = [json.loads(ln) for ln in jsonl.read_text().splitlines() if ln.strip()]
+    assert recs[0]["ok"] is True, recs[0]["error"]
+    assert recs[0]["samples"] > 0
+    assert recs[0]["reset_ms"] is not None
+    assert recs[0]["ble_disconnects"] >= 1  # The board reset drops the link
@@ -0,0 +1,21 @@
+"""Unit tests for the pure layer of extras/perf/mic_alloc_bench.py (the mock-mic runs need liblsl)."""
+
+import mic_alloc_bench as b
+
+
+def _path(alloc, cpu):
+    return {"chunks": 10, "alloc_bytes_per_chunk": alloc, "retained_blocks": 0, "cpu_ms_per_audio_sec": cpu}
+
+
+def test_summarize():
+    summary = b.summarize({"cpu_sec": 0.02, "peak_bytes": [100, 300], "retained_blocks": 2}, audio_sec=10.0)
+    assert summary == {"chunks": 2, "alloc_bytes_per_chunk": 200.0, "retained_blocks": 2,
+                       "cpu_ms_per_audio_sec": 2.0}
+    assert b.summarize({"cpu_sec": 0.0, "peak_bytes": [], "retained_blocks": 0}, 0.0)["alloc_bytes_per_chunk"] is None
+
+
+def test_verdict_flags_allocation_and_cpu_regressions():
+    ok = b.derive_verdict({"legacy": _path(8000.0, 0.5), "preallocated": _path(80.0, 0.1)})
+    assert ok["category"] == "OK"
+    worse = b.derive_verdict({"legacy": _path(80.0, 0.1), "preallocated": _path(8000.0, 0.5)})
+    assert worse["category"] == "DEGRADED" and len(worse["reasons"]) == 2
@@ -6,6 +6,8 @@ Exercise ``MockVidRec_Flir`` end-to-end without ``PySpin`` installed.
 import os
 import time
 
+import cv2
+import numpy as np
 import pytest
 
 from neurobooth_os.iout import flir_cam as flir_mod
@@ -91,17 +93,52 @@ class TestMockVidRecFlirLifecycle:
         finally:
             device.close()
 
-    def test_frame_preview_returns_png_bytes(self, mock_args):
+    def test_continuous_acquisition_rotates_files(self, mock_args, tmp_path):
+        mock_args.continuous_acquisition = True
+        device = MockVidRec_Flir(device_args=mock_args)
+        try:
+            device.connect()
+            threads = []
+            for task in ("task_a", "task_b"):
+                files = device.start(str(tmp_path / task))
+                assert files == [f"{task}_flir.avi"]
+                threads.append(device.video_thread)
+                time.sleep(RECORDING_WINDOW_SEC)
+                device.stop()
+                device.ensure_stopped(timeout_seconds=2)
+                assert os.path.getsize(tmp_path / f"{task}_flir.avi") > 0
+            # One acquisition thread serves both tasks and is still streaming between them
+            assert threads[0] is threads[1] and device.acquiring
+        finally:
+            device.close()
+        assert not device.acquiring
+
+    def test_frame_preview_returns_jpeg_bytes(self, mock_args):
         device = MockVidRec_Flir(device_args=mock_args)
         try:
             device.connect()
             preview = device.frame_preview()
             assert isinstance(preview, bytes)
             assert len(preview) > 0
-            # cv2.imencode produces a real PNG; check the magic bytes.
-            assert preview[:8] == b"\x89PNG\r\n\x1a\n"
+            # cv2.imencode produces a real JPEG; check the SOI marker.
+            assert preview[:2] == b"\xff\xd8"
+        finally:
+            device.close()
+
+    def test_frame_preview_while_recording_uses_capture_frames(self, mock_args, tmp_path):
+        device = MockVidRec_Flir(device_args=mock_args)
+        try:
+            device.connect()
+            device.start(str(tmp_path / "task_a"))
+            preview = device.frame_preview()
+            device.stop()
+            device.ensure_stopped(timeout_seconds=2)
         finally:
             device.close()
+        assert preview[:2] == b"\xff\xd8"
+        # A synthetic (black) frame from the record loop, not the gray labeled placeholder
+        img = cv2.imdecode(np.frombuffer(preview, dtype=np.uint8), cv2.IMREAD_COLOR)
+        assert img.max() < 20
 
 
 class TestMockVidRecFlirRegistration:
@@ -6,14 +6,18 @@ Exercise ``MockVidRec_Intel`` end-to-end without ``pyrealsense2`` installed.
 import os
 import time
 
+import numpy as np
 import pytest
 
 from neurobooth_os.iout import camera_intel as intel_mod
 from neurobooth_os.iout.device import DeviceState
 from neurobooth_os.iout.mock.mock_intel import (
+    _MOCK_DEPTH_SCALE,
+    _MOCK_DEPTH_VALUE,
     _STUB_BAG_BYTES,
     MockVidRec_Intel,
 )
+from neurobooth_os.iout.raw_frame_file import RawFrameReader
 from neurobooth_os.iout.stim_param_reader import (
     IntelDeviceArgs,
     IntelSensorArgs,
@@ -54,6 +58,27 @@ def mock_args() -> MockIntelDeviceArgs:
     return _build_mock_args()
 
 
+def _build_frames_args() -> MockIntelDeviceArgs:
+    """Small frames so the real encoders keep up on a CI box."""
+    sensors = [
+        IntelSensorArgs.model_construct(sensor_id=sensor_id, sample_rate=SAMPLE_RATE_HZ, width_px=64, height_px=48,
+                                        size=(64, 48))
+        for sensor_id in ("intel_rgb_sens", "intel_depth_sens")
+    ]
+    args = _build_mock_args()
+    return args.model_copy(update={"sensor_array": sensors, "recording_backend": "frames"})
+
+
+class _RecordingOutlet:
+    """Captures the frame-index samples pushed to LSL."""
+
+    def __init__(self):
+        self.samples = []
+
+    def push_chunk(self, samples, timestamps):
+        self.samples.extend(samples)
+
+
 @pytest.fixture(autouse=True)
 def _silence_messaging(monkeypatch):
     """Silence ``meta.post_message`` so tests don't need a database."""
@@ -147,3 +172,70 @@ class TestMockVidRecIntelRegistration:
         result = apply_mock_substitution(real, active={"VidRec_Intel"})
         assert isinstance(result, MockIntelDeviceArgs)
         assert result.device_sn == "REAL_INTEL_SN"
+
+
+class TestMockVidRecIntelFrameRecording:
+    """``recording_backend: frames``: the real acquisition thread and encoders on a synthetic pipeline."""
+
+    @pytest.fixture
+    def device(self):
+        device = MockVidRec_Intel(device_args=_build_frames_args())
+        device.connect()
+        device.outlet = _RecordingOutlet()
+        yield device
+        device.close()
+
+    def _record_task(self, device, path) -> list:
+        files = device.start(str(path))
+        time.sleep(RECORDING_WINDOW_SEC)
+        device.stop()
+        device.ensure_stopped(timeout_seconds=5)
+        return files
+
+    def test_consecutive_tasks_switch_files_without_restarting_the_pipeline(self, device, tmp_path):
+        announced = []
+        for task in ("task_a", "task_b"):
+            files = self._record_task(device, tmp_path / task)
+            assert files == [f"{task}_intel1.avi", f"{task}_intel1_depth.nbraw"]
+            announced.append(device.outlet.samples)
+            device.outlet.samples = []
+
+            assert (tmp_path / f"{task}_intel1.avi").stat().st_size > 0
+            with RawFrameReader(str(tmp_path / f"{task}_intel1_depth.nbraw")) as reader:
+                depth = list(reader)
+                assert reader.header["depth_scale_m"] == _MOCK_DEPTH_SCALE
+                assert not reader.truncated
+            # Every announced frameset is in the depth file, and FrameNum restarts at 1 for each task's files
+            frame_nums = [sample[0] for sample in announced[-1]]
+            assert len(depth) == len(frame_nums) >= 3
+            assert frame_nums == list(range(1, len(frame_nums) + 1))
+            assert np.all(depth[0] == _MOCK_DEPTH_VALUE)
+
+        assert device.pipeline.n_starts == 1
+        assert device.pipeline.n_stops == 0
+        assert device.acquiring
+        # The camera's own frame numbers carry on across the task boundary
+        assert announced[1][0][1] > announced[0][-1][1]
+
+    def test_stalled_acquisition_is_stopped_by_ensure_stopped(self, device, tmp_path):
+        device.start(str(tmp_path / "task_a"))
+        time.sleep(RECORDING_WINDOW_SEC)
+        device.pipeline.delivering.clear()  # The next wait for frames blocks past the ensure_stopped timeout
+        time.sleep(0.1)
+        device.stop()
+        with pytest.raises(intel_mod.RealSenseException):
+            device.ensure_stopped(timeout_seconds=0.2)
+
+        # Once the camera delivers again, the thread closes the files and the pipeline on its way out
+        device.pipeline.delivering.set()
+        device.video_thread.join(5)
+        assert not device.acquiring
+        assert device.pipeline.n_stops == 1
+        with RawFrameReader(str(tmp_path / "task_a_intel1_depth.nbraw")) as reader:
+            assert len(list(reader)) >= 3
+
+        # The next task brings the pipeline up again
+        self._record_task(device, tmp_path / "task_b")
+        assert device.pipeline.n_starts == 2
+        with RawFrameReader(str(tmp_path / "task_b_intel1_depth.nbraw")) as reader:
+            assert len(list(reader)) >= 3
@@ -14,11 +14,14 @@ the mbientlab SDK installed.  They cover:
 
 import time
 
+import numpy as np
 import pytest
 
 from neurobooth_os.iout import mbient as mbient_mod
 from neurobooth_os.iout.device import DeviceState
-from neurobooth_os.iout.mock.mock_mbient import MockMbient
+from neurobooth_os.iout.mbient import ConnectionParameters, Mbient
+from neurobooth_os.iout.mock.ble_link import SimulatedBleLink, simulate_stream
+from neurobooth_os.iout.mock.mock_mbient import MockMbient, SimulatedBleAdapter, _MockSample
 from neurobooth_os.iout.stim_param_reader import (
     MbientDeviceArgs,
     MbientSensorArgs,
@@ -151,6 +154,316 @@ class TestMockMbientLifecycle:
             device.close()
 
 
+class TestMockMbientSampleLoss:
+    """Steps in the device epoch are counted as lost samples and reported at the end of a task."""
+
+    def test_every_streamed_sample_is_accounted_for(self, mock_args):
+        device = MockMbient(mock_args)
+        try:
+            device.bring_up({})
+            time.sleep(SAMPLE_WINDOW_SEC)
+            device.stop()
+        finally:
+            device.close()
+        assert device.gap_counter.received == device.n_samples_streamed >= 5
+        assert device.gap_counter.expected >= device.gap_counter.received
+
+    def test_loss_above_threshold_warns_the_operator(self, mock_args, captured_messages):
+        device = MockMbient(mock_args)
+        sample = _MockSample(0.0, 0.0, 1.0)
+        for i in list(range(50)) + list(range(52, 100)):  # Samples 50 and 51 lost
+            device._dispatch_sample(1.7e12 + 10.0 * i, sample, sample)
+        device._report_stream()
+
+        assert device.gap_counter.missing == 2
+        assert device.gap_counter.gaps == 1
+        assert [m.body.status for m in captured_messages] == ["WARNING"]
+        assert "lost 2 of 100 samples (2.0%)" in captured_messages[0].body.text
+
+    def test_loss_below_threshold_is_only_logged(self, mock_args, captured_messages):
+        mock_args.loss_alert_pct = 5.0
+        device = MockMbient(mock_args)
+        sample = _MockSample(0.0, 0.0, 1.0)
+        for i in list(range(50)) + list(range(52, 100)):
+            device._dispatch_sample(1.7e12 + 10.0 * i, sample, sample)
+        device._report_stream()
+        assert captured_messages == []
+
+
+class TestSimulatedBleLink:
+    """The BLE throughput model behind extras/perf/mbient_ble_profile.py."""
+
+    def test_interval_is_granted_in_adapter_units_and_shared(self):
+        link = SimulatedBleLink(ConnectionParameters(10.0, 10.0), n_devices=5, min_interval_ms=7.5)
+        assert link.interval_ms == 10.0
+        assert SimulatedBleLink(ConnectionParameters(7.5, 7.5), min_interval_ms=15.0).interval_ms == 15.0
+        assert link.slots_per_event == 4
+        assert SimulatedBleLink(ConnectionParameters(), n_devices=5).slots_per_event == 3
+
+    def test_capacity_bounds_throughput_and_unfused_costs_twice(self):
+        params = ConnectionParameters(30.0, 30.0)
+        _, fused = simulate_stream(SimulatedBleLink(params, n_devices=5), 100, 10.0)
+        _, unfused = simulate_stream(SimulatedBleLink(params, n_devices=5), 100, 10.0, fused=False)
+        assert not np.isnan(fused).any()  # 3 samples per 30 ms event, 4 slots
+        assert np.isnan(unfused).mean() > 0.2  # 6 notifications per event, 4 slots
+
+    def test_missed_events_delay_but_do_not_lose_within_queue(self):
+        link = SimulatedBleLink(ConnectionParameters(), event_miss_prob=0.2, seed=1)
+        sample_times, received = simulate_stream(link, 100, 10.0)
+        assert not np.isnan(received).any()
+        assert np.all(received >= sample_times)
+        assert np.max(received - sample_times) > 3 * link.interval_ms / 1e3
+
+    def test_supervision_timeout_drops_the_link(self):
+        link = SimulatedBleLink(ConnectionParameters(timeout=100), event_miss_prob=1.0)
+        _, received = simulate_stream(link, 100, 1.0)
+        assert np.isnan(received).all()
+        assert link.link_dropped_at is not None
+
+
+class _RecordingOutlet:
+    """Stands in for the LSL outlet, recording what the device pushes."""
+
+    def __init__(self):
+        self.samples = []
+        self.timestamps = []
+        self.chunks = []
+
+    def push_sample(self, sample, timestamp=0.0):
+        self.samples.append(list(sample))
+        self.timestamps.append(timestamp)
+
+    def push_chunk(self, samples, timestamps):
+        self.chunks.append((samples.copy(), list(timestamps)))
+
+
+class TestMockMbientLslPush:
+    """Samples reach LSL through the ring and pusher thread, or inline when the interval is 0."""
+
+    @pytest.fixture
+    def outlet(self, monkeypatch):
+        outlet = _RecordingOutlet()
+        monkeypatch.setattr(mbient_mod, "DISABLE_LSL", False)
+        monkeypatch.setattr(MockMbient, "_create_outlet", lambda self: outlet)
+        return outlet
+
+    def test_ring_pushes_chunks_with_per_sample_timestamps(self, mock_args, outlet):
+        device = MockMbient(mock_args)
+        try:
+            device.bring_up({})
+            time.sleep(SAMPLE_WINDOW_SEC)
+            device.stop()
+            assert device._lsl_pusher is None
+        finally:
+            device.close()
+
+        assert outlet.samples == []
+        n_pushed = sum(len(ts) for _, ts in outlet.chunks)
+        assert n_pushed == device.n_samples_streamed >= 5
+        assert len(outlet.chunks) < n_pushed  # Batched, not one push per sample
+        timestamps = [t for _, ts in outlet.chunks for t in ts]
+        assert timestamps == sorted(timestamps)
+        assert all(samples.shape[1] == 7 for samples, _ in outlet.chunks)
+
+    def test_zero_interval_pushes_from_the_callback(self, mock_args, outlet):
+        mock_args.lsl_push_interval_ms = 0.0
+        device = MockMbient(mock_args)
+        try:
+            device.bring_up({})
+            time.sleep(SAMPLE_WINDOW_SEC)
+            device.stop()
+        finally:
+            device.close()
+
+        assert device._lsl_ring is None
+        assert outlet.chunks == []
+        assert len(outlet.samples) == device.n_samples_streamed >= 5
+
+    def test_timestamps_follow_device_epoch_not_ble_bursts(self, mock_args, outlet, monkeypatch):
+        """Samples taken every 10 ms but received in bursts of 4 are stamped 10 ms apart."""
+        mock_args.lsl_push_interval_ms = 0.0
+        mock_args.clock_bin_sec = 0.2
+        device = MockMbient(mock_args)
+        device.outlet = outlet
+        receive = iter(5000.0 + 0.012 + 0.04 * (i // 4) for i in range(400))
+        monkeypatch.setattr(mbient_mod, "local_clock", lambda: next(receive))
+        sample = _MockSample(0.0, 0.0, 1.0)
+        for i in range(400):
+            device._lsl_data_handler(1.7e12 + 10.0 * i, sample, sample)
+
+        stamps = outlet.timestamps[100:]  # Once the fit has a few bins
+        assert max(abs(b - a - 0.010) for a, b in zip(stamps, stamps[1:])) < 1e-4
+        assert device.hot_log.flush("test")["stats"]["clock_delay_removed_ms"]["max"] > 25.0
+
+    @pytest.mark.parametrize("clock_correction, version", [(True, "1.2"), (False, "1.1")])
+    def test_data_version_marks_clock_corrected_timestamps(self, mock_args, monkeypatch, clock_correction, version):
+        described = {}
+
+        def describe(stream_info, **kwargs):
+            described.update(kwargs)
+            return stream_info
+
+        monkeypatch.setattr(mbient_mod, "set_stream_description", describe)
+        monkeypatch.setattr(mbient_mod, "StreamInfo", lambda **kwargs: kwargs)
+        monkeypatch.setattr(mbient_mod, "StreamOutlet", lambda info: info)
+        mock_args.clock_correction = clock_correction
+        Mbient._create_outlet(MockMbient(mock_args))
+        assert str(described["data_version"]) == version
+
+
+class TestMockMbientGroupBringUp:
+    """``Mbient.bring_up_group`` against the simulated BLE adapter's latency model."""
+
+    N_DEVICES = 4
+
+    @pytest.fixture
+    def adapter(self, monkeypatch):
+        adapter = SimulatedBleAdapter(
+            scan_sec=0.2, connect_sec=0.1, reset_sec=0.1, post_reset_wait_sec=0.3, max_concurrent=2,
+        )
+        monkeypatch.setattr(MockMbient, "ble_adapter", adapter)
+        return adapter
+
+    def _devices(self):
+        devices = []
+        for i in range(self.N_DEVICES):
+            args = _build_mock_args()
+            args.device_name = f"Dev{i}"
+            devices.append(MockMbient(args))
+        return devices
+
+    def test_group_overlaps_devices_within_adapter_limit(self, adapter):
+        devices = self._devices()
+        try:
+            t0 = time.perf_counter()
+            results = Mbient.bring_up_group(devices, {}, max_concurrent_ble=2)
+            elapsed = time.perf_counter() - t0
+        finally:
+            for device in devices:
+                device.close()
+
+        assert results == devices
+        assert adapter.n_scans == 1
+        assert adapter.peak_in_flight <= 2
+        assert adapter.failed_connects == 0
+        for device in devices:
+            assert {"scan", "connect", "reset", "reset_wait", "reconnect", "setup", "start"} <= set(device.phase_ms)
+            assert device.phase_ms["reset_wait"] >= 300 * 0.9
+        # One after the other: scan + 4 x (connect + reset + wait + reconnect) = 2.6 s
+        sequential = adapter.scan_sec + self.N_DEVICES * (
+            2 * adapter.connect_sec + adapter.reset_sec + adapter.post_reset_wait_sec)
+        assert elapsed < sequential / 2
+
+    def test_oversubscribing_the_adapter_fails_connects(self, adapter):
+        devices = self._devices()
+        try:
+            results = Mbient.bring_up_group(devices, {}, max_concurrent_ble=self.N_DEVICES)
+            states = [device.state for device in devices]
+        finally:
+            for device in devices:
+                device.close()
+
+        assert adapter.failed_connects > 0
+        assert None in results
+        assert all(state == DeviceState.ERROR for state, r in zip(states, results) if r is None)
+
+    def test_single_slot_still_overlaps_post_reset_waits(self, adapter):
+        devices = self._devices()
+        try:
+            t0 = time.perf_counter()
+            results = Mbient.bring_up_group(devices, {}, max_concurrent_ble=1)
+            elapsed = time.perf_counter() - t0
+        finally:
+            for device in devices:
+                device.close()
+
+        assert results == devices
+        assert adapter.peak_in_flight == 1
+        assert elapsed < adapter.scan_sec + self.N_DEVICES * (
+            2 * adapter.connect_sec + adapter.reset_sec + adapter.post_reset_wait_sec)
+        assert sum(d.phase_ms.get("ble_queue", 0.0) for d in devices) > 0
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestMbientHealthMonitor:
+    """The monitor keeps a ready set and reconnects between tasks only, within the retry budget."""
+
+    @pytest.fixture
+    def adapter(self, monkeypatch):
+        adapter = SimulatedBleAdapter(connect_sec=0.01)
+        monkeypatch.setattr(MockMbient, "ble_adapter", adapter)
+        return adapter
+
+    @pytest.fixture
+    def devices(self, adapter):
+        devices = []
+        for name in ("LF", "RF"):
+            args = _build_mock_args()
+            args.device_name = name
+            args.mac = f"AA:BB:CC:DD:EE:{len(devices):02X}"
+            devices.append(MockMbient(args))
+        Mbient.bring_up_group(devices, {})
+        yield devices
+        for device in devices:
+            device.close()
+
+    def test_ready_set_tracks_links_and_task_start_only_reads_it(self, adapter, devices):
+        lf, rf = devices
+        monitor = MockMbient.supervise(devices)
+        try:
+            assert monitor.ready() == {"LF", "RF"}
+            adapter.out_of_range.add(lf.mac)
+            monitor.task_started()
+            lf.device_wrapper.disconnect()  # Link drop; the immediate reconnect fails
+            assert not monitor.is_ready(lf)
+
+            t0 = time.perf_counter()
+            lf.on_task_reconnect()
+            assert time.perf_counter() - t0 < 0.05  # No scan or reconnect on the task-start path
+            time.sleep(0.2)
+            assert monitor.n_rounds == 0  # Nothing happens while the task runs
+            assert lf._auto_reconnect_failures == 0
+
+            adapter.out_of_range.clear()
+            lf.on_task_end()
+            assert _wait_for(lambda: monitor.ready() == {"LF", "RF"})
+            assert monitor.n_rounds == 1
+            assert lf._auto_reconnect_failures == 0
+        finally:
+            monitor.stop()
+        assert lf.health_monitor is None
+
+    def test_retry_budget_matches_task_start_reconnect(self, adapter, devices):
+        lf, _ = devices
+        monitor = MockMbient.supervise(devices)
+        try:
+            adapter.out_of_range.add(lf.mac)
+            lf.device_wrapper.disconnect()
+            for n_failures in range(1, Mbient.MAX_AUTO_RECONNECT_ATTEMPTS + 1):
+                monitor.task_ended()
+                assert _wait_for(lambda: lf._auto_reconnect_failures == n_failures)
+
+            rounds = monitor.n_rounds
+            adapter.out_of_range.clear()
+            monitor.task_ended()  # Budget spent: the round skips the device
+            assert _wait_for(lambda: monitor.n_rounds > rounds)
+            assert not monitor.is_ready(lf)
+
+            lf._auto_reconnect_failures = 0  # What the operator's Reset Mbients does
+            monitor.task_ended()
+            assert _wait_for(lambda: monitor.is_ready(lf))
+        finally:
+            monitor.stop()
+
+
 class TestMockMbientReconnectPaths:
     """The mock should not pretend to disconnect/reconnect or notify operators."""
 
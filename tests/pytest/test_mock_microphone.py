@@ -3,8 +3,12 @@
 Exercise ``MockMicStream`` end-to-end without ``pyaudio`` installed.
 """
 
+import json
+import logging
 import time
+import wave
 
+import numpy as np
 import pytest
 
 from neurobooth_os.iout import microphone as mic_mod
@@ -54,6 +58,16 @@ def _silence_messaging(monkeypatch):
     monkeypatch.setattr(mic_mod, "post_message", lambda msg: None)
 
 
+class _RecordingOutlet:
+    """Keeps a copy of every pushed chunk and its timestamp; the microphone reuses its sample buffer."""
+
+    def __init__(self, pushed):
+        self.pushed = pushed
+
+    def push_chunk(self, x, timestamp=0.0):
+        self.pushed.append((x.copy(), timestamp))
+
+
 class TestMockMicStreamLifecycle:
 
     def test_connect_lands_in_connected(self, mock_args):
@@ -88,6 +102,73 @@ class TestMockMicStreamLifecycle:
         assert device.streaming is False
         assert device.state in (DeviceState.STOPPED, DeviceState.DISCONNECTED)
 
+    @pytest.mark.parametrize("capture_mode", ["callback", "read"])
+    def test_each_audio_frame_is_one_sample(self, mock_args, capture_mode):
+        mock_args.capture_mode = capture_mode
+        device = MockMicStream(device_args=mock_args)
+        pushed = []
+        try:
+            device.connect()
+            device.outlet_audio = _RecordingOutlet(pushed)
+            device.start()
+            time.sleep(RECORDING_WINDOW_SEC)
+            device.stop()
+        finally:
+            device.close()
+        assert len(pushed) >= 3
+        for frames, _ in pushed:
+            assert frames.dtype == np.int16 and frames.shape == (CHUNK_SIZE, 1)
+            assert not frames.any()  # The synthetic input is silence
+
+    def test_callback_timestamps_come_from_adc_time(self, mock_args):
+        mock_args.capture_mode = "callback"
+        device = MockMicStream(device_args=mock_args)
+        pushed = []
+        try:
+            device.connect()
+            device.outlet_audio = _RecordingOutlet(pushed)
+            synthetic = device.stream_in
+            device.start()
+            time.sleep(RECORDING_WINDOW_SEC)
+            device.stop()
+        finally:
+            device.close()
+        last_frame_times = np.array([t for _, t in pushed])
+        truth = np.array(synthetic.chunk_times[:len(pushed)]) + (CHUNK_SIZE - 1) / SAMPLE_RATE_HZ
+        # However late each callback ran, the timestamps are the sample times (within 1 ms, not one 46 ms chunk)
+        assert np.max(np.abs(last_frame_times - truth)) < 1e-3
+
+    def test_save_on_disk_writes_audio_file_as_it_records(self, mock_args, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        device = MockMicStream(device_args=mock_args, save_on_disk=True)
+        try:
+            device.connect()
+            device.start()
+            time.sleep(RECORDING_WINDOW_SEC)
+            device.stop()
+        finally:
+            device.close()
+        with wave.open(str(tmp_path / "raw_mic_data.wav"), "rb") as wav:
+            assert wav.getnframes() >= 3 * CHUNK_SIZE and wav.getnframes() % CHUNK_SIZE == 0
+
+    def test_callback_mode_counts_input_overflows(self, mock_args, caplog):
+        mock_args.capture_mode = "callback"
+        device = MockMicStream(device_args=mock_args)
+        try:
+            device.connect()
+            synthetic = device.stream_in
+            synthetic.overflow_every = 2
+            device.start()
+            time.sleep(RECORDING_WINDOW_SEC)
+            with caplog.at_level(logging.INFO):
+                device.stop()
+        finally:
+            device.close()
+        assert any(r.getMessage().startswith("Microphone: Input overflow") for r in caplog.records)
+        summary = next(r.getMessage() for r in caplog.records if r.getMessage().startswith("HOTPATH SUMMARY"))
+        overflows = json.loads(summary.split(": ", 1)[1])["counters"]["input_overflows"]
+        assert overflows == synthetic.chunks // 2 > 0
+
 
 class TestMockMicStreamRegistration:
 
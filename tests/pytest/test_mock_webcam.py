@@ -0,0 +1,111 @@
+"""Lifecycle and timestamping tests for the synthetic webcam mock.
+
+Exercise ``MockVidRec_Webcam`` end-to-end without a camera.
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from neurobooth_os.iout.device import DeviceState
+from neurobooth_os.iout.mock.mock_webcam import MockVidRec_Webcam
+from neurobooth_os.iout.stim_param_reader import (
+    MockWebcamDeviceArgs,
+    StandardSensorArgs,
+    WebcamDeviceArgs,
+)
+
+
+SAMPLE_RATE_HZ = 30
+RECORDING_WINDOW_SEC = 1.0
+
+
+def _build_mock_args() -> MockWebcamDeviceArgs:
+    sensor = StandardSensorArgs.model_construct(
+        sensor_id="webcam_sens_1",
+        sample_rate=SAMPLE_RATE_HZ,
+        width_px=320,
+        height_px=240,
+    )
+    return MockWebcamDeviceArgs.model_construct(
+        ENV_devices={},
+        device_id="Webcam_dev_1",
+        sensor_ids=["webcam_sens_1"],
+        sensor_array=[sensor],
+        camera_idx=0,
+        fourcc="MJPG",
+        n_frames_to_flush=0,
+        arg_parser="iout.stim_param_reader.py::MockWebcamDeviceArgs()",
+    )
+
+
+@pytest.fixture
+def mock_args() -> MockWebcamDeviceArgs:
+    return _build_mock_args()
+
+
+@pytest.fixture(autouse=True)
+def _silence_messaging(monkeypatch):
+    """Silence ``post_message`` so tests don't need a database."""
+    from neurobooth_os.iout import metadator as meta_mod
+    monkeypatch.setattr(meta_mod, "post_message", lambda msg: None)
+
+
+def _record(device, tmp_path, seconds=RECORDING_WINDOW_SEC):
+    device.connect()
+    files = device.start(filename=str(tmp_path / "task"))
+    time.sleep(seconds)
+    device.stop()
+    device.ensure_stopped(timeout_seconds=5)
+    return files
+
+
+class TestMockVidRecWebcamLifecycle:
+
+    def test_start_stop_writes_video(self, mock_args, tmp_path):
+        device = MockVidRec_Webcam(device_args=mock_args)
+        try:
+            files = _record(device, tmp_path)
+            assert device.state == DeviceState.STOPPED
+            assert files == ["task_webcam.avi"]
+            assert os.path.getsize(tmp_path / "task_webcam.avi") > 0
+            assert device.frame_counter > 0
+        finally:
+            device.close()
+
+    def test_timestamps_are_taken_at_grab_not_after_decode(self, mock_args, tmp_path):
+        """The synthetic decode takes 2-12 ms; none of that may show up in the frame timestamps."""
+        device = MockVidRec_Webcam(device_args=mock_args)
+        try:
+            _record(device, tmp_path)
+        finally:
+            device.close()
+
+        camera = device.synthetic_camera
+        stamps = np.asarray(device.timestamps)
+        assert len(stamps) >= SAMPLE_RATE_HZ * RECORDING_WINDOW_SEC / 2
+        # Each frame is stamped between grab() returning and retrieve() starting to decode it. Ordering, not
+        # durations, so a busy test machine cannot make this flaky.
+        assert np.all(np.asarray(camera.grab_returned[:len(stamps)]) <= stamps)
+        assert np.all(stamps <= np.asarray(camera.decode_started[:len(stamps)]))
+
+    def test_degraded_recording_is_resized_and_keeps_every_frame(self, mock_args, tmp_path):
+        device = MockVidRec_Webcam(device_args=mock_args)
+        device.set_degrade_level(2)  # "preview" and "resize"
+        try:
+            _record(device, tmp_path)
+        finally:
+            device.close()
+        assert device.frame_size == (160, 120)
+        assert device.preview.latest() is None
+        assert device.frame_counter == len(device.timestamps) > 0
+
+
+class TestMockWebcamRegistry:
+
+    def test_registry_resolves_to_mock(self):
+        from neurobooth_os.iout.mock_substitution import MOCK_REGISTRY
+        assert MOCK_REGISTRY[WebcamDeviceArgs] is MockWebcamDeviceArgs
+        assert MockWebcamDeviceArgs.device_class() is MockVidRec_Webcam
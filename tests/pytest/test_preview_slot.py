@@ -0,0 +1,49 @@
+"""Tests for the capture-loop preview slot (neurobooth_os/iout/preview_slot.py)."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from neurobooth_os.iout.preview_slot import PREVIEW_MAX_WIDTH, PreviewSlot  # noqa: E402
+
+
+def _frame(value, width=1920, height=1080):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_keeps_every_nth_frame_downscaled_copy():
+    slot = PreviewSlot(every_n=3)
+    frames = [_frame(i) for i in range(5)]
+    for f in frames:
+        slot.offer(f)
+    latest = slot.latest()
+    assert latest[0, 0, 0] == 3  # Frames 0 and 3 were kept
+    assert latest.shape[1] <= PREVIEW_MAX_WIDTH
+    frames[3][:] = 99  # The capture loop reuses its buffer
+    assert slot.latest()[0, 0, 0] == 3
+
+
+def test_raw_frames_are_not_decimated():
+    slot = PreviewSlot(every_n=1, downscale=False)
+    slot.offer(np.zeros((768, 1024), dtype=np.uint8))
+    assert slot.latest().shape == (768, 1024)
+
+
+def test_empty_or_stale_slot_serves_nothing():
+    slot = PreviewSlot(every_n=1, max_age_sec=0.05)
+    assert slot.jpeg() == b""
+    slot.offer(_frame(1))
+    assert slot.jpeg()[:2] == b"\xff\xd8"
+    time.sleep(0.1)
+    assert slot.jpeg() == b""
+
+
+def test_waits_for_the_first_frame():
+    slot = PreviewSlot(every_n=1)
+    threading.Timer(0.05, slot.offer, args=(_frame(7),)).start()
+    jpeg = slot.jpeg(timeout=2.0, convert=lambda f: f[:10, :10])
+    assert jpeg[:2] == b"\xff\xd8"
@@ -0,0 +1,50 @@
+"""Tests for the raw frame container (neurobooth_os/iout/raw_frame_file.py) used for RealSense depth."""
+
+import numpy as np
+import pytest
+
+from neurobooth_os.iout.raw_frame_file import RAW_FOURCC, RawFrameException, RawFrameReader, RawFrameWriter
+from neurobooth_os.iout.video_encoder import EncoderProcess, ThreadEncoder
+
+SIZE = (8, 6)  # (width, height)
+
+
+def _depth(value):
+    return np.full((SIZE[1], SIZE[0]), value, dtype=np.uint16)
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_uint16_round_trip_keeps_metadata(tmp_path, compression):
+    path = str(tmp_path / "a_intel1_depth.nbraw")
+    writer = RawFrameWriter(path, 90.0, SIZE, dtype="uint16", compression=compression, depth_scale_m=0.001)
+    for value in (0, 1000, 65535):
+        writer.write(_depth(value))
+    writer.release()
+
+    with RawFrameReader(path) as reader:
+        assert reader.header["depth_scale_m"] == 0.001
+        assert reader.dtype == np.uint16
+        frames = list(reader)
+    assert [int(f[0, 0]) for f in frames] == [0, 1000, 65535]
+    assert frames[0].shape == (SIZE[1], SIZE[0])
+
+
+def test_rejects_unknown_compression(tmp_path):
+    with pytest.raises(RawFrameException):
+        RawFrameWriter(str(tmp_path / "a.nbraw"), 30.0, SIZE, compression="lz4")
+
+
+@pytest.mark.parametrize("backend", [ThreadEncoder, EncoderProcess])
+def test_encoder_writes_uint16_frames(tmp_path, backend):
+    path = str(tmp_path / "a_intel1_depth.nbraw")
+    enc = backend(4, name="test_encoder")
+    try:
+        enc.open(path, RAW_FOURCC, 90.0, SIZE, channels=1, dtype="uint16",
+                 writer_options={"dtype": "uint16", "compression": "zlib"})
+        for i in range(5):
+            assert enc.put(_depth(i * 1000), timeout=5)
+        assert enc.close_file()["frames_written"] == 5
+    finally:
+        enc.shutdown()
+    with RawFrameReader(path) as reader:
+        assert [int(f[0, 0]) for f in reader] == [0, 1000, 2000, 3000, 4000]
@@ -0,0 +1,47 @@
+"""Unit tests for extras/perf/replay_db_log_fallback.py (the pure parse layer)."""
+
+import json
+from datetime import datetime
+
+import replay_db_log_fallback as replay
+
+
+def _line(**overrides):
+    rec = {
+        "log_level": "error", "message": "db down", "function": "run", "filename": "server_acq.py",
+        "line_no": 12, "traceback": None, "server_type": "acquisition", "server_id": "ACQ",
+        "subject_id": "100001", "session_id": "100001_2026-10-19", "server_time": "2026-10-19T10:00:00.250000",
+        "device": "FLIR_blackfly_1", "fallback_reason": "DB unavailable",
+    }
+    rec.update(overrides)
+    return json.dumps(rec) + "\n"
+
+
+def test_parse_rows_in_column_order():
+    rows, skipped = replay.parse_fallback([_line()])
+    assert skipped == 0
+    row = dict(zip(replay.COLUMNS, rows[0]))
+    assert row["server_time"] == datetime(2026, 10, 19, 10, 0, 0, 250000)
+    assert row["device"] == "FLIR_blackfly_1"
+    assert row["message"] == "db down"
+    assert "fallback_reason" not in row
+
+
+def test_parse_skips_legacy_and_truncated_lines():
+    lines = [
+        "[2026-10-19T10:00:00] ERROR x.py:1 f> old text format  (DB log write failed: x)\n",
+        _line(message="kept"),
+        "",
+        _line()[:30],  # cut off by a crash
+    ]
+    rows, skipped = replay.parse_fallback(lines)
+    assert [dict(zip(replay.COLUMNS, r))["message"] for r in rows] == ["kept"]
+    assert skipped == 2
+
+
+def test_parse_fills_missing_columns_and_normalizes_level():
+    minimal = json.dumps({"log_level": "notset", "message": "m", "server_time": "2026-10-19T10:00:00"})
+    rows, _ = replay.parse_fallback([minimal])
+    row = dict(zip(replay.COLUMNS, rows[0]))
+    assert row["log_level"] == "debug"
+    assert row["session_id"] is None
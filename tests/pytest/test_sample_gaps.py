@@ -0,0 +1,57 @@
+"""Tests for the per-task lost-sample accounting (neurobooth_os/iout/sample_gaps.py)."""
+
+import math
+
+from neurobooth_os.iout.sample_gaps import GapCounter
+
+EPOCH_MS = 1_700_000_000_000
+
+
+def _feed(counter, indices, period_ms=10.0, jitter_ms=()):
+    for n, i in enumerate(indices):
+        jitter = jitter_ms[n % len(jitter_ms)] if jitter_ms else 0.0
+        counter.add(EPOCH_MS + i * period_ms + jitter)
+
+
+def test_steady_stream_has_no_loss():
+    counter = GapCounter(100)
+    _feed(counter, range(1000), jitter_ms=(0.0, 1.0, -1.0))
+    summary = counter.summary()
+    assert summary['received'] == summary['expected'] == 1000
+    assert summary['missing'] == summary['gaps'] == 0
+    assert summary['loss_pct'] == 0.0
+    assert summary['effective_hz'] == 100.0
+    assert summary['delta_periods']['counts'] == [0, 999, 0, 0, 0, 0, 0]
+
+
+def test_gaps_count_missing_samples_and_fill_the_histogram():
+    counter = GapCounter(100)
+    indices = [i for i in range(200) if i not in (10, 50, 51, 52, 53, 54, 55)]
+    _feed(counter, indices)
+    summary = counter.summary()
+    assert summary['missing'] == 7
+    assert summary['gaps'] == 2
+    assert summary['expected'] == 200
+    assert summary['loss_pct'] == 3.5
+    assert summary['max_gap_ms'] == 70.0
+    assert summary['delta_periods']['counts'] == [0, 190, 1, 0, 1, 0, 0]
+
+
+def test_clock_reset_is_a_discontinuity_not_a_loss():
+    counter = GapCounter(100)
+    _feed(counter, range(100))
+    counter.add(EPOCH_MS - 3_600_000)  # Reconnected: the epoch was set again
+    counter.add(EPOCH_MS + 3_600_000)
+    assert counter.discontinuities == 2
+    assert counter.missing == 0
+
+
+def test_reset_starts_a_new_task():
+    counter = GapCounter(100)
+    _feed(counter, [0, 5])
+    counter.reset()
+    assert math.isnan(counter.loss_pct)
+    assert counter.summary()['loss_pct'] is None
+    _feed(counter, range(500, 510))  # The step from the last task is not a gap
+    assert counter.missing == 0
+    assert counter.received == 10
@@ -0,0 +1,79 @@
+"""Tests for the callback-to-LSL sample ring and its pusher thread."""
+
+import time
+
+import numpy as np
+
+from neurobooth_os.iout.sample_ring import RingPusher, SampleRing
+
+
+def _sample(i: int):
+    return (float(i), i + 0.5)
+
+
+class TestSampleRing:
+
+    def test_pending_is_fifo_and_consume_frees_space(self):
+        ring = SampleRing(4, 2)
+        for i in range(3):
+            assert ring.put(_sample(i), 100.0 + i)
+        blocks = ring.pending()
+        assert len(blocks) == 1
+        data, timestamps = blocks[0]
+        np.testing.assert_array_equal(data[:, 0], [0, 1, 2])
+        np.testing.assert_array_equal(timestamps, [100, 101, 102])
+        ring.consume(3)
+        assert len(ring) == 0
+        assert ring.pending() == []
+
+    def test_wraparound_returns_two_blocks_in_order(self):
+        ring = SampleRing(4, 2)
+        for i in range(3):
+            ring.put(_sample(i), float(i))
+        ring.consume(3)
+        for i in range(3, 7):
+            assert ring.put(_sample(i), float(i))
+        blocks = ring.pending()
+        assert [len(ts) for _, ts in blocks] == [1, 3]
+        np.testing.assert_array_equal(np.concatenate([ts for _, ts in blocks]), [3, 4, 5, 6])
+        np.testing.assert_array_equal(np.concatenate([d for d, _ in blocks])[:, 1], [3.5, 4.5, 5.5, 6.5])
+
+    def test_full_ring_drops_new_samples_and_keeps_unsent_ones(self):
+        ring = SampleRing(2, 2)
+        assert ring.put(_sample(0), 0.0)
+        assert ring.put(_sample(1), 1.0)
+        assert not ring.put(_sample(2), 2.0)
+        assert ring.dropped == 1
+        (data, timestamps), = ring.pending()
+        np.testing.assert_array_equal(timestamps, [0, 1])
+
+
+class TestRingPusher:
+
+    def test_pushes_every_sample_with_its_timestamp(self):
+        ring = SampleRing(8, 2)
+        pushed = []
+        pusher = RingPusher(ring, lambda data, ts: pushed.append((data.copy(), ts)), interval_sec=0.005)
+        pusher.start()
+        for i in range(20):  # More than the ring holds, so the pusher must keep up
+            while not ring.put(_sample(i), 1000.0 + i):
+                time.sleep(0.001)
+        pusher.stop()
+
+        assert not pusher.is_alive()
+        assert pusher.n_samples == 20
+        assert pusher.n_chunks == len(pushed) < 20
+        for data, ts in pushed:
+            assert data.flags.c_contiguous
+            assert isinstance(ts, list) and len(ts) == len(data)
+        np.testing.assert_array_equal(np.concatenate([d for d, _ in pushed])[:, 0], np.arange(20))
+        assert [t for _, ts in pushed for t in ts] == [1000.0 + i for i in range(20)]
+
+    def test_stop_pushes_what_is_waiting(self):
+        ring = SampleRing(8, 2)
+        pushed = []
+        pusher = RingPusher(ring, lambda data, ts: pushed.extend(ts), interval_sec=60.0)
+        pusher.start()
+        ring.put(_sample(0), 5.0)
+        pusher.stop()
+        assert pushed == [5.0]
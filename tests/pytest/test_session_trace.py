@@ -0,0 +1,128 @@
+"""Session trace writer/reader (neurobooth_os/util/session_trace.py) and the
+cross-machine merge in extras/perf/session_trace_merge.py.
+
+A fake LSL clock is injected so the tests need neither pylsl nor liblsl.
+"""
+
+import logging
+import os
+
+import pytest
+
+import session_trace_merge as stm
+from neurobooth_os.util.session_trace import FILE_EXTENSION, SessionTraceHandler, read_trace
+
+
+class _Clock:
+    def __init__(self, t=100.0):
+        self.t = t
+
+    def __call__(self):
+        self.t += 0.001
+        return self.t
+
+
+def _logger(handler, name):
+    log = logging.getLogger(f"test_session_trace.{name}")
+    log.handlers = [handler]
+    log.setLevel(logging.DEBUG)
+    log.propagate = False
+    return log
+
+
+def _segments(directory):
+    return sorted(p for p in os.listdir(directory) if p.endswith(FILE_EXTENSION))
+
+
+def test_round_trip(tmp_path):
+    h = SessionTraceHandler(str(tmp_path), "ACQ_0", session="100001_2026-10-19", clock=_Clock())
+    log = _logger(h, "round_trip")
+    log.info("frame %d", 7, extra={"device": "FLIR_blackfly_1", "trace_fields": {"queue_depth": 3}})
+    log.warning("late")
+    h.close()
+
+    [name] = _segments(tmp_path)
+    header, records = read_trace(str(tmp_path / name))
+    assert header["server"] == "ACQ_0"
+    assert header["session"] == "100001_2026-10-19"
+    assert [r["message"] for r in records] == ["frame 7", "late"]
+    assert records[0]["level"] == "INFO"
+    assert records[0]["fields"] == {"queue_depth": 3, "device": "FLIR_blackfly_1"}
+    assert records[0]["function"] == "test_round_trip"
+    assert records[1]["fields"] == {}
+    assert records[0]["lsl_time"] < records[1]["lsl_time"]
+
+
+def test_rotation_and_pruning(tmp_path):
+    h = SessionTraceHandler(str(tmp_path), "STM", clock=_Clock(), max_bytes=512, max_files=3)
+    log = _logger(h, "rotation")
+    for i in range(100):
+        log.debug("message number %d with some padding", i)
+    h.close()
+
+    names = _segments(tmp_path)
+    assert len(names) == 3
+    headers = [read_trace(str(tmp_path / n))[0] for n in names]
+    assert [hd["segment"] for hd in headers] == sorted(hd["segment"] for hd in headers)
+    assert headers[0]["segment"] > 0  # the oldest segments were pruned
+
+    # A restarted server continues the numbering rather than appending to an old segment.
+    h2 = SessionTraceHandler(str(tmp_path), "STM", clock=_Clock())
+    h2.close()
+    assert read_trace(str(tmp_path / _segments(tmp_path)[-1]))[0]["segment"] == headers[-1]["segment"] + 1
+
+
+def test_truncated_tail_is_dropped(tmp_path):
+    h = SessionTraceHandler(str(tmp_path), "CTR", clock=_Clock())
+    log = _logger(h, "truncated")
+    log.info("one")
+    log.info("two")
+    h.close()
+
+    path = tmp_path / _segments(tmp_path)[0]
+    data = path.read_bytes()
+    path.write_bytes(data[:-5])
+    _, records = read_trace(str(path))
+    assert [r["message"] for r in records] == ["one"]
+
+
+def test_read_rejects_other_files(tmp_path):
+    path = tmp_path / "x.nbtrace"
+    path.write_bytes(b"not a trace")
+    with pytest.raises(ValueError):
+        read_trace(str(path))
+
+
+def _trace(server, anchor_lsl, anchor_unix, lsl_times, segment=0):
+    header = {"server": server, "segment": segment, "anchor_lsl_time": anchor_lsl, "anchor_unix_time": anchor_unix}
+    records = [
+        {"lsl_time": t, "unix_time": 0.0, "level": "INFO", "thread": "", "filename": "", "function": "",
+         "line_no": 0, "message": f"{server}@{t}", "fields": {}}
+        for t in lsl_times
+    ]
+    return header, records
+
+
+def test_merge_aligns_clocks_via_anchors():
+    # CTR's LSL clock reads 10 at wall 1000; ACQ's reads 5000 at wall 1000.5.
+    ctr = _trace("CTR", 10.0, 1000.0, [10.2, 10.9])
+    acq = _trace("ACQ_0", 5000.0, 1000.5, [4999.8, 5000.0])
+    offsets = stm.clock_offsets([ctr[0], acq[0]])
+    assert offsets["CTR"] == 0.0
+    assert offsets["ACQ_0"] == pytest.approx(-4989.5)
+
+    rows = stm.merge([ctr, acq], offsets)
+    assert [r["message"] for r in rows] == ["CTR@10.2", "ACQ_0@4999.8", "ACQ_0@5000.0", "CTR@10.9"]
+    assert rows[1]["t"] == pytest.approx(10.3)
+
+
+def test_merge_manual_offset_and_level_filter():
+    ctr = _trace("CTR", 0.0, 0.0, [1.0])
+    acq = _trace("ACQ_0", 0.0, 0.0, [0.9])
+    acq[1][0]["level"] = "WARNING"
+    offsets = stm.clock_offsets([ctr[0], acq[0]], manual={"ACQ_0": 0.2})
+    assert [r["server"] for r in stm.merge([ctr, acq], offsets)] == ["CTR", "ACQ_0"]
+    assert [r["server"] for r in stm.merge([ctr, acq], offsets, logging.WARNING)] == ["ACQ_0"]
+
+    with pytest.raises(ValueError):
+        stm.clock_offsets([ctr[0]], reference="STM")
@@ -0,0 +1,213 @@
+"""Tests for the simulated MetaWear SDK.
+
+The production ``Mbient`` runs unmodified against ``SimulatedMetaWear``, so
+these cover the real connect -> reset -> reconnect bring-up, streaming
+through ``Mbient._callback``, notifications arriving in connection-event
+bursts, recovery from a dropped link via ``attempt_reconnect``, and failed
+connects. No mbientlab, BLE adapter, LSL or database is needed.
+"""
+
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from neurobooth_os.iout.device import DeviceState
+from neurobooth_os.iout.mock.sim_metawear import Distribution, SimulatedMetaWear, installed
+from neurobooth_os.iout.stim_param_reader import MbientDeviceArgs, MbientSensorArgs
+
+MAC = "5E:00:00:00:00:01"
+
+
+def _build_args(**fields) -> MbientDeviceArgs:
+    acc = MbientSensorArgs.model_construct(sensor_id="acc1", sample_rate=100, data_range=8)
+    gyro = MbientSensorArgs.model_construct(sensor_id="gyro1", sample_rate=100, data_range=2000)
+    return MbientDeviceArgs.model_construct(
+        ENV_devices={},
+        device_id="Mbient_Sim_1",
+        sensor_ids=["acc1", "gyro1"],
+        sensor_array=[acc, gyro],
+        mac=MAC,
+        device_name="Sim",
+        arg_parser="iout.stim_param_reader.py::MbientDeviceArgs()",
+        **fields,
+    )
+
+
+@pytest.fixture
+def mbient_mod():
+    """
+    The mbient module as imported now. Other tests delete and re-import it, which would leave an ``Mbient`` imported
+    when this file is collected reading the globals of a module the simulated SDK is not installed in.
+    """
+    from neurobooth_os.iout.mbient import Mbient
+    return sys.modules[Mbient.__module__]
+
+
+@pytest.fixture
+def posted(monkeypatch, mbient_mod):
+    """Messages the device posts; LSL is off, as in test_mock_mbient.py."""
+    messages = []
+    monkeypatch.setattr(mbient_mod, "DISABLE_LSL", True)
+    monkeypatch.setattr(mbient_mod, "post_message", lambda msg: messages.append(msg))
+    # scan_BLE waits its full timeout for fewer than 5 devices
+    monkeypatch.setattr(mbient_mod.Mbient, "SCAN_PERFORMED", True)
+    return messages
+
+
+@pytest.fixture
+def sdk(posted, mbient_mod):
+    backend = SimulatedMetaWear(macs=[MAC], connect_sec=Distribution("fixed", 0.01))
+    with installed(backend, mbient_mod):
+        yield backend
+
+
+@pytest.fixture
+def make_device(mbient_mod):
+    def _make_device(**fields):
+        device = mbient_mod.Mbient(_build_args(**fields))
+        device.retry_delay_sec = 0
+        return device
+    return _make_device
+
+
+def _wait_for(predicate, timeout_sec: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout_sec
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestSimulatedBringUp:
+    """The real connect path: connect, board reset, reconnect, configure."""
+
+    def test_connect_resets_and_reconnects(self, sdk, make_device):
+        device = make_device()
+        try:
+            assert device.connect() is True
+            assert device.state == DeviceState.CONNECTED
+            assert {"connect", "reset", "reconnect", "setup"} <= set(device.phase_ms)
+            assert sdk.n_connects == 2  # Before and after the reset
+            assert sdk.n_disconnects == 1  # The reset
+        finally:
+            device.close()
+        assert sdk.n_connected == 0
+
+    def test_unreachable_device_fails_every_attempt(self, sdk, make_device):
+        sdk.out_of_range.add(MAC)
+        device = make_device()
+        device.max_connect_attempts = 2
+        assert device.connect() is False
+        assert device.state == DeviceState.ERROR
+        assert sdk.failed_connects == 2
+
+    def test_installed_restores_the_sdk_bindings(self, posted, mbient_mod):
+        before = (mbient_mod.MetaWear, mbient_mod.libmetawear, mbient_mod._HAS_MBIENTLAB)
+        with installed(SimulatedMetaWear(), mbient_mod) as backend:
+            assert mbient_mod.MetaWear is backend.MetaWear
+        assert (mbient_mod.MetaWear, mbient_mod.libmetawear, mbient_mod._HAS_MBIENTLAB) == before
+
+
+class TestSimulatedStreaming:
+    """Samples reach the real callbacks at the configured rate, in connection-event bursts."""
+
+    @pytest.mark.parametrize("fusion", [True, False])
+    def test_every_sample_arrives_in_epoch_order(self, sdk, make_device, fusion):
+        device = make_device(sensor_fusion=fusion)
+        epochs = []
+        device.register_data_handler(lambda epoch, acc, gyro: epochs.append(epoch))
+        try:
+            assert device.connect()
+            device.start(buzz=False)
+            time.sleep(0.4)
+            device.stop()
+        finally:
+            device.close()
+
+        assert len(epochs) >= 20
+        assert np.all(np.diff(epochs) == pytest.approx(10.0))  # 100 Hz on the device clock
+        assert device.gap_counter.missing == 0
+
+    @pytest.mark.parametrize("fusion", [True, False])
+    def test_handlers_see_the_streamed_values(self, sdk, make_device, fusion):
+        # Notification buffers are overwritten once the callback returns, so an accelerometer sample kept for the
+        # next gyroscope sample (unfused) reads NaN unless it was copied
+        device = make_device(sensor_fusion=fusion)
+        samples = []
+        device.register_data_handler(
+            lambda epoch, acc, gyro: samples.append((acc.x, acc.y, acc.z, gyro.x, gyro.y, gyro.z)))
+        try:
+            assert device.connect()
+            device.start(buzz=False)
+            assert _wait_for(lambda: len(samples) >= 10)
+            device.stop()
+        finally:
+            device.close()
+
+        assert np.array(samples) == pytest.approx(np.array([[0.0, 0.0, 1.0, 0.0, 0.0, 0.0]] * len(samples)))
+
+    def test_long_interval_batches_notifications(self, sdk, make_device):
+        device = make_device(conn_min_interval_ms=30, conn_max_interval_ms=30)
+        received = []
+        device.register_data_handler(lambda epoch, acc, gyro: received.append(time.perf_counter()))
+        try:
+            assert device.connect()
+            device.start(buzz=False)
+            time.sleep(0.5)
+            device.stop()
+        finally:
+            device.close()
+
+        # About three 100 Hz samples per 30 ms connection event: far fewer bursts than samples
+        bursts = 1 + int(np.sum(np.diff(received) > 0.005))
+        assert len(received) >= 30
+        assert bursts <= len(received) / 2
+
+
+class TestSimulatedDisconnects:
+    """A dropped link goes through the real disconnect handler and reconnect."""
+
+    def test_dropped_link_reconnects_and_resumes_streaming(self, sdk, make_device, posted):
+        device = make_device()
+        try:
+            assert device.connect()
+            device.start(buzz=False)
+            assert _wait_for(lambda: device.n_samples_streamed > 0)
+
+            sdk.drop(MAC)
+            assert _wait_for(lambda: sdk.n_connects == 3)  # attempt_reconnect connected again
+            n_after_drop = device.n_samples_streamed
+            assert _wait_for(lambda: device.n_samples_streamed > n_after_drop + 10)
+            assert device.streaming
+        finally:
+            device.close()
+
+        assert any(type(msg.body).__name__ == "MbientDisconnected" for msg in posted)
+
+    def test_spontaneous_drops_are_injected_while_streaming(self, posted, mbient_mod, make_device):
+        with installed(SimulatedMetaWear(macs=[MAC], disconnects_per_min=300, seed=1), mbient_mod) as backend:
+            device = make_device()
+            try:
+                assert device.connect()
+                n_disconnects, n_connects = backend.n_disconnects, backend.n_connects
+                device.start(buzz=False)
+                assert _wait_for(lambda: backend.n_disconnects > n_disconnects)
+                backend.disconnects_per_min = 0
+                assert _wait_for(lambda: backend.n_connects > n_connects)
+                n_after_drop = device.n_samples_streamed
+                assert _wait_for(lambda: device.n_samples_streamed > n_after_drop + 10)  # Reconnect completed
+            finally:
+                device.close()
+
+
+def test_distributions():
+    rng = np.random.default_rng(0)
+    assert Distribution("fixed", 0.2).draw(rng) == 0.2
+    assert all(0.1 <= Distribution("uniform", 0.1, 0.3).draw(rng) <= 0.3 for _ in range(100))
+    lognormal = [Distribution("lognormal", 0.05, 0.5).draw(rng) for _ in range(2000)]
+    assert np.median(lognormal) == pytest.approx(0.05, rel=0.1)
+    with pytest.raises(ValueError):
+        Distribution("gamma", 1.0).draw(rng)
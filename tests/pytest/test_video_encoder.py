@@ -0,0 +1,202 @@
+"""Tests for the thread and encoder-process video back-ends (neurobooth_os/iout/video_encoder.py)."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from neurobooth_os.iout.video_encoder import (
+    EncoderProcess,
+    ThreadEncoder,
+    VideoEncoderException,
+    make_video_encoder,
+)
+
+SIZE = (6, 4)  # (width, height)
+
+
+class _TextWriter:
+    """Picklable stand-in for cv2.VideoWriter: writes the first pixel of each frame as a line of text."""
+
+    def __init__(self, path, fourcc, fps, frame_size):
+        self.frame_size = frame_size
+        self.f = open(path, "w")
+
+    def write(self, frame):
+        assert frame.shape == (self.frame_size[1], self.frame_size[0], 3)
+        self.f.write(f"{frame[0, 0, 0]}\n")
+
+    def release(self):
+        self.f.close()
+
+
+class _StuckWriter(_TextWriter):
+    def write(self, frame):
+        time.sleep(30)
+
+
+def _text_writer(path, fourcc, fps, frame_size):
+    if fourcc == "FAIL":
+        raise RuntimeError("no such codec")
+    if fourcc == "STUCK":
+        return _StuckWriter(path, fourcc, fps, frame_size)
+    return _TextWriter(path, fourcc, fps, frame_size)
+
+
+def _frame(value, size=SIZE):
+    return np.full((size[1], size[0], 3), value, dtype=np.uint8)
+
+
+def _written(path):
+    return [int(line) for line in path.read_text().split()]
+
+
+@pytest.fixture(params=[ThreadEncoder, EncoderProcess])
+def encoder(request):
+    enc = request.param(4, writer_factory=_text_writer, name="test_encoder")
+    yield enc
+    enc.shutdown()
+
+
+def test_round_trip_in_order(encoder, tmp_path):
+    path = tmp_path / "a.avi"
+    encoder.open(str(path), "MJPG", 30, SIZE)
+    for i in range(20):
+        assert encoder.put(_frame(i), i, timeout=5)
+    stats = encoder.close_file()
+    assert _written(path) == list(range(20))
+    assert stats["frames_written"] == 20 and stats["frames_dropped"] == 0
+    assert stats["backend"] == encoder.backend
+
+
+def test_reopen_with_new_frame_size(encoder, tmp_path):
+    encoder.open(str(tmp_path / "a.avi"), "MJPG", 30, SIZE)
+    encoder.put(_frame(1), timeout=5)
+    encoder.close_file()
+
+    path = tmp_path / "b.avi"
+    encoder.open(str(path), "MJPG", 30, (8, 2))
+    encoder.put(_frame(7, (8, 2)), timeout=5)
+    stats = encoder.close_file()
+    assert _written(path) == [7]
+    assert stats["frames_queued"] == 1
+
+
+def test_drop_newest_when_encoder_stalls(tmp_path):
+    gate = threading.Event()
+
+    class _StalledWriter(_TextWriter):
+        def write(self, frame):
+            gate.wait(5)
+            super().write(frame)
+
+    enc = ThreadEncoder(2, policy="drop_newest", writer_factory=_StalledWriter)
+    path = tmp_path / "a.avi"
+    enc.open(str(path), "MJPG", 30, SIZE)
+    accepted = [enc.put(_frame(i), timeout=5) for i in range(5)]
+    gate.set()
+    stats = enc.close_file()
+    # One frame is held by the stalled writer and one is queued; later frames are dropped, never queued ones
+    assert accepted == [True, True, False, False, False]
+    assert _written(path) == [0, 1]
+    assert stats["frames_dropped"] == 3
+
+
+def test_thread_encoder_load_reports_backlog_and_encode_time(tmp_path):
+    gate = threading.Event()
+
+    class _StalledWriter(_TextWriter):
+        def write(self, frame):
+            gate.wait(5)
+            super().write(frame)
+
+    enc = ThreadEncoder(4, writer_factory=_StalledWriter)
+    assert enc.load() == (0.0, None)
+    enc.open(str(tmp_path / "a.avi"), "MJPG", 30, SIZE)
+    for i in range(3):
+        enc.put(_frame(i), timeout=5)
+    fill, encode_ms = enc.load()
+    assert fill >= 0.5 and encode_ms is None  # Nothing has finished encoding yet
+    gate.set()
+    enc.close_file()
+    assert enc.load()[1] is not None
+
+
+def test_open_error_is_raised(encoder, tmp_path):
+    with pytest.raises(VideoEncoderException):
+        encoder.open(str(tmp_path / "a.avi"), "FAIL", 30, SIZE)
+
+
+def test_process_survives_between_files_and_shuts_down(tmp_path):
+    enc = EncoderProcess(2, writer_factory=_text_writer)
+    for name in ("a.avi", "b.avi"):
+        enc.open(str(tmp_path / name), "MJPG", 30, SIZE)
+        first = enc._process
+        enc.put(_frame(3), timeout=5)
+        enc.close_file()
+    assert enc._process is first
+    enc.shutdown()
+    assert not first.is_alive()
+    assert enc._shm is None
+
+
+def test_thread_encoder_refuses_a_new_file_until_a_late_close_finishes(tmp_path):
+    gate = threading.Event()
+    released = []
+
+    class _StalledWriter(_TextWriter):
+        def write(self, frame):
+            gate.wait(5)
+            super().write(frame)
+
+        def release(self):
+            super().release()
+            released.append(self)
+
+    enc = ThreadEncoder(4, writer_factory=_StalledWriter)
+    a = tmp_path / "a.avi"
+    enc.open(str(a), "MJPG", 30, SIZE)
+    for i in range(3):
+        enc.put(_frame(i), timeout=5)
+    enc.close_file(timeout=0.2)
+    # The save thread still owns the writer and the ring
+    assert not released
+    with pytest.raises(VideoEncoderException):
+        enc.open(str(tmp_path / "b.avi"), "MJPG", 30, SIZE)
+
+    gate.set()
+    enc._thread.join(5)
+    assert len(released) == 1 and _written(a) == [0, 1, 2]
+    b = tmp_path / "b.avi"
+    enc.open(str(b), "MJPG", 30, SIZE)
+    enc.put(_frame(7), timeout=5)
+    enc.close_file()
+    assert _written(b) == [7]
+
+
+def test_process_is_replaced_after_close_times_out(tmp_path):
+    enc = EncoderProcess(2, writer_factory=_text_writer)
+    try:
+        enc.open(str(tmp_path / "a.avi"), "STUCK", 30, SIZE)
+        stuck = enc._process
+        enc.put(_frame(1), timeout=5)
+        stats = enc.close_file(timeout=0.5)
+        assert "closed" in stats["last_error"]
+        assert not stuck.is_alive()
+
+        # The stuck process can no longer read the slots put() reuses
+        path = tmp_path / "b.avi"
+        enc.open(str(path), "MJPG", 30, SIZE)
+        assert enc._process is not stuck
+        for i in range(5):
+            assert enc.put(_frame(i), timeout=5)
+        enc.close_file()
+        assert _written(path) == list(range(5))
+    finally:
+        enc.shutdown()
+
+
+def test_make_video_encoder_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        make_video_encoder("gpu", 4)